@@ -63,15 +63,22 @@ clip_too_short() {
   if ! awk -v min="$MIN_CLIP_SECONDS" 'BEGIN { exit !(min > 0) }'; then
     return 1
   fi
-  if ! command -v ffprobe >/dev/null 2>&1; then
-    if [[ "$FFPROBE_WARNED" -eq 0 ]]; then
-      log_journal "[encode] ffprobe unavailable; cannot enforce min clip seconds"
-      FFPROBE_WARNED=1
+  local duration=""
+  if [[ -n "$PYTHON_BIN" ]]; then
+    # Reads the Ogg granule / WAV data size in-process; -S skips site start-up
+    # because the reader only needs the standard library.
+    duration=$("$PYTHON_BIN" -S -m lib.audio_duration "$path" 2>/dev/null || true)
+  fi
+  if [[ -z "$duration" ]]; then
+    if ! command -v ffprobe >/dev/null 2>&1; then
+      if [[ "$FFPROBE_WARNED" -eq 0 ]]; then
+        log_journal "[encode] ffprobe unavailable; cannot enforce min clip seconds"
+        FFPROBE_WARNED=1
+      fi
+      return 1
     fi
-    return 1
+    duration=$(ffprobe -hide_banner -loglevel error -show_entries format=duration -of default=noprint_wrappers=1:nokey=1 "$path" 2>/dev/null | head -n 1 || true)
   fi
-  local duration
-  duration=$(ffprobe -hide_banner -loglevel error -show_entries format=duration -of default=noprint_wrappers=1:nokey=1 "$path" 2>/dev/null | head -n 1 || true)
   if [[ -z "$duration" ]]; then
     return 1
   fi
@@ -169,14 +176,15 @@ preserve_original_wav() {
     return 1
   fi
 
+  # Compacted originals are stored as FLAC under the same name.
   local candidate="${dest_dir}/${base_name}.wav"
-  if [[ -e "$candidate" ]]; then
+  if [[ -e "$candidate" || -e "${candidate%.wav}.flac" ]]; then
     local suffix=1
-    while [[ -e "$candidate" && $suffix -lt 100 ]]; do
+    while [[ ( -e "$candidate" || -e "${candidate%.wav}.flac" ) && $suffix -lt 100 ]]; do
       candidate="${dest_dir}/${base_name}.${suffix}.wav"
       suffix=$((suffix + 1))
     done
-    if [[ -e "$candidate" ]]; then
+    if [[ -e "$candidate" || -e "${candidate%.wav}.flac" ]]; then
       candidate="${dest_dir}/${base_name}.$(date +%s).wav"
     fi
   fi
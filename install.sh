@@ -19,7 +19,7 @@ DEV_SENTINEL="$BASE/.dev-mode"
 VOICECARD_DIR="$SCRIPT_DIR/drivers/seeed-voicecard"
 VOICECARD_INSTALL="$VOICECARD_DIR/install.sh"
 
-UNITS=(voice-recorder.service web-streamer.service sd-card-monitor.service dropbox.service dropbox.path tmpfs-guard.service tmpfs-guard.timer tricorder-auto-update.service tricorder-auto-update.timer tricorder-audio-restore.service tricorder.target)
+UNITS=(voice-recorder.service web-streamer.service sd-card-monitor.service dropbox.service dropbox.path archival.service original-compaction.service tmpfs-guard.service tmpfs-guard.timer tricorder-auto-update.service tricorder-auto-update.timer tricorder-audio-restore.service tricorder.target)
 
 say(){ echo "[Tricorder] $*"; }
 
@@ -482,7 +482,7 @@ if [[ "${DEV:-0}" != "1" ]]; then
   rm -f "$DEV_SENTINEL"
   say "Enable, reload, and restart Systemd units"
   sudo systemctl daemon-reload
-  for unit in voice-recorder.service web-streamer.service sd-card-monitor.service dropbox.service tmpfs-guard.service tricorder-auto-update.service tricorder-audio-restore.service; do
+  for unit in voice-recorder.service web-streamer.service sd-card-monitor.service dropbox.service archival.service original-compaction.service tmpfs-guard.service tricorder-auto-update.service tricorder-audio-restore.service; do
       sudo systemctl enable "$unit" || true
   done
   for timer in tmpfs-guard.timer tricorder-auto-update.timer; do
@@ -519,6 +519,7 @@ else
   restart_if_active voice-recorder.service
   restart_if_active dropbox.service
   restart_if_active dropbox.path
+  restart_if_active archival.service
 fi
 
 say "Install complete"
@@ -1,50 +1,206 @@
 #!/usr/bin/env python3
-"""Archival upload helpers for Tricorder recordings."""
+"""Archival upload helpers for Tricorder recordings.
+
+Backends whose uploads are worth batching (``queued = True``: rsync and the
+network share) are not uploaded from the encoder: :func:`upload_paths`
+appends the files to :class:`lib.archival_journal.ArchivalJournal` and
+``lib.archival_service`` delivers them with :func:`deliver_paths`.
+
+Network-share copies run on a small thread pool. Each file is written to a
+hidden ``.<name>.partial`` beside its destination, fsynced and renamed into
+place, so the share never shows a truncated recording. A partial left by an
+interrupted copy is resumed from where it stopped when the source still has
+the size and mtime recorded beside it (``.<name>.partial.source``); otherwise
+it is copied again from the start. With
+``archival_service.verify_copies`` the finished copy is read back from the
+share and compared with the source before it is renamed.
+"""
 from __future__ import annotations
 
 import argparse
+import os
 import shlex
 import shutil
+import sqlite3
 import subprocess
-from dataclasses import dataclass
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
 from pathlib import Path
 from collections.abc import Iterable, Sequence
 
+from lib.archival_journal import ArchivalJournal
+from lib.archival_schedule import ArchivalSchedule, TokenBucket
 from lib.config import get_cfg
+from lib.content_index import ContentIndex, archive_scope, file_digest
+
+# rsync exit codes for transfers that stopped partway; the files it reported
+# are complete and the rest are retried.
+_RSYNC_PARTIAL_CODES = {23, 24}
+
+COPY_BLOCK_BYTES = 1 << 20
+# Smaller pieces under a bandwidth cap keep the rate smooth on a slow link.
+THROTTLED_BLOCK_BYTES = 64 << 10
+PARTIAL_PREFIX = "."
+PARTIAL_SUFFIX = ".partial"
+# Size and mtime of the source a partial was started from.
+PARTIAL_SOURCE_SUFFIX = ".source"
+
+
+@dataclass
+class BatchResult:
+    done: list[Path] = field(default_factory=list)
+    failed: dict[Path, str] = field(default_factory=dict)
+    missing: list[Path] = field(default_factory=list)
+    uploaded_bytes: int = 0
 
 
 class _ArchivalPlugin:
     """Minimal protocol for archival backends."""
 
-    def upload(self, path: Path) -> None:  # pragma: no cover - interface only
+    recordings_dir: Path
+    queued = False
+
+    @property
+    def destination_key(self) -> str:  # pragma: no cover - interface only
+        raise NotImplementedError
+
+    def upload(self, path: Path) -> bool:  # pragma: no cover - interface only
         raise NotImplementedError
 
+    def upload_batch(self, paths: Sequence[Path]) -> BatchResult:
+        result = BatchResult()
+        for path in paths:
+            if self.upload(path):
+                result.done.append(path)
+            else:
+                result.failed[path] = "upload failed"
+        return result
+
+    def close(self) -> None:
+        """Release connections held between batches."""
+
+    def delivered(self, relative: Path) -> bool:
+        """Whether a copy recorded at ``relative`` can be trusted to still exist."""
+
+        return True
+
+    def link(self, existing: Path, relative: Path) -> bool:
+        """Place ``relative`` from an identical copy already at ``existing``."""
+
+        return False
+
 
 @dataclass
 class _NetworkShareUploader(_ArchivalPlugin):
     recordings_dir: Path
     target_dir: Path
+    workers: int = 2
+    verify: bool = False
+    # Shared by all copy workers; ``None`` copies at full speed.
+    throttle: TokenBucket | None = field(default=None, compare=False, repr=False)
 
-    def upload(self, path: Path) -> None:
-        if not path.exists():
-            print(f"[archival] skip missing file: {path}", flush=True)
-            return
+    queued = True
+
+    @property
+    def destination_key(self) -> str:
+        return str(self.target_dir)
+
+    def _copy(self, path: Path) -> int:
+        """Copy ``path`` onto the share; returns the bytes written."""
 
         relative = _relative_to_recordings(path, self.recordings_dir)
         dest = self.target_dir / relative
+        dest.parent.mkdir(parents=True, exist_ok=True)
+        partial = dest.with_name(f"{PARTIAL_PREFIX}{dest.name}{PARTIAL_SUFFIX}")
+        source_record = partial.with_name(f"{partial.name}{PARTIAL_SOURCE_SUFFIX}")
+        stat = path.stat()
+        size = stat.st_size
+        version = _source_version(stat)
         try:
-            dest.parent.mkdir(parents=True, exist_ok=True)
-        except OSError as exc:
-            print(f"[archival] failed to create directories for {dest}: {exc}", flush=True)
-            return
-
+            # A partial of an older version of the file must not be extended.
+            offset = partial.stat().st_size if source_record.read_text() == version else 0
+        except (OSError, ValueError):
+            offset = 0
+        if offset > size:
+            offset = 0
+        if not offset:
+            source_record.write_text(version)
+
+        with open(path, "rb") as src, open(partial, "r+b" if offset else "wb") as out:
+            out.seek(offset)
+            _copy_range(src, out, offset, self.throttle)
+            out.truncate()
+            os.fsync(out.fileno())
+
+        if self.verify and file_digest(path) != _reread_digest(partial):
+            partial.unlink(missing_ok=True)
+            source_record.unlink(missing_ok=True)
+            raise OSError(f"checksum mismatch after copying to {dest}")
+        shutil.copystat(path, partial)
+        os.replace(partial, dest)
+        source_record.unlink(missing_ok=True)
+        _fsync_dir(dest.parent)
+        if offset:
+            print(f"[archival] resumed {path} -> {dest} at byte {offset}", flush=True)
+        else:
+            print(f"[archival] copied {path} -> {dest}", flush=True)
+        return size - offset
+
+    def upload(self, path: Path) -> bool:
+        if not path.exists():
+            print(f"[archival] skip missing file: {path}", flush=True)
+            return False
         try:
-            shutil.copy2(path, dest)
+            self._copy(path)
         except OSError as exc:
-            print(f"[archival] copy failed for {path} -> {dest}: {exc}", flush=True)
-            return
-
-        print(f"[archival] copied {path} -> {dest}", flush=True)
+            print(f"[archival] copy failed for {path}: {exc}", flush=True)
+            return False
+        return True
+
+    def upload_batch(self, paths: Sequence[Path]) -> BatchResult:
+        """Copy ``paths`` on up to :attr:`workers` threads."""
+
+        result = BatchResult()
+        present = []
+        for path in paths:
+            if path.exists():
+                present.append(path)
+            else:
+                result.missing.append(path)
+        if not present:
+            return result
+
+        workers = max(1, min(int(self.workers), len(present)))
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="archival-copy") as pool:
+            futures = [(path, pool.submit(self._copy, path)) for path in present]
+            for path, future in futures:
+                try:
+                    result.uploaded_bytes += future.result()
+                except OSError as exc:
+                    print(f"[archival] copy failed for {path}: {exc}", flush=True)
+                    result.failed[path] = str(exc)
+                else:
+                    result.done.append(path)
+        return result
+
+    def delivered(self, relative: Path) -> bool:
+        return (self.target_dir / relative).is_file()
+
+    def link(self, existing: Path, relative: Path) -> bool:
+        source = self.target_dir / existing
+        dest = self.target_dir / relative
+        if not source.is_file():
+            return False
+        try:
+            dest.parent.mkdir(parents=True, exist_ok=True)
+            if dest.exists():
+                dest.unlink()
+            os.link(source, dest)
+        except OSError:
+            return False
+        print(f"[archival] linked {dest} to identical {source}", flush=True)
+        return True
 
 
 @dataclass
@@ -54,37 +210,147 @@ class _RsyncUploader(_ArchivalPlugin):
     options: Sequence[str]
     ssh_identity: str | None
     ssh_options: Sequence[str]
+    # Directory for the multiplexed SSH master socket; ``None`` opens a new
+    # connection per rsync run.
+    control_dir: Path | None = None
+    control_persist: int = 600
+    # KiB/s passed as --bwlimit unless ``options`` already set one.
+    bwlimit_kib: int = 0
 
-    def upload(self, path: Path) -> None:
-        if not path.exists():
-            print(f"[archival] skip missing file: {path}", flush=True)
-            return
+    queued = True
 
-        relative = _relative_to_recordings(path, self.recordings_dir)
-        remote_path = f"{self.destination.rstrip('/')}/{relative.as_posix()}"
+    @property
+    def destination_key(self) -> str:
+        return self.destination.rstrip("/")
 
-        cmd = ["rsync", *self.options]
+    def _remote_shell(self) -> str:
         ssh_cmd = ["ssh", "-oBatchMode=yes"]
         if self.ssh_identity:
             ssh_cmd.extend(["-i", self.ssh_identity])
+        if self.control_dir is not None:
+            ssh_cmd.extend(
+                [
+                    "-oControlMaster=auto",
+                    f"-oControlPath={self.control_dir / '%C'}",
+                    f"-oControlPersist={int(self.control_persist)}",
+                ]
+            )
         ssh_cmd.extend(self.ssh_options)
-        remote_shell = shlex.join(ssh_cmd)
-        cmd.extend(["-e", remote_shell, "--", str(path), remote_path])
+        return shlex.join(ssh_cmd)
+
+    def _rsync_options(self) -> list[str]:
+        options = list(self.options)
+        if self.bwlimit_kib and not any(str(opt).startswith("--bwlimit") for opt in options):
+            options.append(f"--bwlimit={int(self.bwlimit_kib)}")
+        return options
+
+    def _remote_host(self) -> str | None:
+        host, sep, _path = self.destination.partition(":")
+        if not sep or not host or "/" in host:
+            return None
+        return host
+
+    def upload_batch(self, paths: Sequence[Path]) -> BatchResult:
+        """Send ``paths`` in one ``rsync --files-from`` run."""
+
+        result = BatchResult()
+        root = self.recordings_dir.resolve()
+        relatives: dict[str, Path] = {}
+        for path in paths:
+            try:
+                relatives[path.resolve().relative_to(root).as_posix()] = path
+            except ValueError:
+                # Outside the recordings tree: keep the old one-file upload.
+                if self.upload(path):
+                    result.done.append(path)
+                else:
+                    result.failed[path] = "upload failed"
+        if not relatives:
+            return result
+
+        with tempfile.NamedTemporaryFile("wb", prefix="archival-", suffix=".list") as listing:
+            listing.write(b"\0".join(name.encode("utf-8") for name in relatives))
+            listing.flush()
+            cmd = [
+                "rsync",
+                *self._rsync_options(),
+                "--from0",
+                f"--files-from={listing.name}",
+                "--out-format=%n",
+                "-e",
+                self._remote_shell(),
+                "--",
+                f"{root}/",
+                f"{self.destination.rstrip('/')}/",
+            ]
+            try:
+                completed = subprocess.run(cmd, capture_output=True, text=True, check=False)
+            except FileNotFoundError:
+                error = "rsync not available"
+                result.failed.update({path: error for path in relatives.values()})
+                return result
+
+        if completed.returncode == 0:
+            transferred = set(relatives)
+        else:
+            transferred = set()
+            if completed.returncode in _RSYNC_PARTIAL_CODES:
+                transferred = {line.strip() for line in (completed.stdout or "").splitlines()}
+        error = (completed.stderr or "").strip().splitlines()
+        reason = error[-1] if error else f"rsync exited with {completed.returncode}"
+        for name, path in relatives.items():
+            if name in transferred:
+                result.done.append(path)
+                try:
+                    result.uploaded_bytes += path.stat().st_size
+                except OSError:
+                    pass
+            else:
+                result.failed[path] = reason
+        if result.failed:
+            print(
+                f"[archival] rsync failed ({completed.returncode}) for "
+                f"{len(result.failed)} of {len(relatives)} file(s): {reason}",
+                flush=True,
+            )
+        return result
+
+    def close(self) -> None:
+        host = self._remote_host()
+        if self.control_dir is None or host is None:
+            return
+        cmd = ["ssh", f"-oControlPath={self.control_dir / '%C'}", "-O", "exit", host]
+        try:
+            subprocess.run(cmd, capture_output=True, check=False, timeout=10)
+        except (OSError, subprocess.SubprocessError):
+            pass
+
+    def upload(self, path: Path) -> bool:
+        if not path.exists():
+            print(f"[archival] skip missing file: {path}", flush=True)
+            return False
+
+        relative = _relative_to_recordings(path, self.recordings_dir)
+        remote_path = f"{self.destination.rstrip('/')}/{relative.as_posix()}"
+
+        cmd = ["rsync", *self._rsync_options()]
+        cmd.extend(["-e", self._remote_shell(), "--", str(path), remote_path])
 
         try:
             subprocess.run(cmd, check=True)
         except FileNotFoundError:
             print("[archival] rsync not available", flush=True)
-            return
+            return False
         except subprocess.CalledProcessError as exc:
             print(f"[archival] rsync failed ({exc.returncode}) for {path}", flush=True)
             if exc.stdout:
                 print(exc.stdout, flush=True)
             if exc.stderr:
                 print(exc.stderr, flush=True)
-            return
+            return False
 
         print(f"[archival] rsynced {path} -> {remote_path}", flush=True)
+        return True
 
 
 def _relative_to_recordings(path: Path, recordings_dir: Path) -> Path:
@@ -94,6 +360,80 @@ def _relative_to_recordings(path: Path, recordings_dir: Path) -> Path:
         return Path(path.name)
 
 
+def _source_version(stat: os.stat_result) -> str:
+    return f"{stat.st_size} {stat.st_mtime_ns}\n"
+
+
+def _copy_range(src, out, offset: int, throttle: TokenBucket | None = None) -> None:
+    """Copy ``src`` from ``offset`` to the end into ``out`` at its position."""
+
+    block = COPY_BLOCK_BYTES if throttle is None else THROTTLED_BLOCK_BYTES
+    if hasattr(os, "sendfile"):
+        try:
+            while True:
+                sent = os.sendfile(out.fileno(), src.fileno(), offset, block)
+                if not sent:
+                    return
+                offset += sent
+                if throttle is not None:
+                    throttle.consume(sent)
+        except OSError:
+            # Filesystems without sendfile support fall back to plain reads;
+            # the output position still matches ``offset``.
+            out.seek(offset)
+    src.seek(offset)
+    while True:
+        data = src.read(block)
+        if not data:
+            break
+        out.write(data)
+        if throttle is not None:
+            throttle.consume(len(data))
+    out.flush()
+
+
+def _reread_digest(path: Path) -> str:
+    """Digest of ``path`` as stored, not as still cached from the write."""
+
+    if hasattr(os, "posix_fadvise"):
+        try:
+            fd = os.open(path, os.O_RDONLY)
+            try:
+                os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_DONTNEED)
+            finally:
+                os.close(fd)
+        except OSError:
+            pass
+    return file_digest(path)
+
+
+def _fsync_dir(directory: Path) -> None:
+    try:
+        fd = os.open(directory, os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+
+def _control_dir(raw: object) -> Path | None:
+    text = str(raw or "").strip()
+    if not text:
+        return None
+    for candidate in (Path(text), Path(tempfile.gettempdir()) / "tricorder-archival-ssh"):
+        try:
+            candidate.mkdir(mode=0o700, parents=True, exist_ok=True)
+        except OSError:
+            continue
+        if os.access(candidate, os.W_OK):
+            return candidate
+    return None
+
+
 def _load_plugin() -> _ArchivalPlugin | None:
     cfg = get_cfg()
     arch_cfg = cfg.get("archival") or {}
@@ -102,13 +442,25 @@ def _load_plugin() -> _ArchivalPlugin | None:
 
     recordings_dir = Path(cfg.get("paths", {}).get("recordings_dir", ".")).resolve()
     backend = str(arch_cfg.get("backend", "network_share")).strip().lower()
+    service_cfg = cfg.get("archival_service") or {}
+    schedule = ArchivalSchedule.from_cfg(cfg)
 
     if backend == "network_share":
         target = str(arch_cfg.get("network_share", {}).get("target_dir", "")).strip()
         if not target:
             print("[archival] network_share backend requires archival.network_share.target_dir", flush=True)
             return None
-        return _NetworkShareUploader(recordings_dir=recordings_dir, target_dir=Path(target).resolve())
+        try:
+            workers = max(1, int(service_cfg.get("copy_workers", 2)))
+        except (TypeError, ValueError):
+            workers = 2
+        return _NetworkShareUploader(
+            recordings_dir=recordings_dir,
+            target_dir=Path(target).resolve(),
+            workers=workers,
+            verify=bool(service_cfg.get("verify_copies", False)),
+            throttle=schedule.token_bucket(),
+        )
 
     if backend == "rsync":
         rsync_cfg = arch_cfg.get("rsync", {}) or {}
@@ -131,12 +483,86 @@ def _load_plugin() -> _ArchivalPlugin | None:
             options=list(options) or ["-az"],
             ssh_identity=ssh_identity,
             ssh_options=list(ssh_options),
+            control_dir=_control_dir(service_cfg.get("ssh_control_dir")),
+            control_persist=int(service_cfg.get("ssh_control_persist_seconds", 600)),
+            bwlimit_kib=schedule.rsync_bwlimit,
         )
 
     print(f"[archival] unknown backend: {backend}", flush=True)
     return None
 
 
+def deliver_paths(
+    plugin: _ArchivalPlugin,
+    index: ContentIndex,
+    paths: Sequence[Path],
+) -> BatchResult:
+    """Upload ``paths`` unless the destination already holds the same bytes.
+
+    Content delivered to the same relative path is skipped; content already
+    delivered under another name is linked there when the backend can. The
+    rest goes to the backend in one :meth:`_ArchivalPlugin.upload_batch`.
+    """
+
+    result = BatchResult()
+    scope = archive_scope(plugin.destination_key)
+    digests: dict[Path, tuple[str, int]] = {}
+    pending: list[Path] = []
+    for path in paths:
+        if not path.exists():
+            print(f"[archival] skip missing file: {path}", flush=True)
+            result.missing.append(path)
+            continue
+        relative = _relative_to_recordings(path, plugin.recordings_dir)
+        try:
+            digest = file_digest(path)
+            digests[path] = (digest, path.stat().st_size)
+            record = index.lookup(digest, scope)
+        except (OSError, sqlite3.Error) as exc:
+            print(f"[archival] content index unavailable for {path}: {exc}", flush=True)
+            pending.append(path)
+            continue
+        if record is not None:
+            if relative.as_posix() in record.outputs and plugin.delivered(relative):
+                print(f"[archival] skip {path}: identical copy already archived", flush=True)
+                result.done.append(path)
+                continue
+            if any(
+                plugin.link(Path(existing), relative)
+                for existing in record.outputs
+                if existing != relative.as_posix()
+            ):
+                result.done.append(path)
+                _record_delivery(index, scope, path, relative, digests[path])
+                continue
+        pending.append(path)
+
+    if pending:
+        uploaded = plugin.upload_batch(pending)
+        result.failed.update(uploaded.failed)
+        result.missing.extend(uploaded.missing)
+        result.uploaded_bytes += uploaded.uploaded_bytes
+        for path in uploaded.done:
+            result.done.append(path)
+            if path in digests:
+                relative = _relative_to_recordings(path, plugin.recordings_dir)
+                _record_delivery(index, scope, path, relative, digests[path])
+    return result
+
+
+def _record_delivery(
+    index: ContentIndex,
+    scope: str,
+    path: Path,
+    relative: Path,
+    digest: tuple[str, int],
+) -> None:
+    try:
+        index.add_output(digest[0], scope, relative.as_posix(), size=digest[1])
+    except sqlite3.Error as exc:
+        print(f"[archival] failed to record {path} in content index: {exc}", flush=True)
+
+
 def upload_paths(raw_paths: Iterable[str]) -> None:
     arch_cfg = (get_cfg().get("archival") or {}).copy()
     include_waveforms = bool(arch_cfg.get("include_waveform_sidecars", False))
@@ -146,6 +572,7 @@ def upload_paths(raw_paths: Iterable[str]) -> None:
     if not plugin:
         return
 
+    selected: list[Path] = []
     for raw_path in raw_paths:
         path = Path(raw_path)
         if not path.exists():
@@ -156,7 +583,21 @@ def upload_paths(raw_paths: Iterable[str]) -> None:
                 continue
             if path.name.endswith(".transcript.json") and not include_transcripts:
                 continue
-        plugin.upload(path)
+        selected.append(path)
+    if not selected:
+        return
+
+    if plugin.queued:
+        journal = ArchivalJournal(plugin.recordings_dir)
+        try:
+            journal.enqueue(selected)
+        except sqlite3.Error as exc:
+            print(f"[archival] failed to queue uploads, sending inline: {exc}", flush=True)
+        else:
+            print(f"[archival] queued {len(selected)} file(s) for archival.service", flush=True)
+            return
+
+    deliver_paths(plugin, ContentIndex(plugin.recordings_dir), selected)
 
 
 def main() -> None:
@@ -0,0 +1,281 @@
+"""Persistent upload journal for the archival service.
+
+``encode_and_store.sh`` used to upload each finished recording inline, so a
+network blip lost the upload for good. It now only appends the files to this
+journal (:func:`lib.archival.upload_paths`), and ``lib.archival_service``
+drains it in batches. A job stays in the journal until its upload succeeds;
+every failure pushes its next attempt back exponentially, from
+``retry_base`` up to ``retry_max`` seconds.
+
+The journal also keeps running totals (files, bytes and seconds spent
+uploading) so the service can report throughput and backlog.
+
+The database lives in the recordings root (``.archival_journal.sqlite3``);
+SQLite keeps concurrent writers (several encoder processes enqueueing while
+the service completes jobs) consistent.
+"""
+
+from __future__ import annotations
+
+import contextlib
+import sqlite3
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Iterable, Iterator
+
+JOURNAL_FILENAME = ".archival_journal.sqlite3"
+SCHEMA_VERSION = 1
+
+_SCHEMA = (
+    """
+    CREATE TABLE IF NOT EXISTS jobs (
+        path TEXT PRIMARY KEY,
+        enqueued_at REAL NOT NULL,
+        attempts INTEGER NOT NULL DEFAULT 0,
+        next_attempt REAL NOT NULL,
+        last_error TEXT
+    )
+    """,
+    "CREATE INDEX IF NOT EXISTS jobs_by_due ON jobs (next_attempt, enqueued_at)",
+    "CREATE TABLE IF NOT EXISTS totals (key TEXT PRIMARY KEY, value REAL NOT NULL)",
+    "INSERT OR IGNORE INTO totals (key, value) VALUES ('files', 0), ('bytes', 0), ('seconds', 0)",
+)
+
+
+@dataclass(frozen=True)
+class ArchivalJob:
+    path: Path
+    enqueued_at: float
+    attempts: int
+    next_attempt: float
+    last_error: str | None = None
+
+
+@dataclass(frozen=True)
+class JournalStats:
+    pending: int
+    due: int
+    retrying: int
+    oldest_enqueued_at: float | None
+    next_attempt: float | None
+    last_error: str | None
+    files_uploaded: int
+    bytes_uploaded: int
+    seconds_uploading: float
+
+    @property
+    def bytes_per_second(self) -> float:
+        if self.seconds_uploading <= 0:
+            return 0.0
+        return self.bytes_uploaded / self.seconds_uploading
+
+    def as_dict(self) -> dict[str, object]:
+        return {
+            "pending": self.pending,
+            "due": self.due,
+            "retrying": self.retrying,
+            "oldest_enqueued_at": self.oldest_enqueued_at,
+            "next_attempt": self.next_attempt,
+            "last_error": self.last_error,
+            "files_uploaded": self.files_uploaded,
+            "bytes_uploaded": self.bytes_uploaded,
+            "seconds_uploading": round(self.seconds_uploading, 3),
+            "bytes_per_second": round(self.bytes_per_second, 1),
+        }
+
+
+def retry_delay(attempts: int, *, base: float, cap: float) -> float:
+    """Seconds to wait after the ``attempts``-th consecutive failure."""
+
+    exponent = max(0, int(attempts) - 1)
+    return float(min(cap, base * (2 ** min(exponent, 32))))
+
+
+class ArchivalJournal:
+    """Upload jobs keyed by local path."""
+
+    def __init__(self, root: Path, *, path: Path | None = None) -> None:
+        self.root = Path(root)
+        self.path = Path(path) if path is not None else self.root / JOURNAL_FILENAME
+
+    @contextlib.contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        conn = sqlite3.connect(str(self.path), timeout=10.0, isolation_level=None)
+        try:
+            conn.execute("PRAGMA synchronous=NORMAL")
+            version = conn.execute("PRAGMA user_version").fetchone()[0]
+            if version != SCHEMA_VERSION:
+                conn.execute("BEGIN IMMEDIATE")
+                try:
+                    if version:
+                        conn.execute("DROP TABLE IF EXISTS jobs")
+                        conn.execute("DROP TABLE IF EXISTS totals")
+                    for statement in _SCHEMA:
+                        conn.execute(statement)
+                    conn.execute(f"PRAGMA user_version={SCHEMA_VERSION}")
+                    conn.execute("COMMIT")
+                except BaseException:
+                    conn.execute("ROLLBACK")
+                    raise
+            yield conn
+        finally:
+            conn.close()
+
+    @contextlib.contextmanager
+    def _transaction(self) -> Iterator[sqlite3.Connection]:
+        with self._connect() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                yield conn
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+            conn.execute("COMMIT")
+
+    def enqueue(self, paths: Iterable[Path], *, now: float | None = None) -> int:
+        """Add upload jobs; a queued path becomes due again immediately.
+
+        Returns the number of paths that were not queued before.
+        """
+
+        now = time.time() if now is None else now
+        added = 0
+        with self._transaction() as conn:
+            for path in paths:
+                cursor = conn.execute(
+                    "INSERT OR IGNORE INTO jobs (path, enqueued_at, next_attempt) VALUES (?, ?, ?)",
+                    (str(path), now, now),
+                )
+                if cursor.rowcount:
+                    added += 1
+                else:
+                    # Re-enqueued (e.g. a rewritten sidecar): retry it now.
+                    conn.execute(
+                        "UPDATE jobs SET next_attempt = MIN(next_attempt, ?) WHERE path = ?",
+                        (now, str(path)),
+                    )
+        return added
+
+    def due(self, *, limit: int, now: float | None = None) -> list[ArchivalJob]:
+        now = time.time() if now is None else now
+        with self._connect() as conn:
+            rows = conn.execute(
+                """
+                SELECT path, enqueued_at, attempts, next_attempt, last_error FROM jobs
+                WHERE next_attempt <= ?
+                ORDER BY next_attempt, enqueued_at
+                LIMIT ?
+                """,
+                (now, max(0, int(limit))),
+            ).fetchall()
+        return [
+            ArchivalJob(
+                path=Path(path),
+                enqueued_at=float(enqueued_at),
+                attempts=int(attempts),
+                next_attempt=float(next_attempt),
+                last_error=last_error,
+            )
+            for path, enqueued_at, attempts, next_attempt, last_error in rows
+        ]
+
+    def next_due(self) -> float | None:
+        with self._connect() as conn:
+            row = conn.execute("SELECT MIN(next_attempt) FROM jobs").fetchone()
+        return float(row[0]) if row and row[0] is not None else None
+
+    def complete(
+        self,
+        paths: Iterable[Path],
+        *,
+        uploaded_bytes: int = 0,
+        seconds: float = 0.0,
+    ) -> None:
+        """Remove finished jobs and add the batch to the running totals."""
+
+        rows = [(str(path),) for path in paths]
+        with self._transaction() as conn:
+            if rows:
+                conn.executemany("DELETE FROM jobs WHERE path = ?", rows)
+            conn.execute("UPDATE totals SET value = value + ? WHERE key = 'files'", (len(rows),))
+            conn.execute(
+                "UPDATE totals SET value = value + ? WHERE key = 'bytes'",
+                (max(0, int(uploaded_bytes)),),
+            )
+            conn.execute(
+                "UPDATE totals SET value = value + ? WHERE key = 'seconds'",
+                (max(0.0, float(seconds)),),
+            )
+
+    def fail(
+        self,
+        failures: dict[Path, str],
+        *,
+        retry_base: float,
+        retry_max: float,
+        now: float | None = None,
+    ) -> None:
+        """Record failed attempts and schedule each job's next try."""
+
+        now = time.time() if now is None else now
+        with self._transaction() as conn:
+            for path, error in failures.items():
+                row = conn.execute("SELECT attempts FROM jobs WHERE path = ?", (str(path),)).fetchone()
+                if row is None:
+                    continue
+                attempts = int(row[0]) + 1
+                delay = retry_delay(attempts, base=retry_base, cap=retry_max)
+                conn.execute(
+                    "UPDATE jobs SET attempts = ?, next_attempt = ?, last_error = ? WHERE path = ?",
+                    (attempts, now + delay, str(error)[:500], str(path)),
+                )
+
+    def drop(self, paths: Iterable[Path]) -> None:
+        """Forget jobs that can no longer succeed (e.g. the file is gone)."""
+
+        rows = [(str(path),) for path in paths]
+        if not rows:
+            return
+        with self._transaction() as conn:
+            conn.executemany("DELETE FROM jobs WHERE path = ?", rows)
+
+    def stats(self, *, now: float | None = None) -> JournalStats:
+        now = time.time() if now is None else now
+        with self._connect() as conn:
+            pending, due, retrying, oldest, next_attempt = conn.execute(
+                """
+                SELECT COUNT(*),
+                       SUM(CASE WHEN next_attempt <= ? THEN 1 ELSE 0 END),
+                       SUM(CASE WHEN attempts > 0 THEN 1 ELSE 0 END),
+                       MIN(enqueued_at),
+                       MIN(next_attempt)
+                FROM jobs
+                """,
+                (now,),
+            ).fetchone()
+            last_error_row = conn.execute(
+                "SELECT last_error FROM jobs WHERE last_error IS NOT NULL ORDER BY next_attempt DESC LIMIT 1"
+            ).fetchone()
+            totals = dict(conn.execute("SELECT key, value FROM totals"))
+        return JournalStats(
+            pending=int(pending or 0),
+            due=int(due or 0),
+            retrying=int(retrying or 0),
+            oldest_enqueued_at=float(oldest) if oldest is not None else None,
+            next_attempt=float(next_attempt) if next_attempt is not None else None,
+            last_error=last_error_row[0] if last_error_row else None,
+            files_uploaded=int(totals.get("files", 0)),
+            bytes_uploaded=int(totals.get("bytes", 0)),
+            seconds_uploading=float(totals.get("seconds", 0.0)),
+        )
+
+
+__all__ = [
+    "ArchivalJob",
+    "ArchivalJournal",
+    "JOURNAL_FILENAME",
+    "JournalStats",
+    "retry_delay",
+]
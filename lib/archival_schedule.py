@@ -0,0 +1,256 @@
+"""When, and how fast, ``archival.service`` may upload.
+
+Archival shares the Pi's uplink (often Wi-Fi) with the live HLS/WebRTC
+stream and the dashboard. :class:`ArchivalSchedule` gates each batch:
+
+* ``archival_service.windows`` lists ``"HH:MM-HH:MM"`` local-time windows in
+  which uploads may run (a window may wrap past midnight); an empty list
+  allows any time;
+* with ``pause_while_streaming`` no batch starts while a live listener is
+  connected, read from the HLS controller state and the WebRTC listener file
+  that ``web-streamer.service`` keeps in ``paths.tmp_dir``;
+* ``bandwidth_limit_kbps`` (kbit/s, like the recorder's bitrates) caps the
+  transfer rate: rsync gets the matching ``--bwlimit`` in KiB/s and
+  network-share copies draw from a shared :class:`TokenBucket`.
+
+Jobs that are not allowed to run simply stay in the journal; nothing is
+counted as a failed attempt.
+"""
+
+from __future__ import annotations
+
+import datetime as _dt
+import json
+import os
+import threading
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable, Iterable, Mapping, Sequence
+
+from lib.webrtc_buffer import LISTENERS_FILENAME as WEBRTC_LISTENERS_FILENAME
+
+HLS_STATE_RELATIVE = Path("hls") / "controller_state.json"
+WEBRTC_LISTENERS_RELATIVE = Path("webrtc") / WEBRTC_LISTENERS_FILENAME
+
+# The web server rewrites its listener counts every
+# LISTENER_STATE_REFRESH_INTERVAL seconds while anyone is connected; counts
+# older than LISTENER_STATE_MAX_AGE were left behind by a server that stopped
+# without cleaning up.
+LISTENER_STATE_REFRESH_INTERVAL = 60.0
+LISTENER_STATE_MAX_AGE = 3 * LISTENER_STATE_REFRESH_INTERVAL
+
+_MINUTES_PER_DAY = 24 * 60
+DEFAULT_TMP_DIR = Path("/apps/tricorder/tmp")
+
+
+@dataclass(frozen=True)
+class TimeWindow:
+    """Minutes after local midnight; ``end <= start`` wraps past midnight."""
+
+    start: int
+    end: int
+
+    @classmethod
+    def parse(cls, raw: str) -> "TimeWindow":
+        text = str(raw).strip()
+        start_text, sep, end_text = text.partition("-")
+        if not sep:
+            raise ValueError(f"time window must look like HH:MM-HH:MM: {raw!r}")
+        return cls(_parse_clock(start_text), _parse_clock(end_text))
+
+    def contains(self, minute: int) -> bool:
+        if self.start == self.end:
+            return True
+        if self.start < self.end:
+            return self.start <= minute < self.end
+        return minute >= self.start or minute < self.end
+
+    def minutes_until_open(self, minute: int) -> int:
+        if self.contains(minute):
+            return 0
+        return (self.start - minute) % _MINUTES_PER_DAY
+
+    def __str__(self) -> str:
+        return f"{self.start // 60:02d}:{self.start % 60:02d}-{self.end // 60:02d}:{self.end % 60:02d}"
+
+
+def _parse_clock(text: str) -> int:
+    hours_text, sep, minutes_text = text.strip().partition(":")
+    try:
+        hours = int(hours_text)
+        minutes = int(minutes_text) if sep else 0
+    except ValueError:
+        raise ValueError(f"invalid time of day: {text!r}") from None
+    if hours == 24 and minutes == 0:
+        return _MINUTES_PER_DAY
+    if not (0 <= hours < 24 and 0 <= minutes < 60):
+        raise ValueError(f"invalid time of day: {text!r}")
+    return hours * 60 + minutes
+
+
+def parse_windows(raw: object) -> list[TimeWindow]:
+    """Parse configured windows, skipping (and reporting) invalid entries."""
+
+    if isinstance(raw, str):
+        entries: Iterable[object] = [part for part in raw.split(",") if part.strip()]
+    elif isinstance(raw, Sequence):
+        entries = raw
+    else:
+        return []
+    windows: list[TimeWindow] = []
+    for entry in entries:
+        try:
+            window = TimeWindow.parse(str(entry))
+        except ValueError as exc:
+            print(f"[archival] ignoring {exc}", flush=True)
+            continue
+        if window.end == _MINUTES_PER_DAY:
+            window = TimeWindow(window.start, 0)
+        windows.append(window)
+    return windows
+
+
+class TokenBucket:
+    """Thread-safe token bucket; :meth:`consume` blocks until tokens exist.
+
+    ``rate`` bytes are added per second up to ``burst`` bytes. Copy workers
+    share one bucket, so the cap applies to their combined throughput.
+    """
+
+    def __init__(
+        self,
+        rate: float,
+        *,
+        burst: float | None = None,
+        clock: Callable[[], float] = time.monotonic,
+        sleep: Callable[[float], None] = time.sleep,
+    ) -> None:
+        if rate <= 0:
+            raise ValueError("rate must be positive")
+        self.rate = float(rate)
+        self.burst = float(burst) if burst is not None else self.rate
+        self._clock = clock
+        self._sleep = sleep
+        self._tokens = self.burst
+        self._updated = clock()
+        self._lock = threading.Lock()
+
+    def consume(self, amount: float) -> None:
+        remaining = float(amount)
+        while remaining > 0:
+            # Large requests are taken in burst-sized pieces so they still
+            # complete when ``amount`` exceeds the bucket.
+            piece = min(remaining, self.burst)
+            with self._lock:
+                now = self._clock()
+                self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                self._tokens -= piece
+                wait = -self._tokens / self.rate if self._tokens < 0 else 0.0
+            if wait > 0:
+                self._sleep(wait)
+            remaining -= piece
+
+
+def _listener_count(path: Path, now: float) -> int:
+    try:
+        with open(path, "r", encoding="utf-8") as handle:
+            state = json.load(handle)
+    except (OSError, ValueError):
+        return 0
+    if not isinstance(state, Mapping):
+        return 0
+    try:
+        stamp = float(state.get("timestamp") or state.get("last_change_epoch") or 0.0)
+        clients = int(state.get("clients") or 0)
+    except (TypeError, ValueError):
+        return 0
+    sessions = state.get("sessions")
+    if isinstance(sessions, list):
+        clients = max(clients, len(sessions))
+    if now - stamp > LISTENER_STATE_MAX_AGE:
+        return 0
+    return max(0, clients)
+
+
+def live_listeners(tmp_dir: Path, *, now: float | None = None) -> int:
+    """Connected HLS plus WebRTC listeners, as published under ``tmp_dir``."""
+
+    now = time.time() if now is None else now
+    tmp_dir = Path(tmp_dir)
+    return _listener_count(tmp_dir / HLS_STATE_RELATIVE, now) + _listener_count(
+        tmp_dir / WEBRTC_LISTENERS_RELATIVE, now
+    )
+
+
+@dataclass(frozen=True)
+class ArchivalSchedule:
+    windows: tuple[TimeWindow, ...] = ()
+    bandwidth_limit_kbps: int = 0
+    pause_while_streaming: bool = True
+    tmp_dir: Path = DEFAULT_TMP_DIR
+
+    @classmethod
+    def from_cfg(cls, cfg: Mapping[str, object]) -> "ArchivalSchedule":
+        raw = cfg.get("archival_service") or {}
+        if not isinstance(raw, Mapping):
+            raw = {}
+        paths = cfg.get("paths") or {}
+        tmp_dir = os.environ.get("TRICORDER_TMP") or (
+            paths.get("tmp_dir") if isinstance(paths, Mapping) else None
+        )
+        try:
+            limit = max(0, int(raw.get("bandwidth_limit_kbps", 0) or 0))
+        except (TypeError, ValueError):
+            limit = 0
+        return cls(
+            windows=tuple(parse_windows(raw.get("windows"))),
+            bandwidth_limit_kbps=limit,
+            pause_while_streaming=bool(raw.get("pause_while_streaming", True)),
+            tmp_dir=Path(tmp_dir or DEFAULT_TMP_DIR),
+        )
+
+    @property
+    def bytes_per_second(self) -> int:
+        return self.bandwidth_limit_kbps * 1000 // 8
+
+    @property
+    def rsync_bwlimit(self) -> int:
+        """The limit in KiB/s, the unit of rsync ``--bwlimit``; 0 when unlimited."""
+
+        if not self.bandwidth_limit_kbps:
+            return 0
+        return max(1, round(self.bytes_per_second / 1024))
+
+    def token_bucket(self) -> TokenBucket | None:
+        if not self.bandwidth_limit_kbps:
+            return None
+        return TokenBucket(self.bytes_per_second)
+
+    def blocked_reason(self, now: float | None = None) -> str | None:
+        """Why uploads may not start at ``now``, or ``None`` when they may."""
+
+        now = time.time() if now is None else now
+        if self.windows:
+            local = _dt.datetime.fromtimestamp(now)
+            minute = local.hour * 60 + local.minute
+            if not any(window.contains(minute) for window in self.windows):
+                wait = min(window.minutes_until_open(minute) for window in self.windows)
+                return f"outside upload windows ({', '.join(map(str, self.windows))}; next opens in {wait} min)"
+        if self.pause_while_streaming:
+            listeners = live_listeners(self.tmp_dir, now=now)
+            if listeners:
+                return f"{listeners} live listener(s) connected"
+        return None
+
+
+__all__ = [
+    "ArchivalSchedule",
+    "LISTENER_STATE_MAX_AGE",
+    "LISTENER_STATE_REFRESH_INTERVAL",
+    "TimeWindow",
+    "TokenBucket",
+    "live_listeners",
+    "parse_windows",
+]
@@ -0,0 +1,184 @@
+"""In-process duration reader for Ogg Opus and WAV recordings.
+
+Asking ``ffprobe`` for a duration costs a fork/exec plus library start-up,
+which is 100 ms or more on a Pi Zero. Both container formats the recorder
+writes carry their exact length in a few header bytes instead:
+
+* Ogg Opus: the granule position of the last page is the 48 kHz sample count
+  including the OpusHead pre-skip (RFC 7845 section 4), so only the first page
+  and the tail of the file need to be read;
+* WAV: the ``data`` chunk size divided by the ``fmt `` block alignment is the
+  frame count.
+
+Durations are returned as whole microseconds. Anything else raises
+:class:`DurationUnsupported` so callers can fall back to ``ffprobe``.
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import struct
+import sys
+from pathlib import Path
+from typing import Iterable
+
+from lib.ogg_clip import OPUS_SAMPLE_RATE, ogg_crc
+
+MICROSECONDS = 1_000_000
+# Ogg pages are at most 27 + 255 header bytes plus 255 * 255 body bytes.
+MAX_OGG_PAGE_BYTES = 27 + 255 + 255 * 255
+
+_OGG_PAGE_HEADER = struct.Struct("<4sBBqIIIB")
+_NO_GRANULE = -1
+_WAVE_FORMAT_EXTENSIBLE = 0xFFFE
+# Writers that stream WAV data leave these placeholders in the size fields.
+_UNKNOWN_SIZES = (0, 0xFFFFFFFF)
+
+
+class DurationUnsupported(Exception):
+    """The file is not a container this module can measure."""
+
+
+def _samples_to_us(samples: int, rate: int) -> int:
+    return (max(0, samples) * MICROSECONDS + rate // 2) // rate
+
+
+def _opus_head(handle) -> tuple[int, int]:
+    """Return the stream serial and pre-skip from the first Ogg page."""
+
+    header = handle.read(_OGG_PAGE_HEADER.size)
+    if len(header) < _OGG_PAGE_HEADER.size:
+        raise DurationUnsupported("truncated Ogg page header")
+    capture, version, _type, _granule, serial, _seq, _crc, segments = _OGG_PAGE_HEADER.unpack(
+        header
+    )
+    if capture != b"OggS" or version != 0:
+        raise DurationUnsupported("not an Ogg stream")
+    lacing = handle.read(segments)
+    head = handle.read(min(sum(lacing), 64))
+    if not head.startswith(b"OpusHead") or len(head) < 19:
+        raise DurationUnsupported("Ogg stream does not start with an OpusHead")
+    return serial, struct.unpack_from("<H", head, 10)[0]
+
+
+def _last_granule(data: bytes, serial: int, *, base: int, file_size: int) -> int | None:
+    """Granule of the last complete, checksummed page for ``serial`` in ``data``."""
+
+    position = data.rfind(b"OggS")
+    while position >= 0:
+        header_end = position + _OGG_PAGE_HEADER.size
+        if header_end <= len(data):
+            fields = _OGG_PAGE_HEADER.unpack_from(data, position)
+            _capture, version, _type, granule, page_serial, _seq, crc, segments = fields
+            lacing_end = header_end + segments
+            if version == 0 and page_serial == serial and lacing_end <= len(data):
+                page_end = lacing_end + sum(data[header_end:lacing_end])
+                # A page still being written (or a torn tail) is skipped.
+                if page_end <= len(data) and base + page_end <= file_size and granule != _NO_GRANULE:
+                    page = bytearray(data[position:page_end])
+                    page[22:26] = b"\0\0\0\0"
+                    if ogg_crc(bytes(page)) == crc:
+                        return granule
+        position = data.rfind(b"OggS", 0, position)
+    return None
+
+
+def opus_duration_us(path: os.PathLike[str] | str) -> int:
+    """Exact duration of an Ogg Opus file: last granule minus pre-skip."""
+
+    with open(path, "rb") as handle:
+        serial, pre_skip = _opus_head(handle)
+        file_size = os.fstat(handle.fileno()).st_size
+        window = 2 * MAX_OGG_PAGE_BYTES
+        while True:
+            start = max(0, file_size - window)
+            handle.seek(start)
+            data = handle.read(file_size - start)
+            granule = _last_granule(data, serial, base=start, file_size=file_size)
+            if granule is not None:
+                return _samples_to_us(granule - pre_skip, OPUS_SAMPLE_RATE)
+            if start == 0:
+                raise DurationUnsupported("no Ogg page with a granule position")
+            window *= 4
+
+
+def wav_duration_us(path: os.PathLike[str] | str) -> int:
+    """Exact duration of a PCM WAV file from its ``fmt `` and ``data`` chunks."""
+
+    with open(path, "rb") as handle:
+        file_size = os.fstat(handle.fileno()).st_size
+        riff = handle.read(12)
+        if len(riff) < 12 or riff[:4] != b"RIFF" or riff[8:12] != b"WAVE":
+            raise DurationUnsupported("not a RIFF/WAVE file")
+        rate = block_align = 0
+        offset = 12
+        while offset + 8 <= file_size:
+            handle.seek(offset)
+            chunk_id, chunk_size = struct.unpack("<4sI", handle.read(8))
+            body = offset + 8
+            if chunk_id == b"fmt ":
+                fmt = handle.read(min(chunk_size, 40))
+                if len(fmt) < 16:
+                    raise DurationUnsupported("truncated fmt chunk")
+                format_tag, _channels, rate, _byte_rate, block_align = struct.unpack_from(
+                    "<HHIIH", fmt
+                )
+                if format_tag not in (1, 3, _WAVE_FORMAT_EXTENSIBLE):
+                    raise DurationUnsupported(f"unsupported WAV format {format_tag:#x}")
+            elif chunk_id == b"data":
+                if rate <= 0 or block_align <= 0:
+                    raise DurationUnsupported("data chunk before a valid fmt chunk")
+                available = file_size - body
+                if chunk_size in _UNKNOWN_SIZES or chunk_size > available:
+                    chunk_size = available
+                return _samples_to_us(chunk_size // block_align, rate)
+            offset = body + chunk_size + (chunk_size & 1)
+    raise DurationUnsupported("WAV file has no data chunk")
+
+
+def duration_us(path: os.PathLike[str] | str) -> int:
+    """Duration of an Ogg Opus or WAV file in microseconds, sniffed by content."""
+
+    with open(path, "rb") as handle:
+        magic = handle.read(12)
+    if magic[:4] == b"OggS":
+        return opus_duration_us(path)
+    if magic[:4] == b"RIFF" and magic[8:12] == b"WAVE":
+        return wav_duration_us(path)
+    raise DurationUnsupported("unrecognised container")
+
+
+def duration_seconds(path: os.PathLike[str] | str) -> float:
+    return duration_us(path) / MICROSECONDS
+
+
+def main(argv: Iterable[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(
+        description="Print the duration in seconds of an Ogg Opus or WAV file."
+    )
+    parser.add_argument("path", type=Path)
+    args = parser.parse_args(list(argv) if argv is not None else None)
+    try:
+        micros = duration_us(args.path)
+    except DurationUnsupported as exc:
+        print(f"unsupported: {exc}", file=sys.stderr)
+        return 2
+    except OSError as exc:
+        print(f"error: {exc}", file=sys.stderr)
+        return 1
+    print(f"{micros // MICROSECONDS}.{micros % MICROSECONDS:06d}")
+    return 0
+
+
+__all__ = [
+    "DurationUnsupported",
+    "duration_seconds",
+    "duration_us",
+    "opus_duration_us",
+    "wav_duration_us",
+]
+
+
+if __name__ == "__main__":  # pragma: no cover - CLI entry
+    raise SystemExit(main())
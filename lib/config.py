@@ -106,6 +106,41 @@ _DEFAULTS: Dict[str, Any] = {
         "include_waveform_sidecars": False,
         "include_transcript_sidecars": True,
     },
+    "archival_service": {
+        "batch_max_files": 200,
+        "batch_interval_seconds": 30.0,
+        "copy_workers": 2,
+        "verify_copies": False,
+        "windows": [],
+        "bandwidth_limit_kbps": 0,
+        "pause_while_streaming": True,
+        "retry_base_seconds": 30.0,
+        "retry_max_seconds": 3600.0,
+        "ssh_control_dir": "/run/tricorder-archival",
+        "ssh_control_persist_seconds": 600,
+    },
+    "retention": {
+        "min_age_seconds": 300,
+        "tmpfs": {"stale_after_hours": 12, "max_usage_percent": 80},
+        "recordings": {"max_usage_percent": 80, "max_age_days": 0, "max_gb": 0, "include_saved": False},
+        "original_wav": {"max_age_days": 0, "max_gb": 0},
+        "recycle_bin": {"max_age_days": 0, "max_gb": 0},
+    },
+    "original_compaction": {
+        "enabled": True,
+        "min_age_seconds": 600,
+        "max_load_per_cpu": 0.5,
+        "interval_seconds": 60,
+        "compression_level": 5,
+    },
+    "storage_tiers": {
+        "enabled": False,
+        "include_saved": False,
+        "tiers": [
+            {"name": "speech", "after_days": 30, "bitrate_kbps": 24, "channels": 1, "application": "voip"},
+            {"name": "archive", "after_days": 180, "bitrate_kbps": 12, "channels": 1, "application": "voip"},
+        ],
+    },
     "segmenter": {
         "pre_pad_ms": 2000,
         "post_pad_ms": 3000,
@@ -139,6 +174,11 @@ _DEFAULTS: Dict[str, Any] = {
         "stable_interval_sec": 1.0,
         "allowed_ext": [".wav", ".opus", ".flac", ".mp3"],
         "ignore_suffixes": [".part", ".partial", ".tmp", ".incomplete", ".opdownload", ".crdownload"],
+        "workers": 1,
+        "parallel_workers": 0,
+        "parallel_min_seconds": 1800.0,
+        "chunk_seconds": 300.0,
+        "deduplicate": True,
     },
     "transcription": {
         "enabled": False,
@@ -157,10 +197,21 @@ _DEFAULTS: Dict[str, Any] = {
             {"unit": "voice-recorder.service", "label": "Recorder"},
             {"unit": "web-streamer.service", "label": "Web UI"},
             {"unit": "dropbox.service", "label": "Dropbox ingest"},
+            {"unit": "archival.service", "label": "Archival uploads"},
+            {"unit": "original-compaction.service", "label": "Original compaction"},
             {"unit": "tricorder-auto-update.service", "label": "Auto updater"},
             {"unit": "tmpfs-guard.service", "label": "Tmpfs guard"},
         ],
         "web_service": "web-streamer.service",
+        "clip_workers": 1,
+        "clip_queue_limit": 8,
+        "clip_undo_max_mb": 256,
+        "bulk_batch_size": 50,
+        "storage_reconcile_interval_seconds": 900,
+        "sync_manifest_enabled": True,
+        "sync_rescan_interval_seconds": 60,
+        "sync_page_size": 500,
+        "sync_tombstone_retention_days": 30,
     },
     "web_server": {
         "mode": "http",
@@ -186,6 +237,22 @@ _DEFAULTS: Dict[str, Any] = {
         "min_trigger_rms": None,
         "webhook": {},
         "email": {},
+        "delivery": {
+            "outbox_path": "",
+            "webhook_workers": 2,
+            "email_workers": 1,
+            "email_batch_size": 20,
+            "retry_base_seconds": 5,
+            "retry_max_seconds": 900,
+            "max_attempts": 10,
+            "smtp_keepalive_seconds": 60,
+            "webhook_max_per_hour": 0,
+            "email_max_per_hour": 0,
+        },
+        "digest": {
+            "window_seconds": 0,
+            "max_events": 100,
+        },
     },
 }
 
@@ -345,6 +412,11 @@ def _apply_env_overrides(cfg: Dict[str, Any]) -> None:
     env_map = {
         "INGEST_STABLE_CHECKS": ("ingest", "stable_checks", int),
         "INGEST_STABLE_INTERVAL_SEC": ("ingest", "stable_interval_sec", float),
+        "INGEST_WORKERS": ("ingest", "workers", int),
+        "INGEST_PARALLEL_WORKERS": ("ingest", "parallel_workers", int),
+        "INGEST_PARALLEL_MIN_SECONDS": ("ingest", "parallel_min_seconds", float),
+        "INGEST_CHUNK_SECONDS": ("ingest", "chunk_seconds", float),
+        "INGEST_DEDUPLICATE": ("ingest", "deduplicate", _parse_bool),
         "INGEST_ALLOWED_EXT": ("ingest", "allowed_ext", lambda s: [x.strip().lower() for x in s.split(",") if x.strip()]),
     }
     for env_key, (section, key, cast) in env_map.items():
@@ -1296,6 +1368,16 @@ _SECTION_FALLBACKS: Dict[str, Any] = {
                 "label": "Dropbox ingest",
                 "description": "Monitors dropbox_dir for externally provided audio files.",
             },
+            {
+                "unit": "archival.service",
+                "label": "Archival uploads",
+                "description": "Uploads queued recordings to the archival target.",
+            },
+            {
+                "unit": "original-compaction.service",
+                "label": "Original compaction",
+                "description": "Converts preserved original WAVs to FLAC while idle.",
+            },
             {
                 "unit": "tricorder-auto-update.service",
                 "label": "Auto updater",
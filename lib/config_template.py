@@ -140,6 +140,102 @@ archival:
   # When true, upload transcript JSON sidecars alongside audio.
   include_transcript_sidecars: true
 
+archival_service:
+  # Uploads are queued in .archival_journal.sqlite3 (recordings root) and
+  # delivered by archival.service in batches of up to batch_max_files files
+  # every batch_interval_seconds (one rsync --files-from run for rsync).
+  batch_max_files: 200
+  batch_interval_seconds: 30
+
+  # network_share: parallel copies per batch. Each copy is written to a hidden
+  # .partial file, fsynced and renamed; verify_copies also reads it back from
+  # the share and compares checksums before the rename.
+  copy_workers: 2
+  verify_copies: false
+
+  # Local-time windows in which uploads may run, e.g. ["01:00-06:00",
+  # "22:30-23:30"]; windows may wrap past midnight. Empty = any time.
+  windows: []
+  # Upload rate cap in kbit/s (converted to rsync --bwlimit KiB/s; throttles
+  # share copies too). 0 = unlimited.
+  bandwidth_limit_kbps: 0
+  # Hold new batches while anyone is listening to the live HLS/WebRTC stream.
+  pause_while_streaming: true
+
+  # Failed files are retried after retry_base_seconds, doubling per failure
+  # up to retry_max_seconds. They stay queued until they succeed.
+  retry_base_seconds: 30
+  retry_max_seconds: 3600
+
+  # SSH ControlMaster socket directory shared by consecutive rsync runs, and
+  # how long the master connection stays open after the last one. Leave the
+  # directory blank to open a fresh SSH connection per batch.
+  ssh_control_dir: "/run/tricorder-archival"
+  ssh_control_persist_seconds: 600
+
+retention:
+  # Applied by tmpfs-guard.timer (python -m lib.retention; --dry-run shows the
+  # plan). Files younger than min_age_seconds, recordings still queued for
+  # encoding and files held by an active encode are never deleted.
+  # Limits of 0 disable that policy.
+  min_age_seconds: 300
+  tmpfs:
+    # Staging audio left in tmp_dir (and tmp_dir/parallel) after this long is
+    # considered abandoned.
+    stale_after_hours: 12
+    # Oldest staging files go first while the tmp filesystem is above this.
+    max_usage_percent: 80
+  recordings:
+    # While the recordings filesystem is above max_usage_percent, the oldest
+    # recycle bin entries, then original WAVs, then recordings are deleted.
+    max_usage_percent: 80
+    max_age_days: 0
+    max_gb: 0
+    # Saved recordings are exempt unless this is true.
+    include_saved: false
+  original_wav:
+    max_age_days: 0
+    max_gb: 0
+  recycle_bin:
+    max_age_days: 0
+    max_gb: 0
+
+original_compaction:
+  # original-compaction.service converts the original WAVs kept in
+  # .original_wav to FLAC (lossless, verified by decoding it back) while the
+  # recorder is idle; waveform sidecars are pointed at the new file.
+  enabled: true
+  # Leave originals alone until they are this old.
+  min_age_seconds: 600
+  # Only convert while the 1-minute load average per CPU is at or below this
+  # and no encodes are queued (0 = ignore load).
+  max_load_per_cpu: 0.5
+  interval_seconds: 60
+  # FLAC compression level 0-12; higher is smaller and slower to encode.
+  compression_level: 5
+
+storage_tiers:
+  # Re-encode recordings to smaller Opus as they age, in the same idle pass
+  # as original_compaction. Each file is verified (full decode, same
+  # duration, smaller) before it replaces the old one; waveform sidecars
+  # record the tier. Lossy and irreversible, so off by default.
+  enabled: false
+  # Also tier clips under Saved/.
+  include_saved: false
+  # A recording gets the last tier whose after_days it has reached.
+  # application: voip (speech), audio (general) or lowdelay.
+  tiers:
+    - name: speech
+      after_days: 30
+      bitrate_kbps: 24
+      channels: 1
+      application: voip
+    - name: archive
+      after_days: 180
+      bitrate_kbps: 12
+      channels: 1
+      application: voip
+
 segmenter:
   # Pre-roll saved before trigger (milliseconds). Captures leading context (e.g., first spoken word).
   # Typical: 500–3000 ms. Higher uses more RAM/IO.
@@ -280,6 +376,28 @@ ingest:
   # Common suffixes indicating partial/incomplete downloads or temp files to ignore.
   ignore_suffixes: [".part", ".partial", ".tmp", ".incomplete", ".opdownload", ".crdownload"]
 
+  # Worker processes the ingest service (dropbox.service) runs dropped files
+  # on. A file is only started while the load average is below the offline
+  # encoder's admission threshold (parallel_encode.offline_load_avg_per_cpu).
+  # Typical: 1 on single-core boards, 2 on a Pi 4/5.
+  workers: 1
+
+  # Files at least parallel_min_seconds long are split into chunk_seconds
+  # chunks that are decoded and analysed on parallel_workers processes
+  # (0 = the CPU cores divided among ingest.workers, 1 = never split), while
+  # the offline CPU admission allows it. Events are still cut in a single
+  # pass over the stitched analysis, so boundaries across chunk edges match
+  # an unsplit run.
+  parallel_workers: 0
+  parallel_min_seconds: 1800
+  chunk_seconds: 300
+
+  # Skip files whose exact bytes were already ingested while the recordings
+  # they produced still exist (repeat drops, requeued WAVs). Hashes live in
+  # .content_index.sqlite3 in the recordings root, which archival also uses
+  # to avoid re-uploading content a destination already holds.
+  deduplicate: true
+
 transcription:
   # Enable offline speech-to-text using the configured engine. When disabled no transcript files are written.
   enabled: false
@@ -344,6 +462,37 @@ notifications:
       Start: {started_at}
       Reason: {end_reason}
 
+  delivery:
+    # Notifications are queued in a persistent outbox and sent by background
+    # workers, so bursts of events and unreachable endpoints do not lose alerts.
+    # Blank keeps the outbox in the recordings root (.notification_outbox.sqlite3).
+    outbox_path: ""
+    # Parallel webhook requests; each worker reuses one keep-alive connection.
+    webhook_workers: 2
+    # Parallel SMTP sessions, each sending up to email_batch_size queued
+    # messages per login and staying open for smtp_keepalive_seconds.
+    email_workers: 1
+    email_batch_size: 20
+    smtp_keepalive_seconds: 60
+    # Failed deliveries are retried with exponential backoff between these
+    # bounds, and given up after max_attempts (0 retries forever).
+    retry_base_seconds: 5
+    retry_max_seconds: 900
+    max_attempts: 10
+    # Most messages each channel may send in any hour (0 = unlimited). When the
+    # last one of the hour is due it carries everything queued as a digest, and
+    # later events wait for the budget to refill; nothing is dropped.
+    webhook_max_per_hour: 0
+    email_max_per_hour: 0
+
+  digest:
+    # Hold events until the end of each window (aligned to the clock, e.g. every
+    # 300 s on the five-minute mark) and send one summary per channel instead of
+    # one message per event. 0 sends each event as soon as it finishes.
+    window_seconds: 0
+    # Largest number of events merged into one summary.
+    max_events: 100
+
 streaming:
   # Live streaming mode exposed in the dashboard. Valid values:
   #   "hls"   – HTTP Live Streaming (higher latency, broad compatibility).
@@ -388,6 +537,12 @@ dashboard:
     - unit: "dropbox.service"
       label: "Dropbox ingest"
       description: "Monitors dropbox_dir for externally provided audio files."
+    - unit: "archival.service"
+      label: "Archival uploads"
+      description: "Uploads queued recordings to the archival target."
+    - unit: "original-compaction.service"
+      label: "Original compaction"
+      description: "Converts preserved original WAVs to FLAC while idle."
     - unit: "tricorder-auto-update.service"
       label: "Auto updater"
       description: "Applies updates staged by the project updater."
@@ -398,6 +553,36 @@ dashboard:
   # Unit that should be restarted automatically when stopped or reloaded through
   # the dashboard to keep the management interface reachable.
   web_service: "web-streamer.service"
+  # Clip editor jobs run on a dedicated worker pool. clip_workers bounds how
+  # many clips render at once (keep 1 on a Pi so capture is never starved) and
+  # clip_queue_limit bounds how many jobs may wait before new ones are refused.
+  clip_workers: 1
+  clip_queue_limit: 8
+  # Clip undo history keeps the previous version of an overwritten clip as a
+  # hardlink (no data copied) in <recordings_root>/.clip_undo. Once those
+  # backups hold more than clip_undo_max_mb of otherwise-unreferenced data the
+  # oldest are evicted. Until then (or until they expire after 24 hours) the
+  # links keep the bytes of deleted recordings allocated, while retention's
+  # pressure planning already counts those bytes as freed.
+  clip_undo_max_mb: 256
+  # Bulk delete/save/restore/purge requests run as background jobs in batches
+  # of bulk_batch_size items. Each batch fsyncs the directories it touched and
+  # updates the recycle bin index and change feed once.
+  bulk_batch_size: 50
+  # Storage usage shown in the dashboard comes from per-collection byte
+  # counters (.storage_usage.sqlite3 in the recordings root) that are updated
+  # as recordings change. A low-priority walk reconciles them this often
+  # (seconds, 60-86400) to catch changes nobody reported.
+  storage_reconcile_interval_seconds: 900
+  # Pull sync for backup servers: GET /api/sync/manifest pages through every
+  # recording with size, mtime and content hash, or only what changed since a
+  # cursor. The manifest (.sync_manifest.sqlite3) is rescanned when recordings
+  # change or at most every sync_rescan_interval_seconds; deletions stay
+  # visible to delta clients for sync_tombstone_retention_days.
+  sync_manifest_enabled: true
+  sync_rescan_interval_seconds: 60
+  sync_page_size: 500
+  sync_tombstone_retention_days: 30
 
 web_server:
   # Web UI listener configuration. Set mode to "http" to expose an unsecured
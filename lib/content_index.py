@@ -0,0 +1,204 @@
+"""Content-hash index of ingested and archived audio.
+
+A file dropped into the dropbox twice, or a WAV requeued by
+:func:`lib.fault_handler._safe_requeue_to_dropbox` after its recordings were
+already produced, used to be decoded, segmented, encoded and transcribed
+again, and archival re-uploaded files a destination already held. This index
+maps a digest of a file's bytes to the work already done for it:
+
+* scope :data:`INGESTED` lists the recordings (relative to the recordings
+  root) that ingesting the content produced;
+* scope ``archive:<destination>`` lists the relative paths the content was
+  delivered to on that archival destination.
+
+Callers hash the file with :func:`file_digest` (BLAKE2b over the container
+bytes, read in 1 MiB blocks, so hashing is pure sequential I/O and never
+decodes audio), look the digest up, and record their outputs once the work
+has succeeded. A record whose outputs no longer exist is treated as absent by
+:meth:`ContentIndex.lookup_existing`, so deleting recordings and dropping the
+source again re-ingests it.
+
+The database lives in the recordings root (``.content_index.sqlite3``). It is
+a cache: deleting it only means the next duplicate is processed once more.
+"""
+
+from __future__ import annotations
+
+import contextlib
+import hashlib
+import json
+import sqlite3
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable, Iterable, Iterator
+
+INDEX_FILENAME = ".content_index.sqlite3"
+SCHEMA_VERSION = 1
+HASH_BLOCK_BYTES = 1 << 20
+
+INGESTED = "ingested"
+
+_UPSERT = """
+    INSERT INTO contents (digest, scope, size, outputs, recorded_at)
+    VALUES (?, ?, ?, ?, ?)
+    ON CONFLICT (digest, scope) DO UPDATE SET
+        size = excluded.size,
+        outputs = excluded.outputs,
+        recorded_at = excluded.recorded_at
+"""
+
+_SCHEMA = (
+    """
+    CREATE TABLE IF NOT EXISTS contents (
+        digest TEXT NOT NULL,
+        scope TEXT NOT NULL,
+        size INTEGER NOT NULL DEFAULT 0,
+        outputs TEXT NOT NULL,
+        recorded_at REAL NOT NULL,
+        PRIMARY KEY (digest, scope)
+    )
+    """,
+)
+
+
+def file_digest(path: Path, *, block_bytes: int = HASH_BLOCK_BYTES) -> str:
+    """Hex BLAKE2b digest of the bytes of ``path``."""
+
+    hasher = hashlib.blake2b(digest_size=20)
+    with open(path, "rb") as handle:
+        while True:
+            block = handle.read(block_bytes)
+            if not block:
+                break
+            hasher.update(block)
+    return hasher.hexdigest()
+
+
+def archive_scope(destination: str) -> str:
+    return f"archive:{destination}"
+
+
+@dataclass(frozen=True)
+class ContentRecord:
+    digest: str
+    scope: str
+    size: int
+    outputs: tuple[str, ...]
+    recorded_at: float
+
+
+class ContentIndex:
+    """Digest index stored under the recordings ``root``."""
+
+    def __init__(self, root: Path, *, path: Path | None = None) -> None:
+        self.root = Path(root)
+        self.path = Path(path) if path is not None else self.root / INDEX_FILENAME
+
+    @contextlib.contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        conn = sqlite3.connect(str(self.path), timeout=10.0, isolation_level=None)
+        try:
+            conn.execute("PRAGMA synchronous=NORMAL")
+            version = conn.execute("PRAGMA user_version").fetchone()[0]
+            if version != SCHEMA_VERSION:
+                conn.execute("BEGIN IMMEDIATE")
+                try:
+                    if version:
+                        conn.execute("DROP TABLE IF EXISTS contents")
+                    for statement in _SCHEMA:
+                        conn.execute(statement)
+                    conn.execute(f"PRAGMA user_version={SCHEMA_VERSION}")
+                    conn.execute("COMMIT")
+                except BaseException:
+                    conn.execute("ROLLBACK")
+                    raise
+            yield conn
+        finally:
+            conn.close()
+
+    def lookup(self, digest: str, scope: str) -> ContentRecord | None:
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT size, outputs, recorded_at FROM contents WHERE digest = ? AND scope = ?",
+                (digest, scope),
+            ).fetchone()
+        if row is None:
+            return None
+        size, outputs, recorded_at = row
+        return ContentRecord(
+            digest=digest,
+            scope=scope,
+            size=int(size),
+            outputs=tuple(json.loads(outputs)),
+            recorded_at=float(recorded_at),
+        )
+
+    def lookup_existing(
+        self,
+        digest: str,
+        scope: str,
+        *,
+        exists: Callable[[str], bool] | None = None,
+    ) -> ContentRecord | None:
+        """Like :meth:`lookup`, but only while every recorded output exists.
+
+        ``exists`` defaults to checking the output under :attr:`root`; a
+        record with no outputs (content that produced no recordings) counts
+        as existing.
+        """
+
+        record = self.lookup(digest, scope)
+        if record is None:
+            return None
+        check = exists or (lambda output: (self.root / output).exists())
+        if all(check(output) for output in record.outputs):
+            return record
+        return None
+
+    def record(self, digest: str, scope: str, outputs: Iterable[str], *, size: int = 0) -> None:
+        """Store ``outputs`` for ``digest``, replacing an earlier record."""
+
+        with self._connect() as conn:
+            conn.execute(
+                _UPSERT,
+                (digest, scope, max(0, int(size)), json.dumps(list(outputs)), time.time()),
+            )
+
+    def add_output(self, digest: str, scope: str, output: str, *, size: int = 0) -> None:
+        """Append one output to the record for ``digest``, creating it if needed."""
+
+        with self._connect() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                row = conn.execute(
+                    "SELECT outputs FROM contents WHERE digest = ? AND scope = ?",
+                    (digest, scope),
+                ).fetchone()
+                outputs = json.loads(row[0]) if row else []
+                if output not in outputs:
+                    outputs.append(output)
+                conn.execute(
+                    _UPSERT,
+                    (digest, scope, max(0, int(size)), json.dumps(outputs), time.time()),
+                )
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+            conn.execute("COMMIT")
+
+    def forget(self, digest: str, scope: str) -> None:
+        with self._connect() as conn:
+            conn.execute("DELETE FROM contents WHERE digest = ? AND scope = ?", (digest, scope))
+
+
+__all__ = [
+    "ContentIndex",
+    "ContentRecord",
+    "HASH_BLOCK_BYTES",
+    "INDEX_FILENAME",
+    "INGESTED",
+    "archive_scope",
+    "file_digest",
+]
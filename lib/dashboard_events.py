@@ -7,7 +7,7 @@ import copy
 import threading
 import time
 from collections import deque
-from typing import Any, Deque, Set
+from typing import Any, Callable, Deque, Set
 
 
 class DashboardEventBus:
@@ -28,6 +28,7 @@ class DashboardEventBus:
         self._max_queue_size = max_queue_size
         self._history: Deque[dict[str, Any]] = deque(maxlen=history_limit)
         self._subscribers: Set[asyncio.Queue] = set()
+        self._listeners: list[Callable[[dict[str, Any]], None]] = []
         self._seq = 0
         self._lock = threading.Lock()
 
@@ -62,6 +63,18 @@ class DashboardEventBus:
         with self._lock:
             self._subscribers.discard(queue)
 
+    def add_listener(self, callback: Callable[[dict[str, Any]], None]) -> None:
+        """Invoke ``callback`` synchronously with every published event."""
+
+        with self._lock:
+            if callback not in self._listeners:
+                self._listeners.append(callback)
+
+    def remove_listener(self, callback: Callable[[dict[str, Any]], None]) -> None:
+        with self._lock:
+            if callback in self._listeners:
+                self._listeners.remove(callback)
+
     def publish(self, event_type: str, payload: Any) -> str:
         if not event_type or not isinstance(event_type, str):
             raise ValueError("event_type must be a non-empty string")
@@ -80,6 +93,13 @@ class DashboardEventBus:
             self._history.append(event)
             loop = self._loop
             subscribers = list(self._subscribers)
+            listeners = list(self._listeners)
+
+        for listener in listeners:
+            try:
+                listener(event)
+            except Exception:  # pragma: no cover - listeners must not break publishing
+                pass
 
         if not subscribers:
             return event["id"]
@@ -2,11 +2,14 @@
 import sys
 import json
 import time
+import sqlite3
 import subprocess
 from datetime import datetime, timezone
 from pathlib import Path
 from typing import Tuple
 
+from lib.content_index import INGESTED, ContentIndex, file_digest
+
 BASE = Path("/apps/tricorder")
 TMP_DIR = BASE / "tmp"
 REC_DIR = BASE / "recordings"
@@ -117,6 +120,21 @@ def _write_corrupted_placeholder(base_name: str, reason: str, extra: dict | None
     return out
 
 
+def _already_ingested(wav_path: Path) -> bool:
+    """True when ingest already produced recordings from identical bytes."""
+
+    try:
+        digest = file_digest(wav_path)
+        record = ContentIndex(REC_DIR).lookup_existing(digest, INGESTED)
+    except (OSError, sqlite3.Error) as e:
+        _log(f"[fault] content index unavailable: {e!r}")
+        return False
+    if record is None:
+        return False
+    _log(f"[fault] WAV content already ingested as {', '.join(record.outputs) or 'no events'}; not requeuing")
+    return True
+
+
 def _safe_requeue_to_dropbox(wav_path: Path, base_name: str) -> Path:
     """
     Move a valid WAV into /dropbox for re-processing by the ingestion pipeline.
@@ -150,6 +168,13 @@ def handle_encode_failure(in_wav: str, base_name: str) -> int:
         _log(f"[fault] encode_failure: missing WAV ({in_wav}); nothing to do")
         return 1
 
+    if not base_name.endswith("-RETRY") and _already_ingested(wav_path):
+        try:
+            wav_path.unlink(missing_ok=True)
+        except Exception as e:
+            _log(f"[fault] failed to remove tmp WAV ({wav_path}): {e!r}")
+        return 0
+
     is_ok, probe_msg = _ffmpeg_probe_decodable(wav_path)
 
     if is_ok and not base_name.endswith("-RETRY"):
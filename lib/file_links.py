@@ -0,0 +1,125 @@
+"""Copy-free file duplication helpers for the recordings tree.
+
+Recordings live on SD cards with limited write endurance, so keeping a second
+copy of a file (for example an undo backup) should not rewrite its data when
+the filesystem can share it. :func:`link_or_clone` tries a hardlink first, then
+a ``FICLONE`` reflink (btrfs, XFS, bcachefs) and copies only when neither is
+possible, such as across filesystems or on FAT/exFAT media.
+"""
+
+from __future__ import annotations
+
+import errno
+import os
+import shutil
+from pathlib import Path
+
+try:  # pragma: no cover - fcntl is POSIX-only
+    import fcntl
+except ImportError:  # pragma: no cover - Windows development hosts
+    fcntl = None  # type: ignore[assignment]
+
+# _IOW(0x94, 9, int) from linux/fs.h
+FICLONE = 0x40049409
+
+HARDLINK = "hardlink"
+REFLINK = "reflink"
+COPY = "copy"
+RENAME = "rename"
+
+# errno values meaning "this filesystem/path combination cannot share data".
+_UNSHAREABLE_ERRNOS = {
+    errno.EXDEV,
+    errno.EPERM,
+    errno.EACCES,
+    errno.EMLINK,
+    errno.ENOTSUP,
+    errno.EOPNOTSUPP,
+    errno.EINVAL,
+    errno.ENOSYS,
+    errno.ENOTTY,
+}
+
+
+def clone_file(source: os.PathLike[str] | str, destination: os.PathLike[str] | str) -> None:
+    """Create ``destination`` as a reflink of ``source`` or raise ``OSError``."""
+
+    if fcntl is None:
+        raise OSError(errno.ENOTSUP, "reflinks are not supported on this platform")
+    with open(source, "rb") as src:
+        fd = os.open(destination, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600)
+        try:
+            fcntl.ioctl(fd, FICLONE, src.fileno())
+        except OSError:
+            os.close(fd)
+            try:
+                os.unlink(destination)
+            except FileNotFoundError:
+                pass
+            raise
+        os.close(fd)
+    shutil.copystat(source, destination)
+
+
+def link_or_clone(source: os.PathLike[str] | str, destination: os.PathLike[str] | str) -> str:
+    """Make ``destination`` hold the contents of ``source`` as cheaply as possible.
+
+    Returns the method used: :data:`HARDLINK`, :data:`REFLINK` or :data:`COPY`.
+    A hardlink shares the inode, so callers must replace ``source`` by rename
+    rather than rewrite it in place if the duplicate has to stay unchanged.
+    """
+
+    try:
+        os.link(source, destination)
+        return HARDLINK
+    except OSError as exc:
+        if exc.errno not in _UNSHAREABLE_ERRNOS:
+            raise
+    try:
+        clone_file(source, destination)
+        return REFLINK
+    except OSError as exc:
+        if exc.errno not in _UNSHAREABLE_ERRNOS:
+            raise
+    shutil.copy2(source, destination)
+    return COPY
+
+
+def move_or_copy(source: os.PathLike[str] | str, destination: os.PathLike[str] | str) -> str:
+    """Atomically move ``source`` over ``destination``, copying across filesystems.
+
+    Returns :data:`RENAME` when the data did not have to be rewritten, otherwise
+    :data:`COPY`. The copy goes through a temporary sibling of ``destination``
+    so readers never observe a partially written file.
+    """
+
+    try:
+        os.replace(source, destination)
+        return RENAME
+    except OSError as exc:
+        if exc.errno != errno.EXDEV:
+            raise
+    destination_path = Path(destination)
+    staging = destination_path.with_name(f".{destination_path.name}.{os.getpid()}.tmp")
+    try:
+        shutil.copy2(source, staging)
+        os.replace(staging, destination_path)
+    finally:
+        try:
+            staging.unlink()
+        except FileNotFoundError:
+            pass
+    os.unlink(source)
+    return COPY
+
+
+__all__ = [
+    "COPY",
+    "FICLONE",
+    "HARDLINK",
+    "REFLINK",
+    "RENAME",
+    "clone_file",
+    "link_or_clone",
+    "move_or_copy",
+]
@@ -100,6 +100,17 @@ class _HLSController:
         self._persist_state()
         return clients
 
+    def touch_state(self) -> None:
+        """Rewrite the state file's timestamp while clients are connected.
+
+        Other services treat counts that stop being refreshed as stale.
+        """
+
+        with self._lock:
+            clients = self._clients
+        if clients > 0:
+            self._persist_state()
+
     @property
     def active_clients(self) -> int:
         with self._lock:
@@ -0,0 +1,606 @@
+#!/usr/bin/env python3
+"""Long-running dropbox ingest service.
+
+``dropbox.service`` used to be a oneshot that a path unit started whenever the
+dropbox changed: every start paid interpreter and import start-up, polled each
+file for ``ingest.stable_checks`` intervals and processed files one by one.
+This daemon stays resident instead:
+
+* inotify reports files in the dropbox as soon as the writer closes them
+  (``IN_CLOSE_WRITE``) or renames them into place (``IN_MOVED_TO``), so no size
+  polling is needed for them. A periodic rescan (and an inotify queue
+  overflow) still falls back to the size-stability check, without blocking on
+  it;
+* accepted files are moved to the ingest work directory and queued in
+  ``.ingest_queue.json`` there, so a restart resumes queued and interrupted
+  files instead of rediscovering them;
+* up to ``ingest.workers`` files are processed at once in a process pool, and
+  a file only starts while :func:`lib.segmenter.offline_cpu_available` admits
+  it, the same load check the recorder's offline encoder uses;
+* every finished file logs its realtime factor, plus files per minute and the
+  aggregate realtime factor over the last ten minutes.
+
+A file that fails ``MAX_ATTEMPTS`` times is moved to ``<work dir>/failed``.
+When a worker process dies, every file in flight fails with the same broken
+pool; those files are requeued without using up an attempt and then run one
+at a time, so only the file that actually takes a worker down is charged.
+"""
+
+from __future__ import annotations
+
+import argparse
+import contextlib
+import json
+import multiprocessing
+import os
+import select
+import signal
+import sys
+import time
+from collections import deque
+from concurrent.futures import Executor, Future, ProcessPoolExecutor
+from concurrent.futures import wait as wait_futures
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Callable, Iterable
+
+from lib import process_dropped_file, segmenter
+from lib.config import get_cfg
+from lib.inotify_watch import (
+    IN_CLOSE_WRITE,
+    IN_MOVED_TO,
+    IN_ONLYDIR,
+    IN_Q_OVERFLOW,
+    Inotify,
+    inotify_available,
+)
+
+QUEUE_FILENAME = ".ingest_queue.json"
+FAILED_DIRNAME = "failed"
+MAX_ATTEMPTS = 3
+RESCAN_INTERVAL_SEC = 60.0
+# How long to wait for the rest of a broken pool's futures to fail with it.
+BROKEN_POOL_SETTLE_SEC = 5.0
+THROUGHPUT_WINDOW_SEC = 600.0
+WATCH_MASK = IN_CLOSE_WRITE | IN_MOVED_TO | IN_ONLYDIR
+
+
+def _configured_workers() -> int:
+    raw = get_cfg().get("ingest", {}).get("workers", 1)
+    try:
+        return max(1, int(raw))
+    except (TypeError, ValueError):
+        return 1
+
+
+@dataclass
+class QueueItem:
+    path: str
+    attempts: int = 0
+    enqueued_at: float = field(default_factory=time.time)
+
+
+class IngestQueue:
+    """FIFO of work files persisted to JSON after every change.
+
+    Items move from ``pending`` to ``running`` when a worker picks them up;
+    :meth:`resume` puts running items back at the head of the queue after a
+    restart. ``attempts`` counts starts, so a file that keeps taking the
+    daemon down is eventually given up on as well.
+    """
+
+    def __init__(self, path: Path) -> None:
+        self.path = Path(path)
+        self.pending: deque[QueueItem] = deque()
+        self.running: dict[str, QueueItem] = {}
+        self.totals: dict[str, float] = {"files": 0, "failed": 0, "audio_seconds": 0.0}
+        self._load()
+
+    def _load(self) -> None:
+        try:
+            payload = json.loads(self.path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return
+        if not isinstance(payload, dict):
+            return
+
+        def _items(key: str) -> list[QueueItem]:
+            items = []
+            for raw in payload.get(key) or []:
+                if isinstance(raw, dict) and isinstance(raw.get("path"), str):
+                    items.append(
+                        QueueItem(
+                            path=raw["path"],
+                            attempts=int(raw.get("attempts") or 0),
+                            enqueued_at=float(raw.get("enqueued_at") or time.time()),
+                        )
+                    )
+            return items
+
+        self.pending.extend(_items("pending"))
+        self.running = {item.path: item for item in _items("running")}
+        totals = payload.get("totals")
+        if isinstance(totals, dict):
+            for key in self.totals:
+                value = totals.get(key)
+                if isinstance(value, (int, float)):
+                    self.totals[key] = value
+
+    def save(self, throughput: dict | None = None) -> None:
+        payload = {
+            "pending": [asdict(item) for item in self.pending],
+            "running": [asdict(item) for item in self.running.values()],
+            "totals": self.totals,
+            "updated_at": time.time(),
+        }
+        if throughput is not None:
+            payload["throughput"] = throughput
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.path.with_name(self.path.name + ".tmp")
+        with tmp.open("w", encoding="utf-8") as handle:
+            json.dump(payload, handle, indent=2)
+            handle.write("\n")
+        os.replace(tmp, self.path)
+
+    def __contains__(self, path: str) -> bool:
+        return path in self.running or any(item.path == path for item in self.pending)
+
+    def __len__(self) -> int:
+        return len(self.pending)
+
+    def push(self, path: Path | str) -> bool:
+        key = str(path)
+        if key in self:
+            return False
+        self.pending.append(QueueItem(path=key))
+        self.save()
+        return True
+
+    def pop(self) -> QueueItem | None:
+        if not self.pending:
+            return None
+        item = self.pending.popleft()
+        item.attempts += 1
+        self.running[item.path] = item
+        self.save()
+        return item
+
+    def finish(self, item: QueueItem, *, audio_seconds: float = 0.0, failed: bool = False) -> None:
+        self.running.pop(item.path, None)
+        if failed:
+            self.totals["failed"] += 1
+        else:
+            self.totals["files"] += 1
+            self.totals["audio_seconds"] += max(0.0, float(audio_seconds))
+
+    def discard(self, item: QueueItem) -> None:
+        self.running.pop(item.path, None)
+        self.save()
+
+    def release(self, item: QueueItem) -> None:
+        """Put a started item back at the head of the queue without charging the start."""
+
+        self.running.pop(item.path, None)
+        item.attempts = max(0, item.attempts - 1)
+        self.pending.appendleft(item)
+        self.save()
+
+    def retry(self, item: QueueItem) -> bool:
+        """Requeue a failed item; ``False`` once it has used up its attempts."""
+
+        self.running.pop(item.path, None)
+        if item.attempts >= MAX_ATTEMPTS:
+            return False
+        self.pending.append(item)
+        self.save()
+        return True
+
+    def resume(self, work_files: Iterable[Path]) -> int:
+        """Requeue interrupted items and adopt stray files in the work directory."""
+
+        interrupted = list(self.running.values())
+        self.running.clear()
+        self.pending.extendleft(reversed(interrupted))
+        known = {item.path for item in self.pending}
+        adopted = 0
+        for work_file in work_files:
+            if str(work_file) not in known:
+                self.pending.append(QueueItem(path=str(work_file)))
+                adopted += 1
+        self.save()
+        return len(interrupted) + adopted
+
+
+class ThroughputMeter:
+    """Files per minute and realtime factor over a sliding window.
+
+    The aggregate realtime factor is seconds of audio ingested per second of
+    wall time since the oldest file in the window started, so it reflects the
+    whole pool rather than a single worker.
+    """
+
+    def __init__(
+        self,
+        window: float = THROUGHPUT_WINDOW_SEC,
+        *,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.window = float(window)
+        self._clock = clock
+        self._samples: deque[tuple[float, float, float]] = deque()
+
+    def record(self, audio_seconds: float, wall_seconds: float) -> None:
+        now = self._clock()
+        self._samples.append((now, max(0.0, audio_seconds), max(0.0, wall_seconds)))
+        self._expire(now)
+
+    def _expire(self, now: float) -> None:
+        while self._samples and now - self._samples[0][0] > self.window:
+            self._samples.popleft()
+
+    def snapshot(self) -> dict:
+        now = self._clock()
+        self._expire(now)
+        files = len(self._samples)
+        if not files:
+            return {"files": 0, "files_per_minute": 0.0, "realtime_factor": 0.0, "window_seconds": self.window}
+        started = min(finished - wall for finished, _audio, wall in self._samples)
+        span = max(1.0, now - started)
+        audio = sum(audio for _finished, audio, _wall in self._samples)
+        return {
+            "files": files,
+            "files_per_minute": round(files * 60.0 / span, 2),
+            "realtime_factor": round(audio / span, 2),
+            "window_seconds": self.window,
+        }
+
+
+def _worker_init(workers: int = 1) -> None:
+    # Pool workers inherit the daemon's stop handlers; leave shutdown to it.
+    signal.signal(signal.SIGTERM, signal.SIG_DFL)
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    # Each worker's chunk pool gets its share of the CPUs, not all of them.
+    process_dropped_file.CONCURRENT_FILES = max(1, int(workers))
+
+
+def ingest_work_file(path: str) -> float:
+    """Process one work file in a pool worker; returns seconds of audio ingested."""
+
+    work_file = Path(path)
+    try:
+        process_dropped_file._cleanup_retry_artifacts(work_file)
+    except Exception as exc:  # noqa: BLE001 - diagnostics only
+        print(f"[ingest] retry cleanup failed for {work_file}: {exc}", flush=True)
+    return float(process_dropped_file.process_file(str(work_file)) or 0.0)
+
+
+class IngestDaemon:
+    def __init__(
+        self,
+        *,
+        dropbox_dir: Path | None = None,
+        work_dir: Path | None = None,
+        workers: int | None = None,
+        executor: Executor | None = None,
+        process: Callable[[str], float] = ingest_work_file,
+        cpu_available: Callable[[], bool] = segmenter.offline_cpu_available,
+        rescan_interval: float = RESCAN_INTERVAL_SEC,
+        use_inotify: bool = True,
+    ) -> None:
+        self.dropbox_dir = Path(dropbox_dir or process_dropped_file.DROPBOX_DIR)
+        self.work_dir = Path(work_dir or process_dropped_file.WORK_DIR)
+        self.failed_dir = self.work_dir / FAILED_DIRNAME
+        self.workers = max(1, int(workers if workers is not None else _configured_workers()))
+        self._owns_executor = executor is None
+        self._executor = executor
+        self._process = process
+        self._cpu_available = cpu_available
+        self._rescan_interval = max(1.0, float(rescan_interval))
+        self._use_inotify = use_inotify
+        self.queue = IngestQueue(self.work_dir / QUEUE_FILENAME)
+        self.meter = ThroughputMeter()
+        self._inflight: dict[Future, tuple[QueueItem, float]] = {}
+        # Files that were in flight when a shared worker pool broke; they run
+        # one at a time until each has finished or failed on its own.
+        self._suspects: set[str] = set()
+        # Files found by a rescan rather than an event: path -> (size, mtime, matches).
+        self._unstable: dict[Path, tuple[int, int, int]] = {}
+        self._next_rescan = 0.0
+        self._next_stability_check = 0.0
+        self._inotify: Inotify | None = None
+        self._wake_r, self._wake_w = os.pipe()
+        os.set_blocking(self._wake_r, False)
+        os.set_blocking(self._wake_w, False)
+        self._stopping = False
+
+    # -- lifecycle -----------------------------------------------------
+
+    def _make_executor(self) -> Executor:
+        # Spawned rather than forked: notification delivery threads are running.
+        return ProcessPoolExecutor(
+            max_workers=self.workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_worker_init,
+            initargs=(self.workers,),
+        )
+
+    def _wake(self) -> None:
+        with contextlib.suppress(OSError):
+            os.write(self._wake_w, b"\0")
+
+    def stop(self, *_args: object) -> None:
+        self._stopping = True
+        self._wake()
+
+    def _start_watch(self) -> None:
+        if not self._use_inotify or not inotify_available():
+            return
+        try:
+            watcher = Inotify()
+        except OSError as exc:
+            print(f"[ingest] inotify unavailable ({exc}); polling every {self._rescan_interval:.0f}s", flush=True)
+            return
+        try:
+            watcher.add_watch(self.dropbox_dir, WATCH_MASK)
+        except OSError as exc:
+            watcher.close()
+            print(f"[ingest] cannot watch {self.dropbox_dir}: {exc}", flush=True)
+            return
+        self._inotify = watcher
+
+    def close(self) -> None:
+        if self._inotify is not None:
+            self._inotify.close()
+            self._inotify = None
+        if self._executor is not None and self._owns_executor:
+            # Interrupted files stay "running" in the queue and resume next start.
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+        for fd in (self._wake_r, self._wake_w):
+            with contextlib.suppress(OSError):
+                os.close(fd)
+        self._wake_r = self._wake_w = -1
+
+    # -- discovery -----------------------------------------------------
+
+    def _work_files(self) -> list[Path]:
+        try:
+            entries = sorted(self.work_dir.iterdir())
+        except FileNotFoundError:
+            return []
+        return [path for path in entries if process_dropped_file._is_candidate(path)]
+
+    def _accept(self, path: Path) -> None:
+        self._unstable.pop(path, None)
+        try:
+            work_file = process_dropped_file._move_to_work(path)
+        except FileNotFoundError:
+            return
+        except OSError as exc:
+            print(f"[ingest] move failed for {path}: {exc}", flush=True)
+            return
+        if self.queue.push(work_file):
+            print(f"[ingest] queued {work_file.name} ({len(self.queue)} pending)", flush=True)
+
+    def _handle_events(self) -> None:
+        watcher = self._inotify
+        if watcher is None:
+            return
+        for event in watcher.read_events():
+            if event.mask & IN_Q_OVERFLOW:
+                self._next_rescan = 0.0
+                continue
+            if not event.name:
+                continue
+            path = self.dropbox_dir / event.name
+            if process_dropped_file._is_candidate(path):
+                # Closed after writing or renamed into place: complete.
+                self._accept(path)
+
+    def _rescan(self, now: float) -> None:
+        self._next_rescan = now + self._rescan_interval
+        try:
+            entries = sorted(self.dropbox_dir.iterdir())
+        except FileNotFoundError:
+            print(f"[ingest] DROPBOX_DIR does not exist: {self.dropbox_dir}", flush=True)
+            return
+        for path in entries:
+            if process_dropped_file._is_candidate(path) and path not in self._unstable:
+                self._unstable[path] = (-1, -1, 0)
+        self._check_stability(now)
+
+    def _check_stability(self, now: float) -> None:
+        """Advance the size check of every rescanned file by one step."""
+
+        self._next_stability_check = now + process_dropped_file.STABLE_INTERVAL_SEC
+        for path, (size, mtime, matches) in list(self._unstable.items()):
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                self._unstable.pop(path, None)
+                continue
+            if (stat.st_size, stat.st_mtime_ns) == (size, mtime):
+                matches += 1
+            else:
+                matches = 0
+            if matches >= process_dropped_file.STABLE_CHECKS:
+                self._accept(path)
+            else:
+                self._unstable[path] = (stat.st_size, stat.st_mtime_ns, matches)
+
+    # -- processing ----------------------------------------------------
+
+    def _dispatch(self) -> bool:
+        """Start queued files; ``False`` when CPU admission held work back."""
+
+        limit = 1 if self._suspects else self.workers
+        while len(self._inflight) < limit and self.queue.pending:
+            if not self._cpu_available():
+                return False
+            item = self.queue.pop()
+            if item is None:
+                break
+            if not Path(item.path).exists():
+                self._suspects.discard(item.path)
+                self.queue.discard(item)
+                continue
+            if self._executor is None:
+                self._executor = self._make_executor()
+            future = self._executor.submit(self._process, item.path)
+            self._inflight[future] = (item, time.monotonic())
+            future.add_done_callback(lambda _future: self._wake())
+        return True
+
+    def _reap(self) -> None:
+        done = [future for future in self._inflight if future.done()]
+        if any(isinstance(future.exception(), BrokenProcessPool) for future in done):
+            # A dead worker fails every task of the pool; collect them all so
+            # the crash is only charged when it can be pinned on one file.
+            wait_futures(list(self._inflight), timeout=BROKEN_POOL_SETTLE_SEC)
+            done = [future for future in self._inflight if future.done()]
+        broken = [future for future in done if isinstance(future.exception(), BrokenProcessPool)]
+        for future in done:
+            item, started = self._inflight.pop(future)
+            self._suspects.discard(item.path)
+            wall = time.monotonic() - started
+            exc = future.exception()
+            if exc is None:
+                self._finished(item, float(future.result() or 0.0), wall)
+            elif len(broken) > 1 and future in broken:
+                self._requeue_suspect(item, exc)
+            else:
+                self._failed(item, exc)
+
+    def _discard_broken_executor(self) -> None:
+        if self._owns_executor and self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    def _requeue_suspect(self, item: QueueItem, exc: BaseException) -> None:
+        print(
+            f"[ingest] worker pool broke while {item.path} was running ({exc}); "
+            "retrying it on its own without counting an attempt",
+            flush=True,
+        )
+        self._discard_broken_executor()
+        self.queue.release(item)
+        self._suspects.add(item.path)
+
+    def _finished(self, item: QueueItem, audio: float, wall: float) -> None:
+        with contextlib.suppress(FileNotFoundError):
+            Path(item.path).unlink()
+        self.meter.record(audio, wall)
+        self.queue.finish(item, audio_seconds=audio)
+        stats = self.meter.snapshot()
+        self.queue.save(stats)
+        factor = audio / wall if wall > 0 else 0.0
+        print(
+            f"[ingest] finished {Path(item.path).name}: {audio:.1f}s audio in {wall:.1f}s "
+            f"({factor:.1f}x realtime); {stats['files_per_minute']:.2f} files/min, "
+            f"{stats['realtime_factor']:.1f}x realtime over the last "
+            f"{self.meter.window / 60:.0f} min",
+            flush=True,
+        )
+
+    def _failed(self, item: QueueItem, exc: BaseException) -> None:
+        print(
+            f"[ingest] processing failed for {item.path} (attempt {item.attempts}/{MAX_ATTEMPTS}): {exc}",
+            flush=True,
+        )
+        if isinstance(exc, BrokenProcessPool):
+            self._discard_broken_executor()
+        if self.queue.retry(item):
+            return
+        self.queue.finish(item, failed=True)
+        self.queue.save()
+        source = Path(item.path)
+        try:
+            self.failed_dir.mkdir(parents=True, exist_ok=True)
+            os.replace(source, self.failed_dir / source.name)
+        except FileNotFoundError:
+            return
+        except OSError as move_exc:
+            print(f"[ingest] could not move {source} to {self.failed_dir}: {move_exc}", flush=True)
+            return
+        print(f"[ingest] gave up on {source.name}; moved to {self.failed_dir}", flush=True)
+
+    def _idle(self) -> bool:
+        return not self._inflight and not self.queue.pending and not self._unstable
+
+    def _wait(self, timeout: float) -> None:
+        readers = [self._wake_r]
+        if self._inotify is not None:
+            readers.append(self._inotify.fileno())
+        with contextlib.suppress(InterruptedError):
+            ready, _, _ = select.select(readers, [], [], max(0.0, timeout))
+            if self._wake_r in ready:
+                with contextlib.suppress(BlockingIOError):
+                    while os.read(self._wake_r, 1024):
+                        pass
+
+    def run(self, *, until_idle: bool = False) -> None:
+        """Serve until :meth:`stop`; with ``until_idle`` return once nothing is left."""
+
+        process_dropped_file._prepare_work_area()
+        resumed = self.queue.resume(self._work_files())
+        if resumed:
+            print(f"[ingest] resuming {resumed} queued work file(s)", flush=True)
+        self._start_watch()
+        try:
+            while not self._stopping:
+                now = time.monotonic()
+                self._handle_events()
+                if now >= self._next_rescan:
+                    self._rescan(now)
+                elif self._unstable and now >= self._next_stability_check:
+                    self._check_stability(now)
+                self._reap()
+                admitted = self._dispatch()
+                if until_idle and self._idle():
+                    break
+                deadline = self._next_rescan
+                if self._unstable:
+                    deadline = min(deadline, self._next_stability_check)
+                if not admitted:
+                    deadline = min(deadline, now + segmenter.PARALLEL_OFFLINE_CHECK_INTERVAL)
+                self._wait(deadline - time.monotonic())
+        finally:
+            self.close()
+
+
+def main(argv: Iterable[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Watch the dropbox and ingest dropped audio files.")
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes (default: ingest.workers)")
+    parser.add_argument(
+        "--once",
+        action="store_true",
+        help="Ingest everything currently queued or in the dropbox, then exit",
+    )
+    args = parser.parse_args(list(argv) if argv is not None else None)
+
+    daemon = IngestDaemon(workers=args.workers)
+    # Pool workers only enqueue notifications; this process delivers them.
+    segmenter.start_notification_delivery()
+    signal.signal(signal.SIGTERM, daemon.stop)
+    signal.signal(signal.SIGINT, daemon.stop)
+    print(
+        f"[ingest] watching {daemon.dropbox_dir} with {daemon.workers} worker(s)",
+        flush=True,
+    )
+    daemon.run(until_idle=args.once)
+    return 0
+
+
+__all__ = [
+    "IngestDaemon",
+    "IngestQueue",
+    "QueueItem",
+    "ThroughputMeter",
+    "ingest_work_file",
+    "main",
+]
+
+
+if __name__ == "__main__":  # pragma: no cover - CLI entry
+    sys.exit(main())
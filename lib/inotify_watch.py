@@ -0,0 +1,217 @@
+"""Minimal Linux inotify bindings with an asyncio-friendly file watch.
+
+Only the handful of calls the recorder needs are wrapped (via ``ctypes``, so
+no extra dependency is required). On platforms without inotify
+:func:`inotify_available` returns ``False`` and :class:`AsyncPathWatch` falls
+back to sleeping for the caller's timeout, which keeps poll-based behaviour.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import ctypes
+import ctypes.util
+import os
+import struct
+import sys
+from dataclasses import dataclass
+from pathlib import Path
+
+IN_ACCESS = 0x00000001
+IN_MODIFY = 0x00000002
+IN_ATTRIB = 0x00000004
+IN_CLOSE_WRITE = 0x00000008
+IN_CLOSE_NOWRITE = 0x00000010
+IN_OPEN = 0x00000020
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_DELETE_SELF = 0x00000400
+IN_MOVE_SELF = 0x00000800
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_ONLYDIR = 0x01000000
+IN_NONBLOCK = os.O_NONBLOCK
+IN_CLOEXEC = getattr(os, "O_CLOEXEC", 0o2000000)
+
+_EVENT_HEADER = struct.Struct("iIII")
+
+_libc: ctypes.CDLL | None = None
+if sys.platform.startswith("linux"):  # pragma: no branch - platform specific
+    try:
+        _libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+        _libc.inotify_init1.argtypes = [ctypes.c_int]
+        _libc.inotify_add_watch.argtypes = [ctypes.c_int, ctypes.c_char_p, ctypes.c_uint32]
+        _libc.inotify_rm_watch.argtypes = [ctypes.c_int, ctypes.c_int]
+    except (OSError, AttributeError):  # pragma: no cover - exotic libc
+        _libc = None
+
+
+def inotify_available() -> bool:
+    return _libc is not None
+
+
+@dataclass(frozen=True)
+class InotifyEvent:
+    wd: int
+    mask: int
+    cookie: int
+    name: str
+
+
+class Inotify:
+    """Non-blocking inotify file descriptor."""
+
+    def __init__(self) -> None:
+        if _libc is None:
+            raise OSError("inotify is not available on this platform")
+        fd = _libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if fd < 0:
+            errno = ctypes.get_errno()
+            raise OSError(errno, os.strerror(errno))
+        self._fd = fd
+
+    def fileno(self) -> int:
+        return self._fd
+
+    def add_watch(self, path: str | os.PathLike[str], mask: int) -> int:
+        assert _libc is not None
+        wd = _libc.inotify_add_watch(self._fd, os.fsencode(path), mask)
+        if wd < 0:
+            errno = ctypes.get_errno()
+            raise OSError(errno, os.strerror(errno), str(path))
+        return wd
+
+    def remove_watch(self, wd: int) -> None:
+        assert _libc is not None
+        _libc.inotify_rm_watch(self._fd, wd)
+
+    def read_events(self) -> list[InotifyEvent]:
+        try:
+            data = os.read(self._fd, 64 * 1024)
+        except BlockingIOError:
+            return []
+        events: list[InotifyEvent] = []
+        offset = 0
+        while offset + _EVENT_HEADER.size <= len(data):
+            wd, mask, cookie, length = _EVENT_HEADER.unpack_from(data, offset)
+            offset += _EVENT_HEADER.size
+            raw_name = data[offset : offset + length].split(b"\0", 1)[0]
+            offset += length
+            events.append(InotifyEvent(wd, mask, cookie, os.fsdecode(raw_name)))
+        return events
+
+    def close(self) -> None:
+        if self._fd >= 0:
+            os.close(self._fd)
+            self._fd = -1
+
+    def __enter__(self) -> "Inotify":
+        return self
+
+    def __exit__(self, *_exc: object) -> None:
+        self.close()
+
+
+class AsyncPathWatch:
+    """Wake an asyncio task when a file or directory changes.
+
+    ``wait()`` returns as soon as inotify reports one of ``mask`` for
+    ``path`` or after ``timeout`` seconds, whichever comes first. Without
+    inotify it simply sleeps for ``timeout``.
+    """
+
+    def __init__(
+        self,
+        path: str | os.PathLike[str],
+        mask: int = IN_MODIFY | IN_CLOSE_WRITE | IN_MOVE_SELF | IN_DELETE_SELF | IN_ATTRIB,
+    ) -> None:
+        self._path = Path(path)
+        self._mask = mask
+        self._inotify: Inotify | None = None
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._changed = asyncio.Event()
+
+    @property
+    def active(self) -> bool:
+        return self._inotify is not None
+
+    def start(self) -> bool:
+        """Begin watching; returns ``False`` when falling back to timeouts."""
+
+        if self._inotify is not None or not inotify_available():
+            return self._inotify is not None
+        try:
+            watcher = Inotify()
+        except OSError:
+            return False
+        try:
+            watcher.add_watch(self._path, self._mask)
+        except OSError:
+            watcher.close()
+            return False
+        self._loop = asyncio.get_running_loop()
+        self._loop.add_reader(watcher.fileno(), self._on_readable)
+        self._inotify = watcher
+        return True
+
+    def _on_readable(self) -> None:
+        watcher = self._inotify
+        if watcher is None:
+            return
+        if watcher.read_events():
+            self._changed.set()
+
+    async def wait(self, timeout: float) -> bool:
+        """Return ``True`` if a change was observed before ``timeout``."""
+
+        if self._inotify is None:
+            await asyncio.sleep(timeout)
+            return False
+        try:
+            await asyncio.wait_for(self._changed.wait(), timeout)
+        except asyncio.TimeoutError:
+            return False
+        finally:
+            self._changed.clear()
+        return True
+
+    def close(self) -> None:
+        watcher = self._inotify
+        self._inotify = None
+        if watcher is None:
+            return
+        if self._loop is not None:
+            try:
+                self._loop.remove_reader(watcher.fileno())
+            except Exception:  # pragma: no cover - loop already closed
+                pass
+        watcher.close()
+
+    async def __aenter__(self) -> "AsyncPathWatch":
+        self.start()
+        return self
+
+    async def __aexit__(self, *_exc: object) -> None:
+        self.close()
+
+
+__all__ = [
+    "AsyncPathWatch",
+    "IN_ATTRIB",
+    "IN_CLOSE_WRITE",
+    "IN_CREATE",
+    "IN_DELETE",
+    "IN_DELETE_SELF",
+    "IN_IGNORED",
+    "IN_MODIFY",
+    "IN_MOVED_FROM",
+    "IN_MOVED_TO",
+    "IN_MOVE_SELF",
+    "IN_ONLYDIR",
+    "IN_Q_OVERFLOW",
+    "Inotify",
+    "InotifyEvent",
+    "inotify_available",
+]
@@ -9,7 +9,12 @@ import time
 from collections import deque
 from queue import Empty
 from typing import Any, Iterable, Optional, Tuple
-from lib.segmenter import ENCODING_STATUS, TimelineRecorder, perform_startup_recovery
+from lib.segmenter import (
+    ENCODING_STATUS,
+    TimelineRecorder,
+    perform_startup_recovery,
+    start_notification_delivery,
+)
 from lib.config import get_cfg
 from lib.fault_handler import reset_usb
 from lib.hls_mux import HLSTee
@@ -518,6 +523,8 @@ def main():
     except Exception as exc:  # noqa: BLE001 - diagnostics only
         print(f"[live] WARN: startup recovery failed: {exc!r}", flush=True)
 
+    start_notification_delivery()
+
     publish_frame = None
     hls = None
     webrtc_writer = None
@@ -0,0 +1,312 @@
+"""Persistent outbox for event notifications.
+
+:class:`lib.notifications.NotificationDispatcher` used to hold pending
+notifications in a 32-entry in-memory queue: a burst of events dropped
+alerts, a failed delivery was never retried and a restart lost whatever was
+still queued. Notifications are now written here first, one row per
+channel (``webhook`` or ``email``), and the dispatcher's channel workers
+claim, deliver and remove them.
+
+* :meth:`NotificationOutbox.claim` leases due messages to one worker; a
+  worker that dies mid-delivery leaves the lease to expire and the message
+  is delivered again (at least once);
+* each failure pushes the next attempt back exponentially, from
+  ``retry_base`` up to ``retry_max`` seconds; after ``max_attempts`` the
+  message is given up and reported by the caller;
+* :meth:`NotificationOutbox.claim_within_budget` enforces a channel's
+  per-period send budget. Sends are logged in the same database and
+  reserved in the claiming transaction, so the budget holds across every
+  worker of every process that delivers from the outbox.
+
+The database lives in the recordings root (``.notification_outbox.sqlite3``)
+unless ``notifications.delivery.outbox_path`` says otherwise.
+"""
+
+from __future__ import annotations
+
+import contextlib
+import json
+import sqlite3
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Iterable, Iterator
+
+from lib.archival_journal import retry_delay
+
+OUTBOX_FILENAME = ".notification_outbox.sqlite3"
+SCHEMA_VERSION = 2
+# Older schemas that only lack tables; they are upgraded without dropping
+# queued messages.
+_UPGRADABLE_VERSIONS = frozenset({1})
+
+_SCHEMA = (
+    """
+    CREATE TABLE IF NOT EXISTS messages (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        channel TEXT NOT NULL,
+        payload TEXT NOT NULL,
+        enqueued_at REAL NOT NULL,
+        attempts INTEGER NOT NULL DEFAULT 0,
+        next_attempt REAL NOT NULL,
+        last_error TEXT
+    )
+    """,
+    "CREATE INDEX IF NOT EXISTS messages_by_due ON messages (channel, next_attempt, id)",
+    "CREATE TABLE IF NOT EXISTS sends (channel TEXT NOT NULL, sent_at REAL NOT NULL)",
+    "CREATE INDEX IF NOT EXISTS sends_by_channel ON sends (channel, sent_at)",
+)
+
+
+@dataclass(frozen=True)
+class OutboxMessage:
+    id: int
+    channel: str
+    payload: dict[str, Any]
+    enqueued_at: float
+    attempts: int
+
+
+@dataclass(frozen=True)
+class SendBudget:
+    """At most ``limit`` sends per ``period`` seconds on one channel."""
+
+    limit: int
+    period: float = 3600.0
+
+
+@dataclass(frozen=True)
+class BudgetedClaim:
+    """Messages leased under a send budget.
+
+    ``coalesce`` says the messages must go out as one digest (one send);
+    ``retry_after`` is set when the budget is spent and nothing was claimed.
+    """
+
+    messages: list[OutboxMessage]
+    coalesce: bool
+    retry_after: float = 0.0
+
+
+class NotificationOutbox:
+    """Pending notifications keyed by channel."""
+
+    def __init__(self, path: Path) -> None:
+        self.path = Path(path)
+
+    @contextlib.contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        conn = sqlite3.connect(str(self.path), timeout=10.0, isolation_level=None)
+        try:
+            conn.execute("PRAGMA synchronous=NORMAL")
+            version = conn.execute("PRAGMA user_version").fetchone()[0]
+            if version != SCHEMA_VERSION:
+                conn.execute("BEGIN IMMEDIATE")
+                try:
+                    if version and version not in _UPGRADABLE_VERSIONS:
+                        conn.execute("DROP TABLE IF EXISTS messages")
+                        conn.execute("DROP TABLE IF EXISTS sends")
+                    for statement in _SCHEMA:
+                        conn.execute(statement)
+                    conn.execute(f"PRAGMA user_version={SCHEMA_VERSION}")
+                    conn.execute("COMMIT")
+                except BaseException:
+                    conn.execute("ROLLBACK")
+                    raise
+            yield conn
+        finally:
+            conn.close()
+
+    @contextlib.contextmanager
+    def _transaction(self) -> Iterator[sqlite3.Connection]:
+        with self._connect() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                yield conn
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+            conn.execute("COMMIT")
+
+    def enqueue(
+        self,
+        channels: Iterable[str],
+        payload: dict[str, Any],
+        *,
+        due: float | None = None,
+        now: float | None = None,
+    ) -> list[int]:
+        """Queue ``payload`` once per channel; returns the new message ids.
+
+        ``due`` holds the messages back until then (digest windows).
+        """
+
+        now = time.time() if now is None else now
+        due = now if due is None else due
+        body = json.dumps(payload, separators=(",", ":"), default=str)
+        ids: list[int] = []
+        with self._transaction() as conn:
+            for channel in channels:
+                cursor = conn.execute(
+                    "INSERT INTO messages (channel, payload, enqueued_at, next_attempt) VALUES (?, ?, ?, ?)",
+                    (channel, body, now, due),
+                )
+                ids.append(int(cursor.lastrowid))
+        return ids
+
+    def claim(
+        self,
+        channel: str,
+        *,
+        limit: int,
+        lease: float,
+        now: float | None = None,
+    ) -> list[OutboxMessage]:
+        """Lease up to ``limit`` due messages for ``lease`` seconds."""
+
+        now = time.time() if now is None else now
+        with self._transaction() as conn:
+            rows = self._lease(conn, channel, limit=limit, lease=lease, now=now)
+        return self._messages(channel, rows)
+
+    def claim_within_budget(
+        self,
+        channel: str,
+        *,
+        batch: int,
+        lease: float,
+        budget: SendBudget,
+        coalesce: bool = False,
+        digest_limit: int = 1,
+        now: float | None = None,
+    ) -> BudgetedClaim:
+        """Lease due messages without overspending ``budget``.
+
+        Up to ``batch`` messages are claimed as separate sends while more
+        than one send is left; the last send of the budget (or any claim
+        with ``coalesce``) takes up to ``digest_limit`` messages as one
+        digest. The sends are logged before the transaction commits.
+        """
+
+        now = time.time() if now is None else now
+        with self._transaction() as conn:
+            conn.execute(
+                "DELETE FROM sends WHERE channel = ? AND sent_at <= ?", (channel, now - budget.period)
+            )
+            used, oldest = conn.execute(
+                "SELECT COUNT(*), MIN(sent_at) FROM sends WHERE channel = ?", (channel,)
+            ).fetchone()
+            remaining = max(1, int(budget.limit)) - int(used)
+            if remaining <= 0:
+                # Spent: events pile up here and go out together once it refills.
+                retry_after = max(0.01, float(oldest) + budget.period - now)
+                return BudgetedClaim([], coalesce, retry_after)
+            coalesce = coalesce or remaining == 1
+            limit = digest_limit if coalesce else min(batch, remaining - 1)
+            rows = self._lease(conn, channel, limit=limit, lease=lease, now=now)
+            sends = (1 if rows else 0) if coalesce else len(rows)
+            conn.executemany(
+                "INSERT INTO sends (channel, sent_at) VALUES (?, ?)", [(channel, now)] * sends
+            )
+        return BudgetedClaim(self._messages(channel, rows), coalesce)
+
+    @staticmethod
+    def _lease(
+        conn: sqlite3.Connection, channel: str, *, limit: int, lease: float, now: float
+    ) -> list[tuple[Any, ...]]:
+        rows = conn.execute(
+            """
+            SELECT id, payload, enqueued_at, attempts FROM messages
+            WHERE channel = ? AND next_attempt <= ?
+            ORDER BY next_attempt, id
+            LIMIT ?
+            """,
+            (channel, now, max(0, int(limit))),
+        ).fetchall()
+        conn.executemany(
+            "UPDATE messages SET next_attempt = ? WHERE id = ?",
+            [(now + lease, row[0]) for row in rows],
+        )
+        return rows
+
+    @staticmethod
+    def _messages(channel: str, rows: list[tuple[Any, ...]]) -> list[OutboxMessage]:
+        messages: list[OutboxMessage] = []
+        for message_id, body, enqueued_at, attempts in rows:
+            try:
+                payload = json.loads(body)
+            except ValueError:
+                payload = {}
+            messages.append(
+                OutboxMessage(
+                    id=int(message_id),
+                    channel=channel,
+                    payload=payload if isinstance(payload, dict) else {},
+                    enqueued_at=float(enqueued_at),
+                    attempts=int(attempts),
+                )
+            )
+        return messages
+
+    def next_due(self, channel: str) -> float | None:
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT MIN(next_attempt) FROM messages WHERE channel = ?", (channel,)
+            ).fetchone()
+        return float(row[0]) if row and row[0] is not None else None
+
+    def complete(self, ids: Iterable[int]) -> None:
+        """Forget delivered (or permanently rejected) messages."""
+
+        rows = [(int(message_id),) for message_id in ids]
+        if not rows:
+            return
+        with self._transaction() as conn:
+            conn.executemany("DELETE FROM messages WHERE id = ?", rows)
+
+    def fail(
+        self,
+        failures: dict[int, str],
+        *,
+        retry_base: float,
+        retry_max: float,
+        max_attempts: int,
+        now: float | None = None,
+    ) -> list[int]:
+        """Schedule retries; returns the ids given up after ``max_attempts``."""
+
+        now = time.time() if now is None else now
+        exhausted: list[int] = []
+        with self._transaction() as conn:
+            for message_id, error in failures.items():
+                row = conn.execute("SELECT attempts FROM messages WHERE id = ?", (int(message_id),)).fetchone()
+                if row is None:
+                    continue
+                attempts = int(row[0]) + 1
+                if max_attempts > 0 and attempts >= max_attempts:
+                    conn.execute("DELETE FROM messages WHERE id = ?", (int(message_id),))
+                    exhausted.append(int(message_id))
+                    continue
+                delay = retry_delay(attempts, base=retry_base, cap=retry_max)
+                conn.execute(
+                    "UPDATE messages SET attempts = ?, next_attempt = ?, last_error = ? WHERE id = ?",
+                    (attempts, now + delay, str(error)[:500], int(message_id)),
+                )
+        return exhausted
+
+    def pending(self) -> dict[str, int]:
+        with self._connect() as conn:
+            return {
+                str(channel): int(count)
+                for channel, count in conn.execute("SELECT channel, COUNT(*) FROM messages GROUP BY channel")
+            }
+
+
+__all__ = [
+    "BudgetedClaim",
+    "NotificationOutbox",
+    "OUTBOX_FILENAME",
+    "OutboxMessage",
+    "SendBudget",
+]
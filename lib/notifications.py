@@ -1,18 +1,56 @@
 #!/usr/bin/env python3
-"""Utility helpers for optional event notifications."""
-
+"""Utility helpers for optional event notifications.
+
+Finished events are written to a persistent outbox
+(:mod:`lib.notification_outbox`) and delivered by per-channel worker
+threads, so a burst of events or a flaky endpoint no longer loses alerts:
+
+* each of ``delivery.webhook_workers`` keeps one HTTP/1.1 keep-alive
+  connection to the webhook, so back-to-back notifications skip the TCP and
+  TLS handshakes;
+* each of ``delivery.email_workers`` takes up to ``email_batch_size`` queued
+  messages and sends them over one SMTP session, which stays open for
+  ``smtp_keepalive_seconds`` between batches;
+* failed deliveries are retried with exponential backoff between
+  ``retry_base_seconds`` and ``retry_max_seconds``, up to ``max_attempts``;
+  permanent rejections (HTTP 4xx, SMTP 5xx) are dropped with a warning.
+
+Outbound work is bounded no matter how many events finish:
+
+* with ``digest.window_seconds`` events are held until the end of the
+  current window (aligned to the clock) and every channel sends everything
+  that is due as one summary message of up to ``digest.max_events`` events;
+* ``delivery.webhook_max_per_hour`` / ``email_max_per_hour`` cap the
+  messages a channel sends in any hour. When only one send is left in the
+  budget it carries everything due as a digest, and events arriving while
+  the budget is spent wait for it to refill and are merged then; nothing is
+  dropped. The sends are logged in the outbox itself, so the budget is
+  shared by every worker of every service delivering from it.
+"""
+
+import collections
+import contextlib
+import http.client
 import json
-import queue
 import socket
+import sqlite3
+import tempfile
 import threading
 import time
-from dataclasses import dataclass, field
+from dataclasses import dataclass, field, replace
 from email.message import EmailMessage
+from pathlib import Path
 from typing import Any
-from urllib.error import URLError
-from urllib.request import Request, urlopen
+from urllib.parse import urlsplit
 
 from lib.config import event_type_aliases, get_cfg
+from lib.notification_outbox import OUTBOX_FILENAME, NotificationOutbox, OutboxMessage, SendBudget
+
+# Longest a channel worker sleeps before looking at the outbox again.
+_IDLE_POLL_SECONDS = 30.0
+
+_DIGEST_SUBJECT_TEMPLATE = "Tricorder: {count} events on {host} ({summary})"
+_DIGEST_LINE_TEMPLATE = "{started_at}  {etype}  RMS {trigger_rms}  {duration_seconds}s  {base_name}"
 
 def _as_int(value: Any, default: int | None = None) -> int | None:
     try:
@@ -106,8 +144,280 @@ class NotificationFilters:
         return True
 
 
+class DeliveryError(Exception):
+    """A delivery attempt failed; ``permanent`` failures are not retried."""
+
+    def __init__(self, message: str, *, permanent: bool = False) -> None:
+        super().__init__(message)
+        self.permanent = permanent
+
+
+@dataclass(frozen=True)
+class DeliverySettings:
+    """``notifications.delivery``: outbox location, workers and retries."""
+
+    outbox_path: Path | None = None
+    webhook_workers: int = 2
+    email_workers: int = 1
+    email_batch_size: int = 20
+    retry_base: float = 5.0
+    retry_max: float = 900.0
+    max_attempts: int = 10
+    smtp_keepalive: float = 60.0
+    digest_window: float = 0.0
+    digest_max_events: int = 100
+    webhook_max_per_hour: int = 0
+    email_max_per_hour: int = 0
+    # Length of the rate-limit budget; fixed at an hour outside tests.
+    rate_period: float = 3600.0
+    # A claimed message becomes due again if its worker has not finished
+    # with it by then (e.g. the process was killed mid-delivery).
+    lease: float = 300.0
+
+    @classmethod
+    def from_cfg(cls, cfg: dict[str, Any] | None) -> "DeliverySettings":
+        raw = (cfg or {}).get("delivery") or {}
+        if not isinstance(raw, dict):
+            raw = {}
+        digest = (cfg or {}).get("digest") or {}
+        if not isinstance(digest, dict):
+            digest = {}
+        defaults = cls()
+
+        def _number(key: str, default: float, minimum: float, section: dict[str, Any] = raw) -> float:
+            try:
+                return max(minimum, float(section.get(key, default)))
+            except (TypeError, ValueError):
+                return default
+
+        outbox_path = str(raw.get("outbox_path") or "").strip()
+        return cls(
+            outbox_path=Path(outbox_path) if outbox_path else None,
+            webhook_workers=int(_number("webhook_workers", defaults.webhook_workers, 1)),
+            email_workers=int(_number("email_workers", defaults.email_workers, 1)),
+            email_batch_size=int(_number("email_batch_size", defaults.email_batch_size, 1)),
+            retry_base=_number("retry_base_seconds", defaults.retry_base, 0.01),
+            retry_max=_number("retry_max_seconds", defaults.retry_max, 0.01),
+            max_attempts=int(_number("max_attempts", defaults.max_attempts, 0)),
+            smtp_keepalive=_number("smtp_keepalive_seconds", defaults.smtp_keepalive, 0.0),
+            digest_window=_number("window_seconds", defaults.digest_window, 0.0, digest),
+            digest_max_events=int(_number("max_events", defaults.digest_max_events, 1, digest)),
+            webhook_max_per_hour=int(_number("webhook_max_per_hour", defaults.webhook_max_per_hour, 0)),
+            email_max_per_hour=int(_number("email_max_per_hour", defaults.email_max_per_hour, 0)),
+        )
+
+    def max_per_period(self, channel: str) -> int:
+        return self.webhook_max_per_hour if channel == "webhook" else self.email_max_per_hour
+
+    def digest_due(self, now: float) -> float:
+        """When an event enqueued at ``now`` may go out."""
+
+        if self.digest_window <= 0:
+            return now
+        return (now // self.digest_window + 1) * self.digest_window
+
+
+# Errors raised when a kept-alive connection was closed by the server while
+# idle; the request is repeated once on a fresh connection.
+_STALE_CONNECTION_ERRORS = (
+    http.client.CannotSendRequest,
+    http.client.RemoteDisconnected,
+    BrokenPipeError,
+    ConnectionResetError,
+)
+
+
+class _WebhookClient:
+    """One HTTP/1.1 keep-alive connection to the webhook endpoint.
+
+    Not thread-safe: each webhook worker owns its own client.
+    """
+
+    def __init__(
+        self,
+        url: str,
+        *,
+        method: str = "POST",
+        headers: dict[str, str] | None = None,
+        timeout: float = 5.0,
+    ) -> None:
+        parts = urlsplit(url)
+        if parts.scheme not in {"http", "https"} or not parts.hostname:
+            raise ValueError(f"unsupported webhook URL: {url!r}")
+        self._https = parts.scheme == "https"
+        self._host = parts.hostname
+        self._port = parts.port
+        self._target = (parts.path or "/") + (f"?{parts.query}" if parts.query else "")
+        self.method = method
+        self.headers = {"Content-Type": "application/json", **(headers or {})}
+        self.timeout = timeout
+        self.connections_opened = 0
+        self._conn: http.client.HTTPConnection | None = None
+        self._reused = False
+
+    def _connection(self) -> http.client.HTTPConnection:
+        if self._conn is not None:
+            self._reused = True
+            return self._conn
+        if self._https:
+            import ssl
+
+            self._conn = http.client.HTTPSConnection(
+                self._host,
+                self._port,
+                timeout=self.timeout,
+                context=ssl.create_default_context(),
+            )
+        else:
+            self._conn = http.client.HTTPConnection(self._host, self._port, timeout=self.timeout)
+        self.connections_opened += 1
+        self._reused = False
+        return self._conn
+
+    def send(self, payload: dict[str, Any]) -> None:
+        body = json.dumps(payload, separators=(",", ":")).encode("utf-8")
+        while True:
+            conn = self._connection()
+            try:
+                conn.request(self.method, self._target, body=body, headers=self.headers)
+                response = conn.getresponse()
+                response.read()
+            except (http.client.HTTPException, OSError) as exc:
+                reused = self._reused
+                self.close()
+                if reused and isinstance(exc, _STALE_CONNECTION_ERRORS):
+                    continue
+                raise DeliveryError(f"webhook request failed: {exc}") from exc
+            break
+        if response.will_close:
+            self.close()
+        if response.status >= 400:
+            # Client errors other than timeouts and rate limiting will not
+            # succeed on a retry.
+            permanent = response.status < 500 and response.status not in {408, 429}
+            raise DeliveryError(f"webhook returned HTTP {response.status}", permanent=permanent)
+
+    def idle(self, now: float) -> None:
+        """Keep-alive connections stay open; the server decides when to close."""
+
+    def close(self) -> None:
+        if self._conn is not None:
+            try:
+                self._conn.close()
+            finally:
+                self._conn = None
+
+
+class _SmtpSession:
+    """An SMTP connection reused for consecutive messages.
+
+    The session is checked with ``NOOP`` before reuse and closed once it has
+    been idle for ``keepalive`` seconds. Not thread-safe: each email worker
+    owns its own session.
+    """
+
+    def __init__(self, email_cfg: dict[str, Any], *, keepalive: float = 60.0) -> None:
+        self.host = str(email_cfg.get("smtp_host") or "").strip()
+        self.port = _as_int(email_cfg.get("smtp_port"), 587) or 587
+        self.use_ssl = bool(email_cfg.get("use_ssl", False))
+        self.use_tls = bool(email_cfg.get("use_tls", True))
+        self.username = str(email_cfg.get("username") or "").strip()
+        self.password = email_cfg.get("password")
+        self.timeout = float(email_cfg.get("timeout_sec", 10.0) or 10.0)
+        self.keepalive = keepalive
+        self.sessions_opened = 0
+        self._smtp: Any | None = None
+        self._last_used = 0.0
+
+    def _open(self) -> Any:
+        smtplib_mod, ssl_mod = _load_email_modules(self.use_ssl or self.use_tls)
+        if smtplib_mod is None:
+            raise DeliveryError("email delivery unavailable", permanent=True)
+        if (self.use_ssl or self.use_tls) and ssl_mod is None:
+            raise DeliveryError("email delivery requires TLS", permanent=True)
+        if self.use_ssl:
+            smtp = smtplib_mod.SMTP_SSL(
+                self.host,
+                self.port,
+                timeout=self.timeout,
+                context=ssl_mod.create_default_context(),
+            )
+        else:
+            smtp = smtplib_mod.SMTP(self.host, self.port, timeout=self.timeout)
+        try:
+            if self.use_tls and not self.use_ssl:
+                smtp.starttls(context=ssl_mod.create_default_context())
+            if self.username and self.password:
+                smtp.login(self.username, self.password)
+        except BaseException:
+            with contextlib.suppress(Exception):
+                smtp.close()
+            raise
+        self.sessions_opened += 1
+        return smtp
+
+    def _session(self) -> Any:
+        if self._smtp is not None:
+            alive = time.monotonic() - self._last_used < self.keepalive
+            if alive:
+                try:
+                    alive = self._smtp.noop()[0] == 250
+                except Exception:
+                    alive = False
+            if not alive:
+                self.close()
+        if self._smtp is None:
+            self._smtp = self._open()
+        return self._smtp
+
+    def send(self, message: EmailMessage) -> None:
+        try:
+            smtp = self._session()
+            smtp.send_message(message)
+        except DeliveryError:
+            raise
+        except Exception as exc:
+            codes = [getattr(exc, "smtp_code", None)]
+            recipients = getattr(exc, "recipients", None)
+            if isinstance(recipients, dict):
+                codes = [value[0] for value in recipients.values() if isinstance(value, tuple) and value]
+            codes = [code for code in codes if isinstance(code, int)]
+            if not codes:
+                # Not a server reply (dropped connection, timeout): the
+                # session cannot be trusted any more.
+                self.close()
+            permanent = bool(codes) and all(code >= 500 for code in codes)
+            raise DeliveryError(f"email delivery failed: {exc}", permanent=permanent) from exc
+        finally:
+            self._last_used = time.monotonic()
+
+    def idle(self, now: float) -> None:
+        if self._smtp is not None and time.monotonic() - self._last_used >= self.keepalive:
+            self.close()
+
+    def close(self) -> None:
+        smtp, self._smtp = self._smtp, None
+        if smtp is None:
+            return
+        try:
+            smtp.quit()
+        except Exception:
+            with contextlib.suppress(Exception):
+                smtp.close()
+
+
 class NotificationDispatcher:
-    """Send notifications when an event completes."""
+    """Send notifications when an event completes.
+
+    With ``run_async`` (the default) events go through the persistent
+    outbox and per-channel workers deliver them; otherwise each event is
+    delivered inline, once, without retries.
+
+    Constructing a dispatcher only lets it enqueue. The delivery workers
+    start with :meth:`start`, which the long-running services call, so a
+    process that merely imports the recorder (an ingest pool worker, a
+    one-off tool) adds to the shared outbox without also draining it.
+    """
 
     def __init__(
         self,
@@ -116,16 +426,21 @@ class NotificationDispatcher:
         webhook_cfg: dict[str, Any] | None,
         email_cfg: dict[str, Any] | None,
         run_async: bool = True,
-        queue_size: int = 32,
+        outbox: NotificationOutbox | None = None,
+        settings: DeliverySettings | None = None,
     ) -> None:
         self.filters = filters
         self.webhook_cfg = webhook_cfg or {}
         self.email_cfg = email_cfg or {}
+        self.settings = settings or DeliverySettings()
         self.hostname = socket.gethostname()
         self._run_async = run_async
-        self._queue: queue.Queue[dict[str, Any]] | None = None
-        self._worker: threading.Thread | None = None
-        self._queue_size = max(1, int(queue_size or 32))
+        self._outbox = outbox
+        self._stop = threading.Event()
+        self._wake: dict[str, threading.Event] = {}
+        self._budgets: dict[str, SendBudget] = {}
+        self._workers: list[threading.Thread] = []
+        self._start_lock = threading.Lock()
 
         self.webhook_url = str(self.webhook_cfg.get("url") or "").strip()
         self.webhook_method = (
@@ -136,15 +451,41 @@ class NotificationDispatcher:
 
         self.email_recipients = _as_list(self.email_cfg.get("to"))
         self.email_sender = str(self.email_cfg.get("from") or "").strip()
+        self.email_smtp_host = str(self.email_cfg.get("smtp_host") or "").strip()
 
         if self._run_async:
-            self._queue = queue.Queue(maxsize=self._queue_size)
-            self._worker = threading.Thread(
-                target=self._dispatch_loop,
-                name="notification-dispatcher",
-                daemon=True,
-            )
-            self._worker.start()
+            if self._outbox is None:
+                self._outbox = NotificationOutbox(
+                    self.settings.outbox_path or Path(tempfile.gettempdir()) / OUTBOX_FILENAME
+                )
+            for channel in self._channels():
+                self._wake[channel] = threading.Event()
+                max_per_period = self.settings.max_per_period(channel)
+                if max_per_period > 0:
+                    self._budgets[channel] = SendBudget(max_per_period, period=self.settings.rate_period)
+
+    def start(self) -> None:
+        """Start the outbox delivery workers; later calls do nothing."""
+
+        if not self._run_async:
+            return
+        workers = {
+            "webhook": self.settings.webhook_workers,
+            "email": self.settings.email_workers,
+        }
+        with self._start_lock:
+            if self._workers or self._stop.is_set():
+                return
+            for channel in self._wake:
+                for idx in range(workers[channel]):
+                    thread = threading.Thread(
+                        target=self._channel_loop,
+                        args=(channel,),
+                        name=f"notification-{channel}-{idx}",
+                        daemon=True,
+                    )
+                    thread.start()
+                    self._workers.append(thread)
 
     @staticmethod
     def _normalise_headers(headers: Any) -> dict[str, str]:
@@ -156,6 +497,14 @@ class NotificationDispatcher:
             }
         return {}
 
+    def _channels(self) -> list[str]:
+        channels: list[str] = []
+        if self.webhook_url:
+            channels.append("webhook")
+        if self.email_sender and self.email_recipients and self.email_smtp_host:
+            channels.append("email")
+        return channels
+
     def handle_event(self, event: dict[str, Any]) -> None:
         if not self.filters.matches(event):
             return
@@ -170,31 +519,190 @@ class NotificationDispatcher:
             self._dispatch_payload(payload)
             return
 
-        assert self._queue is not None
+        channels = list(self._wake)
+        if not channels:
+            return
+        assert self._outbox is not None
         try:
-            self._queue.put_nowait(payload)
-        except queue.Full:
+            self._outbox.enqueue(channels, payload, due=self.settings.digest_due(payload["generated_at"]))
+        except (OSError, sqlite3.Error) as exc:
             print(
-                "[notifications] WARN: dropping notification payload (queue full)",
+                f"[notifications] WARN: outbox unavailable ({exc}); sending without retries",
                 flush=True,
             )
+            threading.Thread(
+                target=self._dispatch_payload,
+                args=(payload,),
+                name="notification-fallback",
+                daemon=True,
+            ).start()
+            return
+        for channel in channels:
+            self._wake[channel].set()
+
+    def close(self, timeout: float | None = 5.0) -> None:
+        """Stop the channel workers; undelivered messages stay in the outbox."""
+
+        self._stop.set()
+        for event in self._wake.values():
+            event.set()
+        for thread in self._workers:
+            thread.join(timeout)
+
+    # --- outbox workers ---
+    def _new_client(self, channel: str) -> "_WebhookClient | _SmtpSession":
+        if channel == "webhook":
+            return _WebhookClient(
+                self.webhook_url,
+                method=self.webhook_method,
+                headers=self.webhook_headers,
+                timeout=self.webhook_timeout,
+            )
+        return _SmtpSession(self.email_cfg, keepalive=self.settings.smtp_keepalive)
 
-    def _dispatch_loop(self) -> None:
-        assert self._queue is not None
-        while True:
-            try:
-                payload = self._queue.get()
-            except Exception:
-                continue
-
-            if payload is None:
-                self._queue.task_done()
-                break
+    def _idle_wait(self, channel: str) -> float:
+        assert self._outbox is not None
+        try:
+            next_due = self._outbox.next_due(channel)
+        except (OSError, sqlite3.Error):
+            next_due = None
+        if next_due is None:
+            return _IDLE_POLL_SECONDS
+        return min(_IDLE_POLL_SECONDS, max(0.01, next_due - time.time()))
+
+    def _channel_loop(self, channel: str) -> None:
+        assert self._outbox is not None
+        try:
+            client = self._new_client(channel)
+        except ValueError as exc:
+            print(f"[notifications] WARN: {channel} disabled: {exc}", flush=True)
+            return
+        batch = self.settings.email_batch_size if channel == "email" else 1
+        wake = self._wake[channel]
+        budget = self._budgets.get(channel)
+        try:
+            while not self._stop.is_set():
+                # Clear before claiming so an enqueue racing with an empty
+                # claim still wakes this worker.
+                wake.clear()
+                pause = 0.0
+                coalesce = self.settings.digest_window > 0
+                messages: list[OutboxMessage] = []
+                try:
+                    if budget is not None:
+                        # The budget check and the send reservations share the
+                        # claim's transaction, so concurrent workers (in any
+                        # process) cannot overspend it.
+                        claimed = self._outbox.claim_within_budget(
+                            channel,
+                            batch=batch,
+                            lease=self.settings.lease,
+                            budget=budget,
+                            coalesce=coalesce,
+                            digest_limit=self.settings.digest_max_events,
+                        )
+                        messages, coalesce, pause = claimed.messages, claimed.coalesce, claimed.retry_after
+                    else:
+                        limit = self.settings.digest_max_events if coalesce else batch
+                        messages = self._outbox.claim(channel, limit=limit, lease=self.settings.lease)
+                except (OSError, sqlite3.Error) as exc:
+                    print(f"[notifications] WARN: outbox read failed: {exc}", flush=True)
+                if messages:
+                    self._deliver(channel, client, messages, coalesce=coalesce)
+                    continue
+                if pause:
+                    wake.wait(min(pause, _IDLE_POLL_SECONDS))
+                    continue
+                client.idle(time.time())
+                wake.wait(self._idle_wait(channel))
+        finally:
+            client.close()
+
+    def _digest_payload(self, payloads: list[dict[str, Any]]) -> dict[str, Any]:
+        events = [payload.get("event", {}) for payload in payloads]
+        counts = collections.Counter(str(event.get("etype") or "Unknown") for event in events)
+        stamps = [float(payload.get("generated_at") or 0.0) for payload in payloads]
+        return {
+            "digest": True,
+            "host": self.hostname,
+            "generated_at": time.time(),
+            "count": len(events),
+            "counts": dict(counts),
+            "first_generated_at": min(stamps),
+            "last_generated_at": max(stamps),
+            "events": events,
+        }
 
+    def _deliver(
+        self,
+        channel: str,
+        client: "_WebhookClient | _SmtpSession",
+        messages: list[OutboxMessage],
+        *,
+        coalesce: bool = False,
+    ) -> int:
+        """Send ``messages`` (as one digest when ``coalesce``); returns the send count."""
+
+        assert self._outbox is not None
+        groups = [messages] if coalesce and len(messages) > 1 else [[message] for message in messages]
+        finished: list[int] = []
+        failed: dict[int, str] = {}
+        for group in groups:
+            if len(group) == 1:
+                payload = group[0].payload
+            else:
+                payload = self._digest_payload([message.payload for message in group])
             try:
-                self._dispatch_payload(payload)
-            finally:
-                self._queue.task_done()
+                if isinstance(client, _SmtpSession):
+                    client.send(self._build_email(payload))
+                else:
+                    client.send(payload)
+            except DeliveryError as exc:
+                if exc.permanent:
+                    print(f"[notifications] WARN: {channel} delivery rejected: {exc}", flush=True)
+                    finished.extend(message.id for message in group)
+                else:
+                    failed.update((message.id, str(exc)) for message in group)
+            except Exception as exc:  # noqa: BLE001 - keep the worker alive
+                failed.update((message.id, repr(exc)) for message in group)
+            else:
+                finished.extend(message.id for message in group)
+                if len(group) > 1:
+                    print(f"[notifications] {channel}: sent digest of {len(group)} events", flush=True)
+
+        try:
+            self._outbox.complete(finished)
+            exhausted = set(
+                self._outbox.fail(
+                    failed,
+                    retry_base=self.settings.retry_base,
+                    retry_max=self.settings.retry_max,
+                    max_attempts=self.settings.max_attempts,
+                )
+            )
+        except (OSError, sqlite3.Error) as exc:
+            # The leases expire and the messages are sent again.
+            print(f"[notifications] WARN: outbox update failed: {exc}", flush=True)
+            return len(groups)
+        for group in groups:
+            failures = [message for message in group if message.id in failed]
+            if not failures:
+                continue
+            label = f"{channel} notification" if len(group) == 1 else f"{channel} digest of {len(group)} events"
+            error = failed[failures[0].id]
+            given_up = [message for message in failures if message.id in exhausted]
+            if given_up:
+                print(
+                    f"[notifications] WARN: giving up on {len(given_up)} event(s) of {label} after "
+                    f"{max(message.attempts for message in given_up) + 1} attempt(s): {error}",
+                    flush=True,
+                )
+            if len(given_up) < len(failures):
+                print(
+                    f"[notifications] WARN: {label} failed, will retry: {error}",
+                    flush=True,
+                )
+        return len(groups)
 
     def _dispatch_payload(self, payload: dict[str, Any]) -> None:
         try:
@@ -218,39 +726,21 @@ class NotificationDispatcher:
         if not self.webhook_url:
             return
 
-        body = json.dumps(payload, separators=(",", ":")).encode("utf-8")
-        request = Request(
-            self.webhook_url,
-            data=body,
-            method=self.webhook_method,
-            headers={"Content-Type": "application/json", **self.webhook_headers},
-        )
-
+        client = self._new_client("webhook")
         try:
-            with urlopen(request, timeout=self.webhook_timeout) as response:
-                response.read()
-        except URLError as exc:
+            client.send(payload)
+        except DeliveryError as exc:
             print(
                 f"[notifications] WARN: webhook delivery failed: {exc}",
                 flush=True,
             )
+        finally:
+            client.close()
 
     # --- email ---
-    def _send_email(self, payload: dict[str, Any]) -> None:
-        if not (self.email_sender and self.email_recipients):
-            return
-
-        smtp_host = str(self.email_cfg.get("smtp_host") or "").strip()
-        if not smtp_host:
-            return
-
-        smtp_port = _as_int(self.email_cfg.get("smtp_port"), 587) or 587
-        use_ssl = bool(self.email_cfg.get("use_ssl", False))
-        use_tls = bool(self.email_cfg.get("use_tls", True))
-        username = str(self.email_cfg.get("username") or "").strip()
-        password = self.email_cfg.get("password")
-        timeout = float(self.email_cfg.get("timeout_sec", 10.0) or 10.0)
-
+    def _build_email(self, payload: dict[str, Any]) -> EmailMessage:
+        if payload.get("digest"):
+            return self._build_digest_email(payload)
         event = payload.get("event", {})
         subject_template = (
             self.email_cfg.get("subject_template")
@@ -277,42 +767,46 @@ class NotificationDispatcher:
         message["To"] = ", ".join(self.email_recipients)
         message["Subject"] = subject
         message.set_content(body)
+        return message
+
+    def _build_digest_email(self, payload: dict[str, Any]) -> EmailMessage:
+        counts = payload.get("counts") or {}
+        summary = ", ".join(f"{etype} {count}" for etype, count in sorted(counts.items()))
+        fields = _SafeDict(
+            count=payload.get("count", 0),
+            host=payload.get("host", self.hostname),
+            summary=summary,
+        )
+        lines = [
+            _DIGEST_LINE_TEMPLATE.format_map(_SafeDict(event))
+            for event in payload.get("events", [])
+        ]
 
-        require_tls = use_ssl or use_tls
-        smtplib_mod, ssl_mod = _load_email_modules(require_tls)
-        if smtplib_mod is None:
+        message = EmailMessage()
+        message["From"] = self.email_sender
+        message["To"] = ", ".join(self.email_recipients)
+        message["Subject"] = _DIGEST_SUBJECT_TEMPLATE.format_map(fields)
+        message.set_content(
+            "{count} events finished on {host} ({summary}):\n\n".format_map(fields)
+            + "\n".join(lines)
+            + "\n"
+        )
+        return message
+
+    def _send_email(self, payload: dict[str, Any]) -> None:
+        if not (self.email_sender and self.email_recipients and self.email_smtp_host):
             return
 
+        session = self._new_client("email")
         try:
-            if use_ssl:
-                if ssl_mod is None:
-                    return
-                context = ssl_mod.create_default_context()
-                with smtplib_mod.SMTP_SSL(
-                    smtp_host, smtp_port, timeout=timeout, context=context
-                ) as smtp:
-                    self._smtp_login_and_send(smtp, username, password, message)
-            else:
-                with smtplib_mod.SMTP(smtp_host, smtp_port, timeout=timeout) as smtp:
-                    if use_tls:
-                        if ssl_mod is None:
-                            return
-                        context = ssl_mod.create_default_context()
-                        smtp.starttls(context=context)
-                    self._smtp_login_and_send(smtp, username, password, message)
-        except Exception as exc:
+            session.send(self._build_email(payload))
+        except DeliveryError as exc:
             print(
-                f"[notifications] WARN: email delivery failed: {exc}",
+                f"[notifications] WARN: {exc}",
                 flush=True,
             )
-
-    @staticmethod
-    def _smtp_login_and_send(
-        smtp: Any, username: str, password: Any, message: EmailMessage
-    ) -> None:
-        if username and password:
-            smtp.login(username, password)
-        smtp.send_message(message)
+        finally:
+            session.close()
 
 
 class _SafeDict(dict):
@@ -336,9 +830,17 @@ def build_dispatcher(cfg: dict[str, Any] | None) -> NotificationDispatcher | Non
     if not any((webhook_cfg, email_cfg)):
         return None
 
+    settings = DeliverySettings.from_cfg(cfg)
+    if settings.outbox_path is None:
+        paths = get_cfg().get("paths", {})
+        recordings_dir = paths.get("recordings_dir") if isinstance(paths, dict) else None
+        if recordings_dir:
+            settings = replace(settings, outbox_path=Path(recordings_dir) / OUTBOX_FILENAME)
+
     return NotificationDispatcher(
         filters=filters,
         webhook_cfg=webhook_cfg,
         email_cfg=email_cfg,
+        settings=settings,
     )
 
@@ -0,0 +1,419 @@
+"""Stream-copy clipping for Ogg Opus recordings.
+
+Clipping used to decode the requested window with ffmpeg and re-encode it,
+which costs seconds of CPU on a Pi and another generation of lossy coding.
+Ogg Opus can be cut without touching the audio packets instead (RFC 7845):
+
+* the clip starts on an Ogg page boundary at least 80 ms before the requested
+  start, and the OpusHead pre-skip tells the decoder to discard the pre-roll,
+  so the first audible sample is still exactly the requested one;
+* the clip ends on the first page that covers the requested end, and that
+  page's granule position is lowered so the decoder trims the surplus.
+
+Both edges therefore stay sample-accurate without re-encoding. Page offsets
+and granule positions come from a per-recording index that is cached on the
+file's size and mtime. Streams this module cannot cut safely (chained or
+non-Opus streams, packets spanning the cut, pre-skip overflow) raise
+:class:`OggClipUnsupported` so callers can fall back to re-encoding.
+"""
+
+from __future__ import annotations
+
+import collections
+import json
+import math
+import os
+import struct
+import threading
+import zlib
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Mapping
+
+OPUS_SAMPLE_RATE = 48000
+# RFC 7845 section 4.6: decode at least 80 ms before a seek target so the
+# decoder converges before the first sample that is played back.
+OPUS_PREROLL_SAMPLES = 3840
+MAX_PRE_SKIP = 0xFFFF
+INDEX_CACHE_SIZE = 32
+MIN_SLICED_WAVEFORM_BUCKETS = 128
+
+_CAPTURE_PATTERN = b"OggS"
+_PAGE_HEADER = struct.Struct("<4sBBqIIIB")
+_FLAG_CONTINUED = 0x01
+_FLAG_BOS = 0x02
+_FLAG_EOS = 0x04
+_NO_GRANULE = -1
+_BIT_REVERSE = bytes(int(f"{value:08b}"[::-1], 2) for value in range(256))
+
+
+class OggClipUnsupported(Exception):
+    """The recording cannot be clipped by stream copy; re-encode instead."""
+
+
+def ogg_crc(data: bytes) -> int:
+    """Return the Ogg page checksum (CRC-32, poly 0x04C11DB7, MSB first).
+
+    zlib implements the bit-reflected variant in C; feeding it bit-reversed
+    bytes and reversing the result yields the Ogg checksum far faster than a
+    pure-Python table walk.
+    """
+
+    reflected = zlib.crc32(data.translate(_BIT_REVERSE), 0xFFFFFFFF) ^ 0xFFFFFFFF
+    return int(f"{reflected:032b}"[::-1], 2)
+
+
+@dataclass(frozen=True)
+class OggPage:
+    offset: int
+    header_size: int
+    body_size: int
+    header_type: int
+    granule: int
+    sequence: int
+    ends_with_complete_packet: bool
+
+    @property
+    def end(self) -> int:
+        return self.offset + self.header_size + self.body_size
+
+    @property
+    def continued(self) -> bool:
+        return bool(self.header_type & _FLAG_CONTINUED)
+
+
+@dataclass(frozen=True)
+class OpusIndex:
+    """Granule-position index of a single-stream Ogg Opus file."""
+
+    serial: int
+    pre_skip: int
+    header_pages: tuple[OggPage, ...]
+    audio_pages: tuple[OggPage, ...]
+
+    @property
+    def total_samples(self) -> int:
+        for page in reversed(self.audio_pages):
+            if page.granule != _NO_GRANULE:
+                return max(0, page.granule - self.pre_skip)
+        return 0
+
+    @property
+    def duration_seconds(self) -> float:
+        return self.total_samples / OPUS_SAMPLE_RATE
+
+
+@dataclass(frozen=True)
+class ClipPlan:
+    first_page: int
+    last_page: int
+    base_granule: int
+    pre_skip: int
+    final_granule: int
+    start_sample: int
+    end_sample: int
+
+    @property
+    def duration_seconds(self) -> float:
+        return (self.end_sample - self.start_sample) / OPUS_SAMPLE_RATE
+
+
+def _iter_pages(handle: Any) -> list[tuple[OggPage, int, bytes]]:
+    pages: list[tuple[OggPage, int, bytes]] = []
+    offset = 0
+    while True:
+        handle.seek(offset)
+        header = handle.read(_PAGE_HEADER.size)
+        if not header:
+            break
+        if len(header) < _PAGE_HEADER.size:
+            raise OggClipUnsupported("truncated Ogg page header")
+        capture, version, header_type, granule, serial, sequence, _crc, segments = (
+            _PAGE_HEADER.unpack(header)
+        )
+        if capture != _CAPTURE_PATTERN or version != 0:
+            raise OggClipUnsupported("not an Ogg stream")
+        lacing = handle.read(segments)
+        if len(lacing) < segments:
+            raise OggClipUnsupported("truncated Ogg segment table")
+        body_size = sum(lacing)
+        header_size = _PAGE_HEADER.size + segments
+        if offset + header_size + body_size > os.fstat(handle.fileno()).st_size:
+            # A page still being written (or a torn tail) ends the usable index.
+            break
+        page = OggPage(
+            offset=offset,
+            header_size=header_size,
+            body_size=body_size,
+            header_type=header_type,
+            granule=granule,
+            sequence=sequence,
+            ends_with_complete_packet=bool(lacing) and lacing[-1] < 255,
+        )
+        pages.append((page, serial, lacing))
+        offset = page.end
+    return pages
+
+
+def build_index(path: os.PathLike[str] | str) -> OpusIndex:
+    with open(path, "rb") as handle:
+        pages = _iter_pages(handle)
+        if not pages:
+            raise OggClipUnsupported("empty Ogg stream")
+        first, serial, _lacing = pages[0]
+        handle.seek(first.offset + first.header_size)
+        head = handle.read(first.body_size)
+    if not (first.header_type & _FLAG_BOS) or not head.startswith(b"OpusHead"):
+        raise OggClipUnsupported("first page is not an OpusHead")
+    if len(head) < 19 or head[9] != 1 or head[18] != 0:
+        # Channel mapping families other than 0 may carry several streams.
+        raise OggClipUnsupported("unsupported OpusHead layout")
+    pre_skip = struct.unpack_from("<H", head, 10)[0]
+
+    header_pages = [first]
+    index = 1
+    tags_complete = False
+    while index < len(pages) and not tags_complete:
+        page, page_serial, lacing = pages[index]
+        if page_serial != serial:
+            raise OggClipUnsupported("multiplexed Ogg streams are not supported")
+        header_pages.append(page)
+        tags_complete = any(value < 255 for value in lacing)
+        index += 1
+    if not tags_complete:
+        raise OggClipUnsupported("missing OpusTags header")
+
+    audio_pages: list[OggPage] = []
+    for page, page_serial, _lacing in pages[index:]:
+        if page_serial != serial or page.header_type & _FLAG_BOS:
+            raise OggClipUnsupported("chained Ogg streams are not supported")
+        audio_pages.append(page)
+    if not audio_pages:
+        raise OggClipUnsupported("no audio pages")
+    return OpusIndex(
+        serial=serial,
+        pre_skip=pre_skip,
+        header_pages=tuple(header_pages),
+        audio_pages=tuple(audio_pages),
+    )
+
+
+_index_cache: "collections.OrderedDict[tuple[str, int, int], OpusIndex]" = (
+    collections.OrderedDict()
+)
+_index_lock = threading.Lock()
+
+
+def cached_index(path: os.PathLike[str] | str) -> OpusIndex:
+    """Return the index for ``path``, rebuilding it when the file changed."""
+
+    stat = os.stat(path)
+    key = (os.fspath(path), stat.st_size, stat.st_mtime_ns)
+    with _index_lock:
+        cached = _index_cache.get(key)
+        if cached is not None:
+            _index_cache.move_to_end(key)
+            return cached
+    index = build_index(path)
+    with _index_lock:
+        _index_cache[key] = index
+        while len(_index_cache) > INDEX_CACHE_SIZE:
+            _index_cache.popitem(last=False)
+    return index
+
+
+def plan_clip(index: OpusIndex, start_seconds: float, end_seconds: float) -> ClipPlan:
+    pages = index.audio_pages
+    pre_skip = index.pre_skip
+    total = index.total_samples
+    start_sample = max(0, int(round(start_seconds * OPUS_SAMPLE_RATE)))
+    end_sample = min(total, int(round(end_seconds * OPUS_SAMPLE_RATE)))
+    if end_sample <= start_sample:
+        raise OggClipUnsupported("clip range falls outside the recording")
+
+    # Page ``i`` starts at the granule where page ``i - 1`` ended; the first
+    # audio page starts the stream at granule zero.
+    start_granules = [0] + [page.granule for page in pages[:-1]]
+    target = start_sample + pre_skip - OPUS_PREROLL_SAMPLES
+
+    first = 0
+    for candidate in range(len(pages)):
+        boundary = start_granules[candidate]
+        if boundary == _NO_GRANULE:
+            continue
+        if boundary > target:
+            break
+        if candidate and not pages[candidate - 1].ends_with_complete_packet:
+            continue
+        if pages[candidate].continued:
+            continue
+        first = candidate
+    base_granule = start_granules[first]
+    if pages[first].continued:
+        raise OggClipUnsupported("first clip page continues a packet")
+    new_pre_skip = start_sample + pre_skip - base_granule
+    if new_pre_skip > MAX_PRE_SKIP:
+        raise OggClipUnsupported("pages are too long for a pre-skip cut")
+
+    end_granule = end_sample + pre_skip
+    last = None
+    for candidate in range(first, len(pages)):
+        granule = pages[candidate].granule
+        if granule != _NO_GRANULE and granule >= end_granule:
+            last = candidate
+            break
+    if last is None:
+        raise OggClipUnsupported("clip end lies beyond the indexed pages")
+    if not pages[last].ends_with_complete_packet:
+        raise OggClipUnsupported("last clip page ends inside a packet")
+
+    return ClipPlan(
+        first_page=first,
+        last_page=last,
+        base_granule=base_granule,
+        pre_skip=new_pre_skip,
+        final_granule=end_granule - base_granule,
+        start_sample=start_sample,
+        end_sample=end_sample,
+    )
+
+
+def _rewrite_page(
+    page_bytes: bytes, *, header_type: int, granule: int, sequence: int
+) -> bytes:
+    header = bytearray(page_bytes)
+    header[5] = header_type
+    struct.pack_into("<q", header, 6, granule)
+    struct.pack_into("<I", header, 18, sequence)
+    struct.pack_into("<I", header, 22, 0)
+    struct.pack_into("<I", header, 22, ogg_crc(bytes(header)))
+    return bytes(header)
+
+
+def write_clip(
+    source: os.PathLike[str] | str,
+    destination: os.PathLike[str] | str,
+    index: OpusIndex,
+    plan: ClipPlan,
+) -> None:
+    with open(source, "rb") as reader, open(destination, "wb") as writer:
+        for position, page in enumerate(index.header_pages):
+            reader.seek(page.offset)
+            data = reader.read(page.header_size + page.body_size)
+            if position == 0:
+                body = bytearray(data)
+                struct.pack_into("<H", body, page.header_size + 10, plan.pre_skip)
+                data = _rewrite_page(
+                    bytes(body),
+                    header_type=page.header_type,
+                    granule=page.granule,
+                    sequence=page.sequence,
+                )
+            writer.write(data)
+
+        sequence = index.header_pages[-1].sequence + 1
+        selected = index.audio_pages[plan.first_page : plan.last_page + 1]
+        reader.seek(selected[0].offset)
+        for page in selected:
+            data = reader.read(page.header_size + page.body_size)
+            is_last = page is selected[-1]
+            if is_last:
+                granule = plan.final_granule
+            elif page.granule == _NO_GRANULE:
+                granule = _NO_GRANULE
+            else:
+                granule = page.granule - plan.base_granule
+            header_type = page.header_type & ~(_FLAG_BOS | _FLAG_EOS)
+            if is_last:
+                header_type |= _FLAG_EOS
+            writer.write(
+                _rewrite_page(
+                    data, header_type=header_type, granule=granule, sequence=sequence
+                )
+            )
+            sequence += 1
+
+
+def stream_copy_clip(
+    source: os.PathLike[str] | str,
+    destination: os.PathLike[str] | str,
+    start_seconds: float,
+    end_seconds: float,
+) -> ClipPlan:
+    """Cut ``[start_seconds, end_seconds)`` of ``source`` into ``destination``."""
+
+    index = cached_index(source)
+    plan = plan_clip(index, start_seconds, end_seconds)
+    write_clip(source, destination, index, plan)
+    return plan
+
+
+def slice_waveform(
+    payload: Mapping[str, Any],
+    start_seconds: float,
+    end_seconds: float,
+    *,
+    min_buckets: int = MIN_SLICED_WAVEFORM_BUCKETS,
+) -> dict[str, Any] | None:
+    """Cut a clip's waveform out of its source recording's waveform sidecar.
+
+    Returns ``None`` when the source waveform is unusable or would leave the
+    clip with fewer than ``min_buckets`` buckets; callers then render the
+    waveform from decoded audio instead.
+    """
+
+    peaks = payload.get("peaks")
+    rms_values = payload.get("rms_values")
+    duration = payload.get("duration_seconds")
+    if (
+        not isinstance(peaks, list)
+        or not isinstance(rms_values, list)
+        or not isinstance(duration, (int, float))
+        or duration <= 0
+    ):
+        return None
+    bucket_count = len(rms_values)
+    if bucket_count <= 0 or len(peaks) != bucket_count * 2:
+        return None
+    first = max(0, int(start_seconds / duration * bucket_count))
+    last = min(bucket_count, max(first + 1, math.ceil(end_seconds / duration * bucket_count)))
+    if last - first < min_buckets:
+        return None
+
+    sample_rate = payload.get("sample_rate")
+    if not isinstance(sample_rate, int) or sample_rate <= 0:
+        sample_rate = OPUS_SAMPLE_RATE
+    clip_duration = max(0.0, float(end_seconds) - float(start_seconds))
+    return {
+        "version": payload.get("version", 1),
+        "channels": payload.get("channels", 1),
+        "sample_rate": sample_rate,
+        "frame_count": int(round(clip_duration * sample_rate)),
+        "duration_seconds": clip_duration,
+        "peak_scale": payload.get("peak_scale", 32767),
+        "peaks": list(peaks[first * 2 : last * 2]),
+        "rms_values": list(rms_values[first:last]),
+    }
+
+
+def read_waveform(path: Path) -> dict[str, Any] | None:
+    try:
+        with path.open("r", encoding="utf-8") as handle:
+            payload = json.load(handle)
+    except (OSError, ValueError):
+        return None
+    return payload if isinstance(payload, dict) else None
+
+
+__all__ = [
+    "ClipPlan",
+    "OggClipUnsupported",
+    "OpusIndex",
+    "build_index",
+    "cached_index",
+    "ogg_crc",
+    "plan_clip",
+    "slice_waveform",
+    "stream_copy_clip",
+    "write_clip",
+]
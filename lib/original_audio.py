@@ -0,0 +1,306 @@
+"""Lossless FLAC storage for preserved original recordings.
+
+``encode_and_store.sh`` keeps every capture's original WAV under
+``.original_wav/<day>/``. :mod:`lib.original_compaction` converts those to
+FLAC in the background; this module holds the format-level pieces:
+
+* :func:`compact_original` encodes a WAV to FLAC with ffmpeg into a hidden
+  ``.<name>.flac.partial`` file, decodes it back and compares the PCM hash
+  and frame count with the source before renaming it into place. The WAV
+  itself is left for the caller to remove;
+* :func:`open_pcm` opens an original (or any WAV) as a :mod:`wave` reader.
+  WAVs are opened directly and FLAC files are decoded to a temporary WAV
+  first, so PCM consumers such as :mod:`lib.waveform_cache` and
+  :mod:`lib.transcription` do not care which one they were given;
+* :func:`flac_stream_info` reads a FLAC file's STREAMINFO block (rate,
+  channels, bits per sample, total frames) without decoding anything.
+"""
+
+from __future__ import annotations
+
+import contextlib
+import hashlib
+import os
+import struct
+import subprocess
+import tempfile
+import time
+import wave
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Iterator
+
+COMPACT_SUFFIX = ".flac"
+PARTIAL_SUFFIX = ".partial"
+DEFAULT_COMPRESSION_LEVEL = 5
+
+# WAV sample width -> ffmpeg raw PCM format / codec used to read it back.
+_PCM_FORMATS = {
+    1: ("u8", "pcm_u8"),
+    2: ("s16le", "pcm_s16le"),
+    3: ("s24le", "pcm_s24le"),
+}
+_BITS_TO_CODEC = {8: "pcm_u8", 16: "pcm_s16le", 24: "pcm_s24le", 32: "pcm_s32le"}
+_READ_CHUNK_BYTES = 256 * 1024
+
+
+class CompactionError(RuntimeError):
+    """Raised when an original cannot be converted or fails verification."""
+
+
+@dataclass(frozen=True)
+class StreamInfo:
+    sample_rate: int
+    channels: int
+    bits_per_sample: int
+    total_frames: int
+
+
+@dataclass(frozen=True)
+class CompactionResult:
+    source: Path
+    destination: Path
+    original_bytes: int
+    compacted_bytes: int
+    seconds: float
+    reused: bool = False
+
+    @property
+    def ratio(self) -> float:
+        return self.compacted_bytes / self.original_bytes if self.original_bytes else 0.0
+
+
+def flac_stream_info(path: os.PathLike[str] | str) -> StreamInfo:
+    """Parse the STREAMINFO block at the start of a FLAC file."""
+
+    with open(path, "rb") as handle:
+        header = handle.read(4 + 4 + 34)
+    if len(header) < 42 or header[:4] != b"fLaC" or header[4] & 0x7F != 0:
+        raise CompactionError(f"{path} is not a FLAC file")
+    # 20 bits rate, 3 bits channels-1, 5 bits bits-per-sample-1, 36 bits frames.
+    (packed,) = struct.unpack(">Q", header[18:26])
+    return StreamInfo(
+        sample_rate=packed >> 44,
+        channels=((packed >> 41) & 0x7) + 1,
+        bits_per_sample=((packed >> 36) & 0x1F) + 1,
+        total_frames=packed & 0xFFFFFFFFF,
+    )
+
+
+def _wav_digest(path: Path) -> tuple[str, Any, int]:
+    digest = hashlib.blake2b(digest_size=20)
+    try:
+        with contextlib.closing(wave.open(str(path), "rb")) as wav_file:
+            params = wav_file.getparams()
+            frame_bytes = max(1, params.sampwidth * params.nchannels)
+            chunk_frames = max(1, _READ_CHUNK_BYTES // frame_bytes)
+            length = 0
+            while True:
+                chunk = wav_file.readframes(chunk_frames)
+                if not chunk:
+                    break
+                digest.update(chunk)
+                length += len(chunk)
+    except (wave.Error, EOFError) as exc:
+        raise CompactionError(f"{path.name} is not a PCM WAV: {exc}") from exc
+    return digest.hexdigest(), params, length
+
+
+def _decoded_digest(path: Path, params: Any, *, ffmpeg: str) -> tuple[str, int]:
+    raw_format, codec = _PCM_FORMATS[params.sampwidth]
+    cmd = [
+        ffmpeg,
+        "-hide_banner",
+        "-loglevel",
+        "error",
+        "-i",
+        str(path),
+        "-map",
+        "0:a:0",
+        "-f",
+        raw_format,
+        "-c:a",
+        codec,
+        "-ac",
+        str(params.nchannels),
+        "-ar",
+        str(params.framerate),
+        "pipe:1",
+    ]
+    digest = hashlib.blake2b(digest_size=20)
+    length = 0
+    try:
+        process = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+    except OSError as exc:
+        raise CompactionError(f"unable to run {ffmpeg}: {exc}") from exc
+    assert process.stdout is not None
+    with process:
+        while True:
+            chunk = process.stdout.read(_READ_CHUNK_BYTES)
+            if not chunk:
+                break
+            digest.update(chunk)
+            length += len(chunk)
+        stderr = process.stderr.read() if process.stderr is not None else b""
+    if process.returncode != 0:
+        message = stderr.decode("utf-8", "replace").strip()
+        raise CompactionError(f"decoding {path.name} failed: {message or process.returncode}")
+    return digest.hexdigest(), length
+
+
+def _fsync(path: Path) -> None:
+    fd = os.open(path, os.O_RDONLY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+def _matches(candidate: Path, digest: str, length: int, params: Any, ffmpeg: str) -> bool:
+    try:
+        info = flac_stream_info(candidate)
+        frames = length // max(1, params.sampwidth * params.nchannels)
+        if info.total_frames and info.total_frames != frames:
+            return False
+        return _decoded_digest(candidate, params, ffmpeg=ffmpeg) == (digest, length)
+    except (OSError, CompactionError):
+        return False
+
+
+def compact_original(
+    source: os.PathLike[str] | str,
+    *,
+    ffmpeg: str = "ffmpeg",
+    compression_level: int = DEFAULT_COMPRESSION_LEVEL,
+) -> CompactionResult:
+    """Write a verified FLAC copy of the WAV ``source`` next to it.
+
+    The copy is named after the WAV (``<stem>.flac``). If that name is taken
+    by a FLAC holding the same audio (a previous run stopped before removing
+    the WAV) it is reused; a different file gets a numbered name instead.
+    """
+
+    started = time.monotonic()
+    source = Path(source)
+    if source.suffix.lower() != ".wav":
+        raise CompactionError(f"{source.name} is not a WAV file")
+    digest, params, length = _wav_digest(source)
+    if params.sampwidth not in _PCM_FORMATS:
+        raise CompactionError(f"{source.name}: {params.sampwidth * 8}-bit PCM is not supported")
+    original_bytes = source.stat().st_size
+
+    destination = source.with_suffix(COMPACT_SUFFIX)
+    suffix = 1
+    while destination.exists():
+        if _matches(destination, digest, length, params, ffmpeg):
+            return CompactionResult(
+                source=source,
+                destination=destination,
+                original_bytes=original_bytes,
+                compacted_bytes=destination.stat().st_size,
+                seconds=time.monotonic() - started,
+                reused=True,
+            )
+        destination = source.with_name(f"{source.stem}.{suffix}{COMPACT_SUFFIX}")
+        suffix += 1
+
+    partial = destination.with_name(f".{destination.name}{PARTIAL_SUFFIX}")
+    cmd = [
+        ffmpeg,
+        "-hide_banner",
+        "-loglevel",
+        "error",
+        "-y",
+        "-threads",
+        "1",
+        "-i",
+        str(source),
+        "-map",
+        "0:a:0",
+        "-c:a",
+        "flac",
+        "-compression_level",
+        str(int(compression_level)),
+        "-f",
+        "flac",
+        str(partial),
+    ]
+    try:
+        try:
+            subprocess.run(cmd, capture_output=True, check=True)
+        except OSError as exc:
+            raise CompactionError(f"unable to run {ffmpeg}: {exc}") from exc
+        except subprocess.CalledProcessError as exc:
+            message = (exc.stderr or b"").decode("utf-8", "replace").strip()
+            raise CompactionError(f"encoding {source.name} failed: {message or exc.returncode}") from exc
+        if not _matches(partial, digest, length, params, ffmpeg):
+            raise CompactionError(f"{source.name}: FLAC round trip does not match the original PCM")
+        _fsync(partial)
+        os.replace(partial, destination)
+        with contextlib.suppress(OSError):
+            _fsync(destination.parent)
+    finally:
+        with contextlib.suppress(FileNotFoundError):
+            partial.unlink()
+    return CompactionResult(
+        source=source,
+        destination=destination,
+        original_bytes=original_bytes,
+        compacted_bytes=destination.stat().st_size,
+        seconds=time.monotonic() - started,
+    )
+
+
+@contextlib.contextmanager
+def open_pcm(
+    path: os.PathLike[str] | str,
+    *,
+    ffmpeg: str = "ffmpeg",
+    tmp_dir: os.PathLike[str] | str | None = None,
+) -> Iterator[wave.Wave_read]:
+    """Open ``path`` as a WAV reader, decoding FLAC to a temporary WAV first."""
+
+    path = Path(path)
+    if path.suffix.lower() != COMPACT_SUFFIX:
+        with contextlib.closing(wave.open(str(path), "rb")) as wav_file:
+            yield wav_file
+        return
+
+    info = flac_stream_info(path)
+    codec = _BITS_TO_CODEC.get(info.bits_per_sample, "pcm_s16le")
+    with tempfile.TemporaryDirectory(prefix="pcm-", dir=tmp_dir) as scratch:
+        decoded = Path(scratch) / f"{path.stem}.wav"
+        cmd = [
+            ffmpeg,
+            "-hide_banner",
+            "-loglevel",
+            "error",
+            "-y",
+            "-i",
+            str(path),
+            "-map",
+            "0:a:0",
+            "-c:a",
+            codec,
+            str(decoded),
+        ]
+        try:
+            subprocess.run(cmd, capture_output=True, check=True)
+        except OSError as exc:
+            raise CompactionError(f"unable to run {ffmpeg}: {exc}") from exc
+        except subprocess.CalledProcessError as exc:
+            message = (exc.stderr or b"").decode("utf-8", "replace").strip()
+            raise CompactionError(f"decoding {path.name} failed: {message or exc.returncode}") from exc
+        with contextlib.closing(wave.open(str(decoded), "rb")) as wav_file:
+            yield wav_file
+
+
+__all__ = [
+    "COMPACT_SUFFIX",
+    "CompactionError",
+    "CompactionResult",
+    "StreamInfo",
+    "compact_original",
+    "flac_stream_info",
+    "open_pcm",
+]
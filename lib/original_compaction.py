@@ -0,0 +1,359 @@
+#!/usr/bin/env python3
+"""Idle-time FLAC compaction of preserved original WAVs.
+
+``encode_and_store.sh`` moves every capture's original WAV into
+``.original_wav/<day>/``, where it sits uncompressed at about 5.7 MB per
+minute. ``original-compaction.service`` runs this module to convert them,
+losslessly, to FLAC (usually well under half the size):
+
+* only while the recorder is otherwise idle: the load average per CPU must
+  be at or below ``original_compaction.max_load_per_cpu`` and the segmenter
+  must have no encodes queued; the check is repeated before every file;
+* originals younger than ``min_age_seconds``, or held by an active job
+  (:func:`lib.retention.hold_files`), are left for a later pass; the service
+  holds each file the same way while it converts it, so retention never
+  deletes one mid-conversion;
+* each FLAC is decoded again and compared with the WAV's PCM before it
+  replaces the WAV (:func:`lib.original_audio.compact_original`); waveform
+  sidecars that recorded the WAV as their original are updated
+  (:func:`lib.recording_metadata.update_original_paths`) before the WAV is
+  removed, and the dashboard is told which recordings changed through the
+  recordings event spool;
+* a WAV that cannot be converted, or would not get smaller, is logged and
+  skipped until the service restarts.
+
+After the originals, the same pass moves aged recordings down the
+``storage_tiers`` bitrate tiers (:mod:`lib.storage_tiers`), subject to the
+same idle checks.
+
+Consumers that need PCM open originals with :func:`lib.original_audio.open_pcm`,
+which decodes FLAC transparently. ``--once`` converts everything eligible
+while the system stays idle and exits; ``--status`` prints how many originals
+are still uncompressed and how much tier re-encoding has saved.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import shutil
+import signal
+import sys
+import threading
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Callable, Iterable, Mapping
+
+from lib.config import get_cfg, reload_cfg
+from lib.original_audio import (
+    COMPACT_SUFFIX,
+    DEFAULT_COMPRESSION_LEVEL,
+    PARTIAL_SUFFIX,
+    CompactionError,
+    compact_original,
+)
+from lib.recording_metadata import update_original_paths
+from lib.recycle_bin_utils import RAW_AUDIO_DIRNAME
+from lib.retention import LOCK_DIRNAME, hold_files, locked_paths, pending_encodes, spool_recordings_event
+from lib.segmenter_helpers.system import normalized_load
+from lib.storage_tiers import WAVEFORM_SUFFIX, RecordingTierer, TierSettings
+from lib.storage_tiers import status as tier_status
+
+
+@dataclass(frozen=True)
+class CompactionSettings:
+    recordings_dir: Path
+    tmp_dir: Path
+    enabled: bool = True
+    min_age: float = 600.0
+    max_load_per_cpu: float = 0.5
+    interval: float = 60.0
+    compression_level: int = DEFAULT_COMPRESSION_LEVEL
+    ffmpeg: str = "ffmpeg"
+
+    @classmethod
+    def from_cfg(cls, cfg: Mapping[str, Any]) -> "CompactionSettings":
+        paths = cfg.get("paths") or {}
+        raw = cfg.get("original_compaction") or {}
+        if not isinstance(raw, Mapping):
+            raw = {}
+        defaults = cls(
+            recordings_dir=Path(paths.get("recordings_dir", "/apps/tricorder/recordings")),
+            tmp_dir=Path(paths.get("tmp_dir", "/apps/tricorder/tmp")),
+        )
+
+        def _number(key: str, default: float, minimum: float) -> float:
+            try:
+                return max(minimum, float(raw.get(key, default)))
+            except (TypeError, ValueError):
+                return default
+
+        return cls(
+            recordings_dir=defaults.recordings_dir,
+            tmp_dir=defaults.tmp_dir,
+            enabled=bool(raw.get("enabled", defaults.enabled)),
+            min_age=_number("min_age_seconds", defaults.min_age, 0.0),
+            max_load_per_cpu=_number("max_load_per_cpu", defaults.max_load_per_cpu, 0.0),
+            interval=_number("interval_seconds", defaults.interval, 1.0),
+            compression_level=int(min(12, _number("compression_level", defaults.compression_level, 0))),
+        )
+
+
+def _format_bytes(value: float) -> str:
+    if value < 1024:
+        return f"{int(value)} B"
+    for unit in ("KB", "MB"):
+        value /= 1024
+        if value < 1024:
+            return f"{value:.1f} {unit}"
+    return f"{value / 1024:.1f} GB"
+
+
+def originals(recordings_dir: Path) -> list[tuple[Path, os.stat_result]]:
+    """Every preserved original under ``.original_wav``, oldest first."""
+
+    found: list[tuple[Path, os.stat_result]] = []
+    raw_root = recordings_dir / RAW_AUDIO_DIRNAME
+    try:
+        days = [entry for entry in os.scandir(raw_root) if entry.is_dir(follow_symlinks=False)]
+    except OSError:
+        return found
+    for day in days:
+        try:
+            entries = list(os.scandir(day.path))
+        except OSError:
+            continue
+        for entry in entries:
+            if entry.name.startswith("."):
+                continue
+            try:
+                if entry.is_file(follow_symlinks=False):
+                    found.append((Path(entry.path), entry.stat(follow_symlinks=False)))
+            except OSError:
+                continue
+    found.sort(key=lambda item: (item[1].st_mtime, item[0].name))
+    return found
+
+
+class OriginalCompactor:
+    """Convert ``.original_wav`` WAVs to FLAC while the system is idle.
+
+    Storage tier re-encoding runs after the originals. When ``settings`` is
+    given without ``tiers``, tiering is off.
+    """
+
+    def __init__(
+        self,
+        settings: CompactionSettings | None = None,
+        *,
+        tiers: TierSettings | None = None,
+        load: Callable[[], float | None] = normalized_load,
+        clock: Callable[[], float] = time.time,
+    ) -> None:
+        self._fixed_settings = settings
+        self.settings = settings or CompactionSettings.from_cfg(get_cfg())
+        if tiers is None:
+            tiers = (
+                TierSettings.from_cfg(get_cfg())
+                if settings is None
+                else TierSettings(recordings_dir=self.settings.recordings_dir, tmp_dir=self.settings.tmp_dir)
+            )
+        self.tierer = RecordingTierer(tiers, clock=clock)
+        self._load = load
+        self._clock = clock
+        self._stop = threading.Event()
+        self._failed: dict[Path, tuple[int, int]] = {}
+        self._paused: str | None = None
+        self.saved_bytes = 0
+        self.converted = 0
+
+    def busy_reason(self) -> str | None:
+        """Why conversions should wait, or ``None`` when the system is idle."""
+
+        settings = self.settings
+        if not settings.enabled and not self.tierer.enabled:
+            return "disabled in original_compaction.enabled"
+        if settings.max_load_per_cpu > 0:
+            load = self._load()
+            if load is not None and load > settings.max_load_per_cpu:
+                return f"load {load:.2f} per CPU above {settings.max_load_per_cpu:.2f}"
+        if pending_encodes(settings.tmp_dir):
+            return "segmenter is encoding"
+        if shutil.which(settings.ffmpeg) is None:
+            return f"{settings.ffmpeg} not found"
+        return None
+
+    def _idle(self) -> bool:
+        reason = self.busy_reason()
+        if reason != self._paused:
+            if reason:
+                print(f"[compaction] waiting: {reason}", flush=True)
+            elif self._paused is not None:
+                print("[compaction] resumed", flush=True)
+            self._paused = reason
+        return reason is None
+
+    def due(self) -> list[Path]:
+        """WAV originals old enough to convert and not held by another job."""
+
+        settings = self.settings
+        if not settings.enabled:
+            return []
+        now = self._clock()
+        locked = locked_paths(settings.tmp_dir / LOCK_DIRNAME)
+        due: list[Path] = []
+        for path, stat in originals(settings.recordings_dir):
+            if path.suffix.lower() != ".wav" or now - stat.st_mtime < settings.min_age:
+                continue
+            if os.path.abspath(path) in locked:
+                continue
+            if self._failed.get(path) == (stat.st_size, stat.st_mtime_ns):
+                continue
+            due.append(path)
+        return due
+
+    def compact(self, path: Path) -> bool:
+        """Convert one original; returns whether it was replaced by a FLAC."""
+
+        settings = self.settings
+        root = settings.recordings_dir
+        try:
+            stat = path.stat()
+        except OSError:
+            return False
+        partial = path.with_name(f".{path.stem}{COMPACT_SUFFIX}{PARTIAL_SUFFIX}")
+        held = (path, path.with_suffix(COMPACT_SUFFIX), partial)
+        with hold_files(held, lock_dir=settings.tmp_dir / LOCK_DIRNAME):
+            try:
+                result = compact_original(
+                    path, ffmpeg=settings.ffmpeg, compression_level=settings.compression_level
+                )
+            except (CompactionError, OSError) as exc:
+                self._failed[path] = (stat.st_size, stat.st_mtime_ns)
+                print(f"[compaction] skipped {path.name}: {exc}", flush=True)
+                return False
+            if not result.reused and result.compacted_bytes >= result.original_bytes:
+                # Very short or noisy clips may not shrink; keep the WAV.
+                result.destination.unlink(missing_ok=True)
+                self._failed[path] = (stat.st_size, stat.st_mtime_ns)
+                print(f"[compaction] kept {path.name}: FLAC would not be smaller", flush=True)
+                return False
+            old_rel = path.relative_to(root).as_posix()
+            new_rel = result.destination.relative_to(root).as_posix()
+            updated = update_original_paths(root, old_rel, new_rel)
+            try:
+                path.unlink()
+            except FileNotFoundError:
+                pass
+        self.converted += 1
+        self.saved_bytes += max(0, result.original_bytes - result.compacted_bytes)
+        # Only the recordings whose sidecar now names the FLAC: original WAVs
+        # are not listed. Usage of an unreferenced original is picked up by
+        # the next storage reconcile.
+        recordings = [
+            waveform.relative_to(root).as_posix().removesuffix(WAVEFORM_SUFFIX) for waveform in updated
+        ]
+        if recordings:
+            spool_recordings_event(settings.tmp_dir, {"reason": "original_compacted", "paths": recordings})
+        print(
+            f"[compaction] {old_rel} -> {result.destination.name}: "
+            f"{_format_bytes(result.original_bytes)} -> {_format_bytes(result.compacted_bytes)} "
+            f"({result.ratio:.0%}) in {result.seconds:.1f}s",
+            flush=True,
+        )
+        return True
+
+    def run_once(self) -> int:
+        """Convert due originals, then re-encode due recordings, until the
+        system gets busy; returns files attempted."""
+
+        if self._fixed_settings is None:
+            cfg = reload_cfg()
+            self.settings = CompactionSettings.from_cfg(cfg)
+            self.tierer.settings = TierSettings.from_cfg(cfg)
+        attempted = 0
+        for path in self.due():
+            if self._stop.is_set() or not self._idle():
+                break
+            self.compact(path)
+            attempted += 1
+        if not self._stop.is_set():
+            attempted += self.tierer.run_once(self._idle, self._stop.is_set)
+        return attempted
+
+    def run(self, *, until_idle: bool = False) -> None:
+        while not self._stop.is_set():
+            try:
+                attempted = self.run_once()
+            except Exception as exc:  # noqa: BLE001 - keep the service alive
+                print(f"[compaction] pass failed: {exc!r}", flush=True)
+                attempted = 0
+            if until_idle and not attempted:
+                break
+            self._stop.wait(self.settings.interval)
+        if self.converted:
+            print(
+                f"[compaction] converted {self.converted} original(s), saved {_format_bytes(self.saved_bytes)}",
+                flush=True,
+            )
+        if self.tierer.reencoded:
+            print(
+                f"[tiers] re-encoded {self.tierer.reencoded} recording(s), "
+                f"saved {_format_bytes(self.tierer.saved_bytes)}",
+                flush=True,
+            )
+
+    def stop(self, *_args) -> None:
+        self._stop.set()
+
+
+def status(settings: CompactionSettings) -> dict[str, object]:
+    counts = {"wav_files": 0, "wav_bytes": 0, "flac_files": 0, "flac_bytes": 0}
+    for path, stat in originals(settings.recordings_dir):
+        suffix = path.suffix.lower()
+        if suffix == ".wav":
+            counts["wav_files"] += 1
+            counts["wav_bytes"] += stat.st_size
+        elif suffix == COMPACT_SUFFIX:
+            counts["flac_files"] += 1
+            counts["flac_bytes"] += stat.st_size
+    return {"enabled": settings.enabled, **counts}
+
+
+def main(argv: Iterable[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Convert preserved original WAVs to FLAC while idle.")
+    parser.add_argument("--once", action="store_true", help="Convert everything eligible now, then exit")
+    parser.add_argument("--status", action="store_true", help="Print original WAV/FLAC and storage tier totals as JSON")
+    args = parser.parse_args(list(argv) if argv is not None else None)
+
+    if args.status:
+        cfg = get_cfg()
+        report = status(CompactionSettings.from_cfg(cfg))
+        report["storage_tiers"] = tier_status(TierSettings.from_cfg(cfg))
+        print(json.dumps(report, indent=2, sort_keys=True))
+        return 0
+
+    compactor = OriginalCompactor()
+    signal.signal(signal.SIGTERM, compactor.stop)
+    signal.signal(signal.SIGINT, compactor.stop)
+    print(
+        f"[compaction] service started (checks every {compactor.settings.interval:.0f}s)",
+        flush=True,
+    )
+    compactor.run(until_idle=args.once)
+    return 0
+
+
+__all__ = [
+    "CompactionSettings",
+    "OriginalCompactor",
+    "main",
+    "originals",
+    "status",
+]
+
+
+if __name__ == "__main__":  # pragma: no cover - CLI entry
+    sys.exit(main())
@@ -1,17 +1,22 @@
 #!/usr/bin/env python3
 import json
+import multiprocessing
 import os
 import re
+import sqlite3
 import subprocess
 import sys
 import time
 import wave
+from concurrent.futures import Executor, ProcessPoolExecutor
 from datetime import datetime, timezone
 from contextlib import contextmanager
+from functools import partial
 from pathlib import Path
 
 from typing import Iterable
 
+import lib.segmenter as segmenter
 from lib.segmenter import (
     ENCODING_STATUS,
     FRAME_BYTES,
@@ -19,8 +24,20 @@ from lib.segmenter import (
     SAMPLE_RATE,
     SAMPLE_WIDTH,
     TimelineRecorder,
+    offline_cpu_available,
+)
+from lib.batch_ingest import (
+    BLOCK_FRAMES,
+    BatchIngest,
+    ChunkedIngest,
+    ChunkFeatures,
+    analyze_block,
+    apply_gain,
+    plan_chunks,
 )
 from lib.config import get_cfg
+from lib.audio_duration import DurationUnsupported, duration_seconds
+from lib.content_index import INGESTED, ContentIndex, file_digest
 
 cfg = get_cfg()
 
@@ -31,6 +48,17 @@ WORK_DIR = Path(cfg["paths"]["ingest_work_dir"])
 REC_DIR = Path(cfg["paths"]["recordings_dir"])
 ALLOWED_EXT = set(x.lower() for x in cfg["ingest"]["allowed_ext"])
 IGNORE_SUFFIXES = set(cfg["ingest"]["ignore_suffixes"])
+PARALLEL_WORKERS = int(cfg["ingest"]["parallel_workers"])
+PARALLEL_MIN_SECONDS = float(cfg["ingest"]["parallel_min_seconds"])
+CHUNK_SECONDS = float(cfg["ingest"]["chunk_seconds"])
+DEDUPLICATE = bool(cfg["ingest"]["deduplicate"])
+# Files this process may be ingesting alongside others; ingest-daemon pool
+# workers set it to ``ingest.workers`` so their chunk pools share the CPUs.
+CONCURRENT_FILES = 1
+# Frames decoded ahead of each chunk and discarded, so decoder and resampler
+# warm-up after a seek never reaches the analysed audio.
+CHUNK_OVERLAP_FRAMES = 50
+FRAMES_PER_SECOND = SAMPLE_RATE * SAMPLE_WIDTH / FRAME_BYTES
 RETRY_SUFFIX = "-RETRY"
 OUTPUT_SUFFIXES = (".opus",)
 
@@ -70,20 +98,21 @@ def _set_single_core_affinity() -> None:
         pass
 
 
-def _ffmpeg_preexec(lower_priority: bool):
+def _ffmpeg_preexec(lower_priority: bool, single_core: bool = True):
     def _apply():
         if lower_priority:
             try:
                 os.nice(5)
             except OSError:
                 pass
-        _set_single_core_affinity()
+        if single_core:
+            _set_single_core_affinity()
 
     return _apply
 
 
 @contextmanager
-def _pcm_source(path: Path):
+def _pcm_source(path: Path, chunk_bytes: int = FRAME_BYTES):
     lower_priority = _should_lower_priority()
     cmd = [
         "ffmpeg",
@@ -124,7 +153,7 @@ def _pcm_source(path: Path):
                     f"audio at {SAMPLE_RATE} Hz ({path})"
                 )
 
-            frames_per_chunk = FRAME_BYTES // SAMPLE_WIDTH
+            frames_per_chunk = max(1, chunk_bytes // SAMPLE_WIDTH)
 
             def wav_iter():
                 while True:
@@ -143,7 +172,7 @@ def _pcm_source(path: Path):
 
             def proc_iter():
                 while True:
-                    data = stdout.read(FRAME_BYTES)
+                    data = stdout.read(chunk_bytes)
                     if not data:
                         break
                     yield data
@@ -154,6 +183,125 @@ def _pcm_source(path: Path):
                 proc.stdout.close()
             proc.wait()
 
+
+def _wav_range(path: Path, start_frame: int, frame_count: int | None) -> bytes | None:
+    try:
+        with wave.open(str(path), "rb") as wav_file:
+            if (
+                wav_file.getnchannels() != 1
+                or wav_file.getsampwidth() != SAMPLE_WIDTH
+                or wav_file.getframerate() != SAMPLE_RATE
+            ):
+                return None
+            samples_per_frame = FRAME_BYTES // SAMPLE_WIDTH
+            start = start_frame * samples_per_frame
+            total = wav_file.getnframes()
+            if start >= total:
+                return b""
+            wav_file.setpos(start)
+            if frame_count is None:
+                return wav_file.readframes(total - start)
+            return wav_file.readframes(frame_count * samples_per_frame)
+    except (wave.Error, EOFError):
+        return None
+
+
+def _pcm_range(path: Path, start_frame: int, frame_count: int | None) -> bytes:
+    """Decode ``frame_count`` frames from ``start_frame`` (``None``: to the end)."""
+
+    if path.suffix.lower() == ".wav":
+        data = _wav_range(path, start_frame, frame_count)
+        if data is not None:
+            return data
+    cmd = [
+        "ffmpeg",
+        "-hide_banner",
+        "-loglevel",
+        "error",
+        "-threads",
+        "1",
+        "-ss",
+        f"{start_frame / FRAMES_PER_SECOND:.6f}",
+        "-i",
+        str(path),
+    ]
+    if frame_count is not None:
+        # One spare frame; the output is trimmed to the exact length below.
+        cmd += ["-t", f"{(frame_count + 1) / FRAMES_PER_SECOND:.6f}"]
+    cmd += ["-ac", "1", "-ar", str(SAMPLE_RATE), "-f", "s16le", "-"]
+    result = subprocess.run(
+        cmd,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+        preexec_fn=_ffmpeg_preexec(_should_lower_priority(), single_core=False),
+    )
+    if result.returncode != 0:
+        detail = result.stderr.decode("utf-8", "replace").strip()
+        raise RuntimeError(f"ffmpeg failed decoding {path} from frame {start_frame}: {detail}")
+    data = result.stdout
+    if frame_count is not None:
+        data = data[: frame_count * FRAME_BYTES]
+    return data
+
+
+def _analyze_range(
+    path: str,
+    start_frame: int,
+    frame_count: int | None,
+    *,
+    gain: float,
+    vad_enabled: bool,
+    denoise: bool,
+) -> ChunkFeatures:
+    lead = min(CHUNK_OVERLAP_FRAMES, start_frame)
+    count = None if frame_count is None else frame_count + lead
+    pcm = _pcm_range(Path(path), start_frame - lead, count)
+    analysis = analyze_block(pcm, gain=gain, vad_enabled=vad_enabled, denoise=denoise)
+    return ChunkFeatures.from_analysis(analysis, start_frame, lead)
+
+
+def _extract_range(path: str, start_frame: int, frame_count: int, *, gain: float) -> bytes:
+    lead = min(CHUNK_OVERLAP_FRAMES, start_frame)
+    pcm = _pcm_range(Path(path), start_frame - lead, frame_count + lead)
+    return apply_gain(pcm, gain)[lead * FRAME_BYTES :]
+
+
+def _chunk_workers() -> int:
+    if PARALLEL_WORKERS > 0:
+        return PARALLEL_WORKERS
+    try:
+        cpus = len(os.sched_getaffinity(0))
+    except (AttributeError, OSError):
+        cpus = os.cpu_count() or 1
+    return max(1, cpus // max(1, CONCURRENT_FILES))
+
+
+def _ingest_chunked(
+    rec: TimelineRecorder,
+    path: Path,
+    total_frames: int,
+    *,
+    executor: Executor,
+    chunk_frames: int | None = None,
+) -> int:
+    """Ingest ``path`` through :class:`ChunkedIngest`; returns frames ingested."""
+
+    if chunk_frames is None:
+        chunk_frames = max(BLOCK_FRAMES, int(CHUNK_SECONDS * FRAMES_PER_SECOND))
+    chunks = plan_chunks(total_frames, chunk_frames)
+    # Resolved here so worker processes analyse with this process's settings.
+    analyze = partial(
+        _analyze_range,
+        str(path),
+        gain=segmenter.GAIN,
+        vad_enabled=segmenter.VAD_TRIGGER_ENABLED,
+        denoise=segmenter.DENOISE_BEFORE_VAD,
+    )
+    extract = partial(_extract_range, str(path), gain=segmenter.GAIN)
+    ingest = ChunkedIngest(rec, analyze=analyze, extract=extract, executor=executor)
+    return ingest.run(chunks)
+
+
 def _is_candidate(p: Path) -> bool:
     if not p.is_file():
         return False
@@ -254,6 +402,12 @@ def _read_waveform_duration(waveform_path: Path) -> float | None:
 def _probe_audio_duration(path: Path) -> float | None:
     if not path.exists():
         return None
+    try:
+        duration = duration_seconds(path)
+    except (OSError, DurationUnsupported):
+        pass
+    else:
+        return duration if duration > 0 else None
     cmd = [
         "ffprobe",
         "-v",
@@ -508,31 +662,98 @@ def _wait_for_encode_completion(job_ids: Iterable[int]) -> None:
             break
 
 
-def process_file(path):
+def _ingested_duplicate(path: Path) -> tuple[str | None, bool]:
+    """Return the file's digest and whether its recordings already exist."""
+
+    try:
+        digest = file_digest(path)
+        record = ContentIndex(REC_DIR).lookup_existing(digest, INGESTED)
+    except (OSError, sqlite3.Error) as exc:
+        print(f"[dropbox] WARN: content index unavailable for {path}: {exc}", flush=True)
+        return None, False
+    if record is None:
+        return digest, False
+    produced = ", ".join(record.outputs) if record.outputs else "no events"
+    print(
+        f"[dropbox] Skipping {path}: identical content was already ingested ({produced})",
+        flush=True,
+    )
+    return digest, True
+
+
+def _record_ingested(path: Path, digest: str, rec: TimelineRecorder) -> None:
+    outputs = []
+    for final_path in rec.finalized_paths():
+        output = Path(final_path)
+        if not output.exists():
+            # The encode failed; the fault handler requeues it, so the
+            # original must stay eligible for another ingest.
+            return
+        try:
+            outputs.append(output.relative_to(REC_DIR).as_posix())
+        except ValueError:
+            outputs.append(str(output))
+    try:
+        ContentIndex(REC_DIR).record(digest, INGESTED, outputs, size=path.stat().st_size)
+    except (OSError, sqlite3.Error) as exc:
+        print(f"[dropbox] WARN: failed to record {path} in content index: {exc}", flush=True)
+
+
+def process_file(path) -> float:
+    """Ingest one audio file; returns the seconds of audio it contained."""
+
     path_obj = Path(path)
+    digest = None
+    if DEDUPLICATE:
+        digest, duplicate = _ingested_duplicate(path_obj)
+        if duplicate:
+            return 0.0
     print(f"[dropbox] Processing {path_obj}", flush=True)
 
     ingest_hint = _extract_ingest_hint(path_obj)
+    duration = _probe_audio_duration(path_obj)
+    workers = _chunk_workers()
     rec = TimelineRecorder(
         ingest_hint=ingest_hint,
         status_mode="ingest",
         recording_source="dropbox",
     )
-    idx = 0
-
-    with _pcm_source(path_obj) as stream:
-        for buf in stream:
-            if not buf:
-                break
-            if len(buf) != FRAME_BYTES:
-                continue
-            rec.ingest(buf, idx)
-            idx += 1
+    fan_out = workers > 1 and duration is not None and duration >= PARALLEL_MIN_SECONDS
+    if fan_out and not offline_cpu_available():
+        # The same admission the encoder and ingest daemon wait on; under load
+        # the file is analysed in this process instead of adding a pool.
+        print(f"[dropbox] CPU busy; analysing {path_obj} without chunk workers", flush=True)
+        fan_out = False
+    if fan_out:
+        print(
+            f"[dropbox] Analysing {duration:.0f}s of audio in {CHUNK_SECONDS:.0f}s chunks "
+            f"on {workers} workers",
+            flush=True,
+        )
+        # Spawned rather than forked: the recorder's writer thread is running.
+        with ProcessPoolExecutor(
+            max_workers=workers,
+            mp_context=multiprocessing.get_context("spawn"),
+        ) as executor:
+            idx = _ingest_chunked(
+                rec,
+                path_obj,
+                int(duration * FRAMES_PER_SECOND),
+                executor=executor,
+            )
+    else:
+        # Analyse whole blocks at once; events are cut and finalized through
+        # the recorder exactly as the live path would have.
+        with _pcm_source(path_obj, chunk_bytes=BLOCK_FRAMES * FRAME_BYTES) as stream:
+            idx = BatchIngest(rec).run(stream)
 
-    # Ensure finalization of last segment(s)
+    # Stop the writer; any open event was already closed at end of input.
     rec.flush(idx)
     _wait_for_encode_completion(rec.encode_job_ids())
+    if digest is not None:
+        _record_ingested(path_obj, digest, rec)
     print(f"[dropbox] Finished processing {path_obj}", flush=True)
+    return idx * FRAME_BYTES / (SAMPLE_RATE * SAMPLE_WIDTH)
 
 if __name__ == "__main__":
     import argparse
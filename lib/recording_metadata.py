@@ -4,10 +4,14 @@ from __future__ import annotations
 
 import argparse
 import json
+import math
 import os
+from datetime import datetime, timedelta
 from pathlib import Path
 from typing import Iterable
 
+from lib.recycle_bin_utils import SAVED_RECORDINGS_DIRNAME
+
 
 def _write_payload_atomic(path: Path, payload: dict[str, object]) -> None:
     tmp_path = path.with_suffix(path.suffix + ".tmp")
@@ -43,6 +47,87 @@ def set_original_path(waveform_path: str | os.PathLike[str], original_rel: str)
     return True
 
 
+def set_storage_tier(waveform_path: str | os.PathLike[str], tier: dict[str, object]) -> bool:
+    """Record the storage tier a recording was re-encoded to.
+
+    Only existing sidecars are updated; returns ``False`` when there is none.
+    """
+
+    destination = Path(waveform_path)
+    try:
+        with destination.open("r", encoding="utf-8") as handle:
+            payload = json.load(handle)
+    except (OSError, json.JSONDecodeError):
+        return False
+    if not isinstance(payload, dict):
+        return False
+    payload["storage_tier"] = dict(tier)
+    _write_payload_atomic(destination, payload)
+    return True
+
+
+def recorded_at(recording_path: str | os.PathLike[str], mtime: float) -> float:
+    """When a recording was captured, for age-based retention and tiering.
+
+    Re-encoding a recording for a storage tier gives it a new modification
+    time; the capture time is kept as ``recorded_at`` in the ``storage_tier``
+    record of its waveform sidecar. A recording is captured on the day of its
+    folder, so the sidecar is only read when ``mtime`` is later than that day.
+    """
+
+    path = Path(recording_path)
+    try:
+        day_end = (datetime.strptime(path.parent.name, "%Y%m%d") + timedelta(days=1)).timestamp()
+    except (ValueError, OverflowError, OSError):
+        day_end = None
+    if day_end is not None and mtime <= day_end:
+        return mtime
+    try:
+        with path.with_name(f"{path.name}.waveform.json").open("r", encoding="utf-8") as handle:
+            payload = json.load(handle)
+    except (OSError, json.JSONDecodeError):
+        return mtime
+    marker = payload.get("storage_tier") if isinstance(payload, dict) else None
+    value = marker.get("recorded_at") if isinstance(marker, dict) else None
+    if isinstance(value, (int, float)) and not isinstance(value, bool) and math.isfinite(value):
+        return min(float(value), mtime)
+    return mtime
+
+
+def update_original_paths(
+    recordings_root: str | os.PathLike[str], old_rel: str, new_rel: str
+) -> list[Path]:
+    """Point waveform sidecars that reference ``old_rel`` at ``new_rel``.
+
+    Originals live under ``.original_wav/<day>/``, so only the recordings of
+    that day (in the day folder and under ``Saved``) are checked. Returns the
+    sidecars that were rewritten.
+    """
+
+    root = Path(recordings_root)
+    parts = Path(old_rel).parts
+    if len(parts) < 3 or not new_rel:
+        return []
+    day = parts[-2]
+    stem = Path(old_rel).name.split(".", 1)[0]
+    updated: list[Path] = []
+    for directory in (root / day, root / SAVED_RECORDINGS_DIRNAME / day):
+        try:
+            candidates = sorted(directory.glob(f"{stem}.*.waveform.json"))
+        except OSError:
+            continue
+        for waveform_path in candidates:
+            try:
+                with waveform_path.open("r", encoding="utf-8") as handle:
+                    payload = json.load(handle)
+            except (OSError, json.JSONDecodeError):
+                continue
+            if isinstance(payload, dict) and payload.get("raw_audio_path") == old_rel:
+                set_original_path(waveform_path, new_rel)
+                updated.append(waveform_path)
+    return updated
+
+
 def _build_parser() -> argparse.ArgumentParser:
     parser = argparse.ArgumentParser(description="Recording metadata utilities")
     subparsers = parser.add_subparsers(dest="command", required=True)
@@ -0,0 +1,308 @@
+"""SQLite index of recycle bin entries.
+
+Every recycle bin entry is a directory holding the moved files and a
+``metadata.json`` document. Listing or counting the bin used to re-read and
+parse each of those documents; this index keeps one row per entry together
+with running totals so listings can page by deletion time and counts are a
+single lookup.
+
+Writers (the dashboard delete/restore/purge handlers and
+:func:`lib.recycle_bin_utils.move_short_recording_to_recycle_bin`) update the
+index next to their filesystem change and record the recycle bin directory
+mtime they produced. Readers call :meth:`RecycleBinIndex.sync` first, which is
+a single ``stat`` when nothing else touched the bin and otherwise reconciles
+the rows against the entry directory names, parsing only entries it has not
+seen yet.
+
+The database lives next to the recycle bin (``.recycle_bin.index.sqlite3`` in
+the recordings root) so its journal files never change the bin's own mtime.
+It is a cache: deleting it only costs one rescan.
+"""
+
+from __future__ import annotations
+
+import contextlib
+import json
+import os
+import re
+import sqlite3
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Callable, Iterable, Iterator, Mapping
+
+INDEX_SUFFIX = ".index.sqlite3"
+SCHEMA_VERSION = 1
+
+_ENTRY_ID_PATTERN = re.compile(r"^[A-Za-z0-9._-]+$")
+
+# Called for entry directories the index has not seen; returns the entry's
+# metadata and its on-disk size, or ``None`` when the directory is not a valid
+# entry.
+EntryReader = Callable[[Path], "tuple[Mapping[str, Any], int] | None"]
+
+_SCHEMA = (
+    """
+    CREATE TABLE IF NOT EXISTS entries (
+        id TEXT PRIMARY KEY,
+        deleted_at_epoch REAL,
+        disk_bytes INTEGER NOT NULL DEFAULT 0,
+        metadata TEXT NOT NULL
+    )
+    """,
+    "CREATE INDEX IF NOT EXISTS entries_by_deleted ON entries (deleted_at_epoch DESC, id)",
+    "CREATE TABLE IF NOT EXISTS state (key TEXT PRIMARY KEY, value INTEGER NOT NULL)",
+    "INSERT OR IGNORE INTO state (key, value) VALUES ('count', 0), ('bytes', 0), ('generation', 0), ('stamp', -1)",
+    """
+    CREATE TRIGGER IF NOT EXISTS entries_inserted AFTER INSERT ON entries BEGIN
+        UPDATE state SET value = value + 1 WHERE key IN ('count', 'generation');
+        UPDATE state SET value = value + NEW.disk_bytes WHERE key = 'bytes';
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS entries_deleted AFTER DELETE ON entries BEGIN
+        UPDATE state SET value = value - 1 WHERE key = 'count';
+        UPDATE state SET value = value + 1 WHERE key = 'generation';
+        UPDATE state SET value = value - OLD.disk_bytes WHERE key = 'bytes';
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS entries_updated AFTER UPDATE ON entries BEGIN
+        UPDATE state SET value = value + 1 WHERE key = 'generation';
+        UPDATE state SET value = value - OLD.disk_bytes + NEW.disk_bytes WHERE key = 'bytes';
+    END
+    """,
+)
+
+
+@dataclass(frozen=True)
+class RecycleBinStats:
+    count: int
+    total_bytes: int
+    generation: int
+
+
+def index_path_for(recycle_root: Path) -> Path:
+    return recycle_root.with_name(recycle_root.name + INDEX_SUFFIX)
+
+
+def _root_stamp(recycle_root: Path) -> int:
+    try:
+        return recycle_root.stat().st_mtime_ns
+    except OSError:
+        return 0
+
+
+def _deleted_epoch(metadata: Mapping[str, Any]) -> float | None:
+    value = metadata.get("deleted_at_epoch")
+    if isinstance(value, (int, float)):
+        return float(value)
+    return None
+
+
+class RecycleBinIndex:
+    """Entry index for the recycle bin rooted at ``recycle_root``."""
+
+    def __init__(self, recycle_root: Path, *, path: Path | None = None) -> None:
+        self.recycle_root = Path(recycle_root)
+        self.path = Path(path) if path is not None else index_path_for(self.recycle_root)
+
+    @contextlib.contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        conn = sqlite3.connect(str(self.path), timeout=10.0, isolation_level=None)
+        try:
+            conn.execute("PRAGMA synchronous=NORMAL")
+            version = conn.execute("PRAGMA user_version").fetchone()[0]
+            if version != SCHEMA_VERSION:
+                conn.execute("BEGIN IMMEDIATE")
+                try:
+                    if version:
+                        conn.execute("DROP TABLE IF EXISTS entries")
+                        conn.execute("DROP TABLE IF EXISTS state")
+                    for statement in _SCHEMA:
+                        conn.execute(statement)
+                    conn.execute(f"PRAGMA user_version={SCHEMA_VERSION}")
+                    conn.execute("COMMIT")
+                except BaseException:
+                    conn.execute("ROLLBACK")
+                    raise
+            yield conn
+        finally:
+            conn.close()
+
+    @contextlib.contextmanager
+    def _transaction(self) -> Iterator[sqlite3.Connection]:
+        with self._connect() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                yield conn
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+            conn.execute("COMMIT")
+
+    @staticmethod
+    def _upsert(conn: sqlite3.Connection, metadata: Mapping[str, Any], disk_bytes: int) -> None:
+        entry_id = str(metadata.get("id") or "")
+        if not entry_id:
+            raise ValueError("recycle bin metadata is missing an id")
+        conn.execute(
+            """
+            INSERT INTO entries (id, deleted_at_epoch, disk_bytes, metadata)
+            VALUES (?, ?, ?, ?)
+            ON CONFLICT (id) DO UPDATE SET
+                deleted_at_epoch = excluded.deleted_at_epoch,
+                disk_bytes = excluded.disk_bytes,
+                metadata = excluded.metadata
+            """,
+            (entry_id, _deleted_epoch(metadata), max(0, int(disk_bytes)), json.dumps(dict(metadata))),
+        )
+
+    def _record_stamp(self, conn: sqlite3.Connection) -> None:
+        conn.execute(
+            "UPDATE state SET value = ? WHERE key = 'stamp'",
+            (_root_stamp(self.recycle_root),),
+        )
+
+    def add(self, metadata: Mapping[str, Any], *, disk_bytes: int = 0) -> None:
+        """Index a freshly written entry."""
+
+        self.add_many([(metadata, disk_bytes)])
+
+    def add_many(self, entries: Iterable[tuple[Mapping[str, Any], int]]) -> None:
+        """Index several freshly written entries in one transaction."""
+
+        with self._transaction() as conn:
+            for metadata, disk_bytes in entries:
+                self._upsert(conn, metadata, disk_bytes)
+            self._record_stamp(conn)
+
+    def remove(self, entry_ids: Iterable[str]) -> None:
+        """Drop entries whose directories were restored or purged."""
+
+        ids = [(str(entry_id),) for entry_id in entry_ids]
+        with self._transaction() as conn:
+            if ids:
+                conn.executemany("DELETE FROM entries WHERE id = ?", ids)
+            self._record_stamp(conn)
+
+    def _entry_names(self) -> set[str]:
+        names: set[str] = set()
+        try:
+            with os.scandir(self.recycle_root) as iterator:
+                for entry in iterator:
+                    try:
+                        if entry.is_dir(follow_symlinks=False) and _ENTRY_ID_PATTERN.match(entry.name):
+                            names.add(entry.name)
+                    except OSError:
+                        continue
+        except OSError:
+            pass
+        return names
+
+    def sync(self, reader: EntryReader, *, full: bool = False) -> bool:
+        """Bring the index in line with the entry directories on disk.
+
+        Returns ``True`` when rows changed. Without ``full`` this only rescans
+        when the recycle bin mtime differs from the one the last writer
+        recorded, and only parses entries missing from the index. ``full``
+        re-reads every entry, which is how stale rows get refreshed.
+        """
+
+        stamp = _root_stamp(self.recycle_root)
+        with self._connect() as conn:
+            recorded = conn.execute("SELECT value FROM state WHERE key = 'stamp'").fetchone()[0]
+            if not full and recorded == stamp:
+                return False
+        names = self._entry_names()
+        with self._transaction() as conn:
+            known = {row[0] for row in conn.execute("SELECT id FROM entries")}
+            pending = names if full else names - known
+            stale = known - names
+            changed = False
+            for name in sorted(pending):
+                loaded = reader(self.recycle_root / name)
+                if loaded is None:
+                    if name in known:
+                        stale.add(name)
+                    continue
+                metadata, disk_bytes = loaded
+                if str(metadata.get("id") or "") != name:
+                    stale.add(name)
+                    continue
+                self._upsert(conn, metadata, disk_bytes)
+                changed = True
+            if stale:
+                conn.executemany("DELETE FROM entries WHERE id = ?", [(name,) for name in stale])
+                changed = True
+            conn.execute("UPDATE state SET value = ? WHERE key = 'stamp'", (stamp,))
+        return changed
+
+    def stats(self) -> RecycleBinStats:
+        with self._connect() as conn:
+            values = dict(conn.execute("SELECT key, value FROM state"))
+        return RecycleBinStats(
+            count=max(0, int(values.get("count", 0))),
+            total_bytes=max(0, int(values.get("bytes", 0))),
+            generation=int(values.get("generation", 0)),
+        )
+
+    def page(self, *, offset: int = 0, limit: int | None = None) -> list[dict[str, Any]]:
+        """Return entry metadata, most recently deleted first."""
+
+        with self._connect() as conn:
+            rows = conn.execute(
+                """
+                SELECT metadata FROM entries
+                ORDER BY deleted_at_epoch IS NULL, deleted_at_epoch DESC, id DESC
+                LIMIT ? OFFSET ?
+                """,
+                (-1 if limit is None else max(0, int(limit)), max(0, int(offset))),
+            ).fetchall()
+        return [json.loads(row[0]) for row in rows]
+
+    def oldest(self) -> list[tuple[str, float | None, int]]:
+        """``(id, deleted_at_epoch, disk_bytes)`` for every entry, oldest deletion first."""
+
+        with self._connect() as conn:
+            rows = conn.execute(
+                """
+                SELECT id, deleted_at_epoch, disk_bytes FROM entries
+                ORDER BY deleted_at_epoch IS NULL, deleted_at_epoch, id
+                """
+            ).fetchall()
+        return [
+            (str(entry_id), float(deleted) if deleted is not None else None, int(disk_bytes))
+            for entry_id, deleted, disk_bytes in rows
+        ]
+
+    def get(self, entry_id: str) -> dict[str, Any] | None:
+        with self._connect() as conn:
+            row = conn.execute("SELECT metadata FROM entries WHERE id = ?", (entry_id,)).fetchone()
+        return json.loads(row[0]) if row else None
+
+
+def entry_disk_usage(entry_dir: Path) -> int:
+    """Total size of the regular files directly inside ``entry_dir``."""
+
+    total = 0
+    try:
+        with os.scandir(entry_dir) as iterator:
+            for entry in iterator:
+                try:
+                    if entry.is_file(follow_symlinks=False):
+                        total += entry.stat(follow_symlinks=False).st_size
+                except OSError:
+                    continue
+    except OSError:
+        return 0
+    return total
+
+
+__all__ = [
+    "INDEX_SUFFIX",
+    "RecycleBinIndex",
+    "RecycleBinStats",
+    "entry_disk_usage",
+    "index_path_for",
+]
@@ -7,15 +7,18 @@ import math
 import os
 import secrets
 import shutil
+import sqlite3
 from dataclasses import dataclass
 from datetime import datetime, timezone
 from pathlib import Path
 from typing import Iterable
 
+from lib.recycle_bin_index import RecycleBinIndex, entry_disk_usage
+
 RECYCLE_BIN_DIRNAME = ".recycle_bin"
 RECYCLE_METADATA_FILENAME = "metadata.json"
 RAW_AUDIO_DIRNAME = ".original_wav"
-RAW_AUDIO_SUFFIXES: tuple[str, ...] = (".wav",)
+RAW_AUDIO_SUFFIXES: tuple[str, ...] = (".wav", ".flac")
 SAVED_RECORDINGS_DIRNAME = "Saved"
 
 
@@ -396,6 +399,12 @@ def move_short_recording_to_recycle_bin(
             pass
         raise RuntimeError(f"unable to move recording to recycle bin: {exc}") from exc
 
+    try:
+        RecycleBinIndex(recycle_root).add(metadata, disk_bytes=entry_disk_usage(entry_dir))
+    except (OSError, sqlite3.Error, ValueError):
+        # Readers reconcile entries the index missed on their next sync.
+        pass
+
     return RecycleMoveResult(
         entry_id=entry_id,
         entry_dir=entry_dir,
@@ -0,0 +1,791 @@
+#!/usr/bin/env python3
+"""Policy-based retention for staging files, recordings and the recycle bin.
+
+``bin/tmpfs_guard.sh`` used to ``find | sort`` every recording, delete the
+oldest one and re-run ``df`` after each deletion until the filesystem dropped
+below 80%, with no idea which files an encode still needed. This engine,
+run by ``tmpfs-guard.timer``, replaces it:
+
+* one ``scandir`` walk of the recordings root and the tmp directory, plus
+  :class:`lib.recycle_bin_index.RecycleBinIndex` for the recycle bin, builds
+  the candidate list; a recording carries its waveform/transcript sidecars
+  and its preserved original WAV with it;
+* deletions are planned in bulk: first everything past its kind's
+  ``max_age_days`` (staging files after ``tmpfs.stale_after_hours``), then
+  the oldest entries of each kind over its ``max_gb`` quota, then, while a
+  filesystem is projected above its ``max_usage_percent``, the oldest
+  remaining candidates in priority order (staging, recycle bin, original
+  WAVs, recordings). Usage is read once per filesystem and the plan
+  subtracts what it frees instead of re-running ``df``;
+* files held with :func:`hold_files` (the segmenter holds each encode's
+  inputs), recordings still queued or encoding in ``segmenter_status.json``,
+  ``.partial`` files and anything younger than ``min_age_seconds`` are never
+  touched; locks are checked again right before each deletion;
+* the run reports reclaimed bytes per kind and announces the removed
+  recordings to the dashboard through the recordings event spool, as a
+  ``deleted`` event; original WAVs removed on their own are reported as
+  ``original_removed``, which only refreshes storage usage.
+
+``Saved`` recordings are exempt unless ``retention.recordings.include_saved``
+is set. Limits of ``0`` disable a policy. ``--dry-run`` prints the plan
+without deleting anything and ``--json`` prints the report as JSON.
+"""
+
+from __future__ import annotations
+
+import argparse
+import contextlib
+import fcntl
+import json
+import os
+import shutil
+import sqlite3
+import sys
+import time
+import uuid
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Callable, Iterable, Iterator, Mapping
+
+from lib.config import get_cfg
+from lib.recording_metadata import recorded_at
+from lib.recycle_bin_index import RecycleBinIndex, entry_disk_usage
+from lib.recycle_bin_utils import (
+    RAW_AUDIO_DIRNAME,
+    RAW_AUDIO_SUFFIXES,
+    RECYCLE_BIN_DIRNAME,
+    RECYCLE_METADATA_FILENAME,
+    SAVED_RECORDINGS_DIRNAME,
+)
+
+LOCK_DIRNAME = "retention_locks"
+RECORDINGS_EVENT_SPOOL_DIRNAME = "recordings_events"
+STATUS_FILENAME = "segmenter_status.json"
+
+STAGING = "staging"
+RECYCLE_BIN = "recycle_bin"
+ORIGINAL_WAV = "original_wav"
+RECORDINGS = "recordings"
+# Order in which filesystem pressure is relieved.
+PRIORITY = (STAGING, RECYCLE_BIN, ORIGINAL_WAV, RECORDINGS)
+
+RECORDING_SUFFIXES = (".opus", ".webm", ".ogg", ".mp3", ".m4a", ".flac", ".wav")
+STAGING_SUFFIXES = (".wav", ".opus", ".webm", ".ogg", ".flac")
+STAGING_SUBDIRS = ("parallel",)
+
+_GIB = 1024**3
+
+
+@dataclass(frozen=True)
+class RetentionPolicy:
+    max_age_days: float = 0.0
+    max_gb: float = 0.0
+    max_usage_percent: float = 0.0
+
+    @property
+    def max_age_seconds(self) -> float:
+        return self.max_age_days * 86400.0
+
+    @property
+    def max_bytes(self) -> int:
+        return int(self.max_gb * _GIB)
+
+    @classmethod
+    def from_cfg(cls, raw: object, default: "RetentionPolicy") -> "RetentionPolicy":
+        if not isinstance(raw, Mapping):
+            return default
+
+        def _number(key: str, fallback: float) -> float:
+            try:
+                return max(0.0, float(raw.get(key, fallback)))
+            except (TypeError, ValueError):
+                return fallback
+
+        return cls(
+            max_age_days=_number("max_age_days", default.max_age_days),
+            max_gb=_number("max_gb", default.max_gb),
+            max_usage_percent=_number("max_usage_percent", default.max_usage_percent),
+        )
+
+
+@dataclass(frozen=True)
+class RetentionSettings:
+    recordings_dir: Path
+    tmp_dir: Path
+    min_age: float = 300.0
+    include_saved: bool = False
+    policies: Mapping[str, RetentionPolicy] = field(
+        default_factory=lambda: {
+            STAGING: RetentionPolicy(max_age_days=0.5, max_usage_percent=80.0),
+            RECYCLE_BIN: RetentionPolicy(),
+            ORIGINAL_WAV: RetentionPolicy(),
+            RECORDINGS: RetentionPolicy(max_usage_percent=80.0),
+        }
+    )
+
+    @property
+    def lock_dir(self) -> Path:
+        return self.tmp_dir / LOCK_DIRNAME
+
+    @classmethod
+    def from_cfg(cls, cfg: Mapping[str, Any]) -> "RetentionSettings":
+        paths = cfg.get("paths") or {}
+        raw = cfg.get("retention") or {}
+        if not isinstance(raw, Mapping):
+            raw = {}
+        base = cls(
+            recordings_dir=Path(paths.get("recordings_dir", "/apps/tricorder/recordings")),
+            tmp_dir=Path(paths.get("tmp_dir", "/apps/tricorder/tmp")),
+        )
+        policies = dict(base.policies)
+
+        tmpfs = raw.get("tmpfs")
+        if isinstance(tmpfs, Mapping):
+            staging = policies[STAGING]
+            try:
+                hours = max(0.0, float(tmpfs.get("stale_after_hours", staging.max_age_days * 24)))
+            except (TypeError, ValueError):
+                hours = staging.max_age_days * 24
+            policies[STAGING] = RetentionPolicy.from_cfg(
+                {**tmpfs, "max_age_days": hours / 24, "max_gb": 0}, staging
+            )
+        for kind in (RECORDINGS, ORIGINAL_WAV, RECYCLE_BIN):
+            policies[kind] = RetentionPolicy.from_cfg(raw.get(kind), policies[kind])
+
+        recordings_raw = raw.get(RECORDINGS)
+        include_saved = bool(recordings_raw.get("include_saved", False)) if isinstance(recordings_raw, Mapping) else False
+        try:
+            min_age = max(0.0, float(raw.get("min_age_seconds", base.min_age)))
+        except (TypeError, ValueError):
+            min_age = base.min_age
+        return cls(
+            recordings_dir=base.recordings_dir,
+            tmp_dir=base.tmp_dir,
+            min_age=min_age,
+            include_saved=include_saved,
+            policies=policies,
+        )
+
+
+@dataclass(frozen=True)
+class Candidate:
+    """One deletable unit: a file, a recording with its sidecars, or a recycle bin entry."""
+
+    kind: str
+    key: str
+    files: tuple[tuple[Path, int], ...]
+    mtime: float
+    stem: str = ""
+
+    @property
+    def size(self) -> int:
+        return sum(size for _path, size in self.files)
+
+
+@dataclass
+class RetentionReport:
+    dry_run: bool
+    reclaimed_bytes: dict[str, int] = field(default_factory=lambda: {kind: 0 for kind in PRIORITY})
+    deleted: dict[str, int] = field(default_factory=lambda: {kind: 0 for kind in PRIORITY})
+    reasons: dict[str, int] = field(default_factory=dict)
+    skipped_locked: int = 0
+    errors: list[str] = field(default_factory=list)
+    scanned: int = 0
+    elapsed: float = 0.0
+
+    @property
+    def total_bytes(self) -> int:
+        return sum(self.reclaimed_bytes.values())
+
+    def as_dict(self) -> dict[str, object]:
+        return {
+            "dry_run": self.dry_run,
+            "scanned": self.scanned,
+            "deleted": dict(self.deleted),
+            "reclaimed_bytes": dict(self.reclaimed_bytes),
+            "total_reclaimed_bytes": self.total_bytes,
+            "reasons": dict(self.reasons),
+            "skipped_locked": self.skipped_locked,
+            "errors": list(self.errors),
+            "elapsed_seconds": round(self.elapsed, 3),
+        }
+
+
+def _normalize(path: str | os.PathLike[str]) -> str:
+    return os.path.abspath(os.fspath(path))
+
+
+@contextlib.contextmanager
+def hold_files(paths: Iterable[str | os.PathLike[str] | None], *, lock_dir: Path | None = None) -> Iterator[None]:
+    """Keep the retention engine away from ``paths`` while the block runs.
+
+    The paths are listed in a lock file held with ``flock``; a lock file
+    whose holder died is unlocked and gets cleaned up by the next reader.
+    Failing to create the lock never fails the caller.
+    """
+
+    if lock_dir is None:
+        lock_dir = Path(get_cfg()["paths"]["tmp_dir"]) / LOCK_DIRNAME
+    names = [_normalize(path) for path in paths if path]
+    handle = None
+    final_path = lock_dir / f"{os.getpid()}-{uuid.uuid4().hex}.lock"
+    try:
+        lock_dir.mkdir(parents=True, exist_ok=True)
+        # Lock before the file becomes visible so readers never mistake it
+        # for a stale one.
+        pending = lock_dir / f".{final_path.name}.tmp"
+        handle = open(pending, "w", encoding="utf-8")
+        fcntl.flock(handle.fileno(), fcntl.LOCK_EX)
+        handle.write("\n".join(names))
+        handle.flush()
+        os.replace(pending, final_path)
+    except OSError as exc:
+        print(f"[retention] unable to record file lock: {exc}", flush=True)
+        if handle is not None:
+            handle.close()
+            with contextlib.suppress(OSError):
+                os.unlink(pending)
+        handle = None
+    try:
+        yield
+    finally:
+        if handle is not None:
+            with contextlib.suppress(OSError):
+                os.unlink(final_path)
+            handle.close()
+
+
+def locked_paths(lock_dir: Path) -> set[str]:
+    """Paths listed by live :func:`hold_files` holders; stale lock files are removed."""
+
+    held: set[str] = set()
+    try:
+        entries = list(os.scandir(lock_dir))
+    except OSError:
+        return held
+    for entry in entries:
+        if not entry.name.endswith(".lock"):
+            continue
+        try:
+            with open(entry.path, "r", encoding="utf-8") as handle:
+                try:
+                    fcntl.flock(handle.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+                except BlockingIOError:
+                    held.update(line for line in handle.read().splitlines() if line)
+                    continue
+                with contextlib.suppress(OSError):
+                    os.unlink(entry.path)
+        except OSError:
+            continue
+    return held
+
+
+def pending_encodes(tmp_dir: Path) -> set[str]:
+    """Base names the segmenter still has queued or encoding."""
+
+    try:
+        with open(tmp_dir / STATUS_FILENAME, "r", encoding="utf-8") as handle:
+            status = json.load(handle)
+    except (OSError, ValueError):
+        return set()
+    encoding = status.get("encoding") if isinstance(status, Mapping) else None
+    if not isinstance(encoding, Mapping):
+        return set()
+    stems: set[str] = set()
+    for key in ("pending", "active"):
+        items = encoding.get(key)
+        for item in items if isinstance(items, list) else []:
+            if isinstance(item, Mapping) and item.get("base_name"):
+                stems.add(str(item["base_name"]))
+    return stems
+
+
+def spool_recordings_event(tmp_dir: Path, payload: dict[str, object]) -> None:
+    """Queue a ``recordings_changed`` event for the dashboard, best effort.
+
+    Same spool format as the segmenter's; the web streamer publishes the
+    files in ``tmp_dir/recordings_events`` on its event bus.
+    """
+
+    spool_dir = tmp_dir / RECORDINGS_EVENT_SPOOL_DIRNAME
+    timestamp = time.time()
+    payload.setdefault("updated_at", timestamp)
+    identifier = f"{timestamp:.6f}-{uuid.uuid4().hex}"
+    tmp_path = spool_dir / f".{identifier}.tmp"
+    record = {"type": "recordings_changed", "payload": payload, "timestamp": timestamp}
+    try:
+        spool_dir.mkdir(parents=True, exist_ok=True)
+        with open(tmp_path, "w", encoding="utf-8") as handle:
+            json.dump(record, handle)
+            handle.write("\n")
+        os.replace(tmp_path, spool_dir / f"{identifier}.json")
+    except OSError:
+        with contextlib.suppress(OSError):
+            os.unlink(tmp_path)
+
+
+def _is_partial(name: str) -> bool:
+    return any(suffix.lower() == ".partial" for suffix in Path(name).suffixes)
+
+
+def _stem(name: str) -> str:
+    return name.split(".", 1)[0]
+
+
+def _recycle_entry_reader(entry_dir: Path) -> tuple[dict[str, Any], int] | None:
+    try:
+        with open(entry_dir / RECYCLE_METADATA_FILENAME, "r", encoding="utf-8") as handle:
+            metadata = json.load(handle)
+    except (OSError, ValueError):
+        return None
+    if not isinstance(metadata, dict) or not metadata.get("id"):
+        return None
+    return metadata, entry_disk_usage(entry_dir)
+
+
+class RetentionEngine:
+    """Plan and apply deletions for one recordings root and tmp directory."""
+
+    def __init__(
+        self,
+        settings: RetentionSettings,
+        *,
+        disk_usage: Callable[[Path], Any] = shutil.disk_usage,
+        clock: Callable[[], float] = time.time,
+    ) -> None:
+        self.settings = settings
+        self._disk_usage = disk_usage
+        self._clock = clock
+
+    # -- scanning -----------------------------------------------------
+
+    def _scan_recordings(self) -> tuple[list[Candidate], list[Candidate]]:
+        root = self.settings.recordings_dir
+        recordings: list[Candidate] = []
+        raw_by_day: dict[tuple[str, str], Candidate] = {}
+        stack: list[tuple[Path, str]] = []
+        try:
+            top = list(os.scandir(root))
+        except OSError:
+            return [], []
+        for entry in top:
+            try:
+                if not entry.is_dir(follow_symlinks=False):
+                    continue
+            except OSError:
+                continue
+            if entry.name == RAW_AUDIO_DIRNAME:
+                stack.append((Path(entry.path), ORIGINAL_WAV))
+            elif entry.name == SAVED_RECORDINGS_DIRNAME:
+                if self.settings.include_saved:
+                    stack.append((Path(entry.path), RECORDINGS))
+            elif not entry.name.startswith("."):
+                stack.append((Path(entry.path), RECORDINGS))
+
+        while stack:
+            directory, kind = stack.pop()
+            files: dict[str, os.stat_result] = {}
+            try:
+                entries = list(os.scandir(directory))
+            except OSError:
+                continue
+            for entry in entries:
+                if entry.name.startswith("."):
+                    continue
+                try:
+                    if entry.is_dir(follow_symlinks=False):
+                        stack.append((Path(entry.path), kind))
+                    elif entry.is_file(follow_symlinks=False):
+                        files[entry.name] = entry.stat(follow_symlinks=False)
+                except OSError:
+                    continue
+            for name, stat in files.items():
+                if _is_partial(name):
+                    continue
+                suffix = Path(name).suffix.lower()
+                if kind == ORIGINAL_WAV:
+                    if suffix not in RAW_AUDIO_SUFFIXES:
+                        continue
+                    candidate = Candidate(
+                        kind=ORIGINAL_WAV,
+                        key=(directory / name).relative_to(root).as_posix(),
+                        files=((directory / name, stat.st_size),),
+                        mtime=stat.st_mtime,
+                        stem=_stem(name),
+                    )
+                    raw_by_day[(directory.name, _stem(name))] = candidate
+                    continue
+                if suffix not in RECORDING_SUFFIXES:
+                    continue
+                group = [(directory / name, stat.st_size)]
+                group.extend(
+                    (directory / other, other_stat.st_size)
+                    for other, other_stat in files.items()
+                    if other != name and other.startswith(f"{name}.")
+                )
+                recordings.append(
+                    Candidate(
+                        kind=RECORDINGS,
+                        key=(directory / name).relative_to(root).as_posix(),
+                        files=tuple(group),
+                        # Tiered recordings were re-encoded after capture.
+                        mtime=recorded_at(directory / name, stat.st_mtime),
+                        stem=_stem(name),
+                    )
+                )
+
+        # A deleted recording takes its preserved original WAV with it.
+        with_raw: list[Candidate] = []
+        for candidate in recordings:
+            day = candidate.files[0][0].parent.name
+            raw = raw_by_day.get((day, candidate.stem))
+            if raw is not None:
+                candidate = Candidate(
+                    kind=candidate.kind,
+                    key=candidate.key,
+                    files=candidate.files + raw.files,
+                    mtime=candidate.mtime,
+                    stem=candidate.stem,
+                )
+            with_raw.append(candidate)
+        return with_raw, list(raw_by_day.values())
+
+    def _scan_staging(self) -> list[Candidate]:
+        root = self.settings.tmp_dir
+        candidates: list[Candidate] = []
+        stack = [(root, True)]
+        while stack:
+            directory, top = stack.pop()
+            try:
+                entries = list(os.scandir(directory))
+            except OSError:
+                continue
+            for entry in entries:
+                try:
+                    if entry.is_dir(follow_symlinks=False):
+                        if not top or entry.name in STAGING_SUBDIRS:
+                            stack.append((Path(entry.path), False))
+                        continue
+                    if not entry.is_file(follow_symlinks=False):
+                        continue
+                    if Path(entry.name).suffix.lower() not in STAGING_SUFFIXES:
+                        continue
+                    stat = entry.stat(follow_symlinks=False)
+                except OSError:
+                    continue
+                path = Path(entry.path)
+                candidates.append(
+                    Candidate(
+                        kind=STAGING,
+                        key=path.relative_to(root).as_posix(),
+                        files=((path, stat.st_size),),
+                        mtime=stat.st_mtime,
+                        stem=_stem(entry.name),
+                    )
+                )
+        return candidates
+
+    def _recycle_index(self) -> RecycleBinIndex:
+        return RecycleBinIndex(self.settings.recordings_dir / RECYCLE_BIN_DIRNAME)
+
+    def _scan_recycle_bin(self, errors: list[str]) -> list[Candidate]:
+        index = self._recycle_index()
+        if not index.recycle_root.is_dir():
+            return []
+        try:
+            index.sync(_recycle_entry_reader)
+            rows = index.oldest()
+        except (OSError, sqlite3.Error) as exc:
+            errors.append(f"recycle bin index unavailable: {exc}")
+            return []
+        candidates: list[Candidate] = []
+        for entry_id, deleted_at, disk_bytes in rows:
+            entry_dir = index.recycle_root / entry_id
+            if deleted_at is None:
+                try:
+                    deleted_at = entry_dir.stat().st_mtime
+                except OSError:
+                    continue
+            candidates.append(
+                Candidate(
+                    kind=RECYCLE_BIN,
+                    key=entry_id,
+                    files=((entry_dir, disk_bytes),),
+                    mtime=deleted_at,
+                )
+            )
+        return candidates
+
+    def scan(self, errors: list[str] | None = None) -> dict[str, list[Candidate]]:
+        """Every candidate by kind, oldest first."""
+
+        errors = [] if errors is None else errors
+        recordings, original_wav = self._scan_recordings()
+        found = {
+            STAGING: self._scan_staging(),
+            RECYCLE_BIN: self._scan_recycle_bin(errors),
+            ORIGINAL_WAV: original_wav,
+            RECORDINGS: recordings,
+        }
+        for candidates in found.values():
+            candidates.sort(key=lambda candidate: (candidate.mtime, candidate.key))
+        return found
+
+    # -- planning -----------------------------------------------------
+
+    def _protected(self, candidate: Candidate, locked: set[str], stems: set[str], now: float) -> bool:
+        if candidate.kind != RECYCLE_BIN and now - candidate.mtime < self.settings.min_age:
+            return True
+        if candidate.stem and candidate.stem in stems:
+            return True
+        return any(_normalize(path) in locked for path, _size in candidate.files)
+
+    def _device(self, path: Path) -> int | None:
+        try:
+            return path.stat().st_dev
+        except OSError:
+            return None
+
+    def plan(
+        self,
+        found: Mapping[str, list[Candidate]],
+        *,
+        now: float,
+        report: RetentionReport,
+    ) -> list[tuple[Candidate, str]]:
+        settings = self.settings
+        locked = locked_paths(settings.lock_dir)
+        stems = pending_encodes(settings.tmp_dir)
+        available: dict[str, list[Candidate]] = {}
+        for kind in PRIORITY:
+            keep: list[Candidate] = []
+            for candidate in found.get(kind, []):
+                if self._protected(candidate, locked, stems, now):
+                    report.skipped_locked += 1
+                else:
+                    keep.append(candidate)
+            available[kind] = keep
+
+        planned: list[tuple[Candidate, str]] = []
+        claimed: set[Path] = set()
+        freed_by_kind = {kind: 0 for kind in PRIORITY}
+
+        def _take(candidate: Candidate, reason: str) -> int:
+            new = [(path, size) for path, size in candidate.files if path not in claimed]
+            if not new:
+                return 0
+            claimed.update(path for path, _size in new)
+            planned.append((candidate, reason))
+            freed = sum(size for _path, size in new)
+            freed_by_kind[candidate.kind] += freed
+            return freed
+
+        # Age limits.
+        for kind in PRIORITY:
+            limit = settings.policies[kind].max_age_seconds
+            if limit <= 0:
+                continue
+            for candidate in available[kind]:
+                if now - candidate.mtime > limit:
+                    _take(candidate, "age")
+
+        # Size quotas, oldest first.
+        for kind in PRIORITY:
+            quota = settings.policies[kind].max_bytes
+            if quota <= 0:
+                continue
+            # Protected files still count against the quota.
+            total = sum(candidate.size for candidate in found.get(kind, []))
+            excess = total - freed_by_kind[kind] - quota
+            for candidate in available[kind]:
+                if excess <= 0:
+                    break
+                excess -= _take(candidate, "quota")
+
+        # Filesystem pressure: one usage reading per filesystem, then plan
+        # against the projection.
+        roots = {STAGING: settings.tmp_dir}
+        roots.update({kind: settings.recordings_dir for kind in (RECYCLE_BIN, ORIGINAL_WAV, RECORDINGS)})
+        filesystems: dict[int | None, dict[str, Any]] = {}
+        for kind in PRIORITY:
+            device = self._device(roots[kind])
+            if device is None:
+                continue
+            fs = filesystems.setdefault(device, {"root": roots[kind], "kinds": [], "limit": 0.0})
+            fs["kinds"].append(kind)
+            percent = settings.policies[kind].max_usage_percent
+            if percent > 0 and (fs["limit"] <= 0 or percent < fs["limit"]):
+                fs["limit"] = percent
+        for fs in filesystems.values():
+            if fs["limit"] <= 0:
+                continue
+            try:
+                usage = self._disk_usage(fs["root"])
+            except OSError as exc:
+                report.errors.append(f"unable to read usage of {fs['root']}: {exc}")
+                continue
+            target = usage.total * fs["limit"] / 100.0
+            excess = usage.used - sum(freed_by_kind[kind] for kind in fs["kinds"]) - target
+            for kind in fs["kinds"]:
+                for candidate in available[kind]:
+                    if excess <= 0:
+                        break
+                    excess -= _take(candidate, "pressure")
+        return planned
+
+    # -- applying -----------------------------------------------------
+
+    def _prune_empty_parents(self, path: Path) -> None:
+        stop = {self.settings.recordings_dir, self.settings.tmp_dir, self.settings.recordings_dir / RAW_AUDIO_DIRNAME}
+        stop.add(self.settings.recordings_dir / SAVED_RECORDINGS_DIRNAME)
+        parent = path.parent
+        while parent not in stop and self.settings.recordings_dir in parent.parents:
+            try:
+                parent.rmdir()
+            except OSError:
+                return
+            parent = parent.parent
+
+    def _announce(self, removed: list[str], removed_originals: list[str], removed_entries: list[str]) -> None:
+        tmp_dir = self.settings.tmp_dir
+        if removed:
+            # Only the recordings themselves: their sidecars and original
+            # WAVs are not listed, and the dashboard drops them with the
+            # recording.
+            spool_recordings_event(tmp_dir, {"reason": "deleted", "paths": removed, "count": len(removed)})
+        if removed_originals:
+            spool_recordings_event(
+                tmp_dir,
+                {"reason": "original_removed", "paths": removed_originals, "count": len(removed_originals)},
+            )
+        if removed_entries:
+            spool_recordings_event(
+                tmp_dir, {"reason": "recycle_purged", "entries": removed_entries, "count": len(removed_entries)}
+            )
+
+    def apply(self, planned: list[tuple[Candidate, str]], report: RetentionReport) -> None:
+        settings = self.settings
+        locked = locked_paths(settings.lock_dir)
+        stems = pending_encodes(settings.tmp_dir)
+        removed: list[str] = []
+        removed_originals: list[str] = []
+        removed_entries: list[str] = []
+        for candidate, reason in planned:
+            # An encode may have started since the plan was made.
+            if (candidate.stem and candidate.stem in stems) or any(
+                _normalize(path) in locked for path, _size in candidate.files
+            ):
+                report.skipped_locked += 1
+                continue
+            freed = 0
+            for path, size in candidate.files:
+                try:
+                    if candidate.kind == RECYCLE_BIN:
+                        shutil.rmtree(path)
+                    else:
+                        path.unlink()
+                except FileNotFoundError:
+                    continue
+                except OSError as exc:
+                    report.errors.append(f"{path}: {exc}")
+                    continue
+                freed += size
+                if candidate.kind in (RECORDINGS, ORIGINAL_WAV):
+                    if path == candidate.files[0][0]:
+                        announced = removed if candidate.kind == RECORDINGS else removed_originals
+                        with contextlib.suppress(ValueError):
+                            announced.append(path.relative_to(settings.recordings_dir).as_posix())
+                    self._prune_empty_parents(path)
+            if not freed and candidate.size:
+                continue
+            if candidate.kind == RECYCLE_BIN:
+                removed_entries.append(candidate.key)
+            report.deleted[candidate.kind] += 1
+            report.reclaimed_bytes[candidate.kind] += freed
+            report.reasons[reason] = report.reasons.get(reason, 0) + 1
+
+        if removed_entries:
+            try:
+                self._recycle_index().remove(removed_entries)
+            except (OSError, sqlite3.Error, ValueError) as exc:
+                # Readers reconcile the index on their next sync.
+                report.errors.append(f"recycle bin index not updated: {exc}")
+        self._announce(removed, removed_originals, removed_entries)
+
+    def run(self, *, dry_run: bool = False) -> RetentionReport:
+        started = time.monotonic()
+        report = RetentionReport(dry_run=dry_run)
+        found = self.scan(report.errors)
+        report.scanned = sum(len(candidates) for candidates in found.values())
+        planned = self.plan(found, now=self._clock(), report=report)
+        if dry_run:
+            for candidate, reason in planned:
+                report.deleted[candidate.kind] += 1
+                report.reclaimed_bytes[candidate.kind] += candidate.size
+                report.reasons[reason] = report.reasons.get(reason, 0) + 1
+        else:
+            self.apply(planned, report)
+        report.elapsed = time.monotonic() - started
+        return report
+
+
+def _format_bytes(value: float) -> str:
+    if value < 1024:
+        return f"{int(value)} B"
+    for unit in ("KB", "MB"):
+        value /= 1024
+        if value < 1024:
+            return f"{value:.1f} {unit}"
+    return f"{value / 1024:.1f} GB"
+
+
+def describe_report(report: RetentionReport) -> str:
+    verb = "would reclaim" if report.dry_run else "reclaimed"
+    parts = [
+        f"{kind.replace('_', ' ')} {report.deleted[kind]} ({_format_bytes(report.reclaimed_bytes[kind])})"
+        for kind in PRIORITY
+        if report.deleted[kind]
+    ]
+    summary = ", ".join(parts) if parts else "nothing to delete"
+    return (
+        f"{verb} {_format_bytes(report.total_bytes)}: {summary}; scanned {report.scanned}, "
+        f"{report.skipped_locked} protected, {len(report.errors)} error(s) in {report.elapsed:.2f}s"
+    )
+
+
+def main(argv: Iterable[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Apply the retention policies to recordings and staging files.")
+    parser.add_argument("--dry-run", action="store_true", help="Plan deletions without removing anything")
+    parser.add_argument("--json", action="store_true", help="Print the report as JSON")
+    args = parser.parse_args(list(argv) if argv is not None else None)
+
+    engine = RetentionEngine(RetentionSettings.from_cfg(get_cfg()))
+    report = engine.run(dry_run=args.dry_run)
+    if args.json:
+        print(json.dumps(report.as_dict(), indent=2, sort_keys=True))
+    else:
+        print(f"[retention] {describe_report(report)}", flush=True)
+        for error in report.errors:
+            print(f"[retention] {error}", flush=True)
+    return 1 if report.errors else 0
+
+
+__all__ = [
+    "Candidate",
+    "LOCK_DIRNAME",
+    "PRIORITY",
+    "RetentionEngine",
+    "RetentionPolicy",
+    "RetentionReport",
+    "RetentionSettings",
+    "describe_report",
+    "hold_files",
+    "locked_paths",
+    "main",
+    "pending_encodes",
+    "spool_recordings_event",
+]
+
+
+if __name__ == "__main__":  # pragma: no cover - CLI entry
+    sys.exit(main())
@@ -36,6 +36,7 @@ from lib.ffmpeg_io import (
     pcm_pipe_input_args,
 )
 from lib.notifications import build_dispatcher
+from lib.retention import LOCK_DIRNAME as RETENTION_LOCK_DIRNAME, hold_files
 from lib.segmenter_helpers.display import color_tf
 from lib.segmenter_helpers.system import (
     normalized_load as _normalized_load,
@@ -47,6 +48,17 @@ cfg = get_cfg()
 EVENT_TAGS = resolve_event_tags(cfg)
 NOTIFIER = build_dispatcher(cfg.get("notifications"))
 
+
+def start_notification_delivery() -> None:
+    """Deliver outbox notifications from this process.
+
+    Only service entry points call this; importing the segmenter just lets a
+    process enqueue events for them.
+    """
+
+    if NOTIFIER is not None:
+        NOTIFIER.start()
+
 # Debug output formatting defaults (prevents NameError when DEV mode is enabled)
 BAR_SCALE = int(cfg["segmenter"].get("rms_bar_scale", 4000))  # scale for RMS bar visualization
 BAR_WIDTH = int(cfg["segmenter"].get("rms_bar_width", 30))    # character width of the bar
@@ -77,6 +89,21 @@ def _reason_indicates_split(reason: str | None) -> bool:
         return False
     return any(token in normalized for token in _SPLIT_REASON_TOKENS)
 
+
+def _autosplit_reason(limit_seconds: float | None) -> str:
+    limit = float(limit_seconds or 0.0)
+    if limit <= 0.0:
+        return "autosplit limit reached"
+    minutes = limit / 60.0
+    if minutes >= 10.0:
+        human = f"{minutes:.0f}m"
+    elif minutes >= 1.0:
+        human = f"{minutes:.1f}m"
+    else:
+        human = f"{limit:.0f}s"
+    return f"autosplit after {human}"
+
+
 @dataclass(frozen=True)
 class RecorderIngestHint:
     timestamp: str
@@ -1635,18 +1662,27 @@ class EncodingStatus:
 ENCODING_STATUS = EncodingStatus()
 
 
+def offline_cpu_available() -> bool:
+    """CPU admission check shared by offline encodes and dropbox ingest.
+
+    Offline work may start while the load average per CPU is at or below
+    ``parallel_encode.offline_load_avg_per_cpu``; the load average covers
+    every process, so the encoder and the ingest service throttle each other.
+    """
+
+    if PARALLEL_OFFLINE_LOAD_THRESHOLD <= 0.0:
+        return True
+    normalized = _normalized_load()
+    return normalized is None or normalized <= PARALLEL_OFFLINE_LOAD_THRESHOLD
+
+
 class _EncoderWorker(threading.Thread):
     def __init__(self, job_queue: queue.Queue):
         super().__init__(daemon=True)
         self.q = job_queue
 
     def _wait_for_cpu(self) -> None:
-        if PARALLEL_OFFLINE_LOAD_THRESHOLD <= 0.0:
-            return
-        while True:
-            normalized = _normalized_load()
-            if normalized is None or normalized <= PARALLEL_OFFLINE_LOAD_THRESHOLD:
-                return
+        while not offline_cpu_available():
             time.sleep(PARALLEL_OFFLINE_CHECK_INTERVAL)
 
     def run(self):
@@ -1732,14 +1768,19 @@ class _EncoderWorker(threading.Thread):
                 if os.name == "posix":
                     preexec = _set_single_core_affinity
                 try:
-                    subprocess.run(
-                        cmd,
-                        capture_output=True,
-                        text=True,
-                        check=True,
-                        env=env,
-                        preexec_fn=preexec,
-                    )
+                    # Retention must not delete the inputs mid-encode.
+                    with hold_files(
+                        (wav_path, existing_opus, raw_capture_path),
+                        lock_dir=Path(TMP_DIR) / RETENTION_LOCK_DIRNAME,
+                    ):
+                        subprocess.run(
+                            cmd,
+                            capture_output=True,
+                            text=True,
+                            check=True,
+                            env=env,
+                            preexec_fn=preexec,
+                        )
                 except subprocess.CalledProcessError as exc:
                     print(f"[encoder] FAIL {exc.returncode}", flush=True)
                     if exc.stdout:
@@ -1894,7 +1935,11 @@ class AdaptiveRmsController:
         initial_linear_threshold: int,
         cfg_section: dict[str, object] | None,
         debug: bool = True, # noqa: for future implementation
+        clock: Callable[[], float] | None = None,
     ) -> None:
+        # Offline analysis passes a clock driven by the frame index so the
+        # update cadence follows audio time rather than processing speed.
+        self._clock = clock
         section = cfg_section or {}
         self.enabled = bool(section.get("enabled", False))
 
@@ -1947,7 +1992,7 @@ class AdaptiveRmsController:
         window_sec = max(0.1, float(section.get("window_sec", 10.0)))
         window_frames = max(1, int(round((window_sec * 1000.0) / frame_ms)))
         self._buffer: collections.deque[float] = collections.deque(maxlen=window_frames)
-        self._last_update = time.monotonic()
+        self._last_update = self._now()
         self._last_buffer_extend = self._last_update
         self._voiced_fallback_active = False
         self._voiced_fallback_logged = False
@@ -1964,6 +2009,9 @@ class AdaptiveRmsController:
         self.debug = bool(debug)
         self._updates_paused = False
 
+    def _now(self) -> float:
+        return self._clock() if self._clock is not None else time.monotonic()
+
     @property
     def threshold_linear(self) -> int:
         if not self.enabled:
@@ -2018,7 +2066,7 @@ class AdaptiveRmsController:
 
     def resume_updates(self, *, clear_buffer: bool = False) -> None:
         self._updates_paused = False
-        now = time.monotonic()
+        now = self._now()
         if clear_buffer:
             self._buffer.clear()
         self._last_release_candidate = None
@@ -2035,7 +2083,7 @@ class AdaptiveRmsController:
         updates_allowed = not self._updates_paused
 
         norm = max(0.0, min(rms_value / self._NORM, 1.0))
-        now = time.monotonic()
+        now = self._now()
 
         if not capturing:
             self._voiced_fallback_active = False
@@ -2250,6 +2298,7 @@ class TimelineRecorder:
         self._ingest_hint: Optional[RecorderIngestHint] = ingest_hint
         self._ingest_hint_used = False
         self._encode_jobs: list[int] = []
+        self._finalized_paths: list[str] = []
         self._manual_split_requested = False
         self._manual_stop_requested = False
         self._manual_recording = False
@@ -3133,6 +3182,48 @@ class TimelineRecorder:
         except queue.Full:
             self.raw_writer_queue_drops += 1
 
+    def _claim_event_identity(self, prebuf_frames: int) -> None:
+        """Name a new event and reserve its per-timestamp counter.
+
+        ``prebuf_frames`` counts the pre-roll frames written ahead of the
+        trigger (including the trigger frame); they backdate the start time.
+        """
+
+        hint_timestamp: str | None = None
+        hint_counter: int | None = None
+        if self._ingest_hint and not self._ingest_hint_used:
+            hint_timestamp = self._ingest_hint.timestamp
+            hint_counter = self._ingest_hint.event_counter
+            self._ingest_hint_used = True
+
+        prebuf_seconds = max(prebuf_frames - 1, 0) * (FRAME_MS / 1000.0)
+        trigger_epoch = time.time()
+
+        if hint_timestamp:
+            start_time = hint_timestamp
+            start_epoch = trigger_epoch
+        else:
+            start_epoch = max(0.0, trigger_epoch - prebuf_seconds)
+            start_time = datetime.fromtimestamp(start_epoch).strftime("%H-%M-%S")
+
+        if hint_counter is not None and hint_timestamp:
+            existing = TimelineRecorder.event_counters[start_time]
+            if hint_counter > existing:
+                count = hint_counter
+            else:
+                count = existing + 1
+            TimelineRecorder.event_counters[start_time] = count
+        else:
+            TimelineRecorder.event_counters[start_time] += 1
+            count = TimelineRecorder.event_counters[start_time]
+
+        self.event_timestamp = start_time
+        self.event_counter = count
+        self.base_name = f"{start_time}_Both_{count}"
+        self.tmp_wav_path = os.path.join(TMP_DIR, f"{self.base_name}.wav")
+        self.event_started_epoch = start_epoch
+        self.event_day = time.strftime("%Y%m%d", time.localtime(start_epoch))
+
     def ingest(
         self,
         buf: bytes,
@@ -3145,19 +3236,7 @@ class TimelineRecorder:
             and self.active
             and self.frames_written >= self._autosplit_limit_frames
         ):
-            limit_seconds = float(self._autosplit_limit_seconds or 0.0)
-            if limit_seconds > 0.0:
-                minutes = limit_seconds / 60.0
-                if minutes >= 10.0:
-                    human = f"{minutes:.0f}m"
-                elif minutes >= 1.0:
-                    human = f"{minutes:.1f}m"
-                else:
-                    human = f"{limit_seconds:.0f}s"
-                reason = f"autosplit after {human}"
-            else:
-                human = "limit reached"
-                reason = "autosplit limit reached"
+            reason = _autosplit_reason(self._autosplit_limit_seconds)
             current_name = self.base_name or "<pending>"
             print(
                 f"[segmenter] Autosplitting {current_name} ({reason})",
@@ -3341,40 +3420,8 @@ class TimelineRecorder:
 
         if not self.active:
             if self.consec_active >= START_CONSECUTIVE:
-                hint_timestamp: str | None = None
-                hint_counter: int | None = None
-                if self._ingest_hint and not self._ingest_hint_used:
-                    hint_timestamp = self._ingest_hint.timestamp
-                    hint_counter = self._ingest_hint.event_counter
-                    self._ingest_hint_used = True
-
-                prebuf_frames = len(self.prebuf)
-                prebuf_seconds = max(prebuf_frames - 1, 0) * (FRAME_MS / 1000.0)
-                trigger_epoch = time.time()
-
-                if hint_timestamp:
-                    start_time = hint_timestamp
-                    start_epoch = trigger_epoch
-                else:
-                    start_epoch = max(0.0, trigger_epoch - prebuf_seconds)
-                    start_time = datetime.fromtimestamp(start_epoch).strftime("%H-%M-%S")
-
-                if hint_counter is not None and hint_timestamp:
-                    existing = TimelineRecorder.event_counters[start_time]
-                    if hint_counter > existing:
-                        count = hint_counter
-                    else:
-                        count = existing + 1
-                    TimelineRecorder.event_counters[start_time] = count
-                else:
-                    TimelineRecorder.event_counters[start_time] += 1
-                    count = TimelineRecorder.event_counters[start_time]
-
-                self.event_timestamp = start_time
-                self.event_counter = count
+                self._claim_event_identity(len(self.prebuf))
                 self.trigger_rms = int(rms_val)
-                self.base_name = f"{start_time}_Both_{count}"
-                self.tmp_wav_path = os.path.join(TMP_DIR, f"{self.base_name}.wav")
                 raw_prebuf_bytes: list[bytes] = []
                 if self.raw_prebuf is not None and self.raw_prebuf:
                     raw_prebuf_bytes = [bytes(frame) for frame in self.raw_prebuf]
@@ -3399,8 +3446,6 @@ class TimelineRecorder:
                 else:
                     self.tmp_raw_path = None
                     self._raw_active = False
-                self.event_started_epoch = start_epoch
-                self.event_day = time.strftime("%Y%m%d", time.localtime(start_epoch))
 
                 day_stamp = time.strftime("%Y%m%d")
                 self._parallel_day_dir = os.path.join(REC_DIR, day_stamp)
@@ -3840,6 +3885,7 @@ class TimelineRecorder:
             )
             if job_id is not None:
                 self._encode_jobs.append(job_id)
+            self._finalized_paths.append(final_opus_path)
             if job_id is not None and wait_for_encode_start:
                 started = ENCODING_STATUS.wait_for_start(job_id, SHUTDOWN_ENCODE_START_TIMEOUT)
                 if not started:
@@ -4205,11 +4251,56 @@ class TimelineRecorder:
                 },
             )
 
+    def begin_offline_event(self, *, prebuf_frames: int, trigger_rms: int) -> str:
+        """Open an event whose boundaries were decided by ``lib.batch_ingest``.
+
+        The audio is supplied with :meth:`write_offline_frames` and the event
+        is closed by :meth:`finish_offline_event` through the same finalize
+        path as live events, so naming, encode jobs, notifications and
+        dashboard events match.
+        """
+
+        if self.active:
+            raise RuntimeError("an event is already active")
+        self._claim_event_identity(prebuf_frames)
+        self.trigger_rms = int(trigger_rms)
+        self.audio_q.put(("open", self.base_name, self.tmp_wav_path))
+        self.active = True
+        return self.base_name or ""
+
+    def write_offline_frames(self, pcm: bytes) -> None:
+        # Block rather than drop frames, and keep at most one chunk queued so
+        # the next block can be analysed while this one is written.
+        self.audio_q.join()
+        self.audio_q.put(bytes(pcm))
+
+    def finish_offline_event(
+        self,
+        *,
+        frames: int,
+        sum_rms: int,
+        saw_voiced: bool,
+        saw_loud: bool,
+        reason: str,
+    ) -> None:
+        self.frames_written = int(frames)
+        self.sum_rms = int(sum_rms)
+        self.saw_voiced = bool(saw_voiced)
+        self.saw_loud = bool(saw_loud)
+        self.audio_q.join()
+        self._finalize_event(reason=reason)
+
     def encode_job_ids(self) -> tuple[int, ...]:
         return tuple(self._encode_jobs)
 
+    def finalized_paths(self) -> tuple[str, ...]:
+        """Final recording paths of the events this recorder has closed."""
+
+        return tuple(self._finalized_paths)
+
 
 def main():
+    start_notification_delivery()
     rec = TimelineRecorder()
     idx = 0
     while True:
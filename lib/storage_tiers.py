@@ -0,0 +1,450 @@
+"""Age-tiered re-encoding of stored recordings.
+
+``encode_and_store.sh`` writes every recording as 48 kbps Opus and keeps it
+at that rate for good. The ``storage_tiers`` config lists tiers such as "after
+30 days, 24 kbps speech-tuned Opus". Once a recording is older than a tier's
+``after_days`` it is re-encoded to that tier, in place and under the same
+name. :mod:`lib.original_compaction` runs the pass from
+``original-compaction.service``, after its FLAC work and under the same idle
+checks.
+
+* Only Ogg Opus recordings with a waveform sidecar in the day folders are
+  tiered. ``Saved`` clips are included only with ``include_saved``.
+  Recordings that are held (:func:`lib.retention.hold_files`) or still
+  queued for encoding are skipped.
+* A recording already at or below the tier's bitrate and channel count is
+  left alone. The tier it was moved to is recorded in its waveform sidecar
+  under ``storage_tier``. Without a sidecar, the size-over-duration rate is
+  used instead.
+* Each new file is written to a hidden ``.partial`` file and decoded in full
+  by ffmpeg. Its duration must match the old file within one Opus frame, and
+  it must be smaller. Only then does it replace the old file. The new file
+  gets a new modification time, so cached copies and resumed downloads of
+  the old bytes are invalidated. The capture time is kept as ``recorded_at``
+  in the sidecar's ``storage_tier`` record, and age-based retention and later
+  tiers read it from there (:func:`lib.recording_metadata.recorded_at`).
+* Waveform peaks and transcripts come from the original capture and stay
+  valid because the duration does not change. Sidecars only gain the
+  ``storage_tier`` record (tier name, bitrate, bytes before and after, capture
+  time), which
+  :func:`status` adds up into the bytes saved so far.
+
+Re-encoding is lossy and cannot be undone, so ``storage_tiers.enabled`` is
+off by default.
+"""
+
+from __future__ import annotations
+
+import contextlib
+import json
+import os
+import struct
+import subprocess
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Callable, Iterator, Mapping
+
+from lib.audio_duration import DurationUnsupported, opus_duration_us
+from lib.recording_metadata import recorded_at, set_storage_tier
+from lib.recycle_bin_utils import SAVED_RECORDINGS_DIRNAME
+from lib.retention import LOCK_DIRNAME, hold_files, locked_paths, pending_encodes, spool_recordings_event
+
+TIER_SUFFIXES = (".opus",)
+WAVEFORM_SUFFIX = ".waveform.json"
+PARTIAL_SUFFIX = ".partial"
+# Bitrate of the recordings encode_and_store.sh writes.
+SOURCE_BITRATE_KBPS = 48
+# Durations may differ by up to one 20 ms Opus frame after re-encoding.
+DURATION_TOLERANCE_US = 20_000
+_APPLICATIONS = ("voip", "audio", "lowdelay")
+_DAY = 86400.0
+
+
+class TierError(RuntimeError):
+    """Raised when a recording cannot be re-encoded or fails verification."""
+
+
+@dataclass(frozen=True)
+class Tier:
+    name: str
+    after_days: float
+    bitrate_kbps: int
+    channels: int = 1
+    application: str = "voip"
+
+
+@dataclass(frozen=True)
+class TierSettings:
+    recordings_dir: Path
+    tmp_dir: Path
+    enabled: bool = False
+    include_saved: bool = False
+    tiers: tuple[Tier, ...] = ()
+    ffmpeg: str = "ffmpeg"
+
+    @classmethod
+    def from_cfg(cls, cfg: Mapping[str, Any]) -> "TierSettings":
+        paths = cfg.get("paths") or {}
+        raw = cfg.get("storage_tiers") or {}
+        if not isinstance(raw, Mapping):
+            raw = {}
+        tiers: list[Tier] = []
+        raw_tiers = raw.get("tiers")
+        for index, item in enumerate(raw_tiers if isinstance(raw_tiers, list) else []):
+            if not isinstance(item, Mapping):
+                continue
+            try:
+                after_days = max(0.0, float(item.get("after_days")))
+                bitrate = max(6, min(510, int(item.get("bitrate_kbps"))))
+                channels = 2 if int(item.get("channels", 1)) >= 2 else 1
+            except (TypeError, ValueError):
+                print(f"[tiers] ignoring storage_tiers.tiers[{index}]: invalid numbers", flush=True)
+                continue
+            application = str(item.get("application", "voip")).strip().lower()
+            if application not in _APPLICATIONS:
+                application = "voip"
+            name = str(item.get("name") or f"tier{index + 1}").strip()
+            tiers.append(Tier(name, after_days, bitrate, channels, application))
+        tiers.sort(key=lambda tier: tier.after_days)
+        return cls(
+            recordings_dir=Path(paths.get("recordings_dir", "/apps/tricorder/recordings")),
+            tmp_dir=Path(paths.get("tmp_dir", "/apps/tricorder/tmp")),
+            enabled=bool(raw.get("enabled", False)),
+            include_saved=bool(raw.get("include_saved", False)),
+            tiers=tuple(tiers),
+        )
+
+    def tier_for(self, age_seconds: float) -> Tier | None:
+        """The last tier whose ``after_days`` the recording has reached."""
+
+        selected = None
+        for tier in self.tiers:
+            if age_seconds >= tier.after_days * _DAY:
+                selected = tier
+        return selected
+
+
+@dataclass(frozen=True)
+class TierResult:
+    path: Path
+    tier: Tier
+    original_bytes: int
+    reencoded_bytes: int
+    seconds: float
+
+    @property
+    def saved_bytes(self) -> int:
+        return max(0, self.original_bytes - self.reencoded_bytes)
+
+
+def waveform_sidecar(path: Path) -> Path:
+    return path.with_name(path.name + WAVEFORM_SUFFIX)
+
+
+def _read_sidecar(path: Path) -> dict[str, Any]:
+    try:
+        with waveform_sidecar(path).open("r", encoding="utf-8") as handle:
+            payload = json.load(handle)
+    except (OSError, json.JSONDecodeError):
+        return {}
+    return payload if isinstance(payload, dict) else {}
+
+
+def opus_channels(path: os.PathLike[str] | str) -> int:
+    """Channel count from the OpusHead packet on the first Ogg page."""
+
+    with open(path, "rb") as handle:
+        header = handle.read(27)
+        if len(header) < 27 or header[:4] != b"OggS":
+            raise TierError(f"{Path(path).name} is not an Ogg stream")
+        lacing = handle.read(header[26])
+        head = handle.read(min(sum(lacing), 19))
+    if not head.startswith(b"OpusHead") or len(head) < 10:
+        raise TierError(f"{Path(path).name} does not start with an OpusHead")
+    return head[9]
+
+
+def current_format(path: Path, stat: os.stat_result | None = None) -> tuple[float, int]:
+    """Best known ``(bitrate_kbps, channels)`` of a stored recording."""
+
+    marker = _read_sidecar(path).get("storage_tier")
+    if isinstance(marker, dict):
+        try:
+            return float(marker["bitrate_kbps"]), int(marker["channels"])
+        except (KeyError, TypeError, ValueError):
+            pass
+    try:
+        channels = opus_channels(path)
+        duration_us = opus_duration_us(path)
+    except (OSError, TierError, DurationUnsupported, struct.error):
+        return float(SOURCE_BITRATE_KBPS), 1
+    size = (stat or path.stat()).st_size
+    if duration_us <= 0:
+        return float(SOURCE_BITRATE_KBPS), channels
+    return size * 8 * 1000 / duration_us, channels
+
+
+def needs_tier(path: Path, tier: Tier, stat: os.stat_result | None = None) -> bool:
+    bitrate, channels = current_format(path, stat)
+    # VBR files land a little above or below their target; 10% slack keeps a
+    # recording from being re-encoded to the bitrate it already has.
+    return bitrate > tier.bitrate_kbps * 1.1 or channels > tier.channels
+
+
+def _run_ffmpeg(cmd: list[str], what: str) -> None:
+    try:
+        subprocess.run(cmd, capture_output=True, check=True)
+    except OSError as exc:
+        raise TierError(f"unable to run {cmd[0]}: {exc}") from exc
+    except subprocess.CalledProcessError as exc:
+        message = (exc.stderr or b"").decode("utf-8", "replace").strip()
+        raise TierError(f"{what} failed: {message or exc.returncode}") from exc
+
+
+def _fsync(path: Path) -> None:
+    fd = os.open(path, os.O_RDONLY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+def reencode_recording(path: os.PathLike[str] | str, tier: Tier, *, ffmpeg: str = "ffmpeg") -> TierResult:
+    """Re-encode the Opus recording ``path`` in place at ``tier``'s settings."""
+
+    started = time.monotonic()
+    path = Path(path)
+    stat = path.stat()
+    try:
+        source_us = opus_duration_us(path)
+    except DurationUnsupported as exc:
+        raise TierError(f"{path.name}: {exc}") from exc
+
+    partial = path.with_name(f".{path.name}{PARTIAL_SUFFIX}")
+    cmd = [
+        ffmpeg,
+        "-hide_banner",
+        "-loglevel",
+        "error",
+        "-y",
+        "-threads",
+        "1",
+        "-i",
+        str(path),
+        "-map",
+        "0:a:0",
+        "-map_metadata",
+        "0",
+        "-ac",
+        str(tier.channels),
+        "-c:a",
+        "libopus",
+        "-b:a",
+        f"{tier.bitrate_kbps}k",
+        "-vbr",
+        "on",
+        "-application",
+        tier.application,
+        "-frame_duration",
+        "20",
+        "-f",
+        "opus",
+        str(partial),
+    ]
+    try:
+        _run_ffmpeg(cmd, f"re-encoding {path.name}")
+        try:
+            reencoded_us = opus_duration_us(partial)
+        except DurationUnsupported as exc:
+            raise TierError(f"{path.name}: re-encoded file is unreadable: {exc}") from exc
+        if abs(reencoded_us - source_us) > DURATION_TOLERANCE_US:
+            raise TierError(
+                f"{path.name}: duration changed from {source_us / 1e6:.3f}s to {reencoded_us / 1e6:.3f}s"
+            )
+        if opus_channels(partial) != tier.channels:
+            raise TierError(f"{path.name}: re-encoded file does not have {tier.channels} channel(s)")
+        # Decode every packet; a corrupt stream fails here instead of in the player.
+        _run_ffmpeg(
+            [ffmpeg, "-hide_banner", "-loglevel", "error", "-xerror", "-i", str(partial), "-f", "null", "-"],
+            f"verifying {path.name}",
+        )
+        reencoded_bytes = partial.stat().st_size
+        if reencoded_bytes >= stat.st_size:
+            raise TierError(f"{path.name}: {tier.name} would not be smaller")
+        _fsync(partial)
+        os.replace(partial, path)
+        with contextlib.suppress(OSError):
+            _fsync(path.parent)
+    finally:
+        with contextlib.suppress(FileNotFoundError):
+            partial.unlink()
+    return TierResult(
+        path=path,
+        tier=tier,
+        original_bytes=stat.st_size,
+        reencoded_bytes=reencoded_bytes,
+        seconds=time.monotonic() - started,
+    )
+
+
+def recordings(settings: TierSettings) -> Iterator[tuple[Path, os.stat_result]]:
+    """Tierable recordings in the day folders (and ``Saved`` when enabled)."""
+
+    roots = [settings.recordings_dir]
+    if settings.include_saved:
+        roots.append(settings.recordings_dir / SAVED_RECORDINGS_DIRNAME)
+    for root in roots:
+        try:
+            days = sorted(
+                entry.path
+                for entry in os.scandir(root)
+                if entry.is_dir(follow_symlinks=False) and entry.name.isdigit()
+            )
+        except OSError:
+            continue
+        for day in days:
+            try:
+                entries = sorted(os.scandir(day), key=lambda entry: entry.name)
+            except OSError:
+                continue
+            for entry in entries:
+                if entry.name.startswith(".") or not entry.name.lower().endswith(TIER_SUFFIXES):
+                    continue
+                try:
+                    if entry.is_file(follow_symlinks=False):
+                        yield Path(entry.path), entry.stat(follow_symlinks=False)
+                except OSError:
+                    continue
+
+
+class RecordingTierer:
+    """Move recordings down the configured storage tiers as they age."""
+
+    def __init__(self, settings: TierSettings, *, clock: Callable[[], float] = time.time) -> None:
+        self.settings = settings
+        self._clock = clock
+        self._failed: dict[Path, tuple[int, int]] = {}
+        self.saved_bytes = 0
+        self.reencoded = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.settings.enabled and bool(self.settings.tiers)
+
+    def due(self) -> list[tuple[Path, Tier]]:
+        """Recordings whose age puts them in a tier they are not yet at, oldest first."""
+
+        settings = self.settings
+        if not self.enabled:
+            return []
+        now = self._clock()
+        locked = locked_paths(settings.tmp_dir / LOCK_DIRNAME)
+        encoding = pending_encodes(settings.tmp_dir)
+        due: list[tuple[float, Path, Tier]] = []
+        for path, stat in recordings(settings):
+            captured = recorded_at(path, stat.st_mtime)
+            tier = settings.tier_for(now - captured)
+            if tier is None or os.path.abspath(path) in locked:
+                continue
+            if path.name.split(".", 1)[0] in encoding:
+                continue
+            if self._failed.get(path) == (stat.st_size, stat.st_mtime_ns):
+                continue
+            # The sidecar keeps the capture time once the file is rewritten.
+            if not waveform_sidecar(path).is_file():
+                continue
+            if needs_tier(path, tier, stat):
+                due.append((captured, path, tier))
+        due.sort(key=lambda item: (item[0], item[1].name))
+        return [(path, tier) for _captured, path, tier in due]
+
+    def retier(self, path: Path, tier: Tier) -> bool:
+        """Re-encode one recording; returns whether it was replaced."""
+
+        settings = self.settings
+        try:
+            stat = path.stat()
+        except OSError:
+            return False
+        partial = path.with_name(f".{path.name}{PARTIAL_SUFFIX}")
+        with hold_files((path, partial), lock_dir=settings.tmp_dir / LOCK_DIRNAME):
+            try:
+                result = reencode_recording(path, tier, ffmpeg=settings.ffmpeg)
+            except (TierError, OSError) as exc:
+                self._failed[path] = (stat.st_size, stat.st_mtime_ns)
+                print(f"[tiers] skipped {path.name}: {exc}", flush=True)
+                return False
+            sidecar = waveform_sidecar(path)
+            previous = _read_sidecar(path).get("storage_tier")
+            first_bytes = result.original_bytes
+            if isinstance(previous, dict) and isinstance(previous.get("original_bytes"), int):
+                first_bytes = previous["original_bytes"]
+            set_storage_tier(
+                sidecar,
+                {
+                    "name": tier.name,
+                    "bitrate_kbps": tier.bitrate_kbps,
+                    "channels": tier.channels,
+                    "application": tier.application,
+                    "original_bytes": first_bytes,
+                    "bytes": result.reencoded_bytes,
+                    "recorded_at": recorded_at(path, stat.st_mtime),
+                    "reencoded_at": int(self._clock()),
+                },
+            )
+        self.reencoded += 1
+        self.saved_bytes += result.saved_bytes
+        rel = path.relative_to(settings.recordings_dir).as_posix()
+        # Only the recording: the change feed cannot list its sidecar and
+        # would report it as removed.
+        spool_recordings_event(settings.tmp_dir, {"reason": "recording_retiered", "paths": [rel]})
+        print(
+            f"[tiers] {rel} -> {tier.name} ({tier.bitrate_kbps} kbps): "
+            f"{result.original_bytes} -> {result.reencoded_bytes} bytes in {result.seconds:.1f}s",
+            flush=True,
+        )
+        return True
+
+    def run_once(self, idle: Callable[[], bool], stop: Callable[[], bool] = lambda: False) -> int:
+        """Re-encode due recordings while ``idle()`` holds; returns files attempted."""
+
+        attempted = 0
+        for path, tier in self.due():
+            if stop() or not idle():
+                break
+            self.retier(path, tier)
+            attempted += 1
+        return attempted
+
+
+def status(settings: TierSettings) -> dict[str, object]:
+    """Per-tier recording counts and the bytes saved by re-encoding so far."""
+
+    tiers: dict[str, int] = {}
+    saved = 0
+    for path, stat in recordings(settings):
+        marker = _read_sidecar(path).get("storage_tier")
+        if not isinstance(marker, dict):
+            continue
+        name = str(marker.get("name") or "?")
+        tiers[name] = tiers.get(name, 0) + 1
+        original = marker.get("original_bytes")
+        if isinstance(original, int):
+            saved += max(0, original - stat.st_size)
+    return {"enabled": settings.enabled, "recordings_by_tier": tiers, "saved_bytes": saved}
+
+
+__all__ = [
+    "RecordingTierer",
+    "Tier",
+    "TierError",
+    "TierResult",
+    "TierSettings",
+    "WAVEFORM_SUFFIX",
+    "current_format",
+    "opus_channels",
+    "recordings",
+    "reencode_recording",
+    "status",
+]
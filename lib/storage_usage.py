@@ -0,0 +1,306 @@
+"""Persistent per-collection byte counters for the recordings tree.
+
+The dashboard storage gauge used to walk the whole recordings tree on every
+``/api/recordings`` request. This ledger keeps one row per directory with the
+bytes held by the regular files directly inside it, and SQLite triggers keep a
+running total per collection (recent recordings, saved recordings, the recycle
+bin and the preserved original WAVs), so reading usage is a single lookup.
+
+Writers call :meth:`StorageUsageLedger.refresh` with the directories they
+touched; that rescans only those directories and walks subdirectories it has
+not seen before. :meth:`StorageUsageLedger.reconcile` rebuilds every row from
+a full walk and is meant to run periodically in the background to pick up
+changes nobody reported (for example files growing in place).
+
+The database lives in the recordings root (``.storage_usage.sqlite3``) and is
+excluded from its own counts. It is a cache: deleting it only costs one walk.
+"""
+
+from __future__ import annotations
+
+import contextlib
+import os
+import sqlite3
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Collection, Iterable, Iterator, Mapping
+
+RECENT = "recent"
+SAVED = "saved"
+RECYCLE = "recycle"
+ORIGINAL_WAV = "original_wav"
+COLLECTIONS = (RECENT, SAVED, RECYCLE, ORIGINAL_WAV)
+
+LEDGER_FILENAME = ".storage_usage.sqlite3"
+SCHEMA_VERSION = 1
+
+# Top-level directories of the recordings root that hold a collection other
+# than the recent recordings.
+DEFAULT_TOP_LEVEL: Mapping[str, str] = {
+    "Saved": SAVED,
+    ".recycle_bin": RECYCLE,
+    ".original_wav": ORIGINAL_WAV,
+}
+
+_SCHEMA = (
+    """
+    CREATE TABLE IF NOT EXISTS directories (
+        path TEXT PRIMARY KEY,
+        parent TEXT,
+        collection TEXT NOT NULL,
+        bytes INTEGER NOT NULL DEFAULT 0
+    )
+    """,
+    "CREATE INDEX IF NOT EXISTS directories_by_parent ON directories (parent)",
+    "CREATE TABLE IF NOT EXISTS totals (collection TEXT PRIMARY KEY, bytes INTEGER NOT NULL)",
+    "CREATE TABLE IF NOT EXISTS state (key TEXT PRIMARY KEY, value REAL)",
+    """
+    CREATE TRIGGER IF NOT EXISTS directories_inserted AFTER INSERT ON directories BEGIN
+        UPDATE totals SET bytes = bytes + NEW.bytes WHERE collection = NEW.collection;
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS directories_deleted AFTER DELETE ON directories BEGIN
+        UPDATE totals SET bytes = bytes - OLD.bytes WHERE collection = OLD.collection;
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS directories_updated AFTER UPDATE ON directories BEGIN
+        UPDATE totals SET bytes = bytes - OLD.bytes WHERE collection = OLD.collection;
+        UPDATE totals SET bytes = bytes + NEW.bytes WHERE collection = NEW.collection;
+    END
+    """,
+)
+
+
+@dataclass(frozen=True)
+class StorageUsage:
+    """Bytes per collection plus when the ledger was last fully reconciled."""
+
+    collections: Mapping[str, int] = field(default_factory=dict)
+    reconciled_at: float | None = None
+
+    def bytes_for(self, collection: str) -> int:
+        return max(0, int(self.collections.get(collection, 0)))
+
+    @property
+    def total_bytes(self) -> int:
+        return sum(self.bytes_for(name) for name in self.collections)
+
+
+class StorageUsageLedger:
+    """Directory byte counts for the recordings tree rooted at ``root``.
+
+    ``top_level`` maps top-level directory names to their collection; every
+    other directory counts as :data:`RECENT`. Regular files directly in the
+    root whose names start with one of ``ignore_top_level`` (the ledger and
+    other indexes, including their journals) are not counted, and top-level
+    directories named exactly in it are not walked.
+    """
+
+    def __init__(
+        self,
+        root: Path,
+        *,
+        path: Path | None = None,
+        top_level: Mapping[str, str] | None = None,
+        ignore_top_level: Collection[str] = (),
+    ) -> None:
+        self.root = Path(root)
+        self.path = Path(path) if path is not None else self.root / LEDGER_FILENAME
+        self.top_level = dict(DEFAULT_TOP_LEVEL if top_level is None else top_level)
+        ignored = {LEDGER_FILENAME, *ignore_top_level}
+        if self.path.parent == self.root:
+            ignored.add(self.path.name)
+        self._ignored_prefixes = tuple(sorted(name for name in ignored if name))
+        self._ignored_dirs = frozenset(name for name in ignored if name)
+
+    @contextlib.contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        conn = sqlite3.connect(str(self.path), timeout=10.0, isolation_level=None)
+        try:
+            conn.execute("PRAGMA synchronous=NORMAL")
+            version = conn.execute("PRAGMA user_version").fetchone()[0]
+            if version != SCHEMA_VERSION:
+                conn.execute("BEGIN IMMEDIATE")
+                try:
+                    if version:
+                        for table in ("directories", "totals", "state"):
+                            conn.execute(f"DROP TABLE IF EXISTS {table}")
+                    for statement in _SCHEMA:
+                        conn.execute(statement)
+                    conn.execute(f"PRAGMA user_version={SCHEMA_VERSION}")
+                    conn.execute("COMMIT")
+                except BaseException:
+                    conn.execute("ROLLBACK")
+                    raise
+            yield conn
+        finally:
+            conn.close()
+
+    @contextlib.contextmanager
+    def _transaction(self) -> Iterator[sqlite3.Connection]:
+        with self._connect() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                yield conn
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+            conn.execute("COMMIT")
+
+    def _relative(self, directory: Path) -> str | None:
+        try:
+            rel = Path(directory).relative_to(self.root)
+        except ValueError:
+            return None
+        if ".." in rel.parts:
+            return None
+        return rel.as_posix() if rel.parts else ""
+
+    def collection_for(self, rel: str) -> str:
+        head = rel.split("/", 1)[0] if rel else ""
+        return self.top_level.get(head, RECENT)
+
+    def _scan(self, rel: str) -> tuple[int, list[str]] | None:
+        """Bytes of the files directly in ``rel`` and its subdirectory names."""
+
+        directory = self.root / rel if rel else self.root
+        total = 0
+        subdirs: list[str] = []
+        try:
+            with os.scandir(directory) as iterator:
+                for entry in iterator:
+                    try:
+                        if entry.is_dir(follow_symlinks=False):
+                            if not rel and entry.name in self._ignored_dirs:
+                                continue
+                            subdirs.append(entry.name)
+                        elif entry.is_file(follow_symlinks=False):
+                            if not rel and entry.name.startswith(self._ignored_prefixes):
+                                continue
+                            total += max(0, entry.stat(follow_symlinks=False).st_size)
+                    except OSError:
+                        continue
+        except OSError:
+            return None
+        return total, subdirs
+
+    def _walk(self, rel: str, *, pause: float = 0.0) -> Iterator[tuple[str, int]]:
+        stack = [rel]
+        while stack:
+            current = stack.pop()
+            scanned = self._scan(current)
+            if scanned is None:
+                continue
+            total, subdirs = scanned
+            yield current, total
+            stack.extend(
+                f"{current}/{name}" if current else name for name in sorted(subdirs, reverse=True)
+            )
+            if pause > 0:
+                time.sleep(pause)
+
+    @staticmethod
+    def _parent(rel: str) -> str | None:
+        if not rel:
+            return None
+        return rel.rsplit("/", 1)[0] if "/" in rel else ""
+
+    def _upsert(self, conn: sqlite3.Connection, rel: str, total: int) -> None:
+        collection = self.collection_for(rel)
+        # The triggers only update existing totals rows.
+        conn.execute(
+            "INSERT OR IGNORE INTO totals (collection, bytes) VALUES (?, 0)", (collection,)
+        )
+        conn.execute(
+            """
+            INSERT INTO directories (path, parent, collection, bytes) VALUES (?, ?, ?, ?)
+            ON CONFLICT (path) DO UPDATE SET bytes = excluded.bytes
+            WHERE directories.bytes != excluded.bytes
+            """,
+            (rel, self._parent(rel), collection, int(total)),
+        )
+
+    @staticmethod
+    def _delete_subtree(conn: sqlite3.Connection, rel: str) -> None:
+        conn.execute(
+            "DELETE FROM directories WHERE path = ? OR substr(path, 1, ?) = ?",
+            (rel, len(rel) + 1, rel + "/"),
+        )
+
+    def refresh(self, directories: Iterable[Path]) -> int:
+        """Rescan ``directories`` after files were added, removed or moved.
+
+        Only the files directly in each directory are re-counted; child
+        directories the ledger has not seen are walked in full and children
+        that disappeared are dropped with their subtree. Directories outside
+        the root are ignored. Returns the number of directories rescanned.
+        """
+
+        relative = (self._relative(Path(path)) for path in directories)
+        targets = sorted({rel for rel in relative if rel is not None})
+        if not targets:
+            return 0
+        scans = [(rel, self._scan(rel)) for rel in targets]
+        with self._transaction() as conn:
+            for rel, scanned in scans:
+                if scanned is None:
+                    self._delete_subtree(conn, rel)
+                    continue
+                total, subdirs = scanned
+                self._upsert(conn, rel, total)
+                known = {
+                    row[0]
+                    for row in conn.execute("SELECT path FROM directories WHERE parent = ?", (rel,))
+                }
+                present = {f"{rel}/{name}" if rel else name for name in subdirs}
+                for child in sorted(known - present):
+                    self._delete_subtree(conn, child)
+                for child in sorted(present - known):
+                    for walked, walked_total in self._walk(child):
+                        self._upsert(conn, walked, walked_total)
+        return len(scans)
+
+    def reconcile(self, *, pause: float = 0.0) -> StorageUsage:
+        """Rebuild every row from a full walk of the tree.
+
+        ``pause`` sleeps between directories so a background reconcile yields
+        the disk to recording and encoding work.
+        """
+
+        rows = list(self._walk("", pause=pause))
+        with self._transaction() as conn:
+            conn.execute("DELETE FROM directories")
+            conn.execute("DELETE FROM totals")
+            for rel, total in rows:
+                self._upsert(conn, rel, total)
+            conn.execute(
+                "INSERT OR REPLACE INTO state (key, value) VALUES ('reconciled_at', ?)",
+                (time.time(),),
+            )
+        return self.usage()
+
+    def usage(self) -> StorageUsage:
+        with self._connect() as conn:
+            totals = {name: 0 for name in COLLECTIONS}
+            for name, value in conn.execute("SELECT collection, bytes FROM totals"):
+                totals[str(name)] = max(0, int(value))
+            row = conn.execute("SELECT value FROM state WHERE key = 'reconciled_at'").fetchone()
+        reconciled_at = float(row[0]) if row and row[0] is not None else None
+        return StorageUsage(collections=totals, reconciled_at=reconciled_at)
+
+
+__all__ = [
+    "COLLECTIONS",
+    "DEFAULT_TOP_LEVEL",
+    "LEDGER_FILENAME",
+    "ORIGINAL_WAV",
+    "RECENT",
+    "RECYCLE",
+    "SAVED",
+    "StorageUsage",
+    "StorageUsageLedger",
+]
@@ -0,0 +1,446 @@
+"""Versioned file manifest for pull-based archive clients.
+
+A backup server mirroring the recorder used to crawl the dashboard's HTML
+and JSON APIs and download everything. ``GET /api/sync/manifest`` serves
+this manifest instead: one row per file under the recordings root with its
+size, mtime and content hash, each stamped with a monotonically increasing
+change sequence number.
+
+* ``cursor=0`` pages through every live file in sequence order;
+* ``cursor=<n>`` returns only files added, changed or deleted (tombstones)
+  after change ``n``, so a client that stores the ``next_cursor`` of its
+  last page fetches work proportional to what changed;
+* the manifest ``epoch`` changes whenever the database is recreated, and a
+  cursor older than the pruned tombstones (``floor``) cannot be served; in
+  both cases the page is flagged ``reset`` and lists everything again.
+
+Files are fetched with ``GET /recordings/<path>``, which honours HTTP range
+requests, so interrupted downloads resume where they stopped. A renamed or
+moved recording shows up as a tombstone plus a new entry with the same hash,
+which clients can satisfy with a local copy.
+
+:meth:`SyncManifest.refresh` reconciles the table with a stat walk and hashes
+(:func:`lib.content_index.file_digest`) only files whose size or mtime moved.
+:meth:`SyncManifest.refresh_step` does the same within a byte and time budget
+and reports how many files are still waiting to be hashed, so a first build
+of a large tree can run in bounded steps while earlier entries are served.
+The tree is walked once per pass; later steps of the pass only hash what
+the walk found stale.
+Hidden entries (the recycle bin, preserved WAVs, SQLite caches) and
+in-progress ``.partial`` files are not part of the manifest.
+
+The database lives in the recordings root (``.sync_manifest.sqlite3``). It is
+a cache: deleting it costs one full hash pass, and the new epoch tells
+clients to resynchronise. :meth:`SyncManifest.prepare` creates it, and its
+rollback journal is truncated rather than deleted, so refreshes do not add or
+remove entries in the recordings root once it exists.
+"""
+
+from __future__ import annotations
+
+import collections
+import contextlib
+import os
+import secrets
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Iterator
+
+from lib.content_index import file_digest
+
+MANIFEST_FILENAME = ".sync_manifest.sqlite3"
+SCHEMA_VERSION = 1
+# Version of the manifest payload served to clients.
+MANIFEST_VERSION = 1
+HASH_ALGORITHM = "blake2b-160"
+
+DEFAULT_PAGE_SIZE = 500
+DEFAULT_TOMBSTONE_RETENTION = 30 * 86400.0
+
+_SCHEMA = (
+    """
+    CREATE TABLE IF NOT EXISTS files (
+        path TEXT PRIMARY KEY,
+        size INTEGER NOT NULL,
+        mtime_ns INTEGER NOT NULL,
+        digest TEXT,
+        seq INTEGER NOT NULL,
+        deleted INTEGER NOT NULL DEFAULT 0,
+        changed_at REAL NOT NULL
+    )
+    """,
+    "CREATE INDEX IF NOT EXISTS files_by_seq ON files (seq)",
+    "CREATE TABLE IF NOT EXISTS state (key TEXT PRIMARY KEY, value TEXT NOT NULL)",
+)
+
+
+@dataclass(frozen=True)
+class ManifestEntry:
+    path: str
+    size: int
+    mtime: float
+    digest: str | None
+    seq: int
+    deleted: bool = False
+
+    def as_dict(self) -> dict[str, object]:
+        if self.deleted:
+            return {"path": self.path, "seq": self.seq, "deleted": True}
+        return {
+            "path": self.path,
+            "size": self.size,
+            "mtime": self.mtime,
+            "hash": self.digest,
+            "seq": self.seq,
+            "deleted": False,
+        }
+
+
+@dataclass(frozen=True)
+class RefreshResult:
+    """Entries changed by one refresh step and files it left unhashed."""
+
+    changed: int
+    remaining: int = 0
+
+    @property
+    def complete(self) -> bool:
+        return self.remaining == 0
+
+
+@dataclass
+class _RefreshPass:
+    """What one walk found; consumed by the refresh steps that follow it."""
+
+    stale: collections.deque[tuple[str, tuple[int, int]]]
+    removed: list[str] = field(default_factory=list)
+    expired: bool = False
+
+
+@dataclass(frozen=True)
+class ManifestPage:
+    epoch: str
+    cursor: int
+    next_cursor: int
+    latest: int
+    has_more: bool
+    reset: bool
+    entries: tuple[ManifestEntry, ...]
+
+    def as_dict(self) -> dict[str, object]:
+        return {
+            "version": MANIFEST_VERSION,
+            "hash_algorithm": HASH_ALGORITHM,
+            "epoch": self.epoch,
+            "cursor": self.cursor,
+            "next_cursor": self.next_cursor,
+            "latest": self.latest,
+            "has_more": self.has_more,
+            "reset": self.reset,
+            "files": [entry.as_dict() for entry in self.entries],
+        }
+
+
+def _is_partial(name: str) -> bool:
+    return any(suffix.lower() == ".partial" for suffix in Path(name).suffixes)
+
+
+def _walk(root: Path) -> Iterator[tuple[str, os.stat_result]]:
+    stack = [("", root)]
+    while stack:
+        prefix, directory = stack.pop()
+        try:
+            entries = list(os.scandir(directory))
+        except OSError:
+            continue
+        for entry in entries:
+            if entry.name.startswith(".") or _is_partial(entry.name):
+                continue
+            relative = f"{prefix}{entry.name}"
+            try:
+                if entry.is_dir(follow_symlinks=False):
+                    stack.append((f"{relative}/", Path(entry.path)))
+                elif entry.is_file(follow_symlinks=False):
+                    yield relative, entry.stat(follow_symlinks=False)
+            except OSError:
+                continue
+
+
+class SyncManifest:
+    """Manifest of the recordings tree stored under ``root``."""
+
+    def __init__(self, root: Path, *, path: Path | None = None) -> None:
+        self.root = Path(root)
+        self.path = Path(path) if path is not None else self.root / MANIFEST_FILENAME
+        self._pass: _RefreshPass | None = None
+        self._pass_lock = threading.Lock()
+
+    @contextlib.contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        conn = sqlite3.connect(str(self.path), timeout=10.0, isolation_level=None)
+        try:
+            # Keep the journal file between transactions instead of creating
+            # and deleting it in the recordings root on every write.
+            conn.execute("PRAGMA journal_mode=TRUNCATE")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            version = conn.execute("PRAGMA user_version").fetchone()[0]
+            if version != SCHEMA_VERSION:
+                conn.execute("BEGIN IMMEDIATE")
+                try:
+                    if version:
+                        conn.execute("DROP TABLE IF EXISTS files")
+                        conn.execute("DROP TABLE IF EXISTS state")
+                    for statement in _SCHEMA:
+                        conn.execute(statement)
+                    conn.executemany(
+                        "INSERT OR IGNORE INTO state (key, value) VALUES (?, ?)",
+                        (("epoch", secrets.token_hex(8)), ("seq", "0"), ("floor", "0")),
+                    )
+                    conn.execute(f"PRAGMA user_version={SCHEMA_VERSION}")
+                    conn.execute("COMMIT")
+                except BaseException:
+                    conn.execute("ROLLBACK")
+                    raise
+            yield conn
+        finally:
+            conn.close()
+
+    @contextlib.contextmanager
+    def _transaction(self) -> Iterator[sqlite3.Connection]:
+        with self._connect() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                yield conn
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+            conn.execute("COMMIT")
+
+    @staticmethod
+    def _state(conn: sqlite3.Connection) -> dict[str, str]:
+        return dict(conn.execute("SELECT key, value FROM state"))
+
+    def prepare(self) -> None:
+        """Create the database and its journal file if they do not exist yet."""
+
+        with self._transaction() as conn:
+            # One page write makes SQLite create the journal.
+            conn.execute("UPDATE state SET value = value WHERE key = 'seq'")
+
+    @property
+    def epoch(self) -> str:
+        with self._connect() as conn:
+            return self._state(conn)["epoch"]
+
+    def refresh(
+        self,
+        *,
+        now: float | None = None,
+        tombstone_retention: float = DEFAULT_TOMBSTONE_RETENTION,
+    ) -> int:
+        """Reconcile with the files on disk; returns how many entries changed."""
+
+        changed = 0
+        while True:
+            result = self.refresh_step(now=now, tombstone_retention=tombstone_retention)
+            changed += result.changed
+            if result.complete:
+                return changed
+
+    def refresh_step(
+        self,
+        *,
+        now: float | None = None,
+        tombstone_retention: float = DEFAULT_TOMBSTONE_RETENTION,
+        max_bytes: int | None = None,
+        max_seconds: float | None = None,
+    ) -> RefreshResult:
+        """Reconcile with the files on disk, hashing within a budget.
+
+        Hashing stops once ``max_bytes`` were read or ``max_seconds`` passed
+        (at least one file is always hashed); the files left over are
+        reported as ``remaining`` and picked up by the next step.
+        """
+
+        deadline = time.monotonic() + max_seconds if max_seconds is not None else None
+        now = time.time() if now is None else now
+        cutoff = now - tombstone_retention
+        with self._pass_lock:
+            try:
+                return self._refresh_step(now, cutoff, tombstone_retention, max_bytes, deadline)
+            except BaseException:
+                # Start over with a fresh walk; nothing of this step was saved.
+                self._pass = None
+                raise
+
+    def _start_pass(self, cutoff: float, tombstone_retention: float) -> _RefreshPass:
+        seen = {relative: (stat.st_size, stat.st_mtime_ns) for relative, stat in _walk(self.root)}
+        with self._connect() as conn:
+            known = {
+                path: (int(size), int(mtime_ns), bool(deleted))
+                for path, size, mtime_ns, deleted in conn.execute(
+                    "SELECT path, size, mtime_ns, deleted FROM files"
+                )
+            }
+            expired = tombstone_retention > 0 and conn.execute(
+                "SELECT 1 FROM files WHERE deleted = 1 AND changed_at < ? LIMIT 1", (cutoff,)
+            ).fetchone() is not None
+        stale: collections.deque[tuple[str, tuple[int, int]]] = collections.deque()
+        for relative, signature in seen.items():
+            previous = known.get(relative)
+            if previous is not None and not previous[2] and previous[:2] == signature:
+                continue
+            stale.append((relative, signature))
+        removed = [path for path, (_size, _mtime, deleted) in known.items() if not deleted and path not in seen]
+        return _RefreshPass(stale, removed, expired)
+
+    def _refresh_step(
+        self,
+        now: float,
+        cutoff: float,
+        tombstone_retention: float,
+        max_bytes: int | None,
+        deadline: float | None,
+    ) -> RefreshResult:
+        refresh = self._pass
+        if refresh is None:
+            refresh = self._pass = self._start_pass(cutoff, tombstone_retention)
+        # Removals and tombstone expiry are applied by the first step only.
+        removed, expired = refresh.removed, refresh.expired
+        refresh.removed, refresh.expired = [], False
+
+        # Hash outside the transaction; a file that moves while it is hashed
+        # (still being written) is left for the next pass.
+        updates: list[tuple[str, int, int, str]] = []
+        hashed_bytes = 0
+        hashed = 0
+        while refresh.stale:
+            if hashed and (
+                (max_bytes is not None and hashed_bytes >= max_bytes)
+                or (deadline is not None and time.monotonic() >= deadline)
+            ):
+                break
+            relative, signature = refresh.stale.popleft()
+            hashed += 1
+            hashed_bytes += signature[0]
+            path = self.root / relative
+            try:
+                digest = file_digest(path)
+                stat = path.stat()
+            except OSError:
+                continue
+            if (stat.st_size, stat.st_mtime_ns) != signature:
+                continue
+            updates.append((relative, signature[0], signature[1], digest))
+        remaining = len(refresh.stale)
+        if not remaining:
+            self._pass = None
+
+        if not updates and not removed and not expired:
+            return RefreshResult(0, remaining)
+        with self._transaction() as conn:
+            state = self._state(conn)
+            seq = int(state["seq"])
+            for relative, size, mtime_ns, digest in updates:
+                seq += 1
+                conn.execute(
+                    """
+                    INSERT INTO files (path, size, mtime_ns, digest, seq, deleted, changed_at)
+                    VALUES (?, ?, ?, ?, ?, 0, ?)
+                    ON CONFLICT (path) DO UPDATE SET
+                        size = excluded.size,
+                        mtime_ns = excluded.mtime_ns,
+                        digest = excluded.digest,
+                        seq = excluded.seq,
+                        deleted = 0,
+                        changed_at = excluded.changed_at
+                    """,
+                    (relative, size, mtime_ns, digest, seq, now),
+                )
+            for relative in removed:
+                seq += 1
+                conn.execute(
+                    "UPDATE files SET deleted = 1, seq = ?, changed_at = ? WHERE path = ?",
+                    (seq, now, relative),
+                )
+            if expired:
+                row = conn.execute(
+                    "SELECT MAX(seq) FROM files WHERE deleted = 1 AND changed_at < ?", (cutoff,)
+                ).fetchone()
+                if row and row[0] is not None:
+                    floor = max(int(state["floor"]), int(row[0]))
+                    conn.execute("DELETE FROM files WHERE deleted = 1 AND changed_at < ?", (cutoff,))
+                    conn.execute("UPDATE state SET value = ? WHERE key = 'floor'", (str(floor),))
+            conn.execute("UPDATE state SET value = ? WHERE key = 'seq'", (str(seq),))
+        return RefreshResult(len(updates) + len(removed), remaining)
+
+    def page(
+        self,
+        cursor: int = 0,
+        *,
+        limit: int = DEFAULT_PAGE_SIZE,
+        epoch: str | None = None,
+    ) -> ManifestPage:
+        """Entries changed after ``cursor``, oldest change first."""
+
+        limit = max(1, int(limit))
+        cursor = max(0, int(cursor))
+        with self._connect() as conn:
+            state = self._state(conn)
+            latest = int(state["seq"])
+            reset = bool(cursor) and (
+                (epoch is not None and epoch != state["epoch"])
+                or cursor < int(state["floor"])
+                or cursor > latest
+            )
+            if reset:
+                cursor = 0
+            # A full listing (cursor 0) has no use for tombstones.
+            rows = conn.execute(
+                """
+                SELECT path, size, mtime_ns, digest, seq, deleted FROM files
+                WHERE seq > ? AND (? OR deleted = 0)
+                ORDER BY seq
+                LIMIT ?
+                """,
+                (cursor, 1 if cursor else 0, limit + 1),
+            ).fetchall()
+        has_more = len(rows) > limit
+        rows = rows[:limit]
+        entries = tuple(
+            ManifestEntry(
+                path=path,
+                size=int(size),
+                mtime=int(mtime_ns) / 1_000_000_000,
+                digest=digest,
+                seq=int(seq),
+                deleted=bool(deleted),
+            )
+            for path, size, mtime_ns, digest, seq, deleted in rows
+        )
+        next_cursor = entries[-1].seq if has_more else latest
+        return ManifestPage(
+            epoch=state["epoch"],
+            cursor=cursor,
+            next_cursor=next_cursor,
+            latest=latest,
+            has_more=has_more,
+            reset=reset,
+            entries=entries,
+        )
+
+
+__all__ = [
+    "DEFAULT_PAGE_SIZE",
+    "HASH_ALGORITHM",
+    "MANIFEST_FILENAME",
+    "MANIFEST_VERSION",
+    "ManifestEntry",
+    "ManifestPage",
+    "RefreshResult",
+    "SyncManifest",
+]
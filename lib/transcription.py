@@ -4,12 +4,10 @@
 from __future__ import annotations
 
 import argparse
-import contextlib
 import json
 import os
 import sys
 import time
-import wave
 from array import array
 from pathlib import Path
 from typing import Any, Sequence
@@ -18,6 +16,7 @@ import audioop  # noqa: F401  (imported for side-effects + rate conversion)
 import re
 
 from lib.config import event_type_aliases, get_cfg
+from lib.original_audio import open_pcm
 
 
 class TranscriptionError(Exception):
@@ -132,7 +131,7 @@ def _transcribe_with_vosk(
                 flush=True,
             )
 
-    with contextlib.closing(wave.open(str(source), "rb")) as wav_file:
+    with open_pcm(source) as wav_file:
         channels = wav_file.getnchannels()
         sample_width = wav_file.getsampwidth()
         input_rate = wav_file.getframerate()
@@ -4,7 +4,6 @@ from __future__ import annotations
 
 import argparse
 import audioop
-import contextlib
 import json
 import math
 import os
@@ -13,7 +12,8 @@ import tempfile
 from array import array
 from pathlib import Path
 from typing import Any, Iterable, Sequence
-import wave
+
+from lib.original_audio import open_pcm
 
 DEFAULT_BUCKET_COUNT = 2048
 MAX_BUCKET_COUNT = 8192
@@ -199,12 +199,12 @@ def generate_waveform(
     destination: os.PathLike[str] | str,
     bucket_count: int = DEFAULT_BUCKET_COUNT,
 ) -> dict[str, Any]:
-    """Generate waveform peaks from a PCM WAV file and store them as JSON."""
+    """Generate waveform peaks from a PCM WAV (or FLAC original) and store them as JSON."""
 
     source_path = Path(source)
     dest_path = Path(destination)
 
-    with contextlib.closing(wave.open(str(source_path), "rb")) as wav_file:
+    with open_pcm(source_path) as wav_file:
         channels = max(1, wav_file.getnchannels() or 1)
         sample_width = wav_file.getsampwidth() or 2
         sample_rate = wav_file.getframerate() or 0
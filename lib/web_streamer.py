@@ -43,6 +43,7 @@ import os
 import re
 import secrets
 import shutil
+import sqlite3
 import ssl
 import subprocess
 import tempfile
@@ -50,18 +51,37 @@ import threading
 import time
 import types
 import wave
-import zipfile
 from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta, timezone
+from email.utils import formatdate
 from pathlib import Path
 from typing import Any, Callable, Collection, Iterable, Mapping, Sequence
 from zoneinfo import ZoneInfo
 
 
+from .web_streamer_helpers.bulk_jobs import BulkBatch, BulkJobEngine, BulkOperation, BulkQueueFull
+from .web_streamer_helpers.clip_jobs import ClipJobQueue, ClipQueueFull, ClipRequest
 from .web_streamer_helpers.event_bridges import (
     CaptureStatusEventBridge,
     RecordingsEventBridge,
 )
+from .web_streamer_helpers.recordings_changes import (
+    ADDED as CHANGE_ADDED,
+    DISCARDED as CHANGE_DISCARDED,
+    SAVED_PREFIX as CHANGES_SAVED_PREFIX,
+    RecordingsChangeLog,
+    collapse_changes,
+)
+from .web_streamer_helpers.zip_stream import ZipStreamWriter
+from .web_streamer_helpers.storage_tracker import StorageUsageTracker, lower_thread_priority
+from .web_streamer_helpers.resource_generations import (
+    CONFIG as CONFIG_RESOURCE,
+    RECORDINGS as RECORDINGS_RESOURCE,
+    RECYCLE_BIN as RECYCLE_BIN_RESOURCE,
+    ResourceGenerations,
+    directory_signature,
+    file_signature,
+)
 
 
 DEFAULT_RECORDINGS_LIMIT = 200
@@ -72,8 +92,21 @@ DEFAULT_RECORDINGS_LIMIT = 200
 # WEB_STREAMER_EXECUTOR_MAX_WORKERS = max(2, min(4, (os.cpu_count() or 1)))
 WEB_STREAMER_EXECUTOR_MAX_WORKERS = 1  # hardcoded to 1 for this project to save RAM
 CLIP_EXECUTOR_MAX_WORKERS = 1  # serialize long-running clip jobs off the main executor
+CLIP_UNDO_MAX_MEGABYTES = 256  # bytes held only by clip undo backups before eviction
+CLIP_QUEUE_MAX_PENDING = 8  # queued (not yet running) clip jobs before submissions are refused
+BULK_BATCH_SIZE = 50  # items per bulk delete/save/restore/purge batch (one fsync + index update each)
+BULK_QUEUE_MAX_PENDING = 16  # queued bulk jobs before submissions are refused
+STORAGE_RECONCILE_INTERVAL_SECONDS = 900  # full background walk of the storage usage ledger
+STORAGE_RECONCILE_PAUSE_SECONDS = 0.005  # pause between directories during that walk
+SYNC_RESCAN_INTERVAL_SECONDS = 60  # max age of the sync manifest when no change was reported
+SYNC_TOMBSTONE_RETENTION_DAYS = 30  # deletions kept in the sync manifest for delta clients
+SYNC_REFRESH_STEP_BYTES = 64 * 1024 * 1024  # hashed per sync manifest step before yielding the storage thread
+SYNC_REFRESH_STEP_SECONDS = 2.0  # time budget of one sync manifest step
 GLOBAL_THREADPOOL_MAX_WORKERS = 2  # upper bound for any implicit thread pools
 MAX_RECORDINGS_LIMIT = 1000
+BULK_DOWNLOAD_CHUNK_BYTES = 256 * 1024
+# Recordings are private to the recorder, so shared caches must not store them.
+RECORDING_IMMUTABLE_CACHE_CONTROL = "private, max-age=31536000, immutable"
 RECORDINGS_TIME_RANGE_SECONDS = {
     "1h": 60 * 60,
     "2h": 2 * 60 * 60,
@@ -146,13 +179,21 @@ def _quiet_noisy_dependencies(ice_level: int = logging.WARNING) -> None:
 
 RECYCLE_BIN_DIRNAME = ".recycle_bin"
 RAW_AUDIO_DIRNAME = ".original_wav"
-RAW_AUDIO_SUFFIXES: tuple[str, ...] = (".wav",)
+RAW_AUDIO_SUFFIXES: tuple[str, ...] = (".wav", ".flac")
+# Clip undo backups live on the recordings filesystem so they can be
+# hardlinked in and renamed back instead of copied.
+CLIP_UNDO_DIRNAME = ".clip_undo"
 SAVED_RECORDINGS_DIRNAME = "Saved"
 RECORDINGS_EVENT_SPOOL_DIRNAME = "recordings_events"
 RECYCLE_METADATA_FILENAME = "metadata.json"
+RECYCLE_INDEX_FILENAME = RECYCLE_BIN_DIRNAME + ".index.sqlite3"
 RECYCLE_ID_PATTERN = re.compile(r"^[A-Za-z0-9._-]+$")
 STREAMING_OPEN_TIMEOUT_SECONDS = 5.0
 STREAMING_POLL_INTERVAL_SECONDS = 0.25
+# With inotify the tail wakes on writes; the timeout only guards against
+# missed events (for example on network filesystems).
+STREAMING_IDLE_RECHECK_SECONDS = 2.0
+STREAMING_CHUNK_BYTES = 64 * 1024
 
 DEFAULT_VOSK_MODEL_ROOT = Path("/apps/tricorder/models")
 
@@ -2798,22 +2839,22 @@ async def _restart_units(units: Iterable[str]) -> list[dict[str, Any]]:
         )
     return results
 
-from aiohttp import web, web_fileresponse
+from aiohttp import web
 from aiohttp.web import AppKey
 
-# aiohttp's sendfile() path sometimes times out on slow or lossy networks when
-# downloading large recordings. Force the chunked fallback, which cooperates
-# better with flow control and avoids surfacing TimeoutError to clients.
-web_fileresponse.NOSENDFILE = True
+# Finalized recordings are served through aiohttp's zero-copy sendfile() path.
+# Deployments that hit sendfile timeouts on slow or lossy links can fall back to
+# chunked reads by exporting AIOHTTP_NOSENDFILE=1, which aiohttp reads at import.
 
 from lib.hls_controller import controller
-from lib import dashboard_events, recycle_bin_utils, sd_card_health, webui
+from lib import audio_duration, dashboard_events, recycle_bin_utils, sd_card_health, webui
 from lib.config import (
     ConfigPersistenceError,
     apply_config_migrations,
     get_cfg,
     primary_config_path,
     reload_cfg,
+    search_paths,
     update_adaptive_rms_settings,
     update_archival_settings,
     update_audio_settings,
@@ -2827,6 +2868,24 @@ from lib.config import (
     update_transcription_settings,
     update_web_server_settings,
 )
+from lib.file_links import link_or_clone, move_or_copy
+from lib.inotify_watch import AsyncPathWatch
+from lib import ogg_clip
+from lib.archival_journal import JOURNAL_FILENAME as ARCHIVAL_JOURNAL_FILENAME
+from lib.archival_schedule import LISTENER_STATE_REFRESH_INTERVAL
+from lib.content_index import INDEX_FILENAME as CONTENT_INDEX_FILENAME
+from lib.notification_outbox import OUTBOX_FILENAME as NOTIFICATION_OUTBOX_FILENAME
+from lib.sync_manifest import DEFAULT_PAGE_SIZE as SYNC_PAGE_SIZE
+from lib.sync_manifest import MANIFEST_FILENAME as SYNC_MANIFEST_FILENAME
+from lib.sync_manifest import SyncManifest
+from lib.recycle_bin_index import RecycleBinIndex, RecycleBinStats, entry_disk_usage
+from lib.storage_usage import (
+    LEDGER_FILENAME as STORAGE_LEDGER_FILENAME,
+    ORIGINAL_WAV as STORAGE_ORIGINAL_WAV,
+    RECYCLE as STORAGE_RECYCLE,
+    SAVED as STORAGE_SAVED,
+    StorageUsageLedger,
+)
 from lib.lets_encrypt import LetsEncryptError, LetsEncryptManager
 from lib.motion_state import (
     MOTION_STATE_FILENAME,
@@ -2839,20 +2898,15 @@ from lib.waveform_cache import generate_waveform
 @functools.lru_cache(maxsize=1024)
 def _probe_duration_cached(path_str: str, mtime_ns: int, size_bytes: int) -> float | None:
     _ = size_bytes  # participates in cache key to invalidate when file size changes
-    path = Path(path_str)
-    suffix = path.suffix.lower()
-
-    if suffix == ".wav":
-        try:
-            with contextlib.closing(wave.open(path_str, "rb")) as wav_file:
-                frames = wav_file.getnframes()
-                rate = wav_file.getframerate() or 0
-                if frames > 0 and rate > 0:
-                    return frames / float(rate)
-        except FileNotFoundError:
-            return None
-        except (OSError, wave.Error):
-            pass
+    try:
+        duration = audio_duration.duration_seconds(path_str)
+    except FileNotFoundError:
+        return None
+    except (OSError, audio_duration.DurationUnsupported):
+        # Only containers the in-process reader cannot measure pay for ffprobe.
+        pass
+    else:
+        return duration if duration > 0 else None
 
     cmd = [
         "ffprobe",
@@ -2984,6 +3038,12 @@ def _resolve_start_metadata(
             if struct_time is not None:
                 _assign_start_from_epoch(time.mktime(struct_time))
 
+    if start_epoch_value is None and waveform_meta:
+        # Re-encoded storage tiers keep the capture time; the mtime is newer.
+        storage_tier = waveform_meta.get("storage_tier")
+        if isinstance(storage_tier, dict):
+            _assign_start_from_epoch(storage_tier.get("recorded_at"))
+
     if start_epoch_value is None and stat_result is not None:
         _assign_start_from_epoch(getattr(stat_result, "st_mtime", None))
 
@@ -3005,7 +3065,15 @@ def _scan_recordings_worker(
     skip_top_level: Sequence[str] | None = None,
     path_prefix: Sequence[str] | None = None,
     collection_label: str = "recent",
+    candidates: Iterable[Path] | None = None,
 ) -> tuple[list[dict[str, object]], list[str], list[str], int]:
+    """Build recording entries for ``recordings_root``.
+
+    When ``candidates`` is given only those files are examined instead of
+    walking the whole tree, which lets the change feed rebuild individual
+    entries cheaply.
+    """
+
     log = logging.getLogger("web_streamer")
 
     def _float_or_none(value: object) -> float | None:
@@ -3044,7 +3112,7 @@ def _scan_recordings_worker(
             dir_path = Path(dirpath)
             if RECYCLE_BIN_DIRNAME in dir_path.parts:
                 continue
-            if RAW_AUDIO_DIRNAME in dir_path.parts:
+            if RAW_AUDIO_DIRNAME in dir_path.parts or CLIP_UNDO_DIRNAME in dir_path.parts:
                 continue
 
             try:
@@ -3056,7 +3124,7 @@ def _scan_recordings_worker(
                 dirnames[:] = []
                 continue
 
-            exclude_names = {RECYCLE_BIN_DIRNAME, RAW_AUDIO_DIRNAME}
+            exclude_names = {RECYCLE_BIN_DIRNAME, RAW_AUDIO_DIRNAME, CLIP_UNDO_DIRNAME}
 
             if dir_path == recordings_root:
                 dirnames[:] = [
@@ -3072,11 +3140,16 @@ def _scan_recordings_worker(
             for filename in filenames:
                 yield dir_path / filename
 
-    def _index_raw_audio_files() -> dict[tuple[str, str], Path]:
+    def _index_raw_audio_files(
+        days: Collection[str] | None = None,
+    ) -> dict[tuple[str, str], Path]:
         index: dict[tuple[str, str], Path] = {}
         raw_root = recordings_root / RAW_AUDIO_DIRNAME
         try:
-            day_entries = list(raw_root.iterdir())
+            if days is None:
+                day_entries = list(raw_root.iterdir())
+            else:
+                day_entries = [raw_root / day for day in sorted(days) if day]
         except FileNotFoundError:
             return index
         except OSError as error:
@@ -3122,9 +3195,24 @@ def _scan_recordings_worker(
     if not recordings_root.exists():
         return entries, [], [], 0
 
-    raw_audio_index = _index_raw_audio_files()
+    if candidates is None:
+        candidate_files: Iterable[Path] = _iter_candidate_files()
+        raw_audio_index = _index_raw_audio_files()
+    else:
+        candidate_files = []
+        candidate_days: set[str] = set()
+        for candidate in candidates:
+            try:
+                parts = candidate.relative_to(recordings_root).parts
+            except ValueError:
+                continue
+            if RECYCLE_BIN_DIRNAME in parts or RAW_AUDIO_DIRNAME in parts:
+                continue
+            candidate_files.append(candidate)
+            candidate_days.update(parts[:-1])
+        raw_audio_index = _index_raw_audio_files(candidate_days)
 
-    for path in _iter_candidate_files():
+    for path in candidate_files:
         try:
             if not path.is_file():
                 continue
@@ -3427,7 +3515,19 @@ def _read_recycle_entry(entry_dir: Path) -> dict[str, object] | None:
         return None
     if not isinstance(metadata, dict):
         return None
+    return _recycle_entry_from_metadata(entry_dir, metadata)
+
 
+def _recycle_entry_from_metadata(
+    entry_dir: Path, metadata: dict[str, object], *, verify_files: bool = True
+) -> dict[str, object] | None:
+    """Normalise recycle bin ``metadata`` for the entry stored in ``entry_dir``.
+
+    Indexed listings pass ``verify_files=False`` to trust the metadata instead
+    of checking that the audio and raw audio files are still present.
+    """
+
+    metadata_path = entry_dir / RECYCLE_METADATA_FILENAME
     entry_id = metadata.get("id")
     if not isinstance(entry_id, str) or not entry_id or not RECYCLE_ID_PATTERN.match(entry_id):
         return None
@@ -3437,7 +3537,7 @@ def _read_recycle_entry(entry_dir: Path) -> dict[str, object] | None:
         return None
 
     audio_path = entry_dir / stored_name
-    if not audio_path.is_file():
+    if verify_files and not audio_path.is_file():
         return None
 
     original_path = metadata.get("original_path")
@@ -3463,9 +3563,12 @@ def _read_recycle_entry(entry_dir: Path) -> dict[str, object] | None:
     else:
         deleted_epoch = None
 
-    try:
-        size_bytes = int(metadata.get("size_bytes", audio_path.stat().st_size))
-    except OSError:
+    if verify_files:
+        try:
+            size_bytes = int(metadata.get("size_bytes", audio_path.stat().st_size))
+        except OSError:
+            size_bytes = int(metadata.get("size_bytes") or 0)
+    else:
         size_bytes = int(metadata.get("size_bytes") or 0)
 
     duration_raw = metadata.get("duration_seconds")
@@ -3552,7 +3655,9 @@ def _read_recycle_entry(entry_dir: Path) -> dict[str, object] | None:
         raw_audio_path = ""
 
     raw_audio_bin_path: Path | None = None
-    if raw_audio_name:
+    if raw_audio_name and not verify_files:
+        raw_audio_bin_path = entry_dir / raw_audio_name
+    elif raw_audio_name:
         try:
             entry_dir_resolved = entry_dir.resolve()
             candidate = (entry_dir / raw_audio_name).resolve()
@@ -3663,6 +3768,8 @@ def _calculate_directory_usage(
         dirnames[:] = [name for name in dirnames if name not in skip]
 
         for filename in filenames:
+            if not rel_parts and filename in skip:
+                continue
             candidate = dir_path / filename
             try:
                 total += max(int(candidate.stat().st_size), 0)
@@ -3692,11 +3799,56 @@ def _calculate_directory_usage(
     return max(total, 0)
 
 
+_RECYCLE_INDEX_LOCK = threading.Lock()
+_RECYCLE_INDEX_VERIFIED: set[Path] = set()
+
+
+def _recycle_index_reader(entry_dir: Path) -> tuple[dict[str, object], int] | None:
+    data = _read_recycle_entry(entry_dir)
+    if not data:
+        return None
+    return data["metadata"], entry_disk_usage(entry_dir)
+
+
+def _synced_recycle_index(recycle_root: Path) -> RecycleBinIndex:
+    """Return the recycle bin index after reconciling it with the disk.
+
+    The first call per process re-reads every entry so rows left behind by
+    writers that could not update the index are refreshed; later calls only
+    rescan when the recycle bin directory changed behind the index's back.
+    """
+
+    index = RecycleBinIndex(recycle_root)
+    with _RECYCLE_INDEX_LOCK:
+        full = index.path not in _RECYCLE_INDEX_VERIFIED
+    index.sync(_recycle_index_reader, full=full)
+    if full:
+        with _RECYCLE_INDEX_LOCK:
+            _RECYCLE_INDEX_VERIFIED.add(index.path)
+    return index
+
+
+def _recycle_bin_stats(recycle_root: Path) -> RecycleBinStats | None:
+    try:
+        return _synced_recycle_index(recycle_root).stats()
+    except (OSError, sqlite3.Error) as exc:
+        logging.getLogger("web_streamer").warning(
+            "recycle bin index unavailable at %s: %s", recycle_root, exc
+        )
+        return None
+
+
 def _calculate_recycle_bin_usage(recycle_root: Path) -> int:
+    stats = _recycle_bin_stats(recycle_root)
+    if stats is not None:
+        return stats.total_bytes
     return _calculate_directory_usage(recycle_root)
 
 
 def _count_recycle_bin_entries(recycle_root: Path) -> int:
+    stats = _recycle_bin_stats(recycle_root)
+    if stats is not None:
+        return stats.count
     if not recycle_root.exists():
         return 0
     try:
@@ -3710,6 +3862,28 @@ def _count_recycle_bin_entries(recycle_root: Path) -> int:
             count += 1
     return count
 
+
+def _update_recycle_index(
+    recycle_root: Path,
+    *,
+    added: Iterable[tuple[dict[str, object], Path]] = (),
+    removed: Collection[str] = (),
+) -> None:
+    """Apply a handler's recycle bin changes to the index, best effort."""
+
+    try:
+        index = RecycleBinIndex(recycle_root)
+        entries = [(metadata, entry_disk_usage(entry_dir)) for metadata, entry_dir in added]
+        if entries:
+            index.add_many(entries)
+        if removed:
+            index.remove(removed)
+    except (OSError, sqlite3.Error, ValueError) as exc:
+        # Readers pick the change up on their next sync instead.
+        logging.getLogger("web_streamer").warning(
+            "unable to update recycle bin index at %s: %s", recycle_root, exc
+        )
+
 def _service_label_from_unit(unit: str) -> str:
     base = unit.split(".", 1)[0]
     tokens = [segment for segment in base.replace("_", "-").split("-") if segment]
@@ -3808,10 +3982,21 @@ SSL_CONTEXT_KEY: AppKey[ssl.SSLContext] = web.AppKey("ssl_context", ssl.SSLConte
 LETS_ENCRYPT_TASK_KEY: AppKey[asyncio.Task | None] = web.AppKey(
     "lets_encrypt_task", asyncio.Task
 )
+LISTENER_HEARTBEAT_TASK_KEY: AppKey[asyncio.Task | None] = web.AppKey(
+    "listener_heartbeat_task", asyncio.Task
+)
+SYNC_MANIFEST_TASK_KEY: AppKey[asyncio.Task | None] = web.AppKey(
+    "sync_manifest_task", asyncio.Task
+)
 CLIP_EXECUTOR_KEY: AppKey[ThreadPoolExecutor] = web.AppKey(
     "clip_executor",
     ThreadPoolExecutor,
 )
+CLIP_JOBS_KEY: AppKey[ClipJobQueue] = web.AppKey("clip_jobs", ClipJobQueue)
+BULK_JOBS_KEY: AppKey[BulkJobEngine] = web.AppKey("bulk_jobs", BulkJobEngine)
+STORAGE_USAGE_KEY: AppKey[StorageUsageTracker] = web.AppKey(
+    "storage_usage", StorageUsageTracker
+)
 
 _TIMEZONE_ABBREVIATION_OFFSETS: dict[str, int] = {
     "UTC": 0,
@@ -4259,6 +4444,71 @@ def _kick_auto_restart_units(
         _enqueue_service_actions(unit, ["start"], delay=delay)
 
 
+def _request_etag_matches(request: web.Request, etag: str) -> bool:
+    """Return True when ``If-None-Match`` already names ``etag`` (weak compare)."""
+
+    header = request.headers.get("If-None-Match")
+    if not header or not etag:
+        return False
+    target = etag[2:] if etag.startswith("W/") else etag
+    for token in header.split(","):
+        candidate = token.strip()
+        if candidate == "*":
+            return True
+        if candidate.startswith("W/"):
+            candidate = candidate[2:]
+        if candidate == target:
+            return True
+    return False
+
+
+def _validator_headers(etag: str, last_modified: float | None = None) -> dict[str, str]:
+    headers = {"Cache-Control": "no-cache", "ETag": etag}
+    if last_modified is not None:
+        headers["Last-Modified"] = formatdate(last_modified, usegmt=True)
+    return headers
+
+
+def _not_modified_response(
+    request: web.Request,
+    etag: str,
+    last_modified: float | None = None,
+) -> web.Response | None:
+    """Return a ``304`` response when the client's validators are current."""
+
+    if request.headers.get("If-None-Match") is not None:
+        matched = _request_etag_matches(request, etag)
+    elif last_modified is not None and request.if_modified_since is not None:
+        matched = int(last_modified) <= request.if_modified_since.timestamp()
+    else:
+        matched = False
+    if not matched:
+        return None
+    return web.Response(status=304, headers=_validator_headers(etag, last_modified))
+
+
+def _precompressed_response(
+    request: web.Request,
+    body: "webui.assets.PrecompressedBody",
+    *,
+    cache_control: str,
+) -> web.Response:
+    encoding, payload = body.select(request.headers.get("Accept-Encoding"))
+    etag = body.etag_for(encoding)
+    headers = {
+        "Cache-Control": cache_control,
+        "Content-Type": body.content_type,
+        "ETag": etag,
+        "Last-Modified": body.last_modified,
+        "Vary": "Accept-Encoding",
+    }
+    if _request_etag_matches(request, etag):
+        return web.Response(status=304, headers=headers)
+    if encoding is not None:
+        headers["Content-Encoding"] = encoding
+    return web.Response(body=payload, headers=headers)
+
+
 def build_app(lets_encrypt_manager: LetsEncryptManager | None = None) -> web.Application:
     log = logging.getLogger("web_streamer")
     apply_config_migrations(logger=log)
@@ -4267,6 +4517,88 @@ def build_app(lets_encrypt_manager: LetsEncryptManager | None = None) -> web.App
     api_base_raw = dashboard_cfg.get("api_base", "")
     dashboard_api_base = api_base_raw.strip() if isinstance(api_base_raw, str) else ""
     cors_enabled = bool(dashboard_api_base)
+    clip_workers = (
+        _coerce_int(
+            dashboard_cfg.get("clip_workers", CLIP_EXECUTOR_MAX_WORKERS),
+            "dashboard.clip_workers",
+            [],
+            min_value=1,
+            max_value=4,
+        )
+        or CLIP_EXECUTOR_MAX_WORKERS
+    )
+    clip_undo_max_mb = _coerce_int(
+        dashboard_cfg.get("clip_undo_max_mb", CLIP_UNDO_MAX_MEGABYTES),
+        "dashboard.clip_undo_max_mb",
+        [],
+        min_value=0,
+    )
+    if clip_undo_max_mb is None:
+        clip_undo_max_mb = CLIP_UNDO_MAX_MEGABYTES
+    clip_undo_max_bytes = clip_undo_max_mb * 1024 * 1024
+    clip_queue_limit = (
+        _coerce_int(
+            dashboard_cfg.get("clip_queue_limit", CLIP_QUEUE_MAX_PENDING),
+            "dashboard.clip_queue_limit",
+            [],
+            min_value=1,
+            max_value=64,
+        )
+        or CLIP_QUEUE_MAX_PENDING
+    )
+    bulk_batch_size = (
+        _coerce_int(
+            dashboard_cfg.get("bulk_batch_size", BULK_BATCH_SIZE),
+            "dashboard.bulk_batch_size",
+            [],
+            min_value=1,
+            max_value=1000,
+        )
+        or BULK_BATCH_SIZE
+    )
+    storage_reconcile_interval = (
+        _coerce_int(
+            dashboard_cfg.get(
+                "storage_reconcile_interval_seconds", STORAGE_RECONCILE_INTERVAL_SECONDS
+            ),
+            "dashboard.storage_reconcile_interval_seconds",
+            [],
+            min_value=60,
+            max_value=86400,
+        )
+        or STORAGE_RECONCILE_INTERVAL_SECONDS
+    )
+    sync_manifest_enabled = bool(dashboard_cfg.get("sync_manifest_enabled", True))
+    sync_rescan_interval = (
+        _coerce_int(
+            dashboard_cfg.get("sync_rescan_interval_seconds", SYNC_RESCAN_INTERVAL_SECONDS),
+            "dashboard.sync_rescan_interval_seconds",
+            [],
+            min_value=5,
+            max_value=86400,
+        )
+        or SYNC_RESCAN_INTERVAL_SECONDS
+    )
+    sync_page_size = (
+        _coerce_int(
+            dashboard_cfg.get("sync_page_size", SYNC_PAGE_SIZE),
+            "dashboard.sync_page_size",
+            [],
+            min_value=1,
+            max_value=10000,
+        )
+        or SYNC_PAGE_SIZE
+    )
+    sync_tombstone_retention_days = (
+        _coerce_int(
+            dashboard_cfg.get("sync_tombstone_retention_days", SYNC_TOMBSTONE_RETENTION_DAYS),
+            "dashboard.sync_tombstone_retention_days",
+            [],
+            min_value=1,
+            max_value=3650,
+        )
+        or SYNC_TOMBSTONE_RETENTION_DAYS
+    )
 
     middlewares: list[Any] = []
 
@@ -4291,10 +4623,16 @@ def build_app(lets_encrypt_manager: LetsEncryptManager | None = None) -> web.App
 
     app = web.Application(middlewares=middlewares)
     clip_executor = ThreadPoolExecutor(
-        max_workers=CLIP_EXECUTOR_MAX_WORKERS,
+        max_workers=clip_workers,
         thread_name_prefix="web_streamer_clip",
     )
     app[CLIP_EXECUTOR_KEY] = clip_executor
+    # Bulk jobs get their own thread so a long batch never starves the
+    # default executor that request handlers use for scans and signatures.
+    bulk_executor = ThreadPoolExecutor(
+        max_workers=1,
+        thread_name_prefix="web_streamer_bulk",
+    )
     app[SHUTDOWN_EVENT_KEY] = asyncio.Event()
     if lets_encrypt_manager is not None:
         app[LETS_ENCRYPT_MANAGER_KEY] = lets_encrypt_manager
@@ -4311,6 +4649,10 @@ def build_app(lets_encrypt_manager: LetsEncryptManager | None = None) -> web.App
     dashboard_events.install_event_bus(event_bus)
     app[EVENT_BUS_KEY] = event_bus
 
+    # Bumped by recordings/config events; handlers fold the counters into ETags.
+    resource_generations = ResourceGenerations()
+    event_bus.add_listener(resource_generations.observe_event)
+
     def _publish_dashboard_event(event_type: str, payload: dict[str, Any]) -> None:
         try:
             dashboard_events.publish(event_type, payload)
@@ -4319,9 +4661,14 @@ def build_app(lets_encrypt_manager: LetsEncryptManager | None = None) -> web.App
                 "Failed to publish dashboard event %s", event_type, exc_info=True
             )
 
+    # Rendered dashboard HTML (plus its encoded variants) keyed on the config
+    # file signature and static asset version. Cleared on every config update.
+    dashboard_page_cache: dict[str, Any] = {}
+
     def _emit_config_updated(section: str) -> None:
         if not section:
             return
+        dashboard_page_cache.clear()
         _publish_dashboard_event(
             "config_updated",
             {"section": section, "updated_at": time.time()},
@@ -4339,6 +4686,9 @@ def build_app(lets_encrypt_manager: LetsEncryptManager | None = None) -> web.App
         event_bus.set_loop(asyncio.get_running_loop())
 
     async def _cleanup_event_bus(_: web.Application) -> None:
+        event_bus.remove_listener(resource_generations.observe_event)
+        event_bus.remove_listener(recordings_changes.observe_event)
+        event_bus.remove_listener(storage_usage.observe_event)
         dashboard_events.uninstall_event_bus(event_bus)
 
     app.on_startup.append(_init_event_bus)
@@ -4397,6 +4747,33 @@ def build_app(lets_encrypt_manager: LetsEncryptManager | None = None) -> web.App
             ice_servers=webrtc_ice_servers,
         )
     app[WEBRTC_MANAGER_KEY] = webrtc_manager
+
+    async def _start_listener_heartbeat(_: web.Application) -> None:
+        # Archival holds uploads while anyone listens and ignores listener
+        # counts that stop being refreshed, so keep them fresh.
+        async def _heartbeat() -> None:
+            loop = asyncio.get_running_loop()
+            while True:
+                await asyncio.sleep(LISTENER_STATE_REFRESH_INTERVAL)
+                try:
+                    if webrtc_manager is not None:
+                        webrtc_manager.touch_listeners()
+                    else:
+                        await loop.run_in_executor(None, controller.touch_state)
+                except Exception as exc:  # pragma: no cover - defensive logging
+                    log.debug("listener state refresh failed: %s", exc)
+
+        app[LISTENER_HEARTBEAT_TASK_KEY] = asyncio.create_task(_heartbeat())
+
+    async def _stop_listener_heartbeat(_: web.Application) -> None:
+        task = app.get(LISTENER_HEARTBEAT_TASK_KEY)
+        if task is not None:
+            task.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await task
+
+    app.on_startup.append(_start_listener_heartbeat)
+    app.on_cleanup.append(_stop_listener_heartbeat)
     recordings_root = Path(cfg["paths"]["recordings_dir"])
     try:
         recordings_root.mkdir(parents=True, exist_ok=True)
@@ -4436,6 +4813,127 @@ def build_app(lets_encrypt_manager: LetsEncryptManager | None = None) -> web.App
     except FileNotFoundError:
         saved_recordings_root_resolved = saved_recordings_root
 
+    def _recordings_relative_path(raw: str) -> str | None:
+        candidate = Path(raw)
+        for base in (recordings_root_resolved, recordings_root):
+            try:
+                return candidate.relative_to(base).as_posix()
+            except ValueError:
+                continue
+        return None
+
+    recordings_changes = RecordingsChangeLog(relative_path=_recordings_relative_path)
+    event_bus.add_listener(recordings_changes.observe_event)
+
+    # Per-collection byte counters for the storage gauge. Refreshes and the
+    # periodic reconcile walk run on their own lowest-priority thread.
+    storage_executor = ThreadPoolExecutor(
+        max_workers=1,
+        thread_name_prefix="web_streamer_storage",
+        initializer=lower_thread_priority,
+    )
+    storage_usage = StorageUsageTracker(
+        StorageUsageLedger(
+            recordings_root,
+            top_level={
+                SAVED_RECORDINGS_DIRNAME: STORAGE_SAVED,
+                RECYCLE_BIN_DIRNAME: STORAGE_RECYCLE,
+                RAW_AUDIO_DIRNAME: STORAGE_ORIGINAL_WAV,
+            },
+            ignore_top_level=(
+                RECYCLE_INDEX_FILENAME,
+                CONTENT_INDEX_FILENAME,
+                ARCHIVAL_JOURNAL_FILENAME,
+                SYNC_MANIFEST_FILENAME,
+                NOTIFICATION_OUTBOX_FILENAME,
+                CLIP_UNDO_DIRNAME,
+            ),
+        ),
+        executor=storage_executor,
+        reconcile_interval=storage_reconcile_interval,
+        reconcile_pause=STORAGE_RECONCILE_PAUSE_SECONDS,
+        relative_path=_recordings_relative_path,
+        logger=log,
+    )
+    app[STORAGE_USAGE_KEY] = storage_usage
+    event_bus.add_listener(storage_usage.observe_event)
+
+    # Manifest for pull sync clients. A background task refreshes it on the
+    # storage thread, in steps of at most SYNC_REFRESH_STEP_BYTES hashed, and
+    # only when the change log moved or the manifest is older than the rescan
+    # interval. Requests never wait for it: they serve what is indexed and
+    # report ``building`` until the pass is done.
+    sync_manifest = SyncManifest(recordings_root)
+    sync_refresh_wake = asyncio.Event()
+    sync_refresh_state: dict[str, object] = {"scanned_at": None, "changes": None, "running": False}
+
+    def _request_sync_refresh() -> bool:
+        """Queue a refresh when the manifest is stale; returns whether one is pending."""
+
+        changes_marker = (recordings_changes.epoch, recordings_changes.seq)
+        scanned_at = sync_refresh_state["scanned_at"]
+        if not (
+            isinstance(scanned_at, float)
+            and sync_refresh_state["changes"] == changes_marker
+            and time.monotonic() - scanned_at < sync_rescan_interval
+        ):
+            sync_refresh_wake.set()
+        return sync_refresh_wake.is_set() or bool(sync_refresh_state["running"])
+
+    async def _refresh_sync_manifest() -> None:
+        loop = asyncio.get_running_loop()
+        changes_marker = (recordings_changes.epoch, recordings_changes.seq)
+        step = functools.partial(
+            sync_manifest.refresh_step,
+            tombstone_retention=sync_tombstone_retention_days * 86400.0,
+            max_bytes=SYNC_REFRESH_STEP_BYTES,
+            max_seconds=SYNC_REFRESH_STEP_SECONDS,
+        )
+        changed = 0
+        while True:
+            # Each step goes to the back of the storage queue, so page
+            # queries and usage refreshes interleave with a long build.
+            result = await loop.run_in_executor(storage_executor, step)
+            changed += result.changed
+            if result.complete:
+                break
+        sync_refresh_state["scanned_at"] = time.monotonic()
+        sync_refresh_state["changes"] = changes_marker
+        if changed:
+            log.info("sync manifest: %d entr%s changed", changed, "y" if changed == 1 else "ies")
+
+    async def _sync_manifest_builder() -> None:
+        while True:
+            await sync_refresh_wake.wait()
+            sync_refresh_wake.clear()
+            sync_refresh_state["running"] = True
+            try:
+                await _refresh_sync_manifest()
+            except (OSError, sqlite3.Error) as exc:
+                log.warning("sync manifest refresh failed: %s", exc)
+                # Retry after the rescan interval rather than on every poll.
+                sync_refresh_state["scanned_at"] = time.monotonic()
+            finally:
+                sync_refresh_state["running"] = False
+
+    async def _start_sync_manifest_builder(_: web.Application) -> None:
+        if sync_manifest_enabled:
+            # Create the database and its journal before serving: adding them
+            # to the recordings root later would move the root's mtime.
+            try:
+                await asyncio.get_running_loop().run_in_executor(storage_executor, sync_manifest.prepare)
+            except (OSError, sqlite3.Error) as exc:
+                log.warning("sync manifest unavailable: %s", exc)
+            app[SYNC_MANIFEST_TASK_KEY] = asyncio.create_task(_sync_manifest_builder())
+            _request_sync_refresh()
+
+    async def _stop_sync_manifest_builder(_: web.Application) -> None:
+        task = app.get(SYNC_MANIFEST_TASK_KEY)
+        if task is not None:
+            task.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await task
+
     clip_safe_pattern = re.compile(r"[^A-Za-z0-9._-]+")
     MIN_CLIP_DURATION_SECONDS = 0.05
 
@@ -4449,10 +4947,29 @@ def build_app(lets_encrypt_manager: LetsEncryptManager | None = None) -> web.App
             super().__init__(message)
             self.status = status
 
-    clip_undo_root = Path(tmp_root) / "clip_undo"
+    # Backups are hardlinked (or reflinked) from the recordings tree, which
+    # only avoids a data copy when tmp_dir shares the recordings filesystem.
+    clip_undo_root = recordings_root / CLIP_UNDO_DIRNAME
     clip_undo_token_pattern = re.compile(r"^[A-Za-z0-9_-]{16,128}$")
     CLIP_UNDO_MAX_AGE_SECONDS = 24 * 60 * 60
 
+    def _clip_undo_entry_bytes(entry: Path) -> int:
+        """Bytes held only by the undo store (shared hardlinks cost nothing)."""
+
+        total = 0
+        try:
+            children = list(entry.iterdir())
+        except OSError:
+            return 0
+        for child in children:
+            try:
+                stat = child.stat()
+            except OSError:
+                continue
+            if stat.st_nlink <= 1:
+                total += stat.st_size
+        return total
+
     def _cleanup_clip_undo_storage(now: float | None = None) -> None:
         if not clip_undo_root.exists():
             return
@@ -4461,6 +4978,7 @@ def build_app(lets_encrypt_manager: LetsEncryptManager | None = None) -> web.App
             entries = list(clip_undo_root.iterdir())
         except OSError:
             return
+        retained: list[tuple[float, Path]] = []
         for entry in entries:
             if not entry.is_dir():
                 continue
@@ -4472,11 +4990,24 @@ def build_app(lets_encrypt_manager: LetsEncryptManager | None = None) -> web.App
                 if not isinstance(created_at, (int, float)):
                     raise ValueError("missing created_at")
                 if current - float(created_at) <= CLIP_UNDO_MAX_AGE_SECONDS:
+                    retained.append((float(created_at), entry))
                     continue
             except Exception:
                 pass
             shutil.rmtree(entry, ignore_errors=True)
 
+        # Size-bound the history: evict the oldest backups first until the
+        # bytes held exclusively by the undo store fit the budget. The newest
+        # backup always survives so the latest edit can still be undone.
+        retained.sort(key=lambda item: item[0])
+        sizes = {entry: _clip_undo_entry_bytes(entry) for _, entry in retained}
+        total = sum(sizes.values())
+        for _, entry in retained[:-1]:
+            if total <= clip_undo_max_bytes:
+                break
+            shutil.rmtree(entry, ignore_errors=True)
+            total -= sizes[entry]
+
     def _collect_clip_undo_tokens() -> dict[str, str]:
         _cleanup_clip_undo_storage()
         if not clip_undo_root.exists():
@@ -4549,6 +5080,76 @@ def build_app(lets_encrypt_manager: LetsEncryptManager | None = None) -> web.App
         codec_name = (result.stdout or "").strip().lower()
         return codec_name == "opus"
 
+    def _stream_copy_clip(
+        source: Path,
+        start_seconds: float,
+        end_seconds: float,
+        tmp_opus: Path,
+        tmp_waveform: Path,
+        tmp_wav: Path,
+    ) -> bool:
+        """Cut an Opus clip on Ogg page boundaries without re-encoding.
+
+        Returns ``False`` when the source cannot be cut this way, leaving the
+        caller to fall back to the ffmpeg decode/encode path.
+        """
+
+        try:
+            ogg_clip.stream_copy_clip(source, tmp_opus, start_seconds, end_seconds)
+        except (ogg_clip.OggClipUnsupported, OSError) as exc:
+            log.debug("Stream-copy clip unavailable for %s: %s", source, exc)
+            try:
+                tmp_opus.unlink()
+            except OSError:
+                pass
+            return False
+
+        source_waveform = ogg_clip.read_waveform(
+            source.with_suffix(source.suffix + ".waveform.json")
+        )
+        sliced = (
+            ogg_clip.slice_waveform(source_waveform, start_seconds, end_seconds)
+            if source_waveform is not None
+            else None
+        )
+        if sliced is not None:
+            try:
+                with tmp_waveform.open("w", encoding="utf-8") as handle:
+                    json.dump(sliced, handle)
+            except OSError as exc:
+                raise ClipError("waveform generation failed") from exc
+            return True
+
+        # The source waveform is too coarse for this clip; decoding just the
+        # clip is still far cheaper than decoding the source window.
+        decode_cmd = [
+            "ffmpeg",
+            "-hide_banner",
+            "-loglevel",
+            "error",
+            "-y",
+            "-i",
+            str(tmp_opus),
+            "-ac",
+            "1",
+            "-ar",
+            "48000",
+            "-sample_fmt",
+            "s16",
+            str(tmp_wav),
+        ]
+        try:
+            subprocess.run(decode_cmd, check=True)
+        except FileNotFoundError as exc:
+            raise ClipError("ffmpeg is not available") from exc
+        except subprocess.SubprocessError as exc:
+            raise ClipError("ffmpeg failed while decoding clip") from exc
+        try:
+            generate_waveform(tmp_wav, tmp_waveform)
+        except Exception as exc:
+            raise ClipError("waveform generation failed") from exc
+        return True
+
     def _prepare_clip_backup(
         final_path: Path, final_waveform: Path, rel_path: Path
     ) -> str:
@@ -4569,18 +5170,21 @@ def build_app(lets_encrypt_manager: LetsEncryptManager | None = None) -> web.App
             except OSError as exc:
                 raise ClipError("unable to prepare undo storage") from exc
             try:
+                # The clip replaces final_path by rename, so a hardlink keeps
+                # the previous version intact without copying its data.
                 audio_backup = backup_dir / final_path.name
-                shutil.copy2(final_path, audio_backup)
+                method = link_or_clone(final_path, audio_backup)
                 waveform_filename = None
                 if final_waveform.exists():
                     waveform_backup = backup_dir / final_waveform.name
-                    shutil.copy2(final_waveform, waveform_backup)
+                    link_or_clone(final_waveform, waveform_backup)
                     waveform_filename = final_waveform.name
                 metadata = {
                     "path": rel_path.as_posix(),
                     "filename": final_path.name,
                     "waveform_filename": waveform_filename,
                     "created_at": time.time(),
+                    "method": method,
                 }
                 with (backup_dir / "meta.json").open("w", encoding="utf-8") as handle:
                     json.dump(metadata, handle)
@@ -4642,35 +5246,17 @@ def build_app(lets_encrypt_manager: LetsEncryptManager | None = None) -> web.App
             if candidate.is_file():
                 waveform_backup = candidate
 
-        temp_audio_path: Path | None = None
-        temp_waveform_path: Path | None = None
         try:
             target_path.parent.mkdir(parents=True, exist_ok=True)
-            temp_audio_fd, temp_audio_name = tempfile.mkstemp(
-                dir=resolved_target.parent,
-                prefix=f".undo-{resolved_target.stem}-",
-                suffix=resolved_target.suffix or ".tmp",
-            )
-            os.close(temp_audio_fd)
-            temp_audio_path = Path(temp_audio_name)
-            shutil.copy2(audio_backup, temp_audio_path)
-            os.replace(temp_audio_path, resolved_target)
-            temp_audio_path = None
+            # The backup is consumed by the restore, so renaming it back into
+            # place swaps the versions without rewriting any audio data.
+            move_or_copy(audio_backup, resolved_target)
 
             target_waveform = resolved_target.with_suffix(
                 resolved_target.suffix + ".waveform.json"
             )
             if waveform_backup is not None:
-                temp_wave_fd, temp_wave_name = tempfile.mkstemp(
-                    dir=target_waveform.parent,
-                    prefix=f".undo-{target_waveform.stem}-",
-                    suffix=target_waveform.suffix or ".tmp",
-                )
-                os.close(temp_wave_fd)
-                temp_waveform_path = Path(temp_wave_name)
-                shutil.copy2(waveform_backup, temp_waveform_path)
-                os.replace(temp_waveform_path, target_waveform)
-                temp_waveform_path = None
+                move_or_copy(waveform_backup, target_waveform)
             else:
                 try:
                     target_waveform.unlink()
@@ -4680,17 +5266,6 @@ def build_app(lets_encrypt_manager: LetsEncryptManager | None = None) -> web.App
             raise ClipUndoError("Unable to restore clip from history.") from exc
         else:
             shutil.rmtree(backup_dir, ignore_errors=True)
-        finally:
-            if temp_audio_path is not None:
-                try:
-                    temp_audio_path.unlink()
-                except FileNotFoundError:
-                    pass
-            if temp_waveform_path is not None:
-                try:
-                    temp_waveform_path.unlink()
-                except FileNotFoundError:
-                    pass
 
         try:
             rel_verified = resolved_target.relative_to(recordings_root_resolved)
@@ -4821,7 +5396,12 @@ def build_app(lets_encrypt_manager: LetsEncryptManager | None = None) -> web.App
         source_start_epoch: float | None,
         allow_overwrite: bool = True,
         overwrite_existing_rel: str | None = None,
+        progress: Callable[[str, float], None] | None = None,
     ) -> dict[str, object]:
+        def _report(stage: str, fraction: float) -> None:
+            if progress is not None:
+                progress(stage, fraction)
+
         if not source_rel_path:
             raise ClipError("source path is required")
 
@@ -5035,98 +5615,113 @@ def build_app(lets_encrypt_manager: LetsEncryptManager | None = None) -> web.App
             tmp_opus = tmp_root_path / "clip.opus"
             tmp_waveform = tmp_root_path / "clip.waveform.json"
 
-            encode_duration = f"{duration:.6f}".rstrip("0").rstrip(".")
-            start_offset = f"{float(start_seconds):.6f}".rstrip("0").rstrip(".")
-
-            # First decode the window to PCM for waveform generation. When the
-            # source is already Opus we can stream copy the payload to avoid an
-            # expensive re-encode. Other codecs must be re-encoded to keep the
-            # `.opus` destination valid.
-            decode_cmd = [
-                "ffmpeg",
-                "-hide_banner",
-                "-loglevel",
-                "error",
-                "-y",
-                "-ss",
-                start_offset,
-                "-i",
-                str(resolved),
-                "-t",
-                encode_duration,
-                "-ac",
-                "1",
-                "-ar",
-                "48000",
-                "-sample_fmt",
-                "s16",
-                str(tmp_wav),
-            ]
+            _report("cutting", 0.1)
+            stream_copied = resolved.suffix.lower() == ".opus" and _stream_copy_clip(
+                resolved,
+                float(start_seconds),
+                float(end_seconds),
+                tmp_opus,
+                tmp_waveform,
+                tmp_wav,
+            )
 
-            try:
-                subprocess.run(decode_cmd, check=True)
-            except FileNotFoundError as exc:
-                raise ClipError("ffmpeg is not available") from exc
-            except subprocess.SubprocessError as exc:
-                raise ClipError("ffmpeg failed while decoding source") from exc
-
-            stream_copy_allowed = _allows_opus_stream_copy(resolved)
-
-            encode_cmd = [
-                "ffmpeg",
-                "-hide_banner",
-                "-loglevel",
-                "error",
-                "-y",
-            ]
+            if not stream_copied:
+                encode_duration = f"{duration:.6f}".rstrip("0").rstrip(".")
+                start_offset = f"{float(start_seconds):.6f}".rstrip("0").rstrip(".")
+
+                # Otherwise decode the window to PCM for waveform generation. When
+                # the source is already Opus ffmpeg can still stream copy the
+                # payload to avoid an expensive re-encode. Other codecs must be
+                # re-encoded to keep the `.opus` destination valid.
+                decode_cmd = [
+                    "ffmpeg",
+                    "-hide_banner",
+                    "-loglevel",
+                    "error",
+                    "-y",
+                    "-ss",
+                    start_offset,
+                    "-i",
+                    str(resolved),
+                    "-t",
+                    encode_duration,
+                    "-ac",
+                    "1",
+                    "-ar",
+                    "48000",
+                    "-sample_fmt",
+                    "s16",
+                    str(tmp_wav),
+                ]
 
-            if stream_copy_allowed:
-                encode_cmd.extend(
-                    [
-                        "-ss",
-                        start_offset,
-                        "-i",
-                        str(resolved),
-                        "-t",
-                        encode_duration,
-                        "-c:a",
-                        "copy",
-                        "-avoid_negative_ts",
-                        "make_zero",
-                    ]
-                )
-            else:
-                encode_cmd.extend(
-                    [
-                        "-i",
-                        str(tmp_wav),
-                        "-c:a",
-                        "libopus",
-                        "-b:a",
-                        "48k",
-                        "-vbr",
-                        "on",
-                        "-application",
-                        "audio",
-                        "-frame_duration",
-                        "20",
-                    ]
-                )
+                _report("decoding", 0.15)
+                try:
+                    subprocess.run(decode_cmd, check=True)
+                except FileNotFoundError as exc:
+                    raise ClipError("ffmpeg is not available") from exc
+                except subprocess.SubprocessError as exc:
+                    raise ClipError("ffmpeg failed while decoding source") from exc
+
+                stream_copy_allowed = _allows_opus_stream_copy(resolved)
+
+                encode_cmd = [
+                    "ffmpeg",
+                    "-hide_banner",
+                    "-loglevel",
+                    "error",
+                    "-y",
+                ]
 
-            encode_cmd.append(str(tmp_opus))
+                if stream_copy_allowed:
+                    encode_cmd.extend(
+                        [
+                            "-ss",
+                            start_offset,
+                            "-i",
+                            str(resolved),
+                            "-t",
+                            encode_duration,
+                            "-c:a",
+                            "copy",
+                            "-avoid_negative_ts",
+                            "make_zero",
+                        ]
+                    )
+                else:
+                    encode_cmd.extend(
+                        [
+                            "-i",
+                            str(tmp_wav),
+                            "-c:a",
+                            "libopus",
+                            "-b:a",
+                            "48k",
+                            "-vbr",
+                            "on",
+                            "-application",
+                            "audio",
+                            "-frame_duration",
+                            "20",
+                        ]
+                    )
 
-            try:
-                subprocess.run(encode_cmd, check=True)
-            except FileNotFoundError as exc:
-                raise ClipError("ffmpeg is not available") from exc
-            except subprocess.SubprocessError as exc:
-                raise ClipError("ffmpeg failed while encoding clip") from exc
+                encode_cmd.append(str(tmp_opus))
 
-            try:
-                generate_waveform(tmp_wav, tmp_waveform)
-            except Exception as exc:
-                raise ClipError("waveform generation failed") from exc
+                _report("encoding", 0.45)
+                try:
+                    subprocess.run(encode_cmd, check=True)
+                except FileNotFoundError as exc:
+                    raise ClipError("ffmpeg is not available") from exc
+                except subprocess.SubprocessError as exc:
+                    raise ClipError("ffmpeg failed while encoding clip") from exc
+
+                _report("waveform", 0.8)
+                try:
+                    generate_waveform(tmp_wav, tmp_waveform)
+                except Exception as exc:
+                    raise ClipError("waveform generation failed") from exc
 
+            _report("storing", 0.9)
             if final_path.exists():
                 undo_token = _prepare_clip_backup(final_path, final_waveform, rel_path)
 
@@ -5201,6 +5796,88 @@ def build_app(lets_encrypt_manager: LetsEncryptManager | None = None) -> web.App
         _cleanup_clip_undo_storage()
         return payload
 
+    def _run_clip_job(
+        clip_request: ClipRequest, progress: Callable[[str, float], None]
+    ) -> dict[str, object]:
+        try:
+            payload = _create_clip_sync(
+                clip_request.source_path,
+                clip_request.start_seconds,
+                clip_request.end_seconds,
+                clip_request.clip_name,
+                clip_request.source_start_epoch,
+                clip_request.allow_overwrite,
+                clip_request.overwrite_existing,
+                progress=progress,
+            )
+        except ClipError:
+            raise
+        except Exception as exc:
+            log.exception(
+                "Unexpected error while creating clip for %s", clip_request.source_path
+            )
+            raise RuntimeError("unable to create clip") from exc
+
+        clip_path = payload.get("path")
+        if isinstance(clip_path, str) and clip_path:
+            _emit_recordings_changed(
+                "clipped",
+                paths=[clip_path],
+                overwritten=bool(payload.get("undo_token")),
+            )
+        else:
+            _emit_recordings_changed("clipped")
+        return payload
+
+    clip_jobs = ClipJobQueue(
+        _run_clip_job,
+        executor=clip_executor,
+        publish=_publish_dashboard_event,
+        concurrency=clip_workers,
+        max_pending=clip_queue_limit,
+        logger=log,
+    )
+    app[CLIP_JOBS_KEY] = clip_jobs
+
+    bulk_jobs = BulkJobEngine(
+        executor=bulk_executor,
+        publish=_publish_dashboard_event,
+        batch_size=bulk_batch_size,
+        max_pending=BULK_QUEUE_MAX_PENDING,
+        logger=log,
+    )
+    app[BULK_JOBS_KEY] = bulk_jobs
+
+    async def _read_bulk_request(request: web.Request) -> tuple[dict[str, Any], list[Any]]:
+        try:
+            data = await request.json()
+        except Exception as exc:
+            raise web.HTTPBadRequest(reason=f"Invalid JSON: {exc}") from exc
+
+        items = data.get("items")
+        if not isinstance(items, list):
+            raise web.HTTPBadRequest(reason="'items' must be a list")
+        return data, items
+
+    async def _run_bulk_operation(
+        data: Mapping[str, Any], operation: BulkOperation
+    ) -> web.Response:
+        try:
+            job = bulk_jobs.submit(operation)
+        except BulkQueueFull as exc:
+            raise web.HTTPTooManyRequests(reason=str(exc)) from exc
+
+        # ``wait: false`` returns the job immediately; progress and completion
+        # arrive as ``bulk_job`` dashboard events (or via the job endpoint).
+        if not _to_bool(data.get("wait"), True):
+            return web.json_response(job.to_payload(), status=202)
+
+        try:
+            payload = await bulk_jobs.wait(job)
+        except Exception as exc:  # pragma: no cover - unexpected failures
+            raise web.HTTPInternalServerError(reason=f"bulk {operation.kind} failed") from exc
+        return web.json_response(payload)
+
     if stream_mode == "hls":
         template_defaults = {
             "page_title": "Tricorder HLS Stream",
@@ -5228,7 +5905,21 @@ def build_app(lets_encrypt_manager: LetsEncryptManager | None = None) -> web.App
             return False
         return False
 
-    async def dashboard(_: web.Request) -> web.Response:
+    static_catalog = webui.asset_catalog()
+
+    def _dashboard_cache_key() -> tuple[object, ...]:
+        try:
+            stat = primary_config_path().stat()
+            config_signature: object = (stat.st_mtime_ns, stat.st_size)
+        except (OSError, AssertionError):
+            config_signature = None
+        return (config_signature, static_catalog.version)
+
+    def _dashboard_page() -> "webui.assets.PrecompressedBody":
+        key = _dashboard_cache_key()
+        cached = dashboard_page_cache.get("page")
+        if cached is not None and dashboard_page_cache.get("key") == key:
+            return cached
         html = webui.render_template(
             "dashboard.html",
             page_title="Tricorder Dashboard",
@@ -5236,7 +5927,30 @@ def build_app(lets_encrypt_manager: LetsEncryptManager | None = None) -> web.App
             stream_mode=stream_mode,
             webrtc_ice_servers=webrtc_ice_servers,
         )
-        return web.Response(text=html, content_type="text/html")
+        page = webui.assets.PrecompressedBody.from_bytes(
+            html.encode("utf-8"), "text/html; charset=utf-8", time.time()
+        )
+        dashboard_page_cache["key"] = key
+        dashboard_page_cache["page"] = page
+        return page
+
+    async def dashboard(request: web.Request) -> web.Response:
+        return _precompressed_response(
+            request,
+            _dashboard_page(),
+            cache_control=webui.assets.REVALIDATE_CACHE_CONTROL,
+        )
+
+    async def static_asset(request: web.Request) -> web.Response:
+        asset, immutable = static_catalog.resolve(request.match_info.get("path", ""))
+        if asset is None:
+            raise web.HTTPNotFound()
+        cache_control = (
+            webui.assets.IMMUTABLE_CACHE_CONTROL
+            if immutable
+            else webui.assets.REVALIDATE_CACHE_CONTROL
+        )
+        return _precompressed_response(request, asset.body, cache_control=cache_control)
 
     async def hls_index(_: web.Request) -> web.Response:
         if stream_mode != "hls":
@@ -5886,16 +6600,47 @@ def build_app(lets_encrypt_manager: LetsEncryptManager | None = None) -> web.App
     async def _stop_recordings_event_bridge(_: web.Application) -> None:
         await recordings_event_bridge.stop()
 
-    async def _shutdown_clip_executor(_: web.Application) -> None:
+    async def _start_clip_jobs(_: web.Application) -> None:
+        await clip_jobs.start()
+
+    async def _sync_recycle_index(_: web.Application) -> None:
+        # Reconcile once up front so the first listing does not pay for it.
+        await asyncio.get_running_loop().run_in_executor(
+            None, _recycle_bin_stats, recycle_bin_root
+        )
+
+    async def _stop_clip_jobs(_: web.Application) -> None:
+        await clip_jobs.stop()
+
+    async def _shutdown_clip_executor(_: web.Application) -> None:
         clip_executor.shutdown(wait=False, cancel_futures=True)
 
+    async def _stop_bulk_jobs(_: web.Application) -> None:
+        await bulk_jobs.stop()
+        bulk_executor.shutdown(wait=False, cancel_futures=True)
+
+    async def _start_storage_usage(_: web.Application) -> None:
+        await storage_usage.start()
+
+    async def _stop_storage_usage(_: web.Application) -> None:
+        await storage_usage.stop()
+        storage_executor.shutdown(wait=False, cancel_futures=True)
+
     app.on_startup.append(_start_capture_status_bridge)
     app.on_startup.append(_start_recordings_event_bridge)
+    app.on_startup.append(_start_clip_jobs)
+    app.on_startup.append(_sync_recycle_index)
+    app.on_startup.append(_start_storage_usage)
+    app.on_startup.append(_start_sync_manifest_builder)
     app.on_cleanup.append(_stop_capture_status_bridge)
     app.on_cleanup.append(_stop_recordings_event_bridge)
     app.on_cleanup.append(_stop_health_broadcaster)
     app.on_cleanup.append(_cleanup_event_bus)
+    app.on_cleanup.append(_stop_clip_jobs)
     app.on_cleanup.append(_shutdown_clip_executor)
+    app.on_cleanup.append(_stop_bulk_jobs)
+    app.on_cleanup.append(_stop_sync_manifest_builder)
+    app.on_cleanup.append(_stop_storage_usage)
 
     def _motion_state_snapshot(*, include_events: bool = True) -> dict[str, object]:
         state = load_motion_state(motion_state_path)
@@ -5907,6 +6652,135 @@ def build_app(lets_encrypt_manager: LetsEncryptManager | None = None) -> web.App
             payload.setdefault("events", [])
         return payload
 
+    def _excerpt(text: str, limit: int = 240) -> str:
+        normalized = " ".join(text.split())
+        if not normalized:
+            return ""
+        if len(normalized) <= limit:
+            return normalized
+        truncated = normalized[:limit]
+        if " " in truncated:
+            truncated = truncated.rsplit(" ", 1)[0]
+        return truncated + "…"
+
+    def _serialize_recording(
+        entry: Mapping[str, object], undo_tokens: Mapping[str, str]
+    ) -> dict[str, object]:
+        return {
+            "name": str(entry.get("name", "")),
+            "path": str(entry.get("path", "")),
+            "day": str(entry.get("day", "")),
+            "collection": str(entry.get("collection", "")),
+            "extension": str(entry.get("extension", "")),
+            "size_bytes": int(entry.get("size_bytes", 0) or 0),
+            "modified": float(entry.get("modified", 0.0) or 0.0),
+            "modified_iso": str(entry.get("modified_iso", "")),
+            "duration_seconds": (
+                float(entry.get("duration"))
+                if isinstance(entry.get("duration"), (int, float))
+                else None
+            ),
+            "trigger_offset_seconds": (
+                float(entry.get("trigger_offset_seconds"))
+                if isinstance(entry.get("trigger_offset_seconds"), (int, float))
+                else None
+            ),
+            "release_offset_seconds": (
+                float(entry.get("release_offset_seconds"))
+                if isinstance(entry.get("release_offset_seconds"), (int, float))
+                else None
+            ),
+            "motion_trigger_offset_seconds": (
+                float(entry.get("motion_trigger_offset_seconds"))
+                if isinstance(entry.get("motion_trigger_offset_seconds"), (int, float))
+                else None
+            ),
+            "motion_release_offset_seconds": (
+                float(entry.get("motion_release_offset_seconds"))
+                if isinstance(entry.get("motion_release_offset_seconds"), (int, float))
+                else None
+            ),
+            "motion_started_epoch": (
+                float(entry.get("motion_started_epoch"))
+                if isinstance(entry.get("motion_started_epoch"), (int, float))
+                else None
+            ),
+            "motion_released_epoch": (
+                float(entry.get("motion_released_epoch"))
+                if isinstance(entry.get("motion_released_epoch"), (int, float))
+                else None
+            ),
+            "motion_segments": _normalize_motion_segments(
+                entry.get("motion_segments")
+            ),
+            "waveform_path": (
+                str(entry.get("waveform_path"))
+                if entry.get("waveform_path")
+                else ""
+            ),
+            "undo_token": (
+                undo_tokens.get(str(entry.get("path", "")))
+                if undo_tokens
+                else None
+            ),
+            "start_epoch": (
+                float(entry.get("start_epoch", 0.0))
+                if isinstance(entry.get("start_epoch"), (int, float))
+                else None
+            ),
+            "started_epoch": (
+                float(entry.get("started_epoch", 0.0))
+                if isinstance(entry.get("started_epoch"), (int, float))
+                else None
+            ),
+            "started_at": (
+                str(entry.get("started_at"))
+                if isinstance(entry.get("started_at"), str)
+                else ""
+            ),
+            "has_transcript": bool(entry.get("has_transcript")),
+            "transcript_path": (
+                str(entry.get("transcript_path"))
+                if entry.get("transcript_path")
+                else ""
+            ),
+            "transcript_event_type": (
+                str(entry.get("transcript_event_type"))
+                if entry.get("transcript_event_type")
+                else ""
+            ),
+            "transcript_updated": (
+                float(entry.get("transcript_updated", 0.0))
+                if isinstance(entry.get("transcript_updated"), (int, float))
+                else None
+            ),
+            "transcript_updated_iso": (
+                str(entry.get("transcript_updated_iso"))
+                if isinstance(entry.get("transcript_updated_iso"), str)
+                else ""
+            ),
+            "transcript_excerpt": _excerpt(str(entry.get("transcript_text", ""))),
+            "raw_audio_path": (
+                str(entry.get("raw_audio_path"))
+                if entry.get("raw_audio_path")
+                else ""
+            ),
+            "manual_event": bool(entry.get("manual_event")),
+            "detected_rms": bool(entry.get("detected_rms")),
+            "detected_vad": bool(
+                entry.get("detected_vad")
+                or entry.get("detected_bad")
+            ),
+            "end_reason": (
+                str(entry.get("end_reason")).strip()
+                if isinstance(entry.get("end_reason"), str)
+                else ""
+            ),
+            "trigger_sources": (
+                _normalize_trigger_sources(entry.get("trigger_sources"))
+            ),
+        }
+
     def _filter_recordings(entries: list[dict[str, object]], request: web.Request) -> dict[str, object]:
         query = request.rel_url.query
 
@@ -5931,17 +6805,6 @@ def build_app(lets_encrypt_manager: LetsEncryptManager | None = None) -> web.App
         day_filter = _collect("day")
         ext_filter = {token.lower().lstrip(".") for token in _collect("ext")}
 
-        def _excerpt(text: str, limit: int = 240) -> str:
-            normalized = " ".join(text.split())
-            if not normalized:
-                return ""
-            if len(normalized) <= limit:
-                return normalized
-            truncated = normalized[:limit]
-            if " " in truncated:
-                truncated = truncated.rsplit(" ", 1)[0]
-            return truncated + "…"
-
         try:
             limit = int(query.get("limit", str(DEFAULT_RECORDINGS_LIMIT)))
         except ValueError:
@@ -5999,123 +6862,7 @@ def build_app(lets_encrypt_manager: LetsEncryptManager | None = None) -> web.App
 
         undo_tokens = _collect_clip_undo_tokens() if window else {}
 
-        payload_items = [
-            {
-                "name": str(entry.get("name", "")),
-                "path": str(entry.get("path", "")),
-                "day": str(entry.get("day", "")),
-                "collection": str(entry.get("collection", "")),
-                "extension": str(entry.get("extension", "")),
-                "size_bytes": int(entry.get("size_bytes", 0) or 0),
-                "modified": float(entry.get("modified", 0.0) or 0.0),
-                "modified_iso": str(entry.get("modified_iso", "")),
-                "duration_seconds": (
-                    float(entry.get("duration"))
-                    if isinstance(entry.get("duration"), (int, float))
-                    else None
-                ),
-                "trigger_offset_seconds": (
-                    float(entry.get("trigger_offset_seconds"))
-                    if isinstance(entry.get("trigger_offset_seconds"), (int, float))
-                    else None
-                ),
-                "release_offset_seconds": (
-                    float(entry.get("release_offset_seconds"))
-                    if isinstance(entry.get("release_offset_seconds"), (int, float))
-                    else None
-                ),
-                "motion_trigger_offset_seconds": (
-                    float(entry.get("motion_trigger_offset_seconds"))
-                    if isinstance(entry.get("motion_trigger_offset_seconds"), (int, float))
-                    else None
-                ),
-                "motion_release_offset_seconds": (
-                    float(entry.get("motion_release_offset_seconds"))
-                    if isinstance(entry.get("motion_release_offset_seconds"), (int, float))
-                    else None
-                ),
-                "motion_started_epoch": (
-                    float(entry.get("motion_started_epoch"))
-                    if isinstance(entry.get("motion_started_epoch"), (int, float))
-                    else None
-                ),
-                "motion_released_epoch": (
-                    float(entry.get("motion_released_epoch"))
-                    if isinstance(entry.get("motion_released_epoch"), (int, float))
-                    else None
-                ),
-                "motion_segments": _normalize_motion_segments(
-                    entry.get("motion_segments")
-                ),
-                "waveform_path": (
-                    str(entry.get("waveform_path"))
-                    if entry.get("waveform_path")
-                    else ""
-                ),
-                "undo_token": (
-                    undo_tokens.get(str(entry.get("path", "")))
-                    if undo_tokens
-                    else None
-                ),
-                "start_epoch": (
-                    float(entry.get("start_epoch", 0.0))
-                    if isinstance(entry.get("start_epoch"), (int, float))
-                    else None
-                ),
-                "started_epoch": (
-                    float(entry.get("started_epoch", 0.0))
-                    if isinstance(entry.get("started_epoch"), (int, float))
-                    else None
-                ),
-                "started_at": (
-                    str(entry.get("started_at"))
-                    if isinstance(entry.get("started_at"), str)
-                    else ""
-                ),
-                "has_transcript": bool(entry.get("has_transcript")),
-                "transcript_path": (
-                    str(entry.get("transcript_path"))
-                    if entry.get("transcript_path")
-                    else ""
-                ),
-                "transcript_event_type": (
-                    str(entry.get("transcript_event_type"))
-                    if entry.get("transcript_event_type")
-                    else ""
-                ),
-                "transcript_updated": (
-                    float(entry.get("transcript_updated", 0.0))
-                    if isinstance(entry.get("transcript_updated"), (int, float))
-                    else None
-                ),
-                "transcript_updated_iso": (
-                    str(entry.get("transcript_updated_iso"))
-                    if isinstance(entry.get("transcript_updated_iso"), str)
-                    else ""
-                ),
-                "transcript_excerpt": _excerpt(str(entry.get("transcript_text", ""))),
-                "raw_audio_path": (
-                    str(entry.get("raw_audio_path"))
-                    if entry.get("raw_audio_path")
-                    else ""
-                ),
-                "manual_event": bool(entry.get("manual_event")),
-                "detected_rms": bool(entry.get("detected_rms")),
-                "detected_vad": bool(
-                    entry.get("detected_vad")
-                    or entry.get("detected_bad")
-                ),
-                "end_reason": (
-                    str(entry.get("end_reason")).strip()
-                    if isinstance(entry.get("end_reason"), str)
-                    else ""
-                ),
-                "trigger_sources": (
-                    _normalize_trigger_sources(entry.get("trigger_sources"))
-                ),
-            }
-            for entry in window
-        ]
+        payload_items = [_serialize_recording(entry, undo_tokens) for entry in window]
 
         return {
             "items": payload_items,
@@ -6126,8 +6873,85 @@ def build_app(lets_encrypt_manager: LetsEncryptManager | None = None) -> web.App
             "time_range": time_range_value,
         }
 
+    def _recordings_tree_signature() -> tuple[object, ...]:
+        return (
+            directory_signature(
+                recordings_root,
+                skip=(
+                    RECYCLE_BIN_DIRNAME,
+                    SAVED_RECORDINGS_DIRNAME,
+                    RAW_AUDIO_DIRNAME,
+                    CLIP_UNDO_DIRNAME,
+                ),
+            ),
+            directory_signature(saved_recordings_root),
+            directory_signature(recordings_root / RAW_AUDIO_DIRNAME),
+        )
+
+    def _recycle_bin_signature(recycle_root: Path) -> tuple[object, ...]:
+        # Entry restorability depends on the recordings tree as well.
+        stats = _recycle_bin_stats(recycle_root)
+        if stats is None:
+            return (directory_signature(recycle_root), _recordings_tree_signature())
+        return (stats.generation, stats.count, _recordings_tree_signature())
+
+    def _live_recordings_status() -> dict[str, object]:
+        payload: dict[str, object] = {
+            "capture_status": _read_capture_status(),
+            "motion_state": _motion_state_snapshot(),
+        }
+        try:
+            usage = shutil.disk_usage(recordings_root)
+        except (FileNotFoundError, PermissionError, OSError):
+            usage = None
+        if usage is not None:
+            payload["storage_total_bytes"] = int(usage.total)
+            payload["storage_used_bytes"] = int(usage.used)
+            payload["storage_free_bytes"] = int(usage.free)
+        return payload
+
+    async def recordings_status_api(request: web.Request) -> web.Response:
+        """Capture status, motion state and disk usage without the listing.
+
+        These change on every capture tick, so they are kept out of the
+        ``/api/recordings`` ETag; clients replaying a cached listing fetch
+        them here.
+        """
+
+        return web.json_response(
+            _live_recordings_status(), headers={"Cache-Control": "no-store"}
+        )
+
     async def recordings_api(request: web.Request) -> web.Response:
         raw_collection = request.rel_url.query.get("collection", "").strip().lower()
+        loop = asyncio.get_running_loop()
+        recycle_root = request.app.get(
+            RECYCLE_BIN_ROOT_KEY, recordings_root / RECYCLE_BIN_DIRNAME
+        )
+
+        etag: str | None = None
+        # Relative time ranges shift with the clock, so they are never cached.
+        # Live capture status and disk usage are left out of the validator
+        # (they change every tick); see recordings_status_api.
+        if "time_range" not in request.rel_url.query:
+            tree_signature = await loop.run_in_executor(
+                None, functools.partial(_recycle_bin_signature, recycle_root)
+            )
+            etag = resource_generations.etag(
+                RECORDINGS_RESOURCE,
+                resource_generations.current(RECYCLE_BIN_RESOURCE),
+                request.rel_url.query_string,
+                tree_signature,
+                storage_usage.generation,
+            )
+            not_modified = _not_modified_response(request, etag)
+            if not_modified is not None:
+                return not_modified
+
+        # Read the cursor before scanning so changes racing the scan are
+        # replayed by the delta feed rather than lost.
+        changes_epoch = recordings_changes.epoch
+        changes_seq = recordings_changes.seq
         recent_task = asyncio.create_task(_scan_recordings())
         saved_task = asyncio.create_task(_scan_saved_recordings())
         (
@@ -6163,26 +6987,30 @@ def build_app(lets_encrypt_manager: LetsEncryptManager | None = None) -> web.App
         payload["available_days"] = available_days
         payload["available_extensions"] = available_exts
         log = logging.getLogger("web_streamer")
-        loop = asyncio.get_running_loop()
-        recordings_usage_task = loop.run_in_executor(
-            None,
-            functools.partial(
-                _calculate_directory_usage,
-                recordings_root,
-                skip_top_level=(RECYCLE_BIN_DIRNAME,),
-            ),
-        )
-        try:
-            usage = shutil.disk_usage(recordings_root)
-        except (FileNotFoundError, PermissionError, OSError):
-            usage = None
-        if usage is not None:
-            payload["storage_total_bytes"] = int(usage.total)
-            payload["storage_used_bytes"] = int(usage.used)
-            payload["storage_free_bytes"] = int(usage.free)
-        recycle_root = request.app.get(
-            RECYCLE_BIN_ROOT_KEY, recordings_root / RECYCLE_BIN_DIRNAME
-        )
+        ledger_usage = storage_usage.usage
+        if ledger_usage is not None:
+            recordings_usage_task = loop.create_future()
+            recordings_usage_task.set_result(
+                ledger_usage.total_bytes - ledger_usage.bytes_for(STORAGE_RECYCLE)
+            )
+        else:
+            recordings_usage_task = loop.run_in_executor(
+                None,
+                functools.partial(
+                    _calculate_directory_usage,
+                    recordings_root,
+                    skip_top_level=(
+                        RECYCLE_BIN_DIRNAME,
+                        RECYCLE_INDEX_FILENAME,
+                        STORAGE_LEDGER_FILENAME,
+                        CONTENT_INDEX_FILENAME,
+                        ARCHIVAL_JOURNAL_FILENAME,
+                        SYNC_MANIFEST_FILENAME,
+                        NOTIFICATION_OUTBOX_FILENAME,
+                        CLIP_UNDO_DIRNAME,
+                    ),
+                ),
+            )
         recycle_usage_task = loop.run_in_executor(
             None,
             functools.partial(_calculate_recycle_bin_usage, recycle_root),
@@ -6226,9 +7054,167 @@ def build_app(lets_encrypt_manager: LetsEncryptManager | None = None) -> web.App
             "saved": int(saved_total_bytes),
             "recycle": int(recycle_total_bytes),
         }
+        if ledger_usage is not None:
+            payload["collection_size_bytes"]["original_wav"] = ledger_usage.bytes_for(
+                STORAGE_ORIGINAL_WAV
+            )
+        payload.update(_live_recordings_status())
+        payload["changes_epoch"] = changes_epoch
+        payload["changes_seq"] = changes_seq
+        headers = _validator_headers(etag) if etag is not None else None
+        return web.json_response(payload, headers=headers)
+
+    def _build_recording_changes_sync(
+        net_changes: Mapping[str, str],
+    ) -> tuple[list[dict[str, object]], list[dict[str, object]], list[str], list[str]]:
+        recent_candidates: list[Path] = []
+        saved_candidates: list[Path] = []
+        for rel in net_changes:
+            if not _is_safe_relative_path(rel):
+                continue
+            parts = Path(rel).parts
+            if parts and parts[0] == SAVED_RECORDINGS_DIRNAME:
+                saved_candidates.append(saved_recordings_root.joinpath(*parts[1:]))
+            else:
+                recent_candidates.append(recordings_root.joinpath(*parts))
+        entries: list[dict[str, object]] = []
+        if recent_candidates:
+            entries.extend(
+                _scan_recordings_worker(
+                    recordings_root,
+                    allowed_ext,
+                    skip_top_level=(SAVED_RECORDINGS_DIRNAME,),
+                    collection_label="recent",
+                    candidates=recent_candidates,
+                )[0]
+            )
+        if saved_candidates:
+            entries.extend(
+                _scan_recordings_worker(
+                    saved_recordings_root,
+                    allowed_ext,
+                    path_prefix=(SAVED_RECORDINGS_DIRNAME,),
+                    collection_label="saved",
+                    candidates=saved_candidates,
+                )[0]
+            )
+
+        undo_tokens = _collect_clip_undo_tokens() if entries else {}
+        added: list[dict[str, object]] = []
+        updated: list[dict[str, object]] = []
+        present: set[str] = set()
+        for entry in entries:
+            item = _serialize_recording(entry, undo_tokens)
+            path = str(item["path"])
+            present.add(path)
+            if net_changes.get(path) == CHANGE_ADDED:
+                added.append(item)
+            else:
+                updated.append(item)
+        # Additions that are not listable yet (for example a finalized event
+        # whose encode is still running) are reported once they appear.
+        removed: list[str] = []
+        discarded: list[str] = []
+        for path, kind in sorted(net_changes.items()):
+            if path in present or kind == CHANGE_ADDED:
+                continue
+            (discarded if kind == CHANGE_DISCARDED else removed).append(path)
+        return added, updated, removed, discarded
+
+    async def recordings_changes_api(request: web.Request) -> web.Response:
+        query = request.rel_url.query
+        try:
+            since = int(query.get("since", ""))
+        except ValueError as exc:
+            raise web.HTTPBadRequest(reason="since must be an integer") from exc
+        epoch = query.get("epoch") or None
+
+        window = recordings_changes.since(since, epoch)
+        payload: dict[str, object] = {
+            "epoch": window.epoch,
+            "seq": window.seq,
+            "reset": window.reset,
+            "added": [],
+            "updated": [],
+            "removed": [],
+            "discarded": [],
+            "saved_prefix": CHANGES_SAVED_PREFIX,
+        }
+        if not window.reset and window.changes:
+            loop = asyncio.get_running_loop()
+            added, updated, removed, discarded = await loop.run_in_executor(
+                None,
+                functools.partial(
+                    _build_recording_changes_sync, collapse_changes(window.changes)
+                ),
+            )
+            payload["added"] = added
+            payload["updated"] = updated
+            payload["removed"] = removed
+            payload["discarded"] = discarded
+        if not window.reset and window.seq > since:
+            # Deletions, restores and purges all move files through the
+            # recycle bin, which is small enough to recount.
+            recycle_root = request.app.get(
+                RECYCLE_BIN_ROOT_KEY, recordings_root / RECYCLE_BIN_DIRNAME
+            )
+            loop = asyncio.get_running_loop()
+            payload["recycle_bin_count"] = int(
+                await loop.run_in_executor(
+                    None, functools.partial(_count_recycle_bin_entries, recycle_root)
+                )
+            )
+            payload["recycle_bin_total_bytes"] = int(
+                await loop.run_in_executor(
+                    None, functools.partial(_calculate_recycle_bin_usage, recycle_root)
+                )
+            )
+
+        try:
+            usage = shutil.disk_usage(recordings_root)
+        except (FileNotFoundError, PermissionError, OSError):
+            usage = None
+        if usage is not None:
+            payload["storage_total_bytes"] = int(usage.total)
+            payload["storage_used_bytes"] = int(usage.used)
+            payload["storage_free_bytes"] = int(usage.free)
         payload["capture_status"] = _read_capture_status()
         payload["motion_state"] = _motion_state_snapshot()
-        return web.json_response(payload)
+        return web.json_response(payload, headers={"Cache-Control": "no-store"})
+
+    async def sync_manifest_api(request: web.Request) -> web.Response:
+        if not sync_manifest_enabled:
+            raise web.HTTPNotFound()
+        query = request.rel_url.query
+        try:
+            cursor = int(query.get("cursor", "0") or 0)
+            limit = int(query.get("limit", sync_page_size) or sync_page_size)
+        except ValueError as exc:
+            raise web.HTTPBadRequest(reason="cursor and limit must be integers") from exc
+        if cursor < 0 or limit < 1:
+            raise web.HTTPBadRequest(reason="cursor must be >= 0 and limit >= 1")
+        epoch = query.get("epoch") or None
+
+        building = _request_sync_refresh()
+        try:
+            loop = asyncio.get_running_loop()
+            page = await loop.run_in_executor(
+                storage_executor,
+                functools.partial(
+                    sync_manifest.page,
+                    cursor,
+                    limit=min(limit, sync_page_size),
+                    epoch=epoch,
+                ),
+            )
+        except sqlite3.Error as exc:
+            log.warning("sync manifest unavailable: %s", exc)
+            raise web.HTTPServiceUnavailable(reason="sync manifest unavailable") from exc
+
+        payload = page.as_dict()
+        payload["building"] = building
+        payload["files_url"] = "/recordings/"
+        return web.json_response(payload, headers={"Cache-Control": "no-store"})
 
     async def integrations_api(request: web.Request) -> web.Response:
         raw_motion = request.rel_url.query.get("motion")
@@ -6250,20 +7236,12 @@ def build_app(lets_encrypt_manager: LetsEncryptManager | None = None) -> web.App
         payload["ok"] = True
         return web.json_response(payload)
 
-    async def recordings_delete(request: web.Request) -> web.Response:
-        try:
-            data = await request.json()
-        except Exception as exc:
-            raise web.HTTPBadRequest(reason=f"Invalid JSON: {exc}") from exc
-
-        items = data.get("items")
-        if not isinstance(items, list):
-            raise web.HTTPBadRequest(reason="'items' must be a list")
-
+    def _delete_recordings_batch(recycle_root: Path, items: Sequence[object]) -> BulkBatch:
         deleted: list[str] = []
         errors: list[dict[str, str]] = []
+        indexed: list[tuple[dict[str, object], Path]] = []
+        touched: set[Path] = {recycle_root}
         root_resolved = recordings_root_resolved
-        recycle_root = request.app.get(RECYCLE_BIN_ROOT_KEY, recordings_root / RECYCLE_BIN_DIRNAME)
         recycle_root_resolved: Path | None = None
         try:
             recycle_root.mkdir(parents=True, exist_ok=True)
@@ -6484,6 +7462,8 @@ def build_app(lets_encrypt_manager: LetsEncryptManager | None = None) -> web.App
                 with metadata_path.open("w", encoding="utf-8") as handle:
                     json.dump(metadata, handle)
 
+                indexed.append((metadata, entry_dir))
+                touched.update((entry_dir, resolved.parent))
                 deleted.append(rel_posix)
             except Exception as exc:
                 errors.append({"item": rel, "error": str(exc)})
@@ -6541,26 +7521,38 @@ def build_app(lets_encrypt_manager: LetsEncryptManager | None = None) -> web.App
                     break
                 break
 
+        return BulkBatch(
+            {"deleted": deleted, "errors": errors},
+            touched=touched,
+            extra={"indexed": indexed},
+        )
+
+    def _commit_deleted_recordings(recycle_root: Path, batch: BulkBatch) -> None:
+        _update_recycle_index(recycle_root, added=batch.extra.get("indexed", ()))
+        deleted = batch.payload["deleted"]
         if deleted:
             _emit_recordings_changed(
                 "deleted",
                 paths=deleted,
                 count=len(deleted),
             )
-        return web.json_response({"deleted": deleted, "errors": errors})
-
-    async def recordings_save(request: web.Request) -> web.Response:
-        try:
-            data = await request.json()
-        except Exception as exc:
-            raise web.HTTPBadRequest(reason=f"Invalid JSON: {exc}") from exc
 
-        items = data.get("items")
-        if not isinstance(items, list):
-            raise web.HTTPBadRequest(reason="'items' must be a list")
+    async def recordings_delete(request: web.Request) -> web.Response:
+        data, items = await _read_bulk_request(request)
+        recycle_root = request.app.get(RECYCLE_BIN_ROOT_KEY, recordings_root / RECYCLE_BIN_DIRNAME)
+        operation = BulkOperation(
+            kind="delete",
+            items=items,
+            process=functools.partial(_delete_recordings_batch, recycle_root),
+            commit=functools.partial(_commit_deleted_recordings, recycle_root),
+            initial_result={"deleted": [], "errors": []},
+        )
+        return await _run_bulk_operation(data, operation)
 
+    def _save_recordings_batch(items: Sequence[object]) -> BulkBatch:
         saved: list[str] = []
         errors: list[dict[str, str]] = []
+        touched: set[Path] = set()
 
         for raw in items:
             if not isinstance(raw, str) or not raw.strip():
@@ -6648,6 +7640,7 @@ def build_app(lets_encrypt_manager: LetsEncryptManager | None = None) -> web.App
                 except Exception:
                     rel_saved = target.relative_to(recordings_root).as_posix()
                 saved.append(rel_saved)
+                touched.update((target.parent, source_parent))
             except Exception as exc:
                 errors.append({"item": rel, "error": str(exc)})
                 for dest, original in reversed(moved_pairs):
@@ -6679,26 +7672,32 @@ def build_app(lets_encrypt_manager: LetsEncryptManager | None = None) -> web.App
                     break
                 break
 
+        return BulkBatch({"saved": saved, "errors": errors}, touched=touched)
+
+    def _commit_saved_recordings(batch: BulkBatch) -> None:
+        saved = batch.payload["saved"]
         if saved:
             _emit_recordings_changed(
                 "saved",
                 paths=saved,
                 count=len(saved),
             )
-        return web.json_response({"saved": saved, "errors": errors})
-
-    async def recordings_unsave(request: web.Request) -> web.Response:
-        try:
-            data = await request.json()
-        except Exception as exc:
-            raise web.HTTPBadRequest(reason=f"Invalid JSON: {exc}") from exc
 
-        items = data.get("items")
-        if not isinstance(items, list):
-            raise web.HTTPBadRequest(reason="'items' must be a list")
+    async def recordings_save(request: web.Request) -> web.Response:
+        data, items = await _read_bulk_request(request)
+        operation = BulkOperation(
+            kind="save",
+            items=items,
+            process=_save_recordings_batch,
+            commit=_commit_saved_recordings,
+            initial_result={"saved": [], "errors": []},
+        )
+        return await _run_bulk_operation(data, operation)
 
+    def _unsave_recordings_batch(items: Sequence[object]) -> BulkBatch:
         unsaved: list[str] = []
         errors: list[dict[str, str]] = []
+        touched: set[Path] = set()
 
         for raw in items:
             if not isinstance(raw, str) or not raw.strip():
@@ -6784,6 +7783,7 @@ def build_app(lets_encrypt_manager: LetsEncryptManager | None = None) -> web.App
                 except Exception:
                     rel_unsaved = target.relative_to(recordings_root).as_posix()
                 unsaved.append(rel_unsaved)
+                touched.update((target.parent, source_parent))
             except Exception as exc:
                 errors.append({"item": rel, "error": str(exc)})
                 for dest, original in reversed(moved_pairs):
@@ -6815,17 +7815,51 @@ def build_app(lets_encrypt_manager: LetsEncryptManager | None = None) -> web.App
                     break
                 break
 
+        return BulkBatch({"unsaved": unsaved, "errors": errors}, touched=touched)
+
+    def _commit_unsaved_recordings(batch: BulkBatch) -> None:
+        unsaved = batch.payload["unsaved"]
         if unsaved:
             _emit_recordings_changed(
                 "unsaved",
                 paths=unsaved,
                 count=len(unsaved),
             )
-        return web.json_response({"unsaved": unsaved, "errors": errors})
 
-    async def recycle_bin_list(request: web.Request) -> web.Response:
-        recycle_root = request.app.get(RECYCLE_BIN_ROOT_KEY, recordings_root / RECYCLE_BIN_DIRNAME)
-        entries: list[dict[str, object]] = []
+    async def recordings_unsave(request: web.Request) -> web.Response:
+        data, items = await _read_bulk_request(request)
+        operation = BulkOperation(
+            kind="unsave",
+            items=items,
+            process=_unsave_recordings_batch,
+            commit=_commit_unsaved_recordings,
+            initial_result={"unsaved": [], "errors": []},
+        )
+        return await _run_bulk_operation(data, operation)
+
+    def _recycle_bin_page(
+        recycle_root: Path, offset: int, limit: int | None
+    ) -> tuple[list[dict[str, object]], int]:
+        try:
+            index = _synced_recycle_index(recycle_root)
+            stats = index.stats()
+            rows = index.page(offset=offset, limit=limit)
+        except (OSError, sqlite3.Error) as exc:
+            log.warning("recycle bin index unavailable, scanning entries: %s", exc)
+        else:
+            page: list[dict[str, object]] = []
+            for metadata in rows:
+                entry_id = str(metadata.get("id") or "")
+                if not RECYCLE_ID_PATTERN.match(entry_id):
+                    continue
+                data = _recycle_entry_from_metadata(
+                    recycle_root / entry_id, metadata, verify_files=False
+                )
+                if data:
+                    page.append(data)
+            return page, stats.count
+
+        scanned: list[dict[str, object]] = []
         if recycle_root.exists():
             try:
                 candidates = list(recycle_root.iterdir())
@@ -6833,111 +7867,152 @@ def build_app(lets_encrypt_manager: LetsEncryptManager | None = None) -> web.App
                 candidates = []
             for entry_dir in candidates:
                 data = _read_recycle_entry(entry_dir)
-                if not data:
-                    continue
+                if data:
+                    scanned.append(data)
+        scanned.sort(
+            key=lambda item: (
+                float(item["deleted_at_epoch"]) if item.get("deleted_at_epoch") else 0.0
+            ),
+            reverse=True,
+        )
+        end = None if limit is None else offset + limit
+        return scanned[offset:end], len(scanned)
 
-                entry_id = str(data.get("id", ""))
-                original_rel = str(data.get("original_path", ""))
-                stored_name = str(data.get("stored_name", ""))
-                name = Path(stored_name).stem if stored_name else stored_name
-                extension = Path(stored_name).suffix.lstrip(".") if stored_name else ""
+    async def recycle_bin_list(request: web.Request) -> web.Response:
+        recycle_root = request.app.get(RECYCLE_BIN_ROOT_KEY, recordings_root / RECYCLE_BIN_DIRNAME)
+        loop = asyncio.get_running_loop()
+        signature = await loop.run_in_executor(
+            None, functools.partial(_recycle_bin_signature, recycle_root)
+        )
+        etag = resource_generations.etag(
+            RECYCLE_BIN_RESOURCE,
+            resource_generations.current(RECORDINGS_RESOURCE),
+            request.rel_url.query_string,
+            signature,
+        )
+        not_modified = _not_modified_response(request, etag)
+        if not_modified is not None:
+            return not_modified
 
-                restorable = False
-                if original_rel and _is_safe_relative_path(original_rel):
-                    candidate = recordings_root / original_rel
-                    try:
-                        resolved_target = candidate.resolve(strict=False)
-                    except FileNotFoundError:
-                        resolved_target = candidate
-                    try:
-                        resolved_target.relative_to(recordings_root_resolved)
-                    except ValueError:
-                        restorable = False
-                    else:
-                        restorable = not candidate.exists()
+        query = request.rel_url.query
+        limit: int | None = None
+        if "limit" in query:
+            try:
+                limit = max(1, min(MAX_RECORDINGS_LIMIT, int(query["limit"])))
+            except ValueError:
+                limit = None
+        try:
+            offset = max(0, int(query.get("offset", "0")))
+        except ValueError:
+            offset = 0
 
-                deleted_epoch = data.get("deleted_at_epoch")
-                if isinstance(deleted_epoch, (int, float)):
-                    deleted_epoch_value = float(deleted_epoch)
-                else:
-                    deleted_epoch_value = None
+        page, total = await loop.run_in_executor(
+            None, functools.partial(_recycle_bin_page, recycle_root, offset, limit)
+        )
+        entries: list[dict[str, object]] = []
+        for data in page:
+            entry_id = str(data.get("id", ""))
+            original_rel = str(data.get("original_path", ""))
+            stored_name = str(data.get("stored_name", ""))
+            name = Path(stored_name).stem if stored_name else stored_name
+            extension = Path(stored_name).suffix.lstrip(".") if stored_name else ""
 
-                start_epoch_raw = data.get("start_epoch")
-                if isinstance(start_epoch_raw, (int, float)):
-                    start_epoch_value = float(start_epoch_raw)
+            restorable = False
+            if original_rel and _is_safe_relative_path(original_rel):
+                candidate = recordings_root / original_rel
+                try:
+                    resolved_target = candidate.resolve(strict=False)
+                except FileNotFoundError:
+                    resolved_target = candidate
+                try:
+                    resolved_target.relative_to(recordings_root_resolved)
+                except ValueError:
+                    restorable = False
                 else:
-                    start_epoch_value = None
+                    restorable = not candidate.exists()
 
-                started_at_raw = data.get("started_at")
-                started_at_value = (
-                    str(started_at_raw)
-                    if isinstance(started_at_raw, str)
-                    else ""
-                )
+            deleted_epoch = data.get("deleted_at_epoch")
+            if isinstance(deleted_epoch, (int, float)):
+                deleted_epoch_value = float(deleted_epoch)
+            else:
+                deleted_epoch_value = None
 
-                size_value = data.get("size_bytes", 0)
-                try:
-                    size_int = int(size_value)
-                except (TypeError, ValueError):
+            start_epoch_raw = data.get("start_epoch")
+            if isinstance(start_epoch_raw, (int, float)):
+                start_epoch_value = float(start_epoch_raw)
+            else:
+                start_epoch_value = None
+
+            started_at_raw = data.get("started_at")
+            started_at_value = (
+                str(started_at_raw)
+                if isinstance(started_at_raw, str)
+                else ""
+            )
+
+            size_value = data.get("size_bytes", 0)
+            try:
+                size_int = int(size_value)
+            except (TypeError, ValueError):
+                size_int = 0
+            else:
+                if size_int < 0:
                     size_int = 0
-                else:
-                    if size_int < 0:
-                        size_int = 0
-                reason_value = ""
-                raw_reason = data.get("reason")
-                if isinstance(raw_reason, str):
-                    reason_value = raw_reason.strip()
-
-                raw_audio_available = bool(data.get("raw_audio_bin_path"))
-                raw_audio_name = str(data.get("raw_audio_name") or "")
-                entries.append(
-                    {
-                        "id": entry_id,
-                        "name": name,
-                        "extension": extension,
-                        "original_path": original_rel,
-                        "day": str(data.get("day", "")),
-                        "deleted_at": str(data.get("deleted_at", "")),
-                        "deleted_at_epoch": deleted_epoch_value,
-                        "start_epoch": start_epoch_value,
-                        "started_epoch": start_epoch_value,
-                        "started_at": started_at_value,
-                        "size_bytes": size_int,
-                        "duration_seconds": (
-                            float(data.get("duration"))
-                            if isinstance(data.get("duration"), (int, float))
-                            else None
-                        ),
-                        "motion_trigger_offset_seconds": (
-                            float(data.get("motion_trigger_offset_seconds"))
-                            if isinstance(data.get("motion_trigger_offset_seconds"), (int, float))
-                            else None
-                        ),
-                        "motion_release_offset_seconds": (
-                            float(data.get("motion_release_offset_seconds"))
-                            if isinstance(data.get("motion_release_offset_seconds"), (int, float))
-                            else None
-                        ),
-                        "motion_started_epoch": (
-                            float(data.get("motion_started_epoch"))
-                            if isinstance(data.get("motion_started_epoch"), (int, float))
-                            else None
-                        ),
-                        "motion_released_epoch": (
-                            float(data.get("motion_released_epoch"))
-                            if isinstance(data.get("motion_released_epoch"), (int, float))
-                            else None
-                        ),
-                        "motion_segments": _normalize_motion_segments(
-                            data.get("motion_segments")
-                        ),
-                        "restorable": restorable,
-                        "waveform_available": bool(data.get("waveform_name")),
-                        "raw_audio_available": raw_audio_available,
-                        "raw_audio_name": raw_audio_name,
-                        "reason": reason_value,
-                    }
-                )
+            reason_value = ""
+            raw_reason = data.get("reason")
+            if isinstance(raw_reason, str):
+                reason_value = raw_reason.strip()
+
+            raw_audio_available = bool(data.get("raw_audio_bin_path"))
+            raw_audio_name = str(data.get("raw_audio_name") or "")
+            entries.append(
+                {
+                    "id": entry_id,
+                    "name": name,
+                    "extension": extension,
+                    "original_path": original_rel,
+                    "day": str(data.get("day", "")),
+                    "deleted_at": str(data.get("deleted_at", "")),
+                    "deleted_at_epoch": deleted_epoch_value,
+                    "start_epoch": start_epoch_value,
+                    "started_epoch": start_epoch_value,
+                    "started_at": started_at_value,
+                    "size_bytes": size_int,
+                    "duration_seconds": (
+                        float(data.get("duration"))
+                        if isinstance(data.get("duration"), (int, float))
+                        else None
+                    ),
+                    "motion_trigger_offset_seconds": (
+                        float(data.get("motion_trigger_offset_seconds"))
+                        if isinstance(data.get("motion_trigger_offset_seconds"), (int, float))
+                        else None
+                    ),
+                    "motion_release_offset_seconds": (
+                        float(data.get("motion_release_offset_seconds"))
+                        if isinstance(data.get("motion_release_offset_seconds"), (int, float))
+                        else None
+                    ),
+                    "motion_started_epoch": (
+                        float(data.get("motion_started_epoch"))
+                        if isinstance(data.get("motion_started_epoch"), (int, float))
+                        else None
+                    ),
+                    "motion_released_epoch": (
+                        float(data.get("motion_released_epoch"))
+                        if isinstance(data.get("motion_released_epoch"), (int, float))
+                        else None
+                    ),
+                    "motion_segments": _normalize_motion_segments(
+                        data.get("motion_segments")
+                    ),
+                    "restorable": restorable,
+                    "waveform_available": bool(data.get("waveform_name")),
+                    "raw_audio_available": raw_audio_available,
+                    "raw_audio_name": raw_audio_name,
+                    "reason": reason_value,
+                }
+            )
 
         entries.sort(
             key=lambda item: (
@@ -6945,21 +8020,17 @@ def build_app(lets_encrypt_manager: LetsEncryptManager | None = None) -> web.App
             ),
             reverse=True,
         )
-        return web.json_response({"items": entries, "total": len(entries)})
-
-    async def recycle_bin_restore(request: web.Request) -> web.Response:
-        try:
-            data = await request.json()
-        except Exception as exc:
-            raise web.HTTPBadRequest(reason=f"Invalid JSON: {exc}") from exc
+        payload: dict[str, object] = {"items": entries, "total": total}
+        if limit is not None or offset:
+            payload["offset"] = offset
+            payload["limit"] = limit
+        return web.json_response(payload, headers=_validator_headers(etag))
 
-        items = data.get("items")
-        if not isinstance(items, list):
-            raise web.HTTPBadRequest(reason="'items' must be a list")
-
-        recycle_root = request.app.get(RECYCLE_BIN_ROOT_KEY, recordings_root / RECYCLE_BIN_DIRNAME)
+    def _restore_recycle_batch(recycle_root: Path, items: Sequence[object]) -> BulkBatch:
         restored: list[str] = []
+        restored_ids: list[str] = []
         errors: list[dict[str, str]] = []
+        touched: set[Path] = {recycle_root}
 
         if not recycle_root.exists():
             recycle_root_exists = False
@@ -7147,60 +8218,48 @@ def build_app(lets_encrypt_manager: LetsEncryptManager | None = None) -> web.App
                 pass
 
             restored.append(original_rel)
+            restored_ids.append(entry_id)
+            touched.add(target_path.parent)
             for message in sidecar_errors:
                 errors.append({"item": entry_id, "error": message})
 
+        return BulkBatch(
+            {"restored": restored, "errors": errors},
+            touched=touched,
+            extra={"entry_ids": restored_ids},
+        )
+
+    def _commit_restored_entries(recycle_root: Path, batch: BulkBatch) -> None:
+        restored_ids = batch.extra.get("entry_ids") or []
+        if restored_ids:
+            _update_recycle_index(recycle_root, removed=restored_ids)
+        restored = batch.payload["restored"]
         if restored:
             _emit_recordings_changed(
                 "restored",
                 paths=restored,
                 count=len(restored),
             )
-        return web.json_response({"restored": restored, "errors": errors})
-
-    async def recycle_bin_purge(request: web.Request) -> web.Response:
-        try:
-            data = await request.json()
-        except Exception as exc:
-            raise web.HTTPBadRequest(reason=f"Invalid JSON: {exc}") from exc
 
+    async def recycle_bin_restore(request: web.Request) -> web.Response:
+        data, items = await _read_bulk_request(request)
         recycle_root = request.app.get(RECYCLE_BIN_ROOT_KEY, recordings_root / RECYCLE_BIN_DIRNAME)
+        operation = BulkOperation(
+            kind="restore",
+            items=items,
+            process=functools.partial(_restore_recycle_batch, recycle_root),
+            commit=functools.partial(_commit_restored_entries, recycle_root),
+            initial_result={"restored": [], "errors": []},
+        )
+        return await _run_bulk_operation(data, operation)
+
+    def _select_purge_targets(
+        recycle_root: Path,
+        requested_ids: Collection[str],
+        delete_all: bool,
+        age_cutoff: float | None,
+    ) -> tuple[list[tuple[str, dict[str, object]]], list[dict[str, str]]]:
         errors: list[dict[str, str]] = []
-        items_value = data.get("items")
-        requested_ids: set[str] = set()
-
-        if items_value is not None:
-            if not isinstance(items_value, list):
-                raise web.HTTPBadRequest(reason="'items' must be a list")
-            for raw in items_value:
-                if not isinstance(raw, str) or not raw.strip():
-                    errors.append({"item": str(raw), "error": "invalid entry id"})
-                    continue
-                entry_id = raw.strip()
-                if not RECYCLE_ID_PATTERN.match(entry_id):
-                    errors.append({"item": entry_id, "error": "invalid entry id"})
-                    continue
-                requested_ids.add(entry_id)
-
-        delete_all = bool(data.get("delete_all"))
-
-        older_than_seconds_raw = data.get("older_than_seconds")
-        age_cutoff: float | None = None
-        older_than_seconds: float | None = None
-        if older_than_seconds_raw is not None:
-            try:
-                older_than_seconds = float(older_than_seconds_raw)
-            except (TypeError, ValueError):
-                errors.append({"item": "older_than_seconds", "error": "invalid age"})
-            else:
-                if older_than_seconds < 0:
-                    errors.append({"item": "older_than_seconds", "error": "age must be non-negative"})
-                else:
-                    age_cutoff = time.time() - older_than_seconds
-
-        if items_value is None and not delete_all and age_cutoff is None:
-            raise web.HTTPBadRequest(reason="No purge criteria provided")
-
         entries_by_id: dict[str, dict[str, object]] = {}
         orphan_entries: dict[str, dict[str, object]] = {}
         if recycle_root.exists():
@@ -7260,9 +8319,14 @@ def build_app(lets_encrypt_manager: LetsEncryptManager | None = None) -> web.App
                 continue
             targets.setdefault(entry_id, entry_data)
 
+        return sorted(targets.items()), errors
+
+    def _purge_recycle_batch(
+        recycle_root: Path, items: Sequence[tuple[str, dict[str, object]]]
+    ) -> BulkBatch:
         purged: list[str] = []
-        for entry_id in sorted(targets):
-            entry_data = targets[entry_id]
+        errors: list[dict[str, str]] = []
+        for entry_id, entry_data in items:
             entry_dir = entry_data.get("dir")
             if not isinstance(entry_dir, Path):
                 errors.append({"item": entry_id, "error": "entry directory unavailable"})
@@ -7288,20 +8352,89 @@ def build_app(lets_encrypt_manager: LetsEncryptManager | None = None) -> web.App
             except OSError:
                 pass
 
-        if purged:
-            extra: dict[str, object] = {
-                "entries": purged,
-                "count": len(purged),
-            }
-            if delete_all:
-                extra["delete_all"] = True
-            if older_than_seconds is not None:
-                extra["older_than_seconds"] = older_than_seconds
-            if requested_ids:
-                extra["entry_ids"] = sorted(requested_ids)
-            _emit_recordings_changed("recycle_purged", **extra)
+        return BulkBatch({"purged": purged, "errors": errors}, touched={recycle_root.parent})
 
-        return web.json_response({"purged": purged, "errors": errors})
+    def _commit_purged_entries(
+        recycle_root: Path, event_extra: dict[str, object], batch: BulkBatch
+    ) -> None:
+        purged = batch.payload["purged"]
+        if not purged:
+            return
+        _update_recycle_index(recycle_root, removed=purged)
+        extra: dict[str, object] = {
+            "entries": purged,
+            "count": len(purged),
+        }
+        extra.update(event_extra)
+        _emit_recordings_changed("recycle_purged", **extra)
+
+    async def recycle_bin_purge(request: web.Request) -> web.Response:
+        try:
+            data = await request.json()
+        except Exception as exc:
+            raise web.HTTPBadRequest(reason=f"Invalid JSON: {exc}") from exc
+
+        recycle_root = request.app.get(RECYCLE_BIN_ROOT_KEY, recordings_root / RECYCLE_BIN_DIRNAME)
+        errors: list[dict[str, str]] = []
+        items_value = data.get("items")
+        requested_ids: set[str] = set()
+
+        if items_value is not None:
+            if not isinstance(items_value, list):
+                raise web.HTTPBadRequest(reason="'items' must be a list")
+            for raw in items_value:
+                if not isinstance(raw, str) or not raw.strip():
+                    errors.append({"item": str(raw), "error": "invalid entry id"})
+                    continue
+                entry_id = raw.strip()
+                if not RECYCLE_ID_PATTERN.match(entry_id):
+                    errors.append({"item": entry_id, "error": "invalid entry id"})
+                    continue
+                requested_ids.add(entry_id)
+
+        delete_all = bool(data.get("delete_all"))
+
+        older_than_seconds_raw = data.get("older_than_seconds")
+        age_cutoff: float | None = None
+        older_than_seconds: float | None = None
+        if older_than_seconds_raw is not None:
+            try:
+                older_than_seconds = float(older_than_seconds_raw)
+            except (TypeError, ValueError):
+                errors.append({"item": "older_than_seconds", "error": "invalid age"})
+            else:
+                if older_than_seconds < 0:
+                    errors.append({"item": "older_than_seconds", "error": "age must be non-negative"})
+                else:
+                    age_cutoff = time.time() - older_than_seconds
+
+        if items_value is None and not delete_all and age_cutoff is None:
+            raise web.HTTPBadRequest(reason="No purge criteria provided")
+
+        loop = asyncio.get_running_loop()
+        targets, target_errors = await loop.run_in_executor(
+            None,
+            functools.partial(
+                _select_purge_targets, recycle_root, requested_ids, delete_all, age_cutoff
+            ),
+        )
+        errors.extend(target_errors)
+
+        event_extra: dict[str, object] = {}
+        if delete_all:
+            event_extra["delete_all"] = True
+        if older_than_seconds is not None:
+            event_extra["older_than_seconds"] = older_than_seconds
+        if requested_ids:
+            event_extra["entry_ids"] = sorted(requested_ids)
+        operation = BulkOperation(
+            kind="purge",
+            items=targets,
+            process=functools.partial(_purge_recycle_batch, recycle_root),
+            commit=functools.partial(_commit_purged_entries, recycle_root, event_extra),
+            initial_result={"purged": [], "errors": errors},
+        )
+        return await _run_bulk_operation(data, operation)
 
     async def recycle_bin_file(request: web.Request) -> web.StreamResponse:
         entry_id = request.match_info.get("entry_id", "").strip()
@@ -7560,55 +8693,59 @@ def build_app(lets_encrypt_manager: LetsEncryptManager | None = None) -> web.App
         timestamp = datetime.now(timezone.utc).strftime("%Y%m%d-%H%M%S")
         archive_name = f"tricorder-recordings-{timestamp}.zip"
 
-        tmp_dir = Path(tmp_root)
-        try:
-            tmp_dir.mkdir(parents=True, exist_ok=True)
-        except Exception:
-            tmp_dir = Path(tempfile.gettempdir())
-
-        temp_file = tempfile.NamedTemporaryFile(delete=False, suffix=".zip", dir=tmp_dir)
-        archive_path = Path(temp_file.name)
-        temp_file.close()
+        members: list[tuple[Path, str]] = []
+        for rel, resolved in selected.items():
+            arcname = Path(rel).as_posix()
+            members.append((resolved, arcname))
+            for suffix in (".waveform.json", ".transcript.json"):
+                members.append(
+                    (resolved.with_suffix(resolved.suffix + suffix), f"{arcname}{suffix}")
+                )
 
-        try:
-            with zipfile.ZipFile(archive_path, "w", compression=zipfile.ZIP_DEFLATED) as archive:
-                for rel, resolved in selected.items():
-                    arcname = Path(rel).as_posix()
-                    try:
-                        archive.write(resolved, arcname=arcname)
-                    except FileNotFoundError:
-                        continue
-                    for suffix in (".waveform.json", ".transcript.json"):
-                        sidecar = resolved.with_suffix(resolved.suffix + suffix)
-                        if sidecar.is_file():
-                            try:
-                                archive.write(sidecar, arcname=f"{arcname}{suffix}")
-                            except FileNotFoundError:
-                                pass
-
-            response = web.StreamResponse(
-                status=200,
-                headers={
-                    "Content-Type": "application/zip",
-                    "Content-Disposition": f'attachment; filename="{archive_name}"',
-                },
-            )
-            await response.prepare(request)
-            with archive_path.open("rb") as handle:
+        # Opus and the JSON sidecars gain little from deflate, so members are
+        # stored as-is and streamed straight from disk: the first byte goes out
+        # immediately, memory stays constant and no temporary archive is
+        # written to the SD card.
+        response = web.StreamResponse(
+            status=200,
+            headers={
+                "Content-Type": "application/zip",
+                "Content-Disposition": f'attachment; filename="{archive_name}"',
+            },
+        )
+        await response.prepare(request)
+        writer = ZipStreamWriter()
+        for path, arcname in members:
+            try:
+                handle = path.open("rb")
+            except FileNotFoundError:
+                continue
+            except OSError as exc:
+                # Unreadable, replaced mid-download (retention, tiering) or not
+                # a regular file: skip the member instead of truncating the ZIP.
+                logging.getLogger("web_streamer").warning(
+                    "bulk download: skipping %s: %s", arcname, exc
+                )
+                continue
+            with handle:
+                stat = os.fstat(handle.fileno())
+                await response.write(
+                    writer.start_member(
+                        arcname,
+                        mtime=stat.st_mtime,
+                        size_hint=stat.st_size,
+                        mode=stat.st_mode,
+                    )
+                )
                 while True:
-                    chunk = handle.read(64 * 1024)
+                    chunk = handle.read(BULK_DOWNLOAD_CHUNK_BYTES)
                     if not chunk:
                         break
-                    await response.write(chunk)
-            await response.write_eof()
-            return response
-        except Exception as exc:
-            raise web.HTTPInternalServerError(reason=str(exc)) from exc
-        finally:
-            try:
-                archive_path.unlink()
-            except Exception:
-                pass
+                    await response.write(writer.feed(chunk))
+                await response.write(writer.end_member())
+        await response.write(writer.finish())
+        await response.write_eof()
+        return response
 
     async def recordings_clip(request: web.Request) -> web.Response:
         try:
@@ -7639,38 +8776,60 @@ def build_app(lets_encrypt_manager: LetsEncryptManager | None = None) -> web.App
             else None
         )
 
-        loop = asyncio.get_running_loop()
-        clip_executor = request.app.get(CLIP_EXECUTOR_KEY)
-        executor = clip_executor if isinstance(clip_executor, ThreadPoolExecutor) else None
+        clip_request = ClipRequest(
+            source_path=source_path,
+            start_seconds=start_value,
+            end_seconds=end_value,
+            clip_name=clip_name,
+            source_start_epoch=source_start_epoch,
+            allow_overwrite=_to_bool(data.get("allow_overwrite"), True),
+            overwrite_existing=overwrite_existing,
+        )
         try:
-            allow_overwrite = _to_bool(data.get("allow_overwrite"), True)
-            payload = await loop.run_in_executor(
-                executor,
-                functools.partial(
-                    _create_clip_sync,
-                    source_path,
-                    start_value,
-                    end_value,
-                    clip_name,
-                    source_start_epoch,
-                    allow_overwrite,
-                    overwrite_existing,
-                ),
-            )
+            job, deduplicated = clip_jobs.submit(clip_request)
+        except ClipQueueFull as exc:
+            raise web.HTTPTooManyRequests(reason=str(exc)) from exc
+
+        # ``wait: false`` returns the job immediately; progress and completion
+        # arrive as ``clip_job`` dashboard events (or via the job endpoint).
+        if not _to_bool(data.get("wait"), True):
+            job_payload = job.to_payload()
+            job_payload["deduplicated"] = deduplicated
+            return web.json_response(job_payload, status=202)
+
+        try:
+            payload = await clip_jobs.wait(job)
         except ClipError as exc:
             raise web.HTTPBadRequest(reason=str(exc)) from exc
         except Exception as exc:  # pragma: no cover - unexpected failures
-            log.exception("Unexpected error while creating clip for %s", source_path)
             raise web.HTTPInternalServerError(reason="unable to create clip") from exc
 
-        clip_path = payload.get("path")
-        if isinstance(clip_path, str) and clip_path:
-            _emit_recordings_changed("clipped", paths=[clip_path])
-        else:
-            _emit_recordings_changed("clipped")
-
         return web.json_response(payload)
 
+    async def recordings_clip_jobs(_: web.Request) -> web.Response:
+        return web.json_response({"jobs": clip_jobs.snapshot()})
+
+    async def recordings_clip_job(request: web.Request) -> web.Response:
+        job = clip_jobs.get(request.match_info.get("job_id", ""))
+        if job is None:
+            raise web.HTTPNotFound(reason="unknown clip job")
+        return web.json_response(job.to_payload())
+
+    async def recordings_bulk_jobs(_: web.Request) -> web.Response:
+        return web.json_response({"jobs": bulk_jobs.snapshot()})
+
+    async def recordings_bulk_job(request: web.Request) -> web.Response:
+        job = bulk_jobs.get(request.match_info.get("job_id", ""))
+        if job is None:
+            raise web.HTTPNotFound(reason="unknown bulk job")
+        return web.json_response(job.to_payload())
+
+    async def recordings_bulk_job_cancel(request: web.Request) -> web.Response:
+        job = bulk_jobs.cancel(request.match_info.get("job_id", ""))
+        if job is None:
+            raise web.HTTPNotFound(reason="unknown bulk job")
+        return web.json_response(job.to_payload(include_result=False))
+
     async def recordings_clip_undo(request: web.Request) -> web.Response:
         try:
             data = await request.json()
@@ -7705,7 +8864,6 @@ def build_app(lets_encrypt_manager: LetsEncryptManager | None = None) -> web.App
     async def _stream_partial_file(
         request: web.Request, resolved: Path
     ) -> web.StreamResponse:
-        loop = asyncio.get_running_loop()
         deadline = time.monotonic() + STREAMING_OPEN_TIMEOUT_SECONDS
         handle: io.BufferedReader | None = None
 
@@ -7736,9 +8894,16 @@ def build_app(lets_encrypt_manager: LetsEncryptManager | None = None) -> web.App
         )
         await response.prepare(request)
 
+        # The writer appends to the file and renames it once finalized, so
+        # inotify wakes the tail on every append and on the final move.
+        # Without inotify the watch degrades to the old poll interval.
+        watch = AsyncPathWatch(resolved)
+        watch.start()
         try:
             while True:
-                chunk = await loop.run_in_executor(None, handle.read, 32768)
+                # Freshly appended data is still in the page cache, so this
+                # read does not need a trip through the executor.
+                chunk = handle.read(STREAMING_CHUNK_BYTES)
                 if chunk:
                     try:
                         await response.write(chunk)
@@ -7753,10 +8918,15 @@ def build_app(lets_encrypt_manager: LetsEncryptManager | None = None) -> web.App
 
                 if not resolved.exists():
                     break
-                await asyncio.sleep(STREAMING_POLL_INTERVAL_SECONDS)
+                await watch.wait(
+                    STREAMING_IDLE_RECHECK_SECONDS
+                    if watch.active
+                    else STREAMING_POLL_INTERVAL_SECONDS
+                )
         except asyncio.CancelledError:
             raise
         finally:
+            watch.close()
             with contextlib.suppress(Exception):
                 handle.close()
             with contextlib.suppress(Exception):
@@ -7784,6 +8954,26 @@ def build_app(lets_encrypt_manager: LetsEncryptManager | None = None) -> web.App
         )
         return response
 
+    def _recording_cache_control(request: web.Request, resolved: Path) -> str:
+        """Cache forever when the URL pins the file's current mtime.
+
+        Clips and renames replace files in place, so an unversioned URL must be
+        revalidated (FileResponse answers with a strong ETag, Last-Modified and
+        ``Range`` support). The dashboard appends ``?v=<modified>`` from the
+        listing, and a matching version makes the URL immutable.
+        """
+
+        raw_version = request.rel_url.query.get("v")
+        if raw_version:
+            try:
+                version = float(raw_version)
+                mtime = resolved.stat().st_mtime
+            except (ValueError, OSError):
+                return webui.assets.REVALIDATE_CACHE_CONTROL
+            if math.isfinite(version) and abs(version - mtime) < 0.001:
+                return RECORDING_IMMUTABLE_CACHE_CONTROL
+        return webui.assets.REVALIDATE_CACHE_CONTROL
+
     async def recordings_file(request: web.Request) -> web.StreamResponse:
         rel = request.match_info.get("path", "").strip("/")
         if not rel:
@@ -7808,25 +8998,48 @@ def build_app(lets_encrypt_manager: LetsEncryptManager | None = None) -> web.App
         if not resolved.is_file():
             raise web.HTTPNotFound()
 
-        response = web.FileResponse(resolved)
+        response = web.FileResponse(
+            resolved,
+            chunk_size=STREAMING_CHUNK_BYTES,
+            headers={"Cache-Control": _recording_cache_control(request, resolved)},
+        )
         disposition = "attachment" if request.rel_url.query.get("download") == "1" else "inline"
         response.headers["Content-Disposition"] = f'{disposition}; filename="{resolved.name}"'
-        response.headers.setdefault("Cache-Control", "no-store")
         return response
 
-    async def config_snapshot(_: web.Request) -> web.Response:
+    def _config_validators(section: str) -> tuple[str, float | None]:
+        signatures: list[object] = []
+        last_modified: float | None = None
+        for candidate in search_paths():
+            signature = file_signature(candidate)
+            signatures.append(signature)
+            if signature is not None:
+                mtime = signature[0] / 1_000_000_000
+                last_modified = mtime if last_modified is None else max(last_modified, mtime)
+        etag = resource_generations.etag(CONFIG_RESOURCE, section, tuple(signatures))
+        return etag, last_modified
+
+    async def config_snapshot(request: web.Request) -> web.Response:
+        etag, last_modified = _config_validators("snapshot")
+        not_modified = _not_modified_response(request, etag, last_modified)
+        if not_modified is not None:
+            return not_modified
         refreshed = reload_cfg()
         payload = dict(refreshed)
         try:
             payload["config_path"] = str(primary_config_path())
         except Exception:
             payload["config_path"] = None
-        return web.json_response(payload)
+        return web.json_response(payload, headers=_validator_headers(etag, last_modified))
 
-    async def config_archival_get(_: web.Request) -> web.Response:
+    async def config_archival_get(request: web.Request) -> web.Response:
+        etag, last_modified = _config_validators("archival")
+        not_modified = _not_modified_response(request, etag, last_modified)
+        if not_modified is not None:
+            return not_modified
         refreshed = reload_cfg()
         payload = _archival_response_payload(refreshed)
-        return web.json_response(payload)
+        return web.json_response(payload, headers=_validator_headers(etag, last_modified))
 
     async def config_archival_update(request: web.Request) -> web.Response:
         log = logging.getLogger("web_streamer")
@@ -7878,11 +9091,15 @@ def build_app(lets_encrypt_manager: LetsEncryptManager | None = None) -> web.App
     }
 
     async def _settings_get(
-        section: str, canonical_fn
+        request: web.Request, section: str, canonical_fn
     ) -> web.Response:
+        etag, last_modified = _config_validators(section)
+        not_modified = _not_modified_response(request, etag, last_modified)
+        if not_modified is not None:
+            return not_modified
         refreshed = reload_cfg()
         payload = _config_section_payload(section, refreshed, canonical_fn)
-        return web.json_response(payload)
+        return web.json_response(payload, headers=_validator_headers(etag, last_modified))
 
     async def _settings_update(
         request: web.Request,
@@ -7928,7 +9145,7 @@ def build_app(lets_encrypt_manager: LetsEncryptManager | None = None) -> web.App
         return web.json_response(payload)
 
     async def config_audio_get(request: web.Request) -> web.Response:
-        return await _settings_get("audio", _canonical_audio_settings)
+        return await _settings_get(request, "audio", _canonical_audio_settings)
 
     async def config_audio_update(request: web.Request) -> web.Response:
         return await _settings_update(
@@ -7941,7 +9158,7 @@ def build_app(lets_encrypt_manager: LetsEncryptManager | None = None) -> web.App
         )
 
     async def config_paths_get(request: web.Request) -> web.Response:
-        return await _settings_get("paths", _canonical_paths_settings)
+        return await _settings_get(request, "paths", _canonical_paths_settings)
 
     async def config_paths_update(request: web.Request) -> web.Response:
         return await _settings_update(
@@ -7954,7 +9171,7 @@ def build_app(lets_encrypt_manager: LetsEncryptManager | None = None) -> web.App
         )
 
     async def config_segmenter_get(request: web.Request) -> web.Response:
-        return await _settings_get("segmenter", _canonical_segmenter_settings)
+        return await _settings_get(request, "segmenter", _canonical_segmenter_settings)
 
     async def config_segmenter_update(request: web.Request) -> web.Response:
         return await _settings_update(
@@ -7967,7 +9184,7 @@ def build_app(lets_encrypt_manager: LetsEncryptManager | None = None) -> web.App
         )
 
     async def config_adaptive_rms_get(request: web.Request) -> web.Response:
-        return await _settings_get("adaptive_rms", _canonical_adaptive_rms_settings)
+        return await _settings_get(request, "adaptive_rms", _canonical_adaptive_rms_settings)
 
     async def config_adaptive_rms_update(request: web.Request) -> web.Response:
         return await _settings_update(
@@ -7980,7 +9197,7 @@ def build_app(lets_encrypt_manager: LetsEncryptManager | None = None) -> web.App
         )
 
     async def config_ingest_get(request: web.Request) -> web.Response:
-        return await _settings_get("ingest", _canonical_ingest_settings)
+        return await _settings_get(request, "ingest", _canonical_ingest_settings)
 
     async def config_ingest_update(request: web.Request) -> web.Response:
         return await _settings_update(
@@ -7993,7 +9210,7 @@ def build_app(lets_encrypt_manager: LetsEncryptManager | None = None) -> web.App
         )
 
     async def config_transcription_get(request: web.Request) -> web.Response:
-        return await _settings_get("transcription", _canonical_transcription_settings)
+        return await _settings_get(request, "transcription", _canonical_transcription_settings)
 
     async def config_transcription_update(request: web.Request) -> web.Response:
         return await _settings_update(
@@ -8010,7 +9227,7 @@ def build_app(lets_encrypt_manager: LetsEncryptManager | None = None) -> web.App
         return web.json_response(payload)
 
     async def config_logging_get(request: web.Request) -> web.Response:
-        return await _settings_get("logging", _canonical_logging_settings)
+        return await _settings_get(request, "logging", _canonical_logging_settings)
 
     async def config_logging_update(request: web.Request) -> web.Response:
         return await _settings_update(
@@ -8023,7 +9240,7 @@ def build_app(lets_encrypt_manager: LetsEncryptManager | None = None) -> web.App
         )
 
     async def config_notifications_get(request: web.Request) -> web.Response:
-        return await _settings_get("notifications", _canonical_notifications_settings)
+        return await _settings_get(request, "notifications", _canonical_notifications_settings)
 
     async def config_notifications_update(request: web.Request) -> web.Response:
         return await _settings_update(
@@ -8036,7 +9253,7 @@ def build_app(lets_encrypt_manager: LetsEncryptManager | None = None) -> web.App
         )
 
     async def config_streaming_get(request: web.Request) -> web.Response:
-        return await _settings_get("streaming", _canonical_streaming_settings)
+        return await _settings_get(request, "streaming", _canonical_streaming_settings)
 
     async def config_streaming_update(request: web.Request) -> web.Response:
         return await _settings_update(
@@ -8049,7 +9266,7 @@ def build_app(lets_encrypt_manager: LetsEncryptManager | None = None) -> web.App
         )
 
     async def config_dashboard_get(request: web.Request) -> web.Response:
-        return await _settings_get("dashboard", _canonical_dashboard_settings)
+        return await _settings_get(request, "dashboard", _canonical_dashboard_settings)
 
     async def config_dashboard_update(request: web.Request) -> web.Response:
         return await _settings_update(
@@ -8062,7 +9279,7 @@ def build_app(lets_encrypt_manager: LetsEncryptManager | None = None) -> web.App
         )
 
     async def config_web_server_get(request: web.Request) -> web.Response:
-        return await _settings_get("web_server", _canonical_web_server_settings)
+        return await _settings_get(request, "web_server", _canonical_web_server_settings)
 
     async def config_web_server_update(request: web.Request) -> web.Response:
         return await _settings_update(
@@ -8430,10 +9647,19 @@ def build_app(lets_encrypt_manager: LetsEncryptManager | None = None) -> web.App
     health_broadcaster = _SystemHealthBroadcaster()
     app["system_health_broadcaster"] = health_broadcaster
 
-    async def system_health(_: web.Request) -> web.Response:
+    async def system_health(request: web.Request) -> web.Response:
         payload = _collect_system_health_snapshot()
         health_broadcaster.note_snapshot(payload)
-        return web.json_response(payload, headers={"Cache-Control": "no-store"})
+        # Weak validator: snapshots that round to the same fingerprint are
+        # equivalent for the dashboard, matching the SSE change detection.
+        etag = resource_generations.etag(
+            "system_health", _system_health_fingerprint(payload)
+        )
+        headers = _validator_headers(etag)
+        headers["Cache-Control"] = "no-store"
+        if _request_etag_matches(request, etag):
+            return web.Response(status=304, headers=headers)
+        return web.json_response(payload, headers=headers)
 
     async def dashboard_events_stream(request: web.Request) -> web.StreamResponse:
         bus = request.app.get(EVENT_BUS_KEY)
@@ -8851,6 +10077,9 @@ def build_app(lets_encrypt_manager: LetsEncryptManager | None = None) -> web.App
     app.router.add_get("/hls", hls_index)
 
     app.router.add_get("/api/recordings", recordings_api)
+    app.router.add_get("/api/recordings/changes", recordings_changes_api)
+    app.router.add_get("/api/recordings/status", recordings_status_api)
+    app.router.add_get("/api/sync/manifest", sync_manifest_api)
     app.router.add_post("/api/recordings/delete", recordings_delete)
     app.router.add_post("/api/recordings/remove", recordings_delete)
     app.router.add_post("/api/recordings/save", recordings_save)
@@ -8859,6 +10088,11 @@ def build_app(lets_encrypt_manager: LetsEncryptManager | None = None) -> web.App
     app.router.add_post("/api/recordings/bulk-download", recordings_bulk_download)
     app.router.add_post("/api/recordings/clip", recordings_clip)
     app.router.add_post("/api/recordings/clip/undo", recordings_clip_undo)
+    app.router.add_get("/api/recordings/clip/jobs", recordings_clip_jobs)
+    app.router.add_get("/api/recordings/clip/jobs/{job_id}", recordings_clip_job)
+    app.router.add_get("/api/recordings/bulk-jobs", recordings_bulk_jobs)
+    app.router.add_get("/api/recordings/bulk-jobs/{job_id}", recordings_bulk_job)
+    app.router.add_post("/api/recordings/bulk-jobs/{job_id}/cancel", recordings_bulk_job_cancel)
     app.router.add_get("/recordings/{path:.*}", recordings_file)
     app.router.add_get("/api/recycle-bin", recycle_bin_list)
     app.router.add_post("/api/recycle-bin/restore", recycle_bin_restore)
@@ -8917,7 +10151,7 @@ def build_app(lets_encrypt_manager: LetsEncryptManager | None = None) -> web.App
         app.router.add_post("/webrtc/stop", webrtc_stop)
         app.router.add_get("/webrtc/stats", webrtc_stats)
         app.router.add_post("/webrtc/offer", webrtc_offer)
-    app.router.add_static("/static/", webui.static_directory(), show_index=False)
+    app.router.add_get("/static/{path:.*}", static_asset)
 
     if lets_encrypt_manager is not None:
         async def _start_lets_encrypt(_: web.Application) -> None:
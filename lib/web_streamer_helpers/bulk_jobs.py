@@ -0,0 +1,233 @@
+"""Batched background jobs for bulk recording operations.
+
+Deleting, saving, restoring or purging hundreds of recordings used to happen
+inside the HTTP request. :class:`BulkJobEngine` instead runs each operation on
+a worker in fixed-size batches: the per-item work runs on an executor, the
+directories it touched are fsynced once per batch, and the operation's commit
+hook (index updates, change events) runs once per batch, also on the executor.
+Progress is published as ``bulk_job`` dashboard events and a job can be
+cancelled between batches.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import os
+import secrets
+from concurrent.futures import Executor
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Callable, Iterable, Sequence
+
+from .job_queue import CANCELLED, COMPLETED, FAILED, QUEUED, RUNNING, Job, JobQueue, QueueFull
+
+EVENT_TYPE = "bulk_job"
+
+
+class BulkQueueFull(QueueFull):
+    """Raised when the engine already holds the maximum number of pending jobs."""
+
+
+@dataclass
+class BulkBatch:
+    """Outcome of one batch: result lists plus the directories it changed."""
+
+    payload: dict[str, list[Any]]
+    touched: set[Path] = field(default_factory=set)
+    extra: dict[str, Any] = field(default_factory=dict)
+
+
+@dataclass
+class BulkOperation:
+    """A bulk operation over ``items``.
+
+    ``process`` runs on the executor for each batch of items. ``commit`` runs
+    on the executor too, after the batch's directories were synced, and
+    receives the batch so indexes and change events are updated once per
+    batch; it must therefore only publish through thread-safe channels.
+    ``initial_result`` seeds the merged result, which keeps the response
+    shape of the synchronous endpoints and carries errors found up front.
+    """
+
+    kind: str
+    items: Sequence[Any]
+    process: Callable[[Sequence[Any]], BulkBatch]
+    commit: Callable[[BulkBatch], None] | None = None
+    initial_result: dict[str, list[Any]] = field(default_factory=lambda: {"errors": []})
+
+
+def sync_directories(paths: Iterable[Path]) -> int:
+    """fsync each existing directory in ``paths`` once; returns how many synced."""
+
+    synced = 0
+    for path in sorted({Path(path) for path in paths}):
+        try:
+            fd = os.open(path, os.O_RDONLY | getattr(os, "O_DIRECTORY", 0))
+        except OSError:
+            continue
+        try:
+            os.fsync(fd)
+            synced += 1
+        except OSError:
+            pass
+        finally:
+            os.close(fd)
+    return synced
+
+
+@dataclass
+class BulkJob(Job):
+    processed: int = 0
+    result: dict[str, Any] = field(default_factory=dict)
+
+    @property
+    def operation(self) -> BulkOperation:
+        return self.spec
+
+    @property
+    def total(self) -> int:
+        return len(self.operation.items)
+
+    def to_payload(self, *, include_result: bool = True) -> dict[str, Any]:
+        total = self.total
+        payload: dict[str, Any] = {
+            "job_id": self.job_id,
+            "kind": self.operation.kind,
+            "state": self.state,
+            "processed": self.processed,
+            "total": total,
+            "progress": round(self.processed / total, 3) if total else 1.0,
+            "created_at": self.created_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+        }
+        if include_result and self.finished:
+            payload["result"] = dict(self.result)
+        if self.error is not None:
+            payload["error"] = self.error
+        return payload
+
+
+class BulkJobEngine(JobQueue[BulkJob]):
+    """Run :class:`BulkOperation` jobs one at a time in batches.
+
+    Jobs run sequentially so two bulk operations never race on the same
+    files. ``wait`` returns the merged result in the same shape the
+    synchronous endpoints used (for example ``{"deleted": [...], "errors":
+    [...]}``); a cancelled job's result carries ``cancelled: true`` and the
+    number of items it skipped.
+    """
+
+    event_type = EVENT_TYPE
+    worker_name = "bulk-job-worker"
+    queue_full = BulkQueueFull
+    queue_full_message = "bulk job queue is full"
+    failure_error = "bulk operation failed"
+
+    def __init__(
+        self,
+        *,
+        executor: Executor | None = None,
+        publish: Callable[[str, dict[str, Any]], None] | None = None,
+        batch_size: int = 50,
+        max_pending: int = 16,
+        history_limit: int = 32,
+        fsync: Callable[[Iterable[Path]], int] | None = sync_directories,
+        logger: logging.Logger | None = None,
+    ) -> None:
+        if batch_size <= 0:
+            raise ValueError("batch_size must be positive")
+        super().__init__(
+            publish=publish,
+            concurrency=1,
+            max_pending=max_pending,
+            history_limit=history_limit,
+            logger=logger,
+        )
+        self._executor = executor
+        self._batch_size = int(batch_size)
+        self._fsync = fsync
+
+    @property
+    def batch_size(self) -> int:
+        return self._batch_size
+
+    def submit(self, operation: BulkOperation) -> BulkJob:
+        job = BulkJob(job_id=secrets.token_hex(8), spec=operation)
+        job.result = {key: list(values) for key, values in operation.initial_result.items()}
+        with self._lock:
+            self._admit(job)
+        self._dispatch(job)
+        return job
+
+    def cancel(self, job_id: str) -> BulkJob | None:
+        """Ask ``job_id`` to stop after its current batch."""
+
+        job = self.get(job_id)
+        if job is None or job.finished:
+            return job
+        job.cancel_requested.set()
+        if job.state == QUEUED:
+            self._finish(job, CANCELLED)
+        return job
+
+    def _event_payload(self, job: BulkJob) -> dict[str, Any]:
+        return job.to_payload(include_result=False)
+
+    def _describe(self, job: BulkJob) -> str:
+        return f"Bulk {job.operation.kind} job"
+
+    def _on_finish(
+        self,
+        job: BulkJob,
+        state: str,
+        result: dict[str, Any] | None,
+        error: str | None,
+        exception: BaseException | None,
+    ) -> None:
+        super()._on_finish(job, state, result, error, exception)
+        if state == CANCELLED:
+            job.result["cancelled"] = True
+            job.result["skipped"] = job.total - job.processed
+
+    def _merge(self, job: BulkJob, batch: BulkBatch) -> None:
+        with self._lock:
+            for key, values in batch.payload.items():
+                job.result.setdefault(key, []).extend(values)
+
+    async def _execute(self, job: BulkJob) -> None:
+        loop = asyncio.get_running_loop()
+        operation = job.operation
+        items = list(operation.items)
+        for start in range(0, len(items), self._batch_size):
+            if job.cancel_requested.is_set():
+                self._finish(job, CANCELLED)
+                return
+            batch_items = items[start : start + self._batch_size]
+            batch = await loop.run_in_executor(self._executor, operation.process, batch_items)
+            if batch.touched and self._fsync is not None:
+                await loop.run_in_executor(self._executor, self._fsync, batch.touched)
+            if operation.commit is not None:
+                await loop.run_in_executor(self._executor, operation.commit, batch)
+            self._merge(job, batch)
+            with self._lock:
+                job.processed += len(batch_items)
+            self._emit(job)
+        self._finish(job, COMPLETED)
+
+
+__all__ = [
+    "CANCELLED",
+    "COMPLETED",
+    "EVENT_TYPE",
+    "FAILED",
+    "QUEUED",
+    "RUNNING",
+    "BulkBatch",
+    "BulkJob",
+    "BulkJobEngine",
+    "BulkOperation",
+    "BulkQueueFull",
+    "sync_directories",
+]
@@ -0,0 +1,181 @@
+"""Bounded clip job queue with progress events for the dashboard."""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import secrets
+from concurrent.futures import Executor
+from dataclasses import dataclass
+from typing import Any, Callable
+
+from .job_queue import COMPLETED, FAILED, QUEUED, RUNNING, Job, JobQueue, QueueFull
+
+EVENT_TYPE = "clip_job"
+
+ProgressCallback = Callable[[str, float], None]
+
+
+class ClipQueueFull(QueueFull):
+    """Raised when the queue already holds the maximum number of pending jobs."""
+
+
+@dataclass(frozen=True)
+class ClipRequest:
+    source_path: str
+    start_seconds: float
+    end_seconds: float
+    clip_name: str | None = None
+    source_start_epoch: float | None = None
+    allow_overwrite: bool = True
+    overwrite_existing: str | None = None
+
+    def dedup_key(self) -> tuple[Any, ...]:
+        """Identity used to fold identical in-flight submissions together."""
+
+        def _rounded(value: float | None) -> float | None:
+            return None if value is None else round(float(value), 3)
+
+        return (
+            self.source_path.strip().strip("/"),
+            _rounded(self.start_seconds),
+            _rounded(self.end_seconds),
+            (self.clip_name or "").strip(),
+            _rounded(self.source_start_epoch),
+            bool(self.allow_overwrite),
+            (self.overwrite_existing or "").strip().strip("/"),
+        )
+
+
+@dataclass
+class ClipJob(Job):
+    stage: str = QUEUED
+    progress: float = 0.0
+
+    @property
+    def request(self) -> ClipRequest:
+        return self.spec
+
+    def to_payload(self) -> dict[str, Any]:
+        payload: dict[str, Any] = {
+            "job_id": self.job_id,
+            "state": self.state,
+            "stage": self.stage,
+            "progress": round(self.progress, 3),
+            "source_path": self.request.source_path,
+            "clip_name": self.request.clip_name,
+            "created_at": self.created_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+        }
+        if self.result is not None:
+            payload["result"] = dict(self.result)
+        if self.error is not None:
+            payload["error"] = self.error
+        return payload
+
+
+class ClipJobQueue(JobQueue[ClipJob]):
+    """Run clip jobs on a fixed number of workers and report their progress.
+
+    ``runner`` performs one clip synchronously on ``executor`` and receives a
+    progress callback taking ``(stage, fraction)``; it may be invoked from the
+    worker thread. Every state change is published as a ``clip_job`` event.
+    Submitting a request identical to one that is still queued or running
+    returns the existing job instead of queueing a duplicate.
+    """
+
+    event_type = EVENT_TYPE
+    worker_name = "clip-worker"
+    queue_full = ClipQueueFull
+    queue_full_message = "clip queue is full"
+    stopped_state = FAILED
+    stopped_error = "clip queue stopped"
+    failure_error = "unable to create clip"
+
+    def __init__(
+        self,
+        runner: Callable[[ClipRequest, ProgressCallback], dict[str, Any]],
+        *,
+        executor: Executor | None = None,
+        publish: Callable[[str, dict[str, Any]], None] | None = None,
+        concurrency: int = 1,
+        max_pending: int = 8,
+        history_limit: int = 64,
+        logger: logging.Logger | None = None,
+    ) -> None:
+        super().__init__(
+            publish=publish,
+            concurrency=concurrency,
+            max_pending=max_pending,
+            history_limit=history_limit,
+            logger=logger,
+        )
+        self._runner = runner
+        self._executor = executor
+        self._inflight: dict[tuple[Any, ...], ClipJob] = {}
+
+    def submit(self, request: ClipRequest) -> tuple[ClipJob, bool]:
+        """Queue ``request``; returns the job and whether it was deduplicated."""
+
+        key = request.dedup_key()
+        with self._lock:
+            existing = self._inflight.get(key)
+            if existing is not None and not existing.finished:
+                return existing, True
+            job = ClipJob(job_id=secrets.token_hex(8), spec=request)
+            self._admit(job)
+            self._inflight[key] = job
+        self._dispatch(job)
+        return job, False
+
+    def _progress_callback(self, job: ClipJob) -> ProgressCallback:
+        def _report(stage: str, fraction: float) -> None:
+            with self._lock:
+                if job.finished:
+                    return
+                job.stage = str(stage)
+                job.progress = max(job.progress, min(1.0, max(0.0, float(fraction))))
+            self._emit(job)
+
+        return _report
+
+    def _on_start(self, job: ClipJob) -> None:
+        job.stage = RUNNING
+
+    def _on_finish(
+        self,
+        job: ClipJob,
+        state: str,
+        result: dict[str, Any] | None,
+        error: str | None,
+        exception: BaseException | None,
+    ) -> None:
+        super()._on_finish(job, state, result, error, exception)
+        job.stage = state
+        if state == COMPLETED:
+            job.progress = 1.0
+            job.result = result
+        key = job.request.dedup_key()
+        if self._inflight.get(key) is job:
+            del self._inflight[key]
+
+    async def _execute(self, job: ClipJob) -> None:
+        loop = asyncio.get_running_loop()
+        result = await loop.run_in_executor(
+            self._executor, self._runner, job.request, self._progress_callback(job)
+        )
+        self._finish(job, COMPLETED, result=result if isinstance(result, dict) else {})
+
+
+__all__ = [
+    "COMPLETED",
+    "EVENT_TYPE",
+    "FAILED",
+    "QUEUED",
+    "RUNNING",
+    "ClipJob",
+    "ClipJobQueue",
+    "ClipQueueFull",
+    "ClipRequest",
+]
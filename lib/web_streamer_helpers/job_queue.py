@@ -0,0 +1,275 @@
+"""Shared worker queue for the dashboard's background jobs.
+
+:mod:`clip_jobs` and :mod:`bulk_jobs` both queue work from HTTP handlers, run
+it on a fixed number of asyncio workers, keep a bounded history for the
+status endpoints and publish every state change as a dashboard event.
+:class:`JobQueue` holds that machinery; subclasses only say how one job runs
+(:meth:`JobQueue._execute`) and what their terminal states record.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import collections
+import contextlib
+import logging
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Any, Callable, Generic, TypeVar
+
+QUEUED = "queued"
+RUNNING = "running"
+COMPLETED = "completed"
+CANCELLED = "cancelled"
+FAILED = "failed"
+
+TERMINAL_STATES = frozenset({COMPLETED, CANCELLED, FAILED})
+
+
+class QueueFull(Exception):
+    """Raised when a queue already holds the maximum number of pending jobs."""
+
+
+@dataclass
+class Job:
+    """State shared by every queued job; ``spec`` is what the job runs."""
+
+    job_id: str
+    spec: Any
+    state: str = QUEUED
+    created_at: float = field(default_factory=time.time)
+    started_at: float | None = None
+    finished_at: float | None = None
+    result: dict[str, Any] | None = None
+    error: str | None = None
+    exception: BaseException | None = field(default=None, repr=False)
+    cancel_requested: threading.Event = field(default_factory=threading.Event, repr=False)
+    done: asyncio.Event = field(default_factory=asyncio.Event, repr=False)
+
+    @property
+    def finished(self) -> bool:
+        return self.state in TERMINAL_STATES
+
+    def to_payload(self) -> dict[str, Any]:
+        payload: dict[str, Any] = {
+            "job_id": self.job_id,
+            "state": self.state,
+            "created_at": self.created_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+        }
+        if self.error is not None:
+            payload["error"] = self.error
+        return payload
+
+
+J = TypeVar("J", bound=Job)
+
+
+class JobQueue(Generic[J]):
+    """Bounded queue of jobs run by ``concurrency`` asyncio workers.
+
+    Subclasses implement :meth:`_execute` (which must end the job with
+    :meth:`_finish`) and may extend :meth:`_on_start`/:meth:`_on_finish`,
+    which run under the queue lock. An exception escaping :meth:`_execute`
+    fails the job; jobs still pending when the queue stops end in
+    ``stopped_state``.
+    """
+
+    event_type = "job"
+    worker_name = "job-worker"
+    queue_full: type[QueueFull] = QueueFull
+    queue_full_message = "job queue is full"
+    stopped_state = CANCELLED
+    stopped_error: str | None = None
+    failure_error = "job failed"
+
+    def __init__(
+        self,
+        *,
+        publish: Callable[[str, dict[str, Any]], None] | None = None,
+        concurrency: int = 1,
+        max_pending: int = 8,
+        history_limit: int = 64,
+        logger: logging.Logger | None = None,
+    ) -> None:
+        if concurrency <= 0:
+            raise ValueError("concurrency must be positive")
+        if max_pending <= 0:
+            raise ValueError("max_pending must be positive")
+        self._publish = publish
+        self._concurrency = int(concurrency)
+        self._max_pending = int(max_pending)
+        self._history_limit = max(1, int(history_limit))
+        self._logger = logger or logging.getLogger("web_streamer")
+        self._lock = threading.Lock()
+        self._jobs: "collections.OrderedDict[str, J]" = collections.OrderedDict()
+        self._queue: asyncio.Queue[J] | None = None
+        self._workers: list[asyncio.Task] = []
+
+    @property
+    def concurrency(self) -> int:
+        return self._concurrency
+
+    def _ensure_started(self) -> asyncio.Queue[J]:
+        if self._queue is None:
+            self._queue = asyncio.Queue()
+        if not self._workers:
+            loop = asyncio.get_running_loop()
+            self._workers = [
+                loop.create_task(self._worker(), name=f"{self.worker_name}-{index}")
+                for index in range(self._concurrency)
+            ]
+        return self._queue
+
+    async def start(self) -> None:
+        self._ensure_started()
+
+    async def stop(self) -> None:
+        workers = self._workers
+        self._workers = []
+        for task in workers:
+            task.cancel()
+        for task in workers:
+            with contextlib.suppress(asyncio.CancelledError):
+                await task
+        with self._lock:
+            pending = [job for job in self._jobs.values() if not job.finished]
+        for job in pending:
+            self._abandon(job)
+
+    def get(self, job_id: str) -> J | None:
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def snapshot(self) -> list[dict[str, Any]]:
+        with self._lock:
+            jobs = list(self._jobs.values())
+        return [self._event_payload(job) for job in jobs]
+
+    async def wait(self, job: J) -> dict[str, Any]:
+        """Wait for ``job`` and return its result, re-raising its failure."""
+
+        await job.done.wait()
+        if job.exception is not None:
+            raise job.exception
+        return dict(job.result or {})
+
+    def _admit(self, job: J) -> None:
+        """Register ``job``; the caller holds the lock and then calls :meth:`_dispatch`."""
+
+        self._ensure_started()
+        pending = sum(1 for queued in self._jobs.values() if queued.state == QUEUED)
+        if pending >= self._max_pending:
+            raise self.queue_full(self.queue_full_message)
+        self._jobs[job.job_id] = job
+        self._trim_history()
+
+    def _dispatch(self, job: J) -> None:
+        self._ensure_started().put_nowait(job)
+        self._emit(job)
+
+    def _trim_history(self) -> None:
+        excess = len(self._jobs) - self._history_limit
+        if excess <= 0:
+            return
+        for job_id in list(self._jobs):
+            if excess <= 0:
+                break
+            if self._jobs[job_id].finished:
+                del self._jobs[job_id]
+                excess -= 1
+
+    def _event_payload(self, job: J) -> dict[str, Any]:
+        return job.to_payload()
+
+    def _emit(self, job: J) -> None:
+        if self._publish is None:
+            return
+        try:
+            self._publish(self.event_type, self._event_payload(job))
+        except Exception:  # pragma: no cover - defensive logging
+            self._logger.debug("Failed to publish %s event", self.event_type, exc_info=True)
+
+    def _on_start(self, job: J) -> None:
+        """Extra bookkeeping when ``job`` starts running (lock held)."""
+
+    def _on_finish(
+        self,
+        job: J,
+        state: str,
+        result: dict[str, Any] | None,
+        error: str | None,
+        exception: BaseException | None,
+    ) -> None:
+        """Record a terminal state on ``job`` (lock held)."""
+
+        if state == FAILED:
+            job.error = error or str(exception) or self.failure_error
+            job.exception = exception
+
+    def _finish(
+        self,
+        job: J,
+        state: str,
+        *,
+        result: dict[str, Any] | None = None,
+        error: str | None = None,
+        exception: BaseException | None = None,
+    ) -> None:
+        with self._lock:
+            if job.finished:
+                return
+            job.state = state
+            job.finished_at = time.time()
+            self._on_finish(job, state, result, error, exception)
+            self._trim_history()
+        job.done.set()
+        self._emit(job)
+
+    def _abandon(self, job: J) -> None:
+        exception = asyncio.CancelledError() if self.stopped_state == FAILED else None
+        self._finish(job, self.stopped_state, error=self.stopped_error, exception=exception)
+
+    def _describe(self, job: J) -> str:
+        return f"{self.event_type} {job.job_id}"
+
+    async def _execute(self, job: J) -> None:
+        raise NotImplementedError
+
+    async def _worker(self) -> None:
+        assert self._queue is not None
+        while True:
+            job = await self._queue.get()
+            try:
+                if job.finished:
+                    continue
+                with self._lock:
+                    job.state = RUNNING
+                    job.started_at = time.time()
+                    self._on_start(job)
+                self._emit(job)
+                try:
+                    await self._execute(job)
+                except asyncio.CancelledError:
+                    self._abandon(job)
+                    raise
+                except Exception as exc:
+                    self._logger.warning("%s failed: %s", self._describe(job), exc)
+                    self._finish(job, FAILED, error=str(exc) or None, exception=exc)
+            finally:
+                self._queue.task_done()
+
+
+__all__ = [
+    "CANCELLED",
+    "COMPLETED",
+    "FAILED",
+    "QUEUED",
+    "RUNNING",
+    "TERMINAL_STATES",
+    "Job",
+    "JobQueue",
+    "QueueFull",
+]
@@ -0,0 +1,229 @@
+"""Sequenced change log that backs the ``/api/recordings/changes`` delta feed."""
+
+from __future__ import annotations
+
+import collections
+import secrets
+import threading
+from dataclasses import dataclass
+from typing import Any, Callable, Iterable, Mapping
+
+from lib.recycle_bin_utils import SAVED_RECORDINGS_DIRNAME
+
+SAVED_PREFIX = f"{SAVED_RECORDINGS_DIRNAME}/"
+
+ADDED = "added"
+REMOVED = "removed"
+# The path may or may not have existed before the change (for example a clip
+# written over an existing recording); the feed resolves it against the disk.
+CHANGED = "changed"
+# Net result of a path added and removed again inside one window; only
+# :func:`collapse_changes` produces it.
+DISCARDED = "discarded"
+
+DEFAULT_CAPACITY = 1024
+
+# Changes that never touch the recordings listing: purging the recycle bin
+# and retention removing a preserved original WAV on its own.
+_UNLISTED_REASONS = frozenset({"recycle_purged", "original_removed"})
+
+
+@dataclass(frozen=True)
+class RecordingChange:
+    seq: int
+    kind: str
+    path: str
+
+
+@dataclass(frozen=True)
+class ChangeWindow:
+    """Result of :meth:`RecordingsChangeLog.since`.
+
+    ``reset`` is true when the caller's cursor cannot be served from the log
+    (unknown epoch, evicted history or an event without usable paths) and the
+    full listing must be refetched.
+    """
+
+    epoch: str
+    seq: int
+    reset: bool
+    changes: tuple[RecordingChange, ...] = ()
+
+
+def _clean_path(value: object) -> str | None:
+    if not isinstance(value, str):
+        return None
+    cleaned = value.strip().lstrip("/")
+    return cleaned or None
+
+
+def _toggle_saved_prefix(path: str, *, saved: bool) -> str | None:
+    """Return the path a recording had before it was (un)saved."""
+
+    if saved:
+        if path.startswith(SAVED_PREFIX):
+            return path[len(SAVED_PREFIX):] or None
+        return None
+    return f"{SAVED_PREFIX}{path}"
+
+
+class RecordingsChangeLog:
+    """Bounded, monotonically sequenced log of recordings path changes.
+
+    The log listens to ``recordings_changed`` events on the dashboard event
+    bus. Every event advances the sequence number; events that carry paths are
+    turned into per-path ``added``/``removed``/``changed`` records so clients
+    can patch their listing instead of refetching it. Events that do not say
+    which paths changed are recorded as a reset marker.
+    """
+
+    def __init__(
+        self,
+        *,
+        capacity: int = DEFAULT_CAPACITY,
+        relative_path: Callable[[str], str | None] | None = None,
+    ) -> None:
+        if capacity <= 0:
+            raise ValueError("capacity must be positive")
+        self._lock = threading.Lock()
+        self._entries: collections.deque[RecordingChange] = collections.deque(
+            maxlen=capacity
+        )
+        self._seq = 0
+        # Sequence number at or below which history is no longer available.
+        self._floor = 0
+        self._relative_path = relative_path
+        self.epoch = secrets.token_hex(6)
+
+    @property
+    def seq(self) -> int:
+        with self._lock:
+            return self._seq
+
+    def _normalize(self, value: object) -> str | None:
+        if isinstance(value, str) and value.startswith("/"):
+            # The segmenter reports absolute paths for finalized recordings.
+            if self._relative_path is None:
+                return None
+            return _clean_path(self._relative_path(value))
+        return _clean_path(value)
+
+    def _paths(self, payload: Mapping[str, Any], key: str) -> list[str]:
+        raw = payload.get(key)
+        if isinstance(raw, str):
+            raw = [raw]
+        if not isinstance(raw, (list, tuple)):
+            return []
+        paths: list[str] = []
+        for item in raw:
+            normalized = self._normalize(item)
+            if normalized:
+                paths.append(normalized)
+        return paths
+
+    def _changes_for(self, payload: Mapping[str, Any]) -> list[tuple[str, str]] | None:
+        reason = str(payload.get("reason") or "")
+        if reason in _UNLISTED_REASONS:
+            return []
+        if reason == "renamed":
+            old = self._normalize(payload.get("old_path"))
+            new = self._normalize(payload.get("new_path"))
+            if not old or not new:
+                return None
+            return [(REMOVED, old), (ADDED, new)]
+
+        paths = self._paths(payload, "paths")
+        if not paths and reason == "finalized":
+            paths = self._paths(payload, "path")
+        if not paths:
+            return None
+
+        if reason == "deleted":
+            return [(REMOVED, path) for path in paths]
+        if reason in {"saved", "unsaved"}:
+            changes: list[tuple[str, str]] = []
+            for path in paths:
+                previous = _toggle_saved_prefix(path, saved=reason == "saved")
+                if previous:
+                    changes.append((REMOVED, previous))
+                changes.append((ADDED, path))
+            return changes
+        if reason in {"restored", "finalized", "encode_completed"}:
+            return [(ADDED, path) for path in paths]
+        if reason == "clipped" and payload.get("overwritten") is False:
+            return [(ADDED, path) for path in paths]
+        return [(CHANGED, path) for path in paths]
+
+    def record(self, payload: Mapping[str, Any]) -> int:
+        """Append the changes described by a ``recordings_changed`` payload."""
+
+        changes = self._changes_for(payload)
+        with self._lock:
+            if changes is None:
+                self._seq += 1
+                self._floor = self._seq
+                self._entries.clear()
+                return self._seq
+            if not changes:
+                self._seq += 1
+                return self._seq
+            for kind, path in changes:
+                self._seq += 1
+                if len(self._entries) == self._entries.maxlen:
+                    self._floor = self._entries[0].seq
+                self._entries.append(RecordingChange(self._seq, kind, path))
+            return self._seq
+
+    def observe_event(self, event: Mapping[str, Any]) -> None:
+        """Event bus listener for ``recordings_changed`` events."""
+
+        if event.get("type") != "recordings_changed":
+            return
+        payload = event.get("payload")
+        self.record(payload if isinstance(payload, Mapping) else {})
+
+    def since(self, seq: int, epoch: str | None = None) -> ChangeWindow:
+        with self._lock:
+            current = self._seq
+            if (epoch is not None and epoch != self.epoch) or seq < self._floor or seq > current:
+                return ChangeWindow(self.epoch, current, True)
+            changes = tuple(entry for entry in self._entries if entry.seq > seq)
+            return ChangeWindow(self.epoch, current, False, changes)
+
+
+def collapse_changes(changes: Iterable[RecordingChange]) -> dict[str, str]:
+    """Fold a change sequence into the net change per path.
+
+    A path that was added and later changed is still reported as added, and a
+    path that was removed and added back becomes ``changed`` because the
+    client's copy (if any) is stale either way. A path added and removed
+    inside the window is ``discarded``: a client may have listed it from
+    ``/api/recordings`` before its cursor caught up and should drop it, but
+    its counts never included it otherwise.
+    """
+
+    net: dict[str, str] = {}
+    for change in changes:
+        previous = net.get(change.path)
+        if previous is None:
+            net[change.path] = change.kind
+        elif change.kind == REMOVED:
+            net[change.path] = DISCARDED if previous in {ADDED, DISCARDED} else REMOVED
+        elif previous == REMOVED:
+            net[change.path] = CHANGED
+        elif previous == DISCARDED:
+            net[change.path] = ADDED
+    return net
+
+
+__all__ = [
+    "ADDED",
+    "CHANGED",
+    "DISCARDED",
+    "REMOVED",
+    "SAVED_PREFIX",
+    "ChangeWindow",
+    "RecordingChange",
+    "RecordingsChangeLog",
+    "collapse_changes",
+]
@@ -0,0 +1,117 @@
+"""Generation counters used to derive ETags for dashboard JSON endpoints."""
+
+from __future__ import annotations
+
+import hashlib
+import os
+import threading
+from pathlib import Path
+from typing import Any, Collection, Mapping
+
+RECORDINGS = "recordings"
+RECYCLE_BIN = "recycle_bin"
+CONFIG = "config"
+
+# Dashboard events that invalidate cached API representations.
+_EVENT_RESOURCES: dict[str, tuple[str, ...]] = {
+    # Deletions move files into the recycle bin and restores move them back,
+    # so any recordings change may also alter the recycle bin listing.
+    "recordings_changed": (RECORDINGS, RECYCLE_BIN),
+    "config_updated": (CONFIG,),
+}
+
+
+class ResourceGenerations:
+    """Thread-safe, monotonically increasing counters keyed by resource name.
+
+    Handlers combine the current generation with cheap validators (file
+    mtimes, query strings, small status snapshots) into a weak ETag, so a
+    matching ``If-None-Match`` can be answered with ``304`` before any of the
+    expensive scans behind a payload run.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._counters: dict[str, int] = {}
+
+    def bump(self, *resources: str) -> None:
+        with self._lock:
+            for resource in resources:
+                self._counters[resource] = self._counters.get(resource, 0) + 1
+
+    def current(self, resource: str) -> int:
+        with self._lock:
+            return self._counters.get(resource, 0)
+
+    def observe_event(self, event: Mapping[str, Any]) -> None:
+        """Event bus listener that bumps resources affected by ``event``."""
+
+        resources = _EVENT_RESOURCES.get(str(event.get("type") or ""))
+        if resources:
+            self.bump(*resources)
+
+    def etag(self, resource: str, *validators: object) -> str:
+        material = repr((resource, self.current(resource), validators)).encode("utf-8")
+        digest = hashlib.blake2b(material, digest_size=12).hexdigest()
+        return f'W/"{digest}"'
+
+
+# SQLite side files; the databases themselves are dotfiles.
+_SQLITE_SIDE_SUFFIXES = ("-journal", "-wal", "-shm")
+
+
+def _signed_entry(name: str, skip: Collection[str]) -> bool:
+    return name not in skip and not name.startswith(".") and not name.endswith(_SQLITE_SIDE_SUFFIXES)
+
+
+def directory_signature(
+    root: Path,
+    *,
+    skip: Collection[str] = (),
+) -> tuple[tuple[str, int, int], ...]:
+    """Return mtimes for the visible entries of ``root``.
+
+    Creating, renaming or removing a file updates the mtime of the directory
+    that holds it, so this detects recordings added or removed by other
+    processes at the cost of one ``stat`` per day directory. ``root``'s own
+    mtime is not used: the recordings root also holds hidden SQLite caches
+    (manifest, ledger, indexes, outbox) whose journals come and go on every
+    write. New or removed visible entries show up in the entry list instead.
+    """
+
+    signature: list[tuple[str, int, int]] = []
+    try:
+        with os.scandir(root) as iterator:
+            children = sorted(
+                (entry for entry in iterator if _signed_entry(entry.name, skip)),
+                key=lambda entry: entry.name,
+            )
+            for entry in children:
+                try:
+                    child_stat = entry.stat(follow_symlinks=False)
+                except OSError:
+                    continue
+                signature.append((entry.name, child_stat.st_mtime_ns, child_stat.st_ino))
+    except OSError:
+        pass
+    return tuple(signature)
+
+
+def file_signature(path: Path | None) -> tuple[int, int, int] | None:
+    if path is None:
+        return None
+    try:
+        stat = path.stat()
+    except OSError:
+        return None
+    return (stat.st_mtime_ns, stat.st_size, stat.st_ino)
+
+
+__all__ = [
+    "CONFIG",
+    "RECORDINGS",
+    "RECYCLE_BIN",
+    "ResourceGenerations",
+    "directory_signature",
+    "file_signature",
+]
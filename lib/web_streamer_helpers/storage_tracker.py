@@ -0,0 +1,263 @@
+"""Keep the storage usage ledger current from dashboard events.
+
+:class:`StorageUsageTracker` listens to ``recordings_changed`` events on the
+dashboard event bus, including those replayed from other processes, and
+rescans only the directories an event can have touched. A background task
+applies those refreshes shortly after the events and runs a full, throttled
+reconcile of the ledger at a fixed interval. Handlers read the cached
+:class:`lib.storage_usage.StorageUsage` snapshot, so usage queries do not
+touch the disk.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import contextlib
+import functools
+import logging
+import os
+import sqlite3
+import threading
+import time
+from concurrent.futures import Executor
+from pathlib import Path
+from typing import Any, Callable, Mapping
+
+from lib.storage_usage import RECYCLE, StorageUsage, StorageUsageLedger
+
+# Events that move entries into or out of the recycle bin, or purge them.
+_RECYCLE_REASONS = frozenset({"deleted", "restored", "recycle_purged"})
+_PATH_KEYS = ("paths", "path", "old_path", "new_path")
+REQUESTED_RECONCILE_SPACING = 30.0
+# First retry delay after a failed reconcile; doubles per consecutive failure
+# up to the reconcile interval.
+RECONCILE_RETRY_DELAY = 5.0
+
+
+def lower_thread_priority() -> None:
+    """Executor initializer that drops the calling thread to the lowest CPU priority."""
+
+    setpriority = getattr(os, "setpriority", None)
+    get_native_id = getattr(threading, "get_native_id", None)
+    if setpriority is None or get_native_id is None:
+        return
+    with contextlib.suppress(OSError):
+        # On Linux PRIO_PROCESS with a thread id applies to that thread only.
+        setpriority(os.PRIO_PROCESS, get_native_id(), 19)
+
+
+class StorageUsageTracker:
+    """Apply ledger refreshes for reported changes and reconcile periodically."""
+
+    def __init__(
+        self,
+        ledger: StorageUsageLedger,
+        *,
+        executor: Executor | None = None,
+        reconcile_interval: float = 900.0,
+        debounce: float = 0.25,
+        reconcile_pause: float = 0.0,
+        relative_path: Callable[[str], str | None] | None = None,
+        logger: logging.Logger | None = None,
+    ) -> None:
+        if reconcile_interval <= 0:
+            raise ValueError("reconcile_interval must be positive")
+        self._ledger = ledger
+        self._executor = executor
+        self._reconcile_interval = float(reconcile_interval)
+        self._debounce = max(0.0, float(debounce))
+        self._reconcile_pause = max(0.0, float(reconcile_pause))
+        self._relative_path = relative_path
+        self._logger = logger or logging.getLogger("web_streamer")
+        self._lock = threading.Lock()
+        self._dirty: set[Path] = set()
+        self._reconcile_requested = False
+        self._reconcile_attempted_at: float | None = None
+        self._reconcile_failures = 0
+        self._usage: StorageUsage | None = None
+        self._generation = 0
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._wake: asyncio.Event | None = None
+        self._task: asyncio.Task | None = None
+
+    @property
+    def usage(self) -> StorageUsage | None:
+        with self._lock:
+            return self._usage
+
+    @property
+    def generation(self) -> int:
+        """Bumped whenever the cached usage changes; folded into ETags."""
+
+        with self._lock:
+            return self._generation
+
+    def _set_usage(self, usage: StorageUsage) -> None:
+        with self._lock:
+            if usage != self._usage:
+                self._usage = usage
+                self._generation += 1
+
+    def _directories_for(self, raw: str) -> set[Path]:
+        if raw.startswith("/"):
+            rel = self._relative_path(raw) if self._relative_path is not None else None
+        else:
+            rel = raw
+        if not rel:
+            return set()
+        rel = rel.strip().lstrip("/")
+        parts = Path(rel).parts
+        if not parts or ".." in parts:
+            return set()
+        root = self._ledger.root
+        parent = root.joinpath(*parts[:-1])
+        directories = {parent}
+        # Recordings keep their day directory name when they are saved,
+        # unsaved or have their original WAV preserved, so refresh the same
+        # day in every collection.
+        day = parts[-2] if len(parts) >= 2 else None
+        if day:
+            directories.add(root / day)
+            for name, collection in self._ledger.top_level.items():
+                if collection != RECYCLE:
+                    directories.add(root / name / day)
+        return directories
+
+    def observe_event(self, event: Mapping[str, Any]) -> None:
+        """Event bus listener that queues refreshes for ``recordings_changed``."""
+
+        if event.get("type") != "recordings_changed":
+            return
+        payload = event.get("payload")
+        if not isinstance(payload, Mapping):
+            payload = {}
+        directories: set[Path] = set()
+        for key in _PATH_KEYS:
+            raw = payload.get(key)
+            if isinstance(raw, str):
+                raw = [raw]
+            values = raw if isinstance(raw, (list, tuple)) else []
+            for value in values:
+                if isinstance(value, str) and value.strip():
+                    directories.update(self._directories_for(value.strip()))
+        reason = str(payload.get("reason") or "")
+        if reason in _RECYCLE_REASONS:
+            for name, collection in self._ledger.top_level.items():
+                if collection == RECYCLE:
+                    directories.add(self._ledger.root / name)
+        with self._lock:
+            if directories:
+                self._dirty.update(directories)
+            elif reason not in _RECYCLE_REASONS:
+                # Nothing says what changed; fall back to a full reconcile.
+                self._reconcile_requested = True
+        self._notify()
+
+    def _notify(self) -> None:
+        loop = self._loop
+        wake = self._wake
+        if loop is None or wake is None or loop.is_closed():
+            return
+        with contextlib.suppress(RuntimeError):
+            loop.call_soon_threadsafe(wake.set)
+
+    async def start(self) -> None:
+        """Load the persisted counters, reconciling first if there are none."""
+
+        self._loop = asyncio.get_running_loop()
+        self._wake = asyncio.Event()
+        usage = await self._call(self._ledger.usage)
+        if usage is None or usage.reconciled_at is None:
+            usage = await self._call(self._ledger.reconcile)
+        if usage is not None:
+            self._set_usage(usage)
+        if self._task is None:
+            self._task = self._loop.create_task(self._run(), name="storage-usage-tracker")
+
+    async def stop(self) -> None:
+        task = self._task
+        self._task = None
+        if task is not None:
+            task.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await task
+        self._wake = None
+        self._loop = None
+
+    async def _call(self, func: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+        loop = asyncio.get_running_loop()
+        try:
+            return await loop.run_in_executor(
+                self._executor, functools.partial(func, *args, **kwargs)
+            )
+        except (OSError, sqlite3.Error) as exc:
+            self._logger.warning(
+                "storage usage ledger unavailable at %s: %s", self._ledger.path, exc
+            )
+            return None
+
+    async def flush(self) -> None:
+        """Apply pending directory refreshes now."""
+
+        with self._lock:
+            dirty = self._dirty
+            self._dirty = set()
+        if not dirty:
+            return
+        if await self._call(self._ledger.refresh, dirty) is None:
+            return
+        usage = await self._call(self._ledger.usage)
+        if usage is not None:
+            self._set_usage(usage)
+
+    async def reconcile(self) -> None:
+        with self._lock:
+            self._reconcile_requested = False
+            self._reconcile_attempted_at = time.time()
+        usage = await self._call(self._ledger.reconcile, pause=self._reconcile_pause)
+        with self._lock:
+            self._reconcile_failures = 0 if usage is not None else self._reconcile_failures + 1
+        if usage is not None:
+            self._set_usage(usage)
+
+    def _next_reconcile_delay(self) -> float:
+        with self._lock:
+            requested = self._reconcile_requested
+            attempted_at = self._reconcile_attempted_at
+            failures = self._reconcile_failures
+        if failures and attempted_at is not None:
+            # The ledger is unavailable; back off instead of walking the
+            # recordings tree on every pass.
+            backoff = min(self._reconcile_interval, RECONCILE_RETRY_DELAY * 2 ** (failures - 1))
+            return max(0.0, attempted_at + backoff - time.time())
+        usage = self.usage
+        if usage is None or usage.reconciled_at is None:
+            return 0.0
+        interval = self._reconcile_interval
+        if requested:
+            # Events without paths ask for a walk, but never more than one
+            # every REQUESTED_RECONCILE_SPACING seconds.
+            interval = min(interval, REQUESTED_RECONCILE_SPACING)
+        return max(0.0, usage.reconciled_at + interval - time.time())
+
+    async def _run(self) -> None:
+        assert self._wake is not None
+        wake = self._wake
+        while True:
+            try:
+                with contextlib.suppress(asyncio.TimeoutError):
+                    await asyncio.wait_for(wake.wait(), timeout=self._next_reconcile_delay())
+                wake.clear()
+                if self._debounce:
+                    await asyncio.sleep(self._debounce)
+                await self.flush()
+                if self._next_reconcile_delay() <= 0:
+                    await self.reconcile()
+            except asyncio.CancelledError:
+                raise
+            except Exception as exc:  # pragma: no cover - defensive logging
+                self._logger.debug("storage usage tracker pass failed: %s", exc)
+                await asyncio.sleep(self._debounce or 1.0)
+
+
+__all__ = ["StorageUsageTracker", "lower_thread_priority"]
@@ -0,0 +1,244 @@
+"""Incremental writer for uncompressed (``ZIP_STORED``) ZIP archives.
+
+The writer never seeks: each member is emitted as a local header, the raw file
+bytes and a data descriptor carrying the CRC and sizes, and the central
+directory follows once every member has been written. That lets the dashboard
+stream bulk downloads straight from the recordings on disk without building a
+temporary archive. ZIP64 records are used for members, offsets and central
+directories that exceed the classic 32-bit limits.
+"""
+
+from __future__ import annotations
+
+import struct
+import time
+import zlib
+from dataclasses import dataclass
+
+ZIP64_LIMIT = 0xFFFFFFFF
+ZIP_FILECOUNT_LIMIT = 0xFFFF
+
+_LOCAL_HEADER_SIGNATURE = 0x04034B50
+_DATA_DESCRIPTOR_SIGNATURE = 0x08074B50
+_CENTRAL_HEADER_SIGNATURE = 0x02014B50
+_ZIP64_END_SIGNATURE = 0x06064B50
+_ZIP64_LOCATOR_SIGNATURE = 0x07064B50
+_END_SIGNATURE = 0x06054B50
+
+_FLAG_DATA_DESCRIPTOR = 0x0008
+_FLAG_UTF8 = 0x0800
+_METHOD_STORED = 0
+_VERSION_DEFAULT = 20
+_VERSION_ZIP64 = 45
+_MADE_BY_UNIX = 3 << 8
+_ZIP64_EXTRA_ID = 0x0001
+
+
+def _dos_timestamp(mtime: float) -> tuple[int, int]:
+    parts = time.localtime(mtime)
+    if parts.tm_year < 1980:
+        return 0, (1 << 5) | 1
+    dos_time = (parts.tm_hour << 11) | (parts.tm_min << 5) | (parts.tm_sec // 2)
+    dos_date = ((parts.tm_year - 1980) << 9) | (parts.tm_mon << 5) | parts.tm_mday
+    return dos_time, dos_date
+
+
+@dataclass
+class _Member:
+    name: bytes
+    dos_time: int
+    dos_date: int
+    external_attr: int
+    offset: int
+    zip64: bool
+    crc: int = 0
+    size: int = 0
+
+
+class ZipStreamWriter:
+    """Produce the bytes of a stored ZIP archive one member at a time.
+
+    Call :meth:`start_member`, feed the member's bytes through :meth:`feed`
+    (which returns them unchanged so they can be written straight to the
+    output), close it with :meth:`end_member` and finally call :meth:`finish`.
+    Every method returns the bytes to append to the output stream.
+    """
+
+    def __init__(self, *, zip64_limit: int = ZIP64_LIMIT) -> None:
+        self._zip64_limit = zip64_limit
+        self._members: list[_Member] = []
+        self._current: _Member | None = None
+        self._offset = 0
+        self._finished = False
+
+    @property
+    def bytes_written(self) -> int:
+        return self._offset
+
+    def _emit(self, data: bytes) -> bytes:
+        self._offset += len(data)
+        return data
+
+    def start_member(
+        self,
+        name: str,
+        *,
+        mtime: float,
+        size_hint: int = 0,
+        mode: int = 0o100644,
+    ) -> bytes:
+        """Return the local file header for ``name``.
+
+        ``size_hint`` decides whether the member needs ZIP64 sizes; the real
+        size is whatever is fed before :meth:`end_member`.
+        """
+
+        if self._current is not None:
+            raise RuntimeError("previous member has not been ended")
+        if self._finished:
+            raise RuntimeError("archive already finished")
+        encoded = name.encode("utf-8")
+        dos_time, dos_date = _dos_timestamp(mtime)
+        zip64 = size_hint >= self._zip64_limit
+        member = _Member(
+            name=encoded,
+            dos_time=dos_time,
+            dos_date=dos_date,
+            external_attr=(mode & 0xFFFF) << 16,
+            offset=self._offset,
+            zip64=zip64,
+        )
+        if zip64:
+            extra = struct.pack("<HHQQ", _ZIP64_EXTRA_ID, 16, 0, 0)
+            sizes = ZIP64_LIMIT
+        else:
+            extra = b""
+            sizes = 0
+        header = struct.pack(
+            "<IHHHHHIIIHH",
+            _LOCAL_HEADER_SIGNATURE,
+            _VERSION_ZIP64 if zip64 else _VERSION_DEFAULT,
+            _FLAG_DATA_DESCRIPTOR | _FLAG_UTF8,
+            _METHOD_STORED,
+            dos_time,
+            dos_date,
+            0,
+            sizes,
+            sizes,
+            len(encoded),
+            len(extra),
+        )
+        self._current = member
+        return self._emit(header + encoded + extra)
+
+    def feed(self, chunk: bytes) -> bytes:
+        member = self._current
+        if member is None:
+            raise RuntimeError("no member has been started")
+        member.crc = zlib.crc32(chunk, member.crc)
+        member.size += len(chunk)
+        return self._emit(chunk)
+
+    def end_member(self) -> bytes:
+        member = self._current
+        if member is None:
+            raise RuntimeError("no member has been started")
+        if member.size >= ZIP64_LIMIT and not member.zip64:
+            raise ValueError(
+                f"{member.name.decode('utf-8', 'replace')} grew past 4 GiB without ZIP64"
+            )
+        self._current = None
+        self._members.append(member)
+        if member.zip64:
+            descriptor = struct.pack(
+                "<IIQQ", _DATA_DESCRIPTOR_SIGNATURE, member.crc, member.size, member.size
+            )
+        else:
+            descriptor = struct.pack(
+                "<IIII", _DATA_DESCRIPTOR_SIGNATURE, member.crc, member.size, member.size
+            )
+        return self._emit(descriptor)
+
+    def finish(self) -> bytes:
+        if self._current is not None:
+            raise RuntimeError("last member has not been ended")
+        if self._finished:
+            raise RuntimeError("archive already finished")
+        self._finished = True
+
+        directory = bytearray()
+        for member in self._members:
+            needs_offset64 = member.offset >= ZIP64_LIMIT
+            zip64 = member.zip64 or needs_offset64
+            if zip64:
+                extra = struct.pack(
+                    "<HHQQQ", _ZIP64_EXTRA_ID, 24, member.size, member.size, member.offset
+                )
+                size_field = ZIP64_LIMIT
+                offset_field = ZIP64_LIMIT
+            else:
+                extra = b""
+                size_field = member.size
+                offset_field = member.offset
+            version = _VERSION_ZIP64 if zip64 else _VERSION_DEFAULT
+            directory += struct.pack(
+                "<IHHHHHHIIIHHHHHII",
+                _CENTRAL_HEADER_SIGNATURE,
+                _MADE_BY_UNIX | version,
+                version,
+                _FLAG_DATA_DESCRIPTOR | _FLAG_UTF8,
+                _METHOD_STORED,
+                member.dos_time,
+                member.dos_date,
+                member.crc,
+                size_field,
+                size_field,
+                len(member.name),
+                len(extra),
+                0,
+                0,
+                0,
+                member.external_attr,
+                offset_field,
+            )
+            directory += member.name + extra
+
+        directory_offset = self._offset
+        directory_size = len(directory)
+        count = len(self._members)
+        trailer = bytearray()
+        if (
+            count >= ZIP_FILECOUNT_LIMIT
+            or directory_offset >= ZIP64_LIMIT
+            or directory_size >= ZIP64_LIMIT
+        ):
+            zip64_end_offset = directory_offset + directory_size
+            trailer += struct.pack(
+                "<IQHHIIQQQQ",
+                _ZIP64_END_SIGNATURE,
+                44,
+                _MADE_BY_UNIX | _VERSION_ZIP64,
+                _VERSION_ZIP64,
+                0,
+                0,
+                count,
+                count,
+                directory_size,
+                directory_offset,
+            )
+            trailer += struct.pack("<IIQI", _ZIP64_LOCATOR_SIGNATURE, 0, zip64_end_offset, 1)
+        trailer += struct.pack(
+            "<IHHHHIIH",
+            _END_SIGNATURE,
+            0,
+            0,
+            min(count, ZIP_FILECOUNT_LIMIT),
+            min(count, ZIP_FILECOUNT_LIMIT),
+            min(directory_size, ZIP64_LIMIT),
+            min(directory_offset, ZIP64_LIMIT),
+            0,
+        )
+        return self._emit(bytes(directory) + bytes(trailer))
+
+
+__all__ = ["ZIP64_LIMIT", "ZipStreamWriter"]
@@ -12,6 +12,21 @@ from typing import Optional
 
 BUFFER_FILENAME = "webrtc_buffer.raw"
 STATE_FILENAME = "webrtc_state.json"
+# Connected WebRTC listeners, published by the web server for other services
+# (archival pauses uploads while anyone is listening).
+LISTENERS_FILENAME = "webrtc_listeners.json"
+
+
+def write_listener_count(root_dir: str, clients: int) -> None:
+    path = os.path.join(root_dir, LISTENERS_FILENAME)
+    tmp_path = f"{path}.tmp"
+    try:
+        os.makedirs(root_dir, exist_ok=True)
+        with open(tmp_path, "w", encoding="utf-8") as handle:
+            json.dump({"clients": max(0, int(clients)), "timestamp": time.time()}, handle)
+        os.replace(tmp_path, path)
+    except OSError:
+        pass
 
 
 class WebRTCBufferWriter:
@@ -35,7 +35,7 @@ except (ModuleNotFoundError, ImportError) as exc:  # pragma: no cover - exercise
 else:  # pragma: no cover - import paths tested in integration environments
     _AIORTC_IMPORT_ERROR = None
 
-from .webrtc_buffer import WebRTCBufferConsumer
+from .webrtc_buffer import WebRTCBufferConsumer, write_listener_count
 
 if TYPE_CHECKING:  # pragma: no cover - type checking only
     from aiortc import RTCConfiguration, RTCPeerConnection, RTCIceServer, RTCSessionDescription
@@ -177,6 +177,16 @@ if _AIORTC_IMPORT_ERROR is None:
             self._configuration = self._build_configuration()
             self._sessions: Dict[str, WebRTCSession] = {}
             self._lock = asyncio.Lock()
+            write_listener_count(self._buffer_dir, 0)
+
+        def _publish_listeners(self) -> None:
+            write_listener_count(self._buffer_dir, len(self._sessions))
+
+        def touch_listeners(self) -> None:
+            """Refresh the listener file's timestamp while sessions are open."""
+
+            if self._sessions:
+                self._publish_listeners()
 
         def mark_started(self, session_id: Optional[str]) -> None:
             _ = session_id
@@ -186,6 +196,7 @@ if _AIORTC_IMPORT_ERROR is None:
                 return
             async with self._lock:
                 session = self._sessions.pop(session_id, None)
+                self._publish_listeners()
             if session:
                 await session.close()
 
@@ -200,6 +211,7 @@ if _AIORTC_IMPORT_ERROR is None:
             async with self._lock:
                 sessions = list(self._sessions.values())
                 self._sessions.clear()
+                self._publish_listeners()
             for session in sessions:
                 await session.close()
 
@@ -268,6 +280,7 @@ if _AIORTC_IMPORT_ERROR is None:
                 if existing:
                     await existing.close()
                 self._sessions[session_id] = WebRTCSession(pc, track)
+                self._publish_listeners()
 
             return pc.localDescription
 
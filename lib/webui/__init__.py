@@ -7,7 +7,10 @@ from typing import Any
 
 from jinja2 import Environment, PackageLoader, select_autoescape
 
+from .assets import StaticAssetCatalog
+
 __all__ = [
+    "asset_catalog",
     "render_template",
     "static_directory",
     "static_url",
@@ -15,9 +18,10 @@ __all__ = [
 
 
 def static_url(path: str) -> str:
-    """Return the URL for a static asset served by the web UI."""
+    """Return the content-versioned URL for a static asset served by the web UI."""
     cleaned = path.lstrip("/")
-    return f"/static/{cleaned}" if cleaned else "/static"
+    prefix = asset_catalog().url_prefix()
+    return f"{prefix}/{cleaned}" if cleaned else prefix
 
 
 @lru_cache(maxsize=1)
@@ -38,3 +42,9 @@ def render_template(name: str, **context: Any) -> str:
 def static_directory() -> str:
     directory = resources.files("lib.webui").joinpath("static")
     return os.fspath(directory)
+
+
+@lru_cache(maxsize=1)
+def asset_catalog() -> StaticAssetCatalog:
+    """Fingerprint and precompress the static tree once per process."""
+    return StaticAssetCatalog.build(static_directory())
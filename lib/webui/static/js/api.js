@@ -2,6 +2,7 @@ const DEFAULT_RETRY_ATTEMPTS = 0;
 const DEFAULT_RETRY_MIN_DELAY_MS = 0;
 const DEFAULT_RETRY_MAX_DELAY_MS = 0;
 const DEFAULT_RETRY_JITTER_RATIO = 0.1;
+const VALIDATOR_CACHE_LIMIT = 32;
 
 function createNoopLogger() {
   return {
@@ -106,6 +107,60 @@ function ensureFetchImplementation(options) {
   return null;
 }
 
+function requestMethod(init) {
+  if (init && typeof init.method === "string" && init.method) {
+    return init.method.toUpperCase();
+  }
+  return "GET";
+}
+
+function readHeader(response, name) {
+  if (!response || !response.headers || typeof response.headers.get !== "function") {
+    return null;
+  }
+  return response.headers.get(name);
+}
+
+function withIfNoneMatch(init, etag) {
+  const nextInit = Object.assign({}, init || {});
+  const headers = {};
+  const source = nextInit.headers;
+  if (source && typeof source.forEach === "function") {
+    source.forEach(function copyHeader(value, key) {
+      headers[key] = value;
+    });
+  } else if (source && typeof source === "object") {
+    Object.assign(headers, source);
+  }
+  headers["If-None-Match"] = etag;
+  nextInit.headers = headers;
+  return nextInit;
+}
+
+function replayCachedResponse(entry) {
+  if (typeof Response === "function") {
+    return new Response(entry.body, {
+      status: 200,
+      headers: { "Content-Type": entry.contentType || "application/json", ETag: entry.etag },
+    });
+  }
+  return {
+    ok: true,
+    status: 200,
+    headers: {
+      get(name) {
+        return String(name).toLowerCase() === "etag" ? entry.etag : null;
+      },
+    },
+    async text() {
+      return entry.body;
+    },
+    async json() {
+      return JSON.parse(entry.body);
+    },
+  };
+}
+
 export function createApiClient(options = {}) {
   const windowRef = options.window || (typeof window !== "undefined" ? window : null);
   const documentRef = options.document || (typeof document !== "undefined" ? document : null);
@@ -120,6 +175,45 @@ export function createApiClient(options = {}) {
   const baseOverride = normalizeApiBase(options.baseUrl);
   const baseUrl = baseOverride || resolveApiBase({ window: windowRef, document: documentRef });
 
+  // Last validated representation per URL for conditional GET requests.
+  const validatorCache = new Map();
+
+  function rememberRepresentation(url, entry) {
+    validatorCache.delete(url);
+    validatorCache.set(url, entry);
+    while (validatorCache.size > VALIDATOR_CACHE_LIMIT) {
+      const oldest = validatorCache.keys().next().value;
+      validatorCache.delete(oldest);
+    }
+  }
+
+  async function performConditionalRequest(url, init, send) {
+    const cached = validatorCache.get(url);
+    const response = await send(cached ? withIfNoneMatch(init, cached.etag) : init);
+    if (!response) {
+      return response;
+    }
+    if (response.status === 304 && cached) {
+      return replayCachedResponse(cached);
+    }
+    const etag = readHeader(response, "ETag");
+    if (!response.ok || !etag || typeof response.clone !== "function") {
+      validatorCache.delete(url);
+      return response;
+    }
+    try {
+      const body = await response.clone().text();
+      rememberRepresentation(url, {
+        etag,
+        body,
+        contentType: readHeader(response, "Content-Type"),
+      });
+    } catch (error) {
+      validatorCache.delete(url);
+    }
+    return response;
+  }
+
   const defaultRetry = options.retry || {};
   const defaultAttempts = Number.isFinite(defaultRetry.attempts)
     ? Math.max(0, Math.trunc(defaultRetry.attempts))
@@ -193,11 +287,20 @@ export function createApiClient(options = {}) {
     const maxDelay = resolveMaxDelay(requestOptions && requestOptions.retryMaxDelayMs, minDelay);
     const jitter = resolveJitter(requestOptions && requestOptions.retryJitterRatio);
 
+    const conditional = Boolean(requestOptions && requestOptions.conditional)
+      && requestMethod(init) === "GET";
+    const send = function send(requestInit) {
+      return fetchImpl(url, requestInit);
+    };
+
     let attempt = 0;
     // Always perform at least one attempt.
     while (true) {
       try {
-        return await fetchImpl(url, init);
+        if (conditional) {
+          return await performConditionalRequest(url, init, send);
+        }
+        return await send(init);
       } catch (error) {
         if (attempt >= attempts) {
           throw error;
@@ -195,6 +195,12 @@ import { createFilterControls } from "./dashboard/layout/filterControls.js";
 import { createLiveStreamControls } from "./dashboard/layout/liveStreamControls.js";
 import { createDashboardInitializer } from "./dashboard/layout/dashboardInitializer.js";
 import { createRecycleBinService } from "./dashboard/services/recycleBinService.js";
+import { createBulkJobRunner } from "./dashboard/services/bulkJobs.js";
+import {
+  applyRecordingsDelta,
+  canPatchRecordingsView,
+  recordingsDeltaUrl,
+} from "./dashboard/utils/recordingsDelta.js";
 import {
   parseBoolean,
   parseMotionFlag,
@@ -517,6 +523,10 @@ let configRefreshPending = false;
 let configEventTimer = null;
 let recordingsRefreshPending = false;
 let recordingsEventTimer = null;
+// Last full `/api/recordings` payload plus its change-feed cursor, used to
+// patch the list from `/api/recordings/changes` after recordings events.
+let recordingsDeltaBaseline = null;
+let recordingsDeltaRequested = false;
 let previewRefreshHold = false;
 let previewRefreshPending = false;
 
@@ -932,7 +942,11 @@ async function fetchConfig({ silent = false } = {}) {
   }
   configFetchInFlight = true;
   try {
-    const response = await apiClient.fetch(apiPath("/api/config"), { cache: "no-store" });
+    const response = await apiClient.fetch(
+      apiPath("/api/config"),
+      { cache: "no-store" },
+      { conditional: true },
+    );
     if (!response.ok) {
       throw new Error(`Config request failed with ${response.status}`);
     }
@@ -1461,6 +1475,8 @@ const {
 });
 
 
+const bulkJobs = createBulkJobRunner({ apiClient, apiPath });
+
 const {
   fetchRecycleBin,
   restoreRecycleBinSelection,
@@ -1493,6 +1509,7 @@ const {
   recyclePathFromId,
   shouldDeferDashboardUpdate,
   markRecordingsRefreshDeferred,
+  bulkJobs,
 });
 
 fetchRecycleBinDelegate = fetchRecycleBin;
@@ -1917,6 +1934,8 @@ function closeEventStream({ scheduleReconnect = false } = {}) {
     source.removeEventListener("capture_status", handleCaptureStatusEvent);
     source.removeEventListener("config_updated", handleConfigUpdatedEvent);
     source.removeEventListener("recordings_changed", handleRecordingsChangedEvent);
+    source.removeEventListener("clip_job", handleClipJobEvent);
+    source.removeEventListener("bulk_job", handleBulkJobEvent);
     source.removeEventListener("system_health_updated", handleSystemHealthUpdatedEvent);
     source.removeEventListener("heartbeat", handleEventStreamHeartbeat);
     try {
@@ -2243,9 +2262,95 @@ function handleRecordingsChangedEvent(event) {
   if (typeof event.lastEventId === "string" && event.lastEventId) {
     eventStreamState.lastEventId = event.lastEventId;
   }
+  recordingsDeltaRequested = true;
   requestRecordingsRefresh();
 }
 
+function handleClipJobEvent(event) {
+  markEventStreamHeartbeat();
+  if (!event) {
+    return;
+  }
+  if (typeof event.lastEventId === "string" && event.lastEventId) {
+    eventStreamState.lastEventId = event.lastEventId;
+  }
+  const payload = parseEventStreamData(event.data);
+  if (payload && typeof payload === "object") {
+    clipper.handleJobEvent(payload);
+  }
+}
+
+function handleBulkJobEvent(event) {
+  markEventStreamHeartbeat();
+  if (!event) {
+    return;
+  }
+  if (typeof event.lastEventId === "string" && event.lastEventId) {
+    eventStreamState.lastEventId = event.lastEventId;
+  }
+  const payload = parseEventStreamData(event.data);
+  if (payload && typeof payload === "object") {
+    bulkJobs.handleJobEvent(payload);
+  }
+}
+
+async function fetchRecordingsDelta(endpoint, viewOptions) {
+  const baseline = recordingsDeltaBaseline;
+  if (!baseline || baseline.endpoint !== endpoint || !canPatchRecordingsView(viewOptions)) {
+    return null;
+  }
+  const deltaPath = recordingsDeltaUrl(baseline);
+  if (!deltaPath) {
+    return null;
+  }
+  try {
+    const response = await apiClient.fetch(apiPath(deltaPath), { cache: "no-store" });
+    if (!response.ok) {
+      return null;
+    }
+    return applyRecordingsDelta(baseline.payload, await response.json());
+  } catch (error) {
+    console.warn("Recordings delta failed; refetching the full list", error);
+    return null;
+  }
+}
+
+async function fetchLiveRecordingsStatus() {
+  try {
+    const response = await apiClient.fetch(apiPath("/api/recordings/status"), { cache: "no-store" });
+    if (!response.ok) {
+      return null;
+    }
+    const payload = await response.json();
+    return payload && typeof payload === "object" ? payload : null;
+  } catch (error) {
+    console.warn("Live recordings status failed", error);
+    return null;
+  }
+}
+
+async function loadRecordingsPayload(endpoint, viewOptions) {
+  const useDelta = recordingsDeltaRequested;
+  recordingsDeltaRequested = false;
+  // Capture status and disk usage are not part of the listing's ETag, so a
+  // replayed (304) or delta-patched listing gets them from their own endpoint.
+  const liveStatus = fetchLiveRecordingsStatus();
+  let payload = useDelta ? await fetchRecordingsDelta(endpoint, viewOptions) : null;
+  if (!payload) {
+    const response = await apiClient.fetch(endpoint, { cache: "no-store" }, { conditional: true });
+    if (!response.ok) {
+      throw new Error(`Request failed with status ${response.status}`);
+    }
+    payload = await response.json();
+  }
+  recordingsDeltaBaseline =
+    payload && Number.isFinite(payload.changes_seq) && typeof payload.changes_epoch === "string"
+      ? { endpoint, payload, seq: payload.changes_seq, epoch: payload.changes_epoch }
+      : null;
+  const live = await liveStatus;
+  return live && payload && typeof payload === "object" ? { ...payload, ...live } : payload;
+}
+
 function handleSystemHealthUpdatedEvent(event) {
   markEventStreamHeartbeat();
   if (!event) {
@@ -2298,6 +2403,8 @@ function openEventStream() {
     source.addEventListener("capture_status", handleCaptureStatusEvent);
     source.addEventListener("config_updated", handleConfigUpdatedEvent);
     source.addEventListener("recordings_changed", handleRecordingsChangedEvent);
+    source.addEventListener("clip_job", handleClipJobEvent);
+    source.addEventListener("bulk_job", handleBulkJobEvent);
     source.addEventListener("system_health_updated", handleSystemHealthUpdatedEvent);
     source.addEventListener("heartbeat", handleEventStreamHeartbeat);
   } catch (error) {
@@ -5035,11 +5142,12 @@ async function fetchRecordings(options = {}) {
   const endpoint = apiPath(`/api/recordings?${params.toString()}`);
   let deferredDueToInteraction = false;
   try {
-    const response = await apiClient.fetch(endpoint, { cache: "no-store" });
-    if (!response.ok) {
-      throw new Error(`Request failed with status ${response.status}`);
-    }
-    const payload = await response.json();
+    const payload = await loadRecordingsPayload(endpoint, {
+      search: state.filters.search,
+      day: state.filters.day,
+      timeRange: state.filters.timeRange,
+      offset,
+    });
     if (shouldDeferDashboardUpdate({ silent, force })) {
       deferredDueToInteraction = true;
       markRecordingsRefreshDeferred();
@@ -5825,7 +5933,11 @@ async function fetchRecorderSection(key) {
     return;
   }
   try {
-    const response = await apiClient.fetch(apiPath(section.options.endpoint), { cache: "no-store" });
+    const response = await apiClient.fetch(
+      apiPath(section.options.endpoint),
+      { cache: "no-store" },
+      { conditional: true },
+    );
     if (!response.ok) {
       throw new Error(`Request failed with ${response.status}`);
     }
@@ -453,7 +453,11 @@ function createHealthManager(options) {
     }
     refreshState.fetchInFlight = true;
     try {
-      const response = await apiClient.fetch(healthEndpoint, { cache: "no-store" });
+      const response = await apiClient.fetch(
+        healthEndpoint,
+        { cache: "no-store" },
+        { conditional: true },
+      );
       if (!response || !response.ok) {
         throw new Error(
           response ? `System health request failed with ${response.status}` : "System health request failed",
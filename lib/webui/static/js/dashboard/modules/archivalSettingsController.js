@@ -307,7 +307,11 @@ export function createArchivalSettingsController({
       setStatus("Loading archival settings…", "info");
     }
     try {
-      const response = await apiClient.fetch(archivalEndpoint, { cache: "no-store" });
+      const response = await apiClient.fetch(
+        archivalEndpoint,
+        { cache: "no-store" },
+        { conditional: true },
+      );
       if (!response.ok) {
         const message = await extractErrorMessage(response);
         throw new Error(message);
@@ -3,6 +3,8 @@ import {
   readStoredClipperPreference,
 } from "./preferencesStorage.js";
 
+const CLIP_JOB_POLL_INTERVAL_MS = 2000;
+
 export function createClipperController({
   dom,
   state,
@@ -40,6 +42,84 @@ export function createClipperController({
   const notifyClipSelection =
     typeof updateClipSelectionRange === "function" ? updateClipSelectionRange : () => {};
 
+  // Clip jobs submitted by this page, keyed by job id. Completion normally
+  // arrives as a `clip_job` dashboard event; the poll timer covers periods
+  // when the event stream is offline.
+  const pendingClipJobs = new Map();
+
+  function describeClipJob(job) {
+    const progress = Number(job && job.progress);
+    if (job && job.state === "queued") {
+      return "Clip queued…";
+    }
+    if (Number.isFinite(progress) && progress > 0 && progress < 1) {
+      return `Saving clip… ${Math.round(progress * 100)}%`;
+    }
+    return "Saving clip…";
+  }
+
+  function handleClipJobUpdate(job) {
+    if (!job || typeof job !== "object" || typeof job.job_id !== "string") {
+      return;
+    }
+    const pending = pendingClipJobs.get(job.job_id);
+    if (!pending) {
+      return;
+    }
+    if (job.state === "completed" || job.state === "failed") {
+      pendingClipJobs.delete(job.job_id);
+      if (pending.timer) {
+        clearTimeout(pending.timer);
+        pending.timer = null;
+      }
+      if (job.state === "completed") {
+        pending.resolve(job.result && typeof job.result === "object" ? job.result : null);
+      } else {
+        const message =
+          typeof job.error === "string" && job.error ? job.error : "Unable to save clip.";
+        pending.reject(new Error(message));
+      }
+      return;
+    }
+    setClipperStatus(describeClipJob(job), "pending");
+  }
+
+  function waitForClipJob(job) {
+    return new Promise((resolve, reject) => {
+      const jobId = job.job_id;
+      const entry = { resolve, reject, timer: null };
+      pendingClipJobs.set(jobId, entry);
+
+      const poll = async () => {
+        entry.timer = null;
+        if (pendingClipJobs.get(jobId) !== entry) {
+          return;
+        }
+        try {
+          const response = await apiClient.fetch(
+            apiPath(`/api/recordings/clip/jobs/${encodeURIComponent(jobId)}`),
+            { cache: "no-store" },
+          );
+          if (response.ok) {
+            handleClipJobUpdate(await response.json());
+          } else if (response.status === 404) {
+            pendingClipJobs.delete(jobId);
+            reject(new Error("Clip job is no longer available."));
+            return;
+          }
+        } catch (error) {
+          console.debug("Clip job status check failed", error);
+        }
+        if (pendingClipJobs.get(jobId) === entry) {
+          entry.timer = setTimeout(poll, CLIP_JOB_POLL_INTERVAL_MS);
+        }
+      };
+
+      entry.timer = setTimeout(poll, CLIP_JOB_POLL_INTERVAL_MS);
+      handleClipJobUpdate(job);
+    });
+  }
+
   function parseTimecodeInput(value) {
     if (typeof value !== "string") {
       return null;
@@ -865,6 +945,8 @@ export function createClipperController({
       payload.allow_overwrite = false;
     }
 
+    payload.wait = false;
+
     const startEpoch = getRecordStartSeconds(record);
     if (startEpoch !== null) {
       payload.source_start_epoch = startEpoch;
@@ -912,6 +994,13 @@ export function createClipperController({
       } catch (parseError) {
         responsePayload = null;
       }
+      if (
+        response.status === 202 &&
+        responsePayload &&
+        typeof responsePayload.job_id === "string"
+      ) {
+        responsePayload = await waitForClipJob(responsePayload);
+      }
       if (responsePayload && typeof responsePayload.path === "string") {
         setPendingSelectionPath(responsePayload.path);
         if (clipperState.undoTokens instanceof Map) {
@@ -966,6 +1055,7 @@ export function createClipperController({
     handleReset: handleClipperReset,
     handleUndo: handleClipperUndo,
     submitForm: submitClipperForm,
+    handleJobEvent: handleClipJobUpdate,
     updateDuration: updateClipperDuration,
   };
 }
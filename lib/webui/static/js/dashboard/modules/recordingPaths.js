@@ -5,14 +5,23 @@ export function createRecordingPathHelpers({
   isRecycleBinRecord,
   playbackSourceState,
 }) {
-  function recordingUrl(path, { download = false } = {}) {
+  function recordingUrl(path, { download = false, version = null } = {}) {
     const encoded = path
       .split("/")
       .filter(Boolean)
       .map((segment) => encodeURIComponent(segment))
       .join("/");
-    const suffix = download ? "?download=1" : "";
-    return apiPath(`/recordings/${encoded}${suffix}`);
+    const params = new URLSearchParams();
+    if (download) {
+      params.set("download", "1");
+    }
+    // Pinning the file's mtime lets the server mark the response immutable,
+    // so replaying or seeking a row is served from the browser cache.
+    if (Number.isFinite(version) && version > 0) {
+      params.set("v", String(version));
+    }
+    const query = params.toString();
+    return apiPath(`/recordings/${encoded}${query ? `?${query}` : ""}`);
   }
 
   function normalizePlaybackSource(value) {
@@ -36,7 +45,8 @@ export function createRecordingPathHelpers({
       return recycleBinAudioUrl(record.recycleBinId, { download });
     }
     if (record && typeof record.path === "string" && record.path) {
-      return recordingUrl(record.path, { download });
+      const version = record.isPartial ? null : Number(record.modified);
+      return recordingUrl(record.path, { download, version });
     }
     return "";
   }
@@ -363,7 +363,11 @@ export function createWebServerSettingsController({
     }
 
     try {
-      const response = await apiClient.fetch(webServerEndpoint, { cache: "no-store" });
+      const response = await apiClient.fetch(
+        webServerEndpoint,
+        { cache: "no-store" },
+        { conditional: true },
+      );
       if (!response.ok) {
         throw new Error(`Request failed with ${response.status}`);
       }
@@ -0,0 +1,135 @@
+const BULK_JOB_POLL_INTERVAL_MS = 2000;
+// Selections up to this size still wait for the result in the request; larger
+// ones run as background jobs so the request cannot time out.
+const BULK_JOB_BACKGROUND_THRESHOLD = 20;
+
+const FINISHED_STATES = new Set(["completed", "cancelled", "failed"]);
+
+export function createBulkJobRunner(deps = {}) {
+  const { apiClient, apiPath, onProgress } = deps;
+
+  if (!apiClient || typeof apiClient.fetch !== "function") {
+    throw new Error("createBulkJobRunner requires an apiClient with fetch()");
+  }
+  if (typeof apiPath !== "function") {
+    throw new Error("createBulkJobRunner requires an apiPath helper");
+  }
+
+  const reportProgress = typeof onProgress === "function" ? onProgress : () => {};
+
+  // Jobs submitted by this page, keyed by job id. Progress normally arrives as
+  // `bulk_job` dashboard events; the poll timer covers periods when the event
+  // stream is offline and fetches the result, which events do not carry.
+  const pendingJobs = new Map();
+
+  function jobUrl(jobId) {
+    return apiPath(`/api/recordings/bulk-jobs/${encodeURIComponent(jobId)}`);
+  }
+
+  function settle(job) {
+    const entry = pendingJobs.get(job.job_id);
+    if (!entry) {
+      return;
+    }
+    pendingJobs.delete(job.job_id);
+    if (entry.timer) {
+      clearTimeout(entry.timer);
+      entry.timer = null;
+    }
+    if (job.state === "failed") {
+      const message = typeof job.error === "string" && job.error ? job.error : "Bulk operation failed.";
+      entry.reject(new Error(message));
+      return;
+    }
+    entry.resolve(job.result && typeof job.result === "object" ? job.result : {});
+  }
+
+  async function poll(jobId) {
+    const entry = pendingJobs.get(jobId);
+    if (!entry) {
+      return;
+    }
+    if (entry.timer) {
+      clearTimeout(entry.timer);
+      entry.timer = null;
+    }
+    try {
+      const response = await apiClient.fetch(jobUrl(jobId), { cache: "no-store" });
+      if (response.ok) {
+        const job = await response.json();
+        if (job && FINISHED_STATES.has(job.state)) {
+          settle(job);
+          return;
+        }
+        if (job) {
+          reportProgress(job);
+        }
+      } else if (response.status === 404) {
+        pendingJobs.delete(jobId);
+        entry.reject(new Error("Bulk job is no longer available."));
+        return;
+      }
+    } catch (error) {
+      console.debug("Bulk job status check failed", error);
+    }
+    if (pendingJobs.get(jobId) === entry) {
+      entry.timer = setTimeout(() => poll(jobId), BULK_JOB_POLL_INTERVAL_MS);
+    }
+  }
+
+  function handleJobEvent(job) {
+    if (!job || typeof job !== "object" || typeof job.job_id !== "string") {
+      return;
+    }
+    if (!pendingJobs.has(job.job_id)) {
+      return;
+    }
+    if (FINISHED_STATES.has(job.state)) {
+      if (job.result && typeof job.result === "object") {
+        settle(job);
+      } else {
+        poll(job.job_id);
+      }
+      return;
+    }
+    reportProgress(job);
+  }
+
+  function waitForJob(job) {
+    return new Promise((resolve, reject) => {
+      const entry = { resolve, reject, timer: null };
+      pendingJobs.set(job.job_id, entry);
+      entry.timer = setTimeout(() => poll(job.job_id), BULK_JOB_POLL_INTERVAL_MS);
+      handleJobEvent(job);
+    });
+  }
+
+  async function post(endpoint, payload = {}) {
+    const items = Array.isArray(payload.items) ? payload.items : [];
+    const background = items.length > BULK_JOB_BACKGROUND_THRESHOLD || payload.delete_all === true;
+    const body = background ? { ...payload, wait: false } : payload;
+    const response = await apiClient.fetch(apiPath(endpoint), {
+      method: "POST",
+      headers: { "Content-Type": "application/json" },
+      body: JSON.stringify(body),
+    });
+    if (!response.ok) {
+      throw new Error(`HTTP ${response.status}`);
+    }
+    const result = await response.json();
+    if (response.status !== 202 || !result || typeof result.job_id !== "string") {
+      return result;
+    }
+    return waitForJob(result);
+  }
+
+  async function cancel(jobId) {
+    const response = await apiClient.fetch(
+      apiPath(`/api/recordings/bulk-jobs/${encodeURIComponent(jobId)}/cancel`),
+      { method: "POST" },
+    );
+    return response.ok;
+  }
+
+  return { post, cancel, handleJobEvent };
+}
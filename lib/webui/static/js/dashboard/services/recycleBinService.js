@@ -22,6 +22,7 @@ export function createRecycleBinService(deps = {}) {
     recyclePathFromId,
     shouldDeferDashboardUpdate,
     markRecordingsRefreshDeferred,
+    bulkJobs,
   } = deps;
 
   if (!state || typeof state !== "object") {
@@ -33,6 +34,22 @@ export function createRecycleBinService(deps = {}) {
   if (typeof apiPath !== "function") {
     throw new Error("createRecycleBinService requires an apiPath helper");
   }
+
+  // Large selections run as server-side bulk jobs when a runner is supplied.
+  async function postBulk(endpoint, payload, failurePrefix = "HTTP") {
+    if (bulkJobs && typeof bulkJobs.post === "function") {
+      return bulkJobs.post(endpoint, payload);
+    }
+    const response = await apiClient.fetch(apiPath(endpoint), {
+      method: "POST",
+      headers: { "Content-Type": "application/json" },
+      body: JSON.stringify(payload),
+    });
+    if (!response.ok) {
+      throw new Error(`${failurePrefix} ${response.status}`);
+    }
+    return response.json();
+  }
   if (typeof normalizeStartTimestamps !== "function") {
     throw new Error("createRecycleBinService requires normalizeStartTimestamps");
   }
@@ -101,7 +118,9 @@ export function createRecycleBinService(deps = {}) {
     state.recycleBin.loading = true;
     updateRecycleBinControls();
     try {
-      const response = await apiClient.fetch(apiPath("/api/recycle-bin"));
+      const response = await apiClient.fetch(apiPath("/api/recycle-bin"), undefined, {
+        conditional: true,
+      });
       if (!response.ok) {
         throw new Error(`HTTP ${response.status}`);
       }
@@ -246,15 +265,7 @@ export function createRecycleBinService(deps = {}) {
     state.recycleBin.loading = true;
     updateRecycleBinControls();
     try {
-      const response = await apiClient.fetch(apiPath("/api/recycle-bin/restore"), {
-        method: "POST",
-        headers: { "Content-Type": "application/json" },
-        body: JSON.stringify({ items: ids }),
-      });
-      if (!response.ok) {
-        throw new Error(`HTTP ${response.status}`);
-      }
-      const payload = await response.json();
+      const payload = await postBulk("/api/recycle-bin/restore", { items: ids });
       const restored = Array.isArray(payload.restored) ? payload.restored : [];
       const errors = Array.isArray(payload.errors) ? payload.errors : [];
       if (errors.length > 0) {
@@ -322,15 +333,7 @@ export function createRecycleBinService(deps = {}) {
 
     let shouldReload = false;
     try {
-      const response = await apiClient.fetch(apiPath("/api/recycle-bin/purge"), {
-        method: "POST",
-        headers: { "Content-Type": "application/json" },
-        body: JSON.stringify({ items: sanitized }),
-      });
-      if (!response.ok) {
-        throw new Error(`HTTP ${response.status}`);
-      }
-      const payload = await response.json();
+      const payload = await postBulk("/api/recycle-bin/purge", { items: sanitized });
       const purged = Array.isArray(payload.purged) ? payload.purged : [];
       const errors = Array.isArray(payload.errors) ? payload.errors : [];
 
@@ -490,17 +493,7 @@ export function createRecycleBinService(deps = {}) {
     }
     const nextSelectionPath = findNextSelectionPath(paths);
     try {
-      const response = await apiClient.fetch(apiPath("/api/recordings/delete"), {
-        method: "POST",
-        headers: {
-          "Content-Type": "application/json",
-        },
-        body: JSON.stringify({ items: paths }),
-      });
-      if (!response.ok) {
-        throw new Error(`Delete failed with status ${response.status}`);
-      }
-      const payload = await response.json();
+      const payload = await postBulk("/api/recordings/delete", { items: paths }, "Delete failed with status");
       const deleted = Array.isArray(payload.deleted) ? payload.deleted : [];
       if (
         nextSelectionPath &&
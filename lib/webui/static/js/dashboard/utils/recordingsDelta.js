@@ -0,0 +1,171 @@
+// Fallback for servers that do not send `saved_prefix` with the delta.
+const DEFAULT_SAVED_PREFIX = "Saved/";
+
+function collectionForPath(path, savedPrefix = DEFAULT_SAVED_PREFIX) {
+  return typeof path === "string" && path.startsWith(savedPrefix) ? "saved" : "recent";
+}
+
+function itemSize(item) {
+  const value = Number(item && item.size_bytes);
+  return Number.isFinite(value) && value > 0 ? value : 0;
+}
+
+function numberOr(value, fallback) {
+  const numeric = Number(value);
+  return Number.isFinite(numeric) ? numeric : fallback;
+}
+
+function compareByModifiedDesc(a, b) {
+  return numberOr(b && b.modified, 0) - numberOr(a && a.modified, 0);
+}
+
+export function recordingsDeltaUrl(baseline) {
+  if (!baseline || !Number.isFinite(baseline.seq) || typeof baseline.epoch !== "string") {
+    return null;
+  }
+  const params = new URLSearchParams();
+  params.set("since", String(baseline.seq));
+  params.set("epoch", baseline.epoch);
+  return `/api/recordings/changes?${params.toString()}`;
+}
+
+export function canPatchRecordingsView({ search = "", day = "", timeRange = "", offset = 0 } = {}) {
+  // Filtered or paged views need server-side filtering to stay correct, so
+  // they always refetch the full listing.
+  return !search && !day && !timeRange && !(offset > 0);
+}
+
+/**
+ * Apply a `/api/recordings/changes` response to a previous `/api/recordings`
+ * payload. Returns the patched payload, or `null` when the delta cannot be
+ * applied locally and the caller must refetch the listing.
+ */
+export function applyRecordingsDelta(payload, delta) {
+  if (!payload || typeof payload !== "object" || !delta || typeof delta !== "object") {
+    return null;
+  }
+  if (delta.reset || !Number.isFinite(delta.seq)) {
+    return null;
+  }
+  const collection = payload.collection === "saved" ? "saved" : "recent";
+  const limit = numberOr(payload.limit, 0);
+  const items = Array.isArray(payload.items) ? payload.items.slice() : [];
+  const counts = { ...(payload.collection_counts || {}) };
+  const sizes = { ...(payload.collection_size_bytes || {}) };
+  let total = numberOr(payload.total, items.length);
+  let totalSize = numberOr(payload.total_size_bytes, 0);
+  let recordingsBytes = numberOr(payload.recordings_total_bytes, 0);
+  const days = new Set(Array.isArray(payload.available_days) ? payload.available_days : []);
+  const savedPrefix =
+    typeof delta.saved_prefix === "string" && delta.saved_prefix
+      ? delta.saved_prefix
+      : DEFAULT_SAVED_PREFIX;
+
+  const adjust = (target, countDelta, sizeDelta) => {
+    counts[target] = Math.max(0, numberOr(counts[target], 0) + countDelta);
+    sizes[target] = Math.max(0, numberOr(sizes[target], 0) + sizeDelta);
+    recordingsBytes = Math.max(0, recordingsBytes + sizeDelta);
+    if (target === collection) {
+      total = Math.max(0, total + countDelta);
+      totalSize = Math.max(0, totalSize + sizeDelta);
+    }
+  };
+
+  const indexOfPath = (path) => items.findIndex((item) => item && item.path === path);
+
+  for (const path of Array.isArray(delta.removed) ? delta.removed : []) {
+    const index = indexOfPath(path);
+    const removedSize = index >= 0 ? itemSize(items[index]) : 0;
+    if (index >= 0) {
+      items.splice(index, 1);
+    }
+    adjust(collectionForPath(path, savedPrefix), -1, -removedSize);
+  }
+  // Added and removed again since the cursor: only counted if this listing
+  // already showed it.
+  for (const path of Array.isArray(delta.discarded) ? delta.discarded : []) {
+    const index = indexOfPath(path);
+    if (index >= 0) {
+      const removedSize = itemSize(items[index]);
+      items.splice(index, 1);
+      adjust(collectionForPath(path, savedPrefix), -1, -removedSize);
+    }
+  }
+
+  const upsert = (item, isNew) => {
+    if (!item || typeof item.path !== "string") {
+      return;
+    }
+    const target = item.collection === "saved" || item.collection === "recent"
+      ? item.collection
+      : collectionForPath(item.path, savedPrefix);
+    const index = indexOfPath(item.path);
+    const previousSize = index >= 0 ? itemSize(items[index]) : 0;
+    if (index >= 0) {
+      items.splice(index, 1);
+    }
+    if (isNew && index < 0) {
+      adjust(target, 1, itemSize(item));
+    } else if (index >= 0) {
+      adjust(target, 0, itemSize(item) - previousSize);
+    }
+    if (target === collection) {
+      items.push(item);
+      if (typeof item.day === "string" && item.day) {
+        days.add(item.day);
+      }
+    }
+  };
+
+  for (const item of Array.isArray(delta.added) ? delta.added : []) {
+    upsert(item, true);
+  }
+  for (const item of Array.isArray(delta.updated) ? delta.updated : []) {
+    upsert(item, false);
+  }
+
+  items.sort(compareByModifiedDesc);
+  if (limit > 0 && items.length > limit) {
+    items.length = limit;
+  }
+  // Removals can pull records from the next page into view; only the server
+  // knows which ones.
+  if (items.length < Math.min(limit > 0 ? limit : total, total)) {
+    return null;
+  }
+
+  if (Number.isFinite(delta.recycle_bin_count)) {
+    counts.recycle = delta.recycle_bin_count;
+  }
+  let recycleBytes = payload.recycle_bin_total_bytes;
+  if (Number.isFinite(delta.recycle_bin_total_bytes)) {
+    recycleBytes = delta.recycle_bin_total_bytes;
+    sizes.recycle = delta.recycle_bin_total_bytes;
+  }
+
+  const patched = {
+    ...payload,
+    items,
+    total,
+    total_size_bytes: totalSize,
+    collection_counts: counts,
+    collection_size_bytes: sizes,
+    recordings_total_bytes: recordingsBytes,
+    recycle_bin_total_bytes: recycleBytes,
+    available_days: Array.from(days).sort().reverse(),
+    changes_epoch: delta.epoch,
+    changes_seq: delta.seq,
+  };
+  for (const key of [
+    "capture_status",
+    "motion_state",
+    "storage_total_bytes",
+    "storage_used_bytes",
+    "storage_free_bytes",
+  ]) {
+    if (Object.prototype.hasOwnProperty.call(delta, key)) {
+      patched[key] = delta[key];
+    }
+  }
+  return patched;
+}
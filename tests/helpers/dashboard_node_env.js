@@ -690,6 +690,11 @@ async function loadDashboard() {
     path.join(baseDir, "dashboard", "layout", "dashboardInitializer.js"),
     "dashboard/layout/dashboardInitializer.js",
   );
+  loadDependency(
+    sandbox,
+    path.join(baseDir, "dashboard", "services", "bulkJobs.js"),
+    "dashboard/services/bulkJobs.js",
+  );
   loadDependency(
     sandbox,
     path.join(baseDir, "dashboard", "services", "recycleBinService.js"),
@@ -972,6 +977,8 @@ async function loadDashboard() {
     `const { createDashboardInitializer = undefined } = dashboardInitializerModule;`,
     `const recycleBinServiceModule = globalThis.__dashboardModules[${JSON.stringify("dashboard/services/recycleBinService.js")}] || {};`,
     `const { createRecycleBinService = undefined } = recycleBinServiceModule;`,
+    `const bulkJobsModule = globalThis.__dashboardModules[${JSON.stringify("dashboard/services/bulkJobs.js")}] || {};`,
+    `const { createBulkJobRunner = undefined } = bulkJobsModule;`,
     `const recorderSettingsModule = globalThis.__dashboardModules[${JSON.stringify("dashboard/utils/recorderSettings.js")}] || {};`,
     `const {`,
     `  parseBoolean = undefined,`,
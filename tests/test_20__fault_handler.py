@@ -20,3 +20,20 @@ def test_safe_requeue_to_dropbox(tmp_path, monkeypatch):
     target = fault_handler._safe_requeue_to_dropbox(wav_path, "foo")
     assert target.exists()
     assert target.name.endswith("-RETRY.wav")
+
+
+def test_encode_failure_does_not_requeue_ingested_content(tmp_path, monkeypatch):
+    from lib.content_index import INGESTED, ContentIndex, file_digest
+
+    rec_dir = tmp_path / "recordings"
+    dropbox = tmp_path / "dropbox"
+    monkeypatch.setattr(fault_handler, "REC_DIR", rec_dir)
+    monkeypatch.setattr(fault_handler, "DROPBOX_DIR", dropbox)
+    monkeypatch.setattr(fault_handler, "_log", lambda msg: None)
+    wav_path = tmp_path / "foo.wav"
+    wav_path.write_bytes(b"dummy")
+    ContentIndex(rec_dir).record(file_digest(wav_path), INGESTED, [])
+
+    assert fault_handler.handle_encode_failure(str(wav_path), "foo") == 0
+    assert not wav_path.exists()
+    assert not (dropbox / "foo-RETRY.wav").exists()
@@ -267,8 +267,9 @@ async def test_dashboard_page_structure(aiohttp_client):
     assert "Tricorder Dashboard" in body
     assert 'id="recordings-table"' in body
     assert 'id="config-viewer"' in body
-    assert 'href="/static/css/dashboard.css"' in body
-    assert 'src="/static/js/dashboard/bootstrap.js"' in body
+    static_prefix = web_streamer.webui.asset_catalog().url_prefix()
+    assert f'href="{static_prefix}/css/dashboard.css"' in body
+    assert f'src="{static_prefix}/js/dashboard/bootstrap.js"' in body
     assert 'data-tricorder-stream-mode="hls"' in body
     assert "data-tricorder-webrtc-ice-servers" in body
 
@@ -410,8 +411,9 @@ async def test_hls_page_still_available(aiohttp_client):
     assert 'id="player"' in body
     assert 'id="clients"' in body
     assert 'id="enc"' in body
-    assert 'href="/static/css/main.css"' in body
-    assert 'src="/static/js/hls.js"' in body
+    static_prefix = web_streamer.webui.asset_catalog().url_prefix()
+    assert f'href="{static_prefix}/css/main.css"' in body
+    assert f'src="{static_prefix}/js/hls.js"' in body
 
 
 @pytest.mark.asyncio
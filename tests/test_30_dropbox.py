@@ -36,6 +36,30 @@ def test_process_file_creates_output(tmp_path, monkeypatch):
     assert wav_path.exists()
 
 
+def test_chunk_workers_share_cpus_and_wait_for_admission(tmp_path, monkeypatch):
+    monkeypatch.setattr(segmenter, "ENCODER", "/bin/true")
+    monkeypatch.setattr(process_dropped_file, "PARALLEL_WORKERS", 0)
+    monkeypatch.setattr(process_dropped_file.os, "sched_getaffinity", lambda pid: set(range(8)), raising=False)
+    monkeypatch.setattr(process_dropped_file, "CONCURRENT_FILES", 3)
+    assert process_dropped_file._chunk_workers() == 2
+    monkeypatch.setattr(process_dropped_file, "CONCURRENT_FILES", 16)
+    assert process_dropped_file._chunk_workers() == 1
+
+    # Long enough to split, but the shared CPU admission is closed.
+    monkeypatch.setattr(process_dropped_file, "CONCURRENT_FILES", 1)
+    monkeypatch.setattr(process_dropped_file, "PARALLEL_MIN_SECONDS", 0.5)
+    monkeypatch.setattr(process_dropped_file, "offline_cpu_available", lambda: False)
+
+    def no_pool(*args, **kwargs):
+        raise AssertionError("chunk pool started without CPU admission")
+
+    monkeypatch.setattr(process_dropped_file, "ProcessPoolExecutor", no_pool)
+    wav_path = tmp_path / "input.wav"
+    make_test_wav(wav_path)
+
+    assert process_dropped_file.process_file(str(wav_path)) > 0.0
+
+
 def test_scan_retries_orphaned_work_files(tmp_path, monkeypatch):
     work_dir = tmp_path / "ingest"
     dropbox_dir = tmp_path / "dropbox"
@@ -277,3 +301,48 @@ def test_cleanup_retry_artifacts_handles_missing_waveform(tmp_path, monkeypatch)
     assert payload["reason"] == "missing-waveform"
     assert not audio_path.exists()
 
+
+
+def test_process_file_skips_content_already_ingested(tmp_path, monkeypatch):
+    from lib.content_index import INGESTED, ContentIndex, file_digest
+
+    recordings_dir = tmp_path / "recordings"
+    monkeypatch.setattr(process_dropped_file, "REC_DIR", recordings_dir)
+    monkeypatch.setattr(process_dropped_file, "DEDUPLICATE", True)
+    monkeypatch.setattr(segmenter, "ENCODER", "/bin/true")
+    output = recordings_dir / "20240101" / "12-00-00_Both_RMS-900_1.opus"
+    output.parent.mkdir(parents=True)
+    output.write_bytes(b"opus")
+
+    finalized: list[str] = []
+
+    def fake_enqueue(tmp_wav_path: str, base_name: str, **_kwargs) -> None:
+        finalized.append(base_name)
+        return None
+
+    monkeypatch.setattr(segmenter, "_enqueue_encode_job", fake_enqueue)
+    monkeypatch.setattr(
+        segmenter.TimelineRecorder,
+        "finalized_paths",
+        lambda self: (str(output),) if finalized else (),
+    )
+
+    wav_path = tmp_path / "field.wav"
+    make_test_wav(wav_path, freq=523)
+    process_dropped_file.process_file(str(wav_path))
+    assert finalized
+
+    record = ContentIndex(recordings_dir).lookup_existing(file_digest(wav_path), INGESTED)
+    assert record is not None
+    assert record.outputs == ("20240101/12-00-00_Both_RMS-900_1.opus",)
+
+    finalized.clear()
+    copy = tmp_path / "field-again.wav"
+    copy.write_bytes(wav_path.read_bytes())
+    assert process_dropped_file.process_file(str(copy)) == 0.0
+    assert not finalized
+
+    # Once the recording is gone the same content is ingested again.
+    output.unlink()
+    process_dropped_file.process_file(str(copy))
+    assert finalized
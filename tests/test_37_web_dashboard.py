@@ -9,6 +9,7 @@ import time
 from datetime import datetime, timezone
 import io
 import shutil
+import struct
 import wave
 import zipfile
 from pathlib import Path
@@ -17,7 +18,7 @@ import pytest
 from aiohttp import web
 from aiohttp.test_utils import TestClient, TestServer
 
-from lib import web_streamer
+from lib import ogg_clip, web_streamer
 import lib.config as config
 import yaml
 
@@ -82,6 +83,34 @@ def _write_waveform_stub(
     target.write_text(json.dumps(payload), encoding="utf-8")
 
 
+def _write_ogg_opus_stub(target: Path, duration: float, *, packets_per_page: int = 10) -> None:
+    """Write a structurally valid Ogg Opus stream of 20 ms dummy packets."""
+
+    def page(header_type: int, granule: int, sequence: int, packets: list[bytes]) -> bytes:
+        lacing = b"".join(
+            bytes([255] * (len(packet) // 255) + [len(packet) % 255]) for packet in packets
+        )
+        data = bytearray(
+            struct.pack("<4sBBqIIIB", b"OggS", 0, header_type, granule, 1, sequence, 0, len(lacing))
+            + lacing
+            + b"".join(packets)
+        )
+        struct.pack_into("<I", data, 22, ogg_clip.ogg_crc(bytes(data)))
+        return bytes(data)
+
+    head = b"OpusHead" + struct.pack("<BBHIhB", 1, 1, 312, 48000, 0, 0)
+    tags = b"OpusTags" + struct.pack("<II", 0, 0)
+    pages = [page(0x02, 0, 0, [head]), page(0, 0, 1, [tags])]
+    packets = [b"\xf8" + bytes([index % 256]) * 24 for index in range(int(duration * 50) + 1)]
+    granule = 0
+    for first in range(0, len(packets), packets_per_page):
+        chunk = packets[first : first + packets_per_page]
+        granule += 960 * len(chunk)
+        last = first + packets_per_page >= len(packets)
+        pages.append(page(0x04 if last else 0, granule, len(pages), chunk))
+    target.write_bytes(b"".join(pages))
+
+
 def _create_silent_wav(path: Path, duration: float = 2.0) -> None:
     frame_count = max(1, int(48000 * max(duration, 0)))
     with wave.open(str(path), "wb") as handle:
@@ -321,7 +350,8 @@ def test_dashboard_happy_path_serves_recording(dashboard_env):
             assert response.status == 200
             html = await response.text()
             assert "Tricorder Dashboard" in html
-            assert "/static/js/dashboard.js" in html
+            version = web_streamer.webui.asset_catalog().version
+            assert f"/static/{version}/js/dashboard.js" in html
 
             recordings = await client.get("/api/recordings?limit=5")
             assert recordings.status == 200
@@ -2352,6 +2382,166 @@ def test_recordings_clip_rename_without_reencoding(dashboard_env):
     asyncio.run(runner())
 
 
+def _write_opus_clip_source(day_dir: Path, name: str = "source.opus") -> Path:
+    source = day_dir / name
+    _write_ogg_opus_stub(source, duration=10.0)
+    buckets = 2048
+    _write_waveform_stub(
+        source.with_suffix(source.suffix + ".waveform.json"),
+        duration=10.0,
+        extra={
+            "peaks": [value for index in range(buckets) for value in (-index, index)],
+            "rms_values": list(range(buckets)),
+        },
+    )
+    return source
+
+
+def test_recordings_clip_stream_copies_opus_without_ffmpeg(monkeypatch, dashboard_env):
+    async def runner():
+        day_dir = dashboard_env / "20240113"
+        day_dir.mkdir()
+
+        source = _write_opus_clip_source(day_dir)
+        buckets = 2048
+
+        def fail_subprocess(*_args, **_kwargs):
+            raise AssertionError("stream-copy clips must not spawn ffmpeg")
+
+        monkeypatch.setattr(web_streamer.subprocess, "run", fail_subprocess)
+
+        app = web_streamer.build_app()
+        client, server = await _start_client(app)
+
+        try:
+            payload = {
+                "source_path": f"{day_dir.name}/{source.name}",
+                "start_seconds": 2.5,
+                "end_seconds": 6.0,
+                "clip_name": "copied",
+            }
+            resp = await client.post("/api/recordings/clip", json=payload)
+            assert resp.status == 200
+            data = await resp.json()
+            assert data["path"] == f"{day_dir.name}/copied.opus"
+            assert data["duration_seconds"] == pytest.approx(3.5)
+
+            clip_file = day_dir / "copied.opus"
+            index = ogg_clip.build_index(clip_file)
+            assert index.duration_seconds == pytest.approx(3.5, abs=1e-6)
+            assert index.pre_skip >= ogg_clip.OPUS_PREROLL_SAMPLES
+
+            waveform = json.loads(
+                clip_file.with_suffix(clip_file.suffix + ".waveform.json").read_text()
+            )
+            assert waveform["duration_seconds"] == pytest.approx(3.5)
+            assert waveform["rms_values"][0] == int(2.5 / 10.0 * buckets)
+            assert len(waveform["peaks"]) == 2 * len(waveform["rms_values"])
+            assert not list(day_dir.rglob("*.partial"))
+        finally:
+            await client.close()
+            await server.close()
+
+    asyncio.run(runner())
+
+
+def test_recordings_clip_undo_hardlinks_previous_version(dashboard_env):
+    async def runner():
+        day_dir = dashboard_env / "20240115"
+        day_dir.mkdir()
+        source = _write_opus_clip_source(day_dir)
+        undo_root = dashboard_env / web_streamer.CLIP_UNDO_DIRNAME
+
+        app = web_streamer.build_app()
+        client, server = await _start_client(app)
+
+        try:
+            base = {"source_path": f"{day_dir.name}/{source.name}", "clip_name": "take"}
+            resp = await client.post(
+                "/api/recordings/clip", json={**base, "start_seconds": 1.0, "end_seconds": 4.0}
+            )
+            assert resp.status == 200
+            clip_path = day_dir / "take.opus"
+            first_inode = clip_path.stat().st_ino
+            first_bytes = clip_path.read_bytes()
+
+            resp = await client.post(
+                "/api/recordings/clip", json={**base, "start_seconds": 2.0, "end_seconds": 6.0}
+            )
+            assert resp.status == 200
+            token = (await resp.json())["undo_token"]
+
+            backup_dir = undo_root / token
+            backup = backup_dir / "take.opus"
+            # The previous version was kept by linking, not by copying it.
+            assert backup.stat().st_ino == first_inode
+            assert json.loads((backup_dir / "meta.json").read_text())["method"] == "hardlink"
+            assert clip_path.stat().st_ino != first_inode
+            # Backups sit on the recordings filesystem but are not listed.
+            listing = await (await client.get("/api/recordings")).json()
+            assert sorted(item["path"] for item in listing["items"]) == [
+                f"{day_dir.name}/{source.name}",
+                f"{day_dir.name}/take.opus",
+            ]
+
+            resp = await client.post("/api/recordings/clip/undo", json={"token": token})
+            assert resp.status == 200
+            assert clip_path.stat().st_ino == first_inode
+            assert clip_path.read_bytes() == first_bytes
+            assert not backup_dir.exists()
+        finally:
+            await client.close()
+            await server.close()
+
+    asyncio.run(runner())
+
+
+def test_recordings_clip_undo_history_is_size_bounded(dashboard_env, tmp_path, monkeypatch):
+    config_path = tmp_path / "config.yaml"
+    config_path.write_text("dashboard:\n  clip_undo_max_mb: 0\n", encoding="utf-8")
+    monkeypatch.setenv("TRICORDER_CONFIG", str(config_path))
+
+    async def runner():
+        day_dir = dashboard_env / "20240116"
+        day_dir.mkdir()
+        source = _write_opus_clip_source(day_dir)
+        undo_root = dashboard_env / web_streamer.CLIP_UNDO_DIRNAME
+
+        app = web_streamer.build_app()
+        client, server = await _start_client(app)
+
+        try:
+            tokens = []
+            for start in (1.0, 2.0, 3.0, 4.0):
+                resp = await client.post(
+                    "/api/recordings/clip",
+                    json={
+                        "source_path": f"{day_dir.name}/{source.name}",
+                        "clip_name": "take",
+                        "start_seconds": start,
+                        "end_seconds": start + 2.0,
+                    },
+                )
+                assert resp.status == 200
+                token = (await resp.json()).get("undo_token")
+                if token:
+                    tokens.append(token)
+
+            assert len(tokens) == 3
+            # Over budget, only the newest backup is kept so the last edit
+            # can still be undone.
+            assert sorted(entry.name for entry in undo_root.iterdir()) == [tokens[-1]]
+            resp = await client.post("/api/recordings/clip/undo", json={"token": tokens[0]})
+            assert resp.status == 404
+            resp = await client.post("/api/recordings/clip/undo", json={"token": tokens[-1]})
+            assert resp.status == 200
+        finally:
+            await client.close()
+            await server.close()
+
+    asyncio.run(runner())
+
+
 def test_recordings_rename_rejects_unsupported_characters(dashboard_env):
     if not shutil.which("ffmpeg"):
         pytest.skip("ffmpeg not available")
@@ -2508,6 +2698,206 @@ def test_recordings_clip_long_running_does_not_block_dashboard(monkeypatch, dash
     asyncio.run(runner())
 
 
+def test_recordings_clip_async_jobs_deduplicate_and_publish_progress(monkeypatch, dashboard_env):
+    async def runner():
+        day_dir = dashboard_env / "20240114"
+        day_dir.mkdir()
+
+        source = day_dir / "long.wav"
+        _create_silent_wav(source, duration=5.0)
+        _write_waveform_stub(source.with_suffix(source.suffix + ".waveform.json"), duration=5.0)
+
+        start_event = threading.Event()
+        release_event = threading.Event()
+        encode_calls = []
+
+        def fake_run(cmd, check=False, *_, **__):
+            dest_path = Path(cmd[-1] if cmd else "")
+            if dest_path.name == "clip.wav":
+                dest_path.write_bytes(b"decoded")
+            elif dest_path.name == "clip.opus":
+                encode_calls.append(cmd)
+                start_event.set()
+                if not release_event.wait(timeout=5):
+                    raise RuntimeError("clip encoding did not release in time")
+                dest_path.write_bytes(b"encoded")
+            return subprocess.CompletedProcess(cmd, 0)
+
+        def fake_generate_waveform(_, dest, **__):
+            Path(dest).write_text(json.dumps({"duration_seconds": 1.0}))
+
+        monkeypatch.setattr(web_streamer.subprocess, "run", fake_run)
+        monkeypatch.setattr(web_streamer, "generate_waveform", fake_generate_waveform)
+
+        app = web_streamer.build_app()
+        client, server = await _start_client(app)
+
+        try:
+            payload = {
+                "source_path": f"{day_dir.name}/{source.name}",
+                "start_seconds": 0.5,
+                "end_seconds": 3.0,
+                "clip_name": "queued-take",
+                "wait": False,
+            }
+            first = await client.post("/api/recordings/clip", json=payload)
+            assert first.status == 202
+            first_job = await first.json()
+            assert first_job["state"] in {"queued", "running"}
+            assert first_job["deduplicated"] is False
+
+            for _ in range(100):
+                if start_event.is_set():
+                    break
+                await asyncio.sleep(0.02)
+            assert start_event.is_set()
+
+            second = await client.post("/api/recordings/clip", json=payload)
+            assert second.status == 202
+            second_job = await second.json()
+            assert second_job["job_id"] == first_job["job_id"]
+            assert second_job["deduplicated"] is True
+
+            status = await client.get(f"/api/recordings/clip/jobs/{first_job['job_id']}")
+            assert status.status == 200
+            running = await status.json()
+            assert running["state"] == "running"
+            assert running["stage"] == "encoding"
+
+            release_event.set()
+            final = None
+            for _ in range(100):
+                status = await client.get(f"/api/recordings/clip/jobs/{first_job['job_id']}")
+                final = await status.json()
+                if final["state"] == "completed":
+                    break
+                await asyncio.sleep(0.02)
+            assert final is not None and final["state"] == "completed"
+            assert final["result"]["path"] == f"{day_dir.name}/queued-take.opus"
+            assert len(encode_calls) == 1
+
+            missing = await client.get("/api/recordings/clip/jobs/unknown")
+            assert missing.status == 404
+
+            bus = app[web_streamer.EVENT_BUS_KEY]
+            job_events = [
+                event["payload"]
+                for event in bus.history_snapshot()
+                if event["type"] == "clip_job"
+                and event["payload"]["job_id"] == first_job["job_id"]
+            ]
+            stages = [event["stage"] for event in job_events]
+            assert stages[0] == "queued"
+            assert "encoding" in stages
+            assert stages[-1] == "completed"
+            progress = [event["progress"] for event in job_events]
+            assert progress == sorted(progress)
+            assert any(
+                event["type"] == "recordings_changed"
+                and event["payload"].get("reason") == "clipped"
+                for event in bus.history_snapshot()
+            )
+        finally:
+            release_event.set()
+            await client.close()
+            await server.close()
+
+    asyncio.run(runner())
+
+
+def test_clipper_waits_for_async_clip_job_events():
+    node_path = shutil.which("node")
+    if node_path is None:
+        pytest.skip("Node.js binary is required for dashboard clipper tests")
+    root = Path(__file__).resolve().parents[1]
+    module_url = (
+        root / "lib" / "webui" / "static" / "js" / "dashboard" / "modules" / "clipperController.js"
+    ).as_uri()
+    script = textwrap.dedent(
+        f"""
+        globalThis.window = globalThis;
+        const {{ createClipperController }} = await import({json.dumps(module_url)});
+        const requests = [];
+        const selected = [];
+        const statuses = [];
+        const apiClient = {{
+          fetch: async (url, options = {{}}) => {{
+            requests.push({{ url, body: options.body ? JSON.parse(options.body) : null }});
+            return {{
+              ok: true,
+              status: 202,
+              json: async () => ({{ job_id: "job-1", state: "queued", progress: 0 }}),
+            }};
+          }},
+        }};
+        const dom = {{
+          clipperForm: {{ setAttribute: () => {{}} }},
+          clipperNameInput: {{ value: "take", disabled: false }},
+          clipperStatus: {{ textContent: "", dataset: {{}}, setAttribute: () => {{}} }},
+        }};
+        let refreshed = false;
+        const controller = createClipperController({{
+          dom,
+          state: {{ current: {{ path: "20240105/source.opus", extension: "opus", name: "source" }}, records: [] }},
+          clamp: (value, min, max) => Math.min(Math.max(value, min), max),
+          numericValue: (value, fallback = 0) => (typeof value === "number" ? value : fallback),
+          formatTimecode: (seconds) => String(seconds),
+          formatTimeSlug: (seconds) => String(seconds),
+          toFiniteOrNull: (value) => (Number.isFinite(value) ? value : null),
+          isRecycleBinRecord: () => false,
+          fetchRecordings: async () => {{ refreshed = true; }},
+          apiClient,
+          apiPath: (path) => path,
+          getRecordStartSeconds: () => null,
+          resumeAutoRefresh: () => {{}},
+          setPendingSelectionPath: (path) => selected.push(path),
+          MIN_CLIP_DURATION_SECONDS: 0.05,
+          ensurePreviewSectionOrder: () => {{}},
+          updateClipSelectionRange: () => {{}},
+        }});
+        controller.state.durationSeconds = 10;
+        controller.state.startSeconds = 1;
+        controller.state.endSeconds = 4;
+        const done = controller.submitForm({{ preventDefault: () => {{}} }});
+        await new Promise((resolve) => setTimeout(resolve, 10));
+        controller.handleJobEvent({{ job_id: "job-1", state: "running", stage: "encoding", progress: 0.45 }});
+        statuses.push(dom.clipperStatus.textContent);
+        controller.handleJobEvent({{
+          job_id: "job-1",
+          state: "completed",
+          progress: 1,
+          result: {{ path: "20240105/take.opus", undo_token: "tok" }},
+        }});
+        await done;
+        statuses.push(dom.clipperStatus.textContent);
+        console.log(JSON.stringify({{
+          body: requests[0].body,
+          requestCount: requests.length,
+          selected,
+          statuses,
+          refreshed,
+          undo: controller.state.undoTokens.get("20240105/take.opus") || null,
+        }}));
+        process.exit(0);
+        """
+    )
+    completed = subprocess.run(
+        [node_path, "--input-type=module", "-e", script],
+        cwd=root,
+        capture_output=True,
+        text=True,
+        timeout=30,
+    )
+    assert completed.returncode == 0, completed.stderr
+    result = json.loads(completed.stdout.strip().splitlines()[-1])
+    assert result["body"]["wait"] is False
+    assert result["requestCount"] == 1
+    assert result["selected"] == ["20240105/take.opus"]
+    assert result["statuses"] == ["Saving clip… 45%", "Clip saved."]
+    assert result["refreshed"] is True
+    assert result["undo"] == "tok"
+
+
 def test_recordings_clip_endpoint_validates_range(dashboard_env):
     if not shutil.which("ffmpeg"):
         pytest.skip("ffmpeg not available")
@@ -2631,6 +3021,82 @@ def test_recordings_pagination(dashboard_env):
     asyncio.run(runner())
 
 
+async def _built_sync_manifest(client, query=""):
+    """Poll the sync manifest until its background refresh has finished."""
+
+    for _ in range(200):
+        resp = await client.get(f"/api/sync/manifest{query}")
+        assert resp.status == 200
+        payload = await resp.json()
+        if not payload["building"]:
+            return resp, payload
+        await asyncio.sleep(0.02)
+    raise AssertionError("sync manifest never finished building")
+
+
+def test_sync_manifest_serves_full_listing_then_deltas(dashboard_env):
+    async def runner():
+        day_dir = dashboard_env / "20240110"
+        day_dir.mkdir()
+        first = day_dir / "first.opus"
+        first.write_bytes(b"0123456789")
+        (day_dir / "live.partial.opus").write_bytes(b"growing")
+
+        app = web_streamer.build_app()
+        client, server = await _start_client(app)
+
+        try:
+            resp, payload = await _built_sync_manifest(client)
+            assert resp.headers["Cache-Control"] == "no-store"
+            assert payload["version"] == 1
+            assert payload["files_url"] == "/recordings/"
+            assert [entry["path"] for entry in payload["files"]] == ["20240110/first.opus"]
+            assert payload["files"][0]["size"] == 10
+            assert payload["files"][0]["hash"]
+            assert payload["has_more"] is False
+            cursor, epoch = payload["next_cursor"], payload["epoch"]
+
+            # Interrupted downloads resume through the regular file route.
+            ranged = await client.get(
+                "/recordings/20240110/first.opus", headers={"Range": "bytes=4-"}
+            )
+            assert ranged.status == 206
+            assert await ranged.read() == b"456789"
+
+            second = day_dir / "second.opus"
+            second.write_bytes(b"second")
+            first.unlink()
+            app[web_streamer.EVENT_BUS_KEY].publish(
+                "recordings_changed", {"reason": "test", "paths": ["20240110/second.opus"]}
+            )
+
+            # The reported change starts a refresh that the request does not wait for.
+            _resp, delta = await _built_sync_manifest(
+                client, f"?cursor={cursor}&epoch={epoch}&limit=1"
+            )
+            assert delta["reset"] is False
+            assert delta["has_more"] is True
+            assert len(delta["files"]) == 1
+            rest_resp = await client.get(
+                f"/api/sync/manifest?cursor={delta['next_cursor']}&epoch={epoch}"
+            )
+            rest = await rest_resp.json()
+            changes = {entry["path"]: entry for entry in delta["files"] + rest["files"]}
+            assert changes["20240110/first.opus"]["deleted"] is True
+            assert changes["20240110/second.opus"]["size"] == 6
+
+            stale = await client.get(f"/api/sync/manifest?cursor={cursor}&epoch=stale")
+            assert (await stale.json())["reset"] is True
+
+            bad = await client.get("/api/sync/manifest?cursor=-1")
+            assert bad.status == 400
+        finally:
+            await client.close()
+            await server.close()
+
+    asyncio.run(runner())
+
+
 def test_recording_start_epoch_in_payload(dashboard_env):
     async def runner():
         day_dir = dashboard_env / "20240105"
@@ -2747,6 +3213,113 @@ def test_delete_recording(dashboard_env):
     asyncio.run(runner())
 
 
+def test_bulk_delete_runs_as_background_job(dashboard_env):
+    async def runner():
+        day_dir = dashboard_env / "20240106"
+        day_dir.mkdir()
+        paths = []
+        for index in range(5):
+            path = day_dir / f"bulk-{index}.opus"
+            path.write_bytes(b"bulk")
+            paths.append(f"20240106/{path.name}")
+
+        app = web_streamer.build_app()
+        client, server = await _start_client(app)
+
+        try:
+            resp = await client.post(
+                "/api/recordings/delete", json={"items": paths + ["../escape.opus"], "wait": False}
+            )
+            assert resp.status == 202
+            job = await resp.json()
+            assert job["kind"] == "delete"
+            assert job["total"] == 6
+
+            for _ in range(200):
+                resp = await client.get(f"/api/recordings/bulk-jobs/{job['job_id']}")
+                assert resp.status == 200
+                job = await resp.json()
+                if job["state"] == "completed":
+                    break
+                await asyncio.sleep(0.02)
+            assert job["state"] == "completed"
+            assert job["processed"] == 6
+            assert sorted(job["result"]["deleted"]) == paths
+            assert [error["item"] for error in job["result"]["errors"]] == ["../escape.opus"]
+            assert not any(day_dir.glob("*.opus"))
+
+            resp = await client.get("/api/recycle-bin")
+            assert (await resp.json())["total"] == 5
+
+            resp = await client.get("/api/recordings/bulk-jobs")
+            listed = (await resp.json())["jobs"]
+            assert [entry["job_id"] for entry in listed] == [job["job_id"]]
+
+            resp = await client.post("/api/recordings/bulk-jobs/unknown/cancel")
+            assert resp.status == 404
+        finally:
+            await client.close()
+            await server.close()
+
+    asyncio.run(runner())
+
+def test_recycle_bin_listing_pages_from_index(dashboard_env):
+    from lib import recycle_bin_utils
+    from lib.recycle_bin_index import RecycleBinIndex
+
+    async def runner():
+        day_dir = dashboard_env / "20240104"
+        day_dir.mkdir()
+        for name in ("one", "two", "three"):
+            (day_dir / f"{name}.opus").write_bytes(name.encode())
+
+        app = web_streamer.build_app()
+        client, server = await _start_client(app)
+
+        try:
+            for name in ("one", "two"):
+                resp = await client.post("/api/recordings/delete", json={"items": [f"20240104/{name}.opus"]})
+                assert resp.status == 200
+
+            resp = await client.get("/api/recycle-bin", params={"limit": "1"})
+            assert resp.status == 200
+            first_page = await resp.json()
+            assert first_page["total"] == 2
+            assert first_page["limit"] == 1
+            assert [item["original_path"] for item in first_page["items"]] == ["20240104/two.opus"]
+
+            resp = await client.get("/api/recycle-bin", params={"limit": "1", "offset": "1"})
+            second_page = await resp.json()
+            assert [item["original_path"] for item in second_page["items"]] == ["20240104/one.opus"]
+
+            # The encoder moves short clips into the bin from another process.
+            recycle_bin_utils.move_short_recording_to_recycle_bin(day_dir / "three.opus", dashboard_env)
+
+            resp = await client.get("/api/recycle-bin")
+            listing = await resp.json()
+            assert listing["total"] == 3
+            assert listing["items"][0]["original_path"] == "20240104/three.opus"
+            assert listing["items"][0]["reason"] == "short_clip"
+
+            resp = await client.post("/api/recycle-bin/restore", json={"items": [listing["items"][0]["id"]]})
+            assert resp.status == 200
+            assert (day_dir / "three.opus").exists()
+
+            index = RecycleBinIndex(dashboard_env / web_streamer.RECYCLE_BIN_DIRNAME)
+            assert index.stats().count == 2
+
+            resp = await client.post("/api/recycle-bin/purge", json={"delete_all": True})
+            assert resp.status == 200
+            assert index.stats().count == 0
+            resp = await client.get("/api/recycle-bin")
+            assert (await resp.json())["total"] == 0
+        finally:
+            await client.close()
+            await server.close()
+
+    asyncio.run(runner())
+
+
 def test_services_listing_reports_status(monkeypatch, dashboard_env):
     async def runner():
         show_map = {
@@ -3437,6 +4010,11 @@ def test_recordings_bulk_download_includes_sidecars(dashboard_env):
             assert resp.headers.get("Content-Type") == "application/zip"
             archive_bytes = await resp.read()
             with zipfile.ZipFile(io.BytesIO(archive_bytes)) as archive:
+                assert archive.testzip() is None
+                assert {info.compress_type for info in archive.infolist()} == {
+                    zipfile.ZIP_STORED
+                }
+                assert archive.read(f"{day_dir.name}/{first.name}") == b"alpha"
                 names = sorted(archive.namelist())
                 assert names == sorted(
                     [
@@ -3464,6 +4042,37 @@ def test_recordings_bulk_download_includes_sidecars(dashboard_env):
     asyncio.run(runner())
 
 
+def test_recordings_bulk_download_skips_unreadable_members(dashboard_env):
+    async def runner():
+        day_dir = dashboard_env / "20240105"
+        day_dir.mkdir()
+        recording = day_dir / "alpha.opus"
+        recording.write_bytes(b"alpha")
+        _write_waveform_stub(recording.with_suffix(".opus.waveform.json"))
+        # Opening a directory fails with IsADirectoryError, not FileNotFoundError.
+        (day_dir / "alpha.opus.transcript.json").mkdir()
+
+        app = web_streamer.build_app()
+        client, server = await _start_client(app)
+
+        try:
+            resp = await client.post(
+                "/api/recordings/bulk-download", json={"items": ["20240105/alpha.opus"]}
+            )
+            assert resp.status == 200
+            with zipfile.ZipFile(io.BytesIO(await resp.read())) as archive:
+                assert archive.testzip() is None
+                assert sorted(archive.namelist()) == [
+                    "20240105/alpha.opus",
+                    "20240105/alpha.opus.waveform.json",
+                ]
+        finally:
+            await client.close()
+            await server.close()
+
+    asyncio.run(runner())
+
+
 def test_recording_indicator_motion_badge_tracks_live_flag():
     script = textwrap.dedent(
         """
@@ -4078,3 +4687,604 @@ def test_sd_card_recovery_static_doc_served(dashboard_env):
             await server.close()
 
     asyncio.run(runner())
+
+
+def test_static_assets_are_versioned_precompressed_and_immutable(dashboard_env):
+    async def runner():
+        app = web_streamer.build_app()
+        client, server = await _start_client(app)
+
+        try:
+            version = web_streamer.webui.asset_catalog().version
+            url = f"/static/{version}/js/dashboard.js"
+            plain_resp = await client.get(url, headers={"Accept-Encoding": "identity"})
+            assert plain_resp.status == 200
+            plain = await plain_resp.read()
+            assert "immutable" in plain_resp.headers["Cache-Control"]
+            assert plain_resp.headers["Vary"] == "Accept-Encoding"
+            assert "Content-Encoding" not in plain_resp.headers
+
+            gzip_resp = await client.get(
+                url, headers={"Accept-Encoding": "gzip"}, auto_decompress=False
+            )
+            assert gzip_resp.status == 200
+            assert gzip_resp.headers["Content-Encoding"] == "gzip"
+            compressed = await gzip_resp.read()
+            assert len(compressed) < len(plain)
+            import gzip as gzip_module
+
+            assert gzip_module.decompress(compressed) == plain
+            assert gzip_resp.headers["ETag"] != plain_resp.headers["ETag"]
+
+            revalidated = await client.get(
+                url,
+                headers={
+                    "Accept-Encoding": "gzip",
+                    "If-None-Match": gzip_resp.headers["ETag"],
+                },
+            )
+            assert revalidated.status == 304
+
+            legacy = await client.get("/static/js/dashboard.js")
+            assert legacy.status == 200
+            assert legacy.headers["Cache-Control"] == "no-cache"
+
+            stale = await client.get("/static/000000000000/js/dashboard.js")
+            assert stale.status == 200
+            assert stale.headers["Cache-Control"] == "no-cache"
+
+            missing = await client.get(f"/static/{version}/js/missing.js")
+            assert missing.status == 404
+        finally:
+            await client.close()
+            await server.close()
+
+    asyncio.run(runner())
+
+
+def test_dashboard_html_cached_until_config_changes(dashboard_env, monkeypatch, tmp_path):
+    config_path = tmp_path / "config.yaml"
+    config_path.write_text("dashboard:\n  api_base: ''\n", encoding="utf-8")
+    monkeypatch.setenv("TRICORDER_CONFIG", str(config_path))
+    monkeypatch.setattr(config, "_cfg_cache", None, raising=False)
+    monkeypatch.setattr(config, "_primary_config_path", None, raising=False)
+    monkeypatch.setattr(config, "_active_config_path", None, raising=False)
+    monkeypatch.setattr(config, "_search_paths", [], raising=False)
+
+    renders: list[str] = []
+    original_render = web_streamer.webui.render_template
+
+    def _counting_render(name, **context):
+        renders.append(name)
+        return original_render(name, **context)
+
+    monkeypatch.setattr(web_streamer.webui, "render_template", _counting_render)
+
+    async def runner():
+        app = web_streamer.build_app()
+        client, server = await _start_client(app)
+
+        try:
+            first = await client.get("/", headers={"Accept-Encoding": "gzip"})
+            assert first.status == 200
+            etag = first.headers["ETag"]
+            assert first.headers["Cache-Control"] == "no-cache"
+
+            second = await client.get(
+                "/", headers={"Accept-Encoding": "gzip", "If-None-Match": etag}
+            )
+            assert second.status == 304
+            assert renders.count("dashboard.html") == 1
+
+            assert config.primary_config_path() == config_path
+            stat = config_path.stat()
+            os.utime(config_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 5_000_000_000))
+
+            third = await client.get("/")
+            assert third.status == 200
+            assert renders.count("dashboard.html") == 2
+        finally:
+            await client.close()
+            await server.close()
+
+    asyncio.run(runner())
+
+
+def test_json_apis_answer_conditional_requests(dashboard_env):
+    async def runner():
+        day_dir = dashboard_env / "20240105"
+        day_dir.mkdir()
+        file_path = day_dir / "conditional.opus"
+        file_path.write_bytes(b"conditional")
+        _write_waveform_stub(file_path.with_suffix(".opus.waveform.json"))
+
+        app = web_streamer.build_app()
+        client, server = await _start_client(app)
+
+        try:
+            first = await client.get("/api/recordings?limit=5")
+            assert first.status == 200
+            etag = first.headers["ETag"]
+            assert etag.startswith('W/"')
+            assert first.headers["Cache-Control"] == "no-cache"
+
+            repeat = await client.get(
+                "/api/recordings?limit=5", headers={"If-None-Match": etag}
+            )
+            assert repeat.status == 304
+
+            # SQLite caches in the recordings root do not invalidate listings.
+            journal = dashboard_env / ".cache.sqlite3-journal"
+            journal.write_bytes(b"")
+            journal.unlink()
+            (dashboard_env / ".cache.sqlite3").write_bytes(b"")
+            cached = await client.get(
+                "/api/recordings?limit=5", headers={"If-None-Match": etag}
+            )
+            assert cached.status == 304
+
+            other_query = await client.get(
+                "/api/recordings?limit=10", headers={"If-None-Match": etag}
+            )
+            assert other_query.status == 200
+
+            recycle = await client.get("/api/recycle-bin")
+            assert recycle.status == 200
+            recycle_etag = recycle.headers["ETag"]
+            recycle_repeat = await client.get(
+                "/api/recycle-bin", headers={"If-None-Match": recycle_etag}
+            )
+            assert recycle_repeat.status == 304
+
+            config_resp = await client.get("/api/config")
+            assert config_resp.status == 200
+            config_etag = config_resp.headers["ETag"]
+            config_repeat = await client.get(
+                "/api/config", headers={"If-None-Match": config_etag}
+            )
+            assert config_repeat.status == 304
+            section = await client.get("/api/config/segmenter")
+            assert section.status == 200
+            section_repeat = await client.get(
+                "/api/config/segmenter",
+                headers={"If-None-Match": section.headers["ETag"]},
+            )
+            assert section_repeat.status == 304
+
+            deleted = await client.post(
+                "/api/recordings/delete",
+                json={"items": ["20240105/conditional.opus"]},
+            )
+            assert deleted.status == 200
+
+            after_delete = await client.get(
+                "/api/recordings?limit=5", headers={"If-None-Match": etag}
+            )
+            assert after_delete.status == 200
+            payload = await after_delete.json()
+            assert payload["total"] == 0
+
+            recycle_after = await client.get(
+                "/api/recycle-bin", headers={"If-None-Match": recycle_etag}
+            )
+            assert recycle_after.status == 200
+            assert (await recycle_after.json())["total"] == 1
+        finally:
+            await client.close()
+            await server.close()
+
+    asyncio.run(runner())
+
+
+def test_recordings_etag_ignores_live_capture_status(dashboard_env):
+    async def runner():
+        status_path = Path(os.environ["TMP_DIR"]) / "segmenter_status.json"
+
+        def write_status(updated_at: float) -> None:
+            status_path.write_text(
+                json.dumps({"capturing": True, "service_running": True, "updated_at": updated_at}),
+                encoding="utf-8",
+            )
+
+        now = time.time()
+        write_status(now)
+        app = web_streamer.build_app()
+        client, server = await _start_client(app)
+
+        try:
+            first = await client.get("/api/recordings")
+            assert first.status == 200
+            assert (await first.json())["capture_status"]["updated_at"] == now
+
+            write_status(now + 1)
+            repeat = await client.get(
+                "/api/recordings", headers={"If-None-Match": first.headers["ETag"]}
+            )
+            assert repeat.status == 304
+
+            live = await client.get("/api/recordings/status")
+            assert live.status == 200
+            assert live.headers["Cache-Control"] == "no-store"
+            live_payload = await live.json()
+            assert live_payload["capture_status"]["updated_at"] == now + 1
+            assert "storage_free_bytes" in live_payload
+            assert "motion_state" in live_payload
+        finally:
+            await client.close()
+            await server.close()
+
+    asyncio.run(runner())
+
+
+def test_recordings_etag_tracks_out_of_band_changes(dashboard_env):
+    async def runner():
+        app = web_streamer.build_app()
+        client, server = await _start_client(app)
+
+        try:
+            first = await client.get("/api/recordings")
+            assert first.status == 200
+            etag = first.headers["ETag"]
+
+            day_dir = dashboard_env / "20240106"
+            day_dir.mkdir()
+            file_path = day_dir / "external.opus"
+            file_path.write_bytes(b"external")
+            _write_waveform_stub(file_path.with_suffix(".opus.waveform.json"))
+
+            second = await client.get("/api/recordings", headers={"If-None-Match": etag})
+            assert second.status == 200
+            assert (await second.json())["total"] == 1
+
+            app[web_streamer.EVENT_BUS_KEY].publish(
+                "recordings_changed", {"reason": "external"}
+            )
+            third = await client.get(
+                "/api/recordings", headers={"If-None-Match": second.headers["ETag"]}
+            )
+            assert third.status == 200
+        finally:
+            await client.close()
+            await server.close()
+
+    asyncio.run(runner())
+
+
+def test_api_client_replays_cached_body_on_not_modified():
+    node_path = shutil.which("node")
+    if node_path is None:
+        pytest.skip("Node.js binary is required for API client tests")
+    root = Path(__file__).resolve().parents[1]
+    module_url = (root / "lib" / "webui" / "static" / "js" / "api.js").as_uri()
+    script = textwrap.dedent(
+        f"""
+        const {{ createApiClient }} = await import({json.dumps(module_url)});
+        const seen = [];
+        const responses = [
+          new Response(JSON.stringify({{ value: 1 }}), {{
+            status: 200,
+            headers: {{ ETag: 'W/"abc"', "Content-Type": "application/json" }},
+          }}),
+          new Response(null, {{ status: 304, headers: {{ ETag: 'W/"abc"' }} }}),
+        ];
+        const client = createApiClient({{
+          baseUrl: "http://recorder.local",
+          fetch: async (url, init) => {{
+            seen.push((init && init.headers && init.headers["If-None-Match"]) || null);
+            return responses.shift();
+          }},
+        }});
+        const first = await client.fetch("/api/recordings", {{ cache: "no-store" }}, {{ conditional: true }});
+        const firstBody = await first.json();
+        const second = await client.fetch("/api/recordings", {{ cache: "no-store" }}, {{ conditional: true }});
+        const secondBody = await second.json();
+        console.log(JSON.stringify({{ seen, firstBody, secondBody, status: second.status }}));
+        """
+    )
+    completed = subprocess.run(
+        [node_path, "--input-type=module", "-e", script],
+        capture_output=True,
+        text=True,
+        check=True,
+        cwd=root,
+    )
+    result = json.loads(completed.stdout.strip().splitlines()[-1])
+    assert result["seen"] == [None, 'W/"abc"']
+    assert result["firstBody"] == {"value": 1}
+    assert result["secondBody"] == {"value": 1}
+    assert result["status"] == 200
+
+
+def test_recordings_change_feed_reports_adds_renames_and_deletes(dashboard_env):
+    def _make_recording(rel: str, modified: float) -> Path:
+        path = dashboard_env / rel
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_bytes(b"audio")
+        os.utime(path, (modified, modified))
+        _write_waveform_stub(path.with_suffix(path.suffix + ".waveform.json"))
+        return path
+
+    async def runner():
+        _make_recording("20240107/keep.opus", 1_704_600_000)
+        _make_recording("20240107/doomed.opus", 1_704_600_100)
+
+        app = web_streamer.build_app()
+        client, server = await _start_client(app)
+
+        try:
+            listing = await (await client.get("/api/recordings")).json()
+            seq = listing["changes_seq"]
+            epoch = listing["changes_epoch"]
+
+            unchanged = await client.get(
+                "/api/recordings/changes", params={"since": seq, "epoch": epoch}
+            )
+            assert unchanged.status == 200
+            payload = await unchanged.json()
+            assert payload["reset"] is False
+            assert payload["seq"] == seq
+            assert payload["added"] == payload["updated"] == payload["removed"] == []
+
+            resp = await client.post(
+                "/api/recordings/delete", json={"items": ["20240107/doomed.opus"]}
+            )
+            assert resp.status == 200
+            resp = await client.post(
+                "/api/recordings/rename",
+                json={"item": "20240107/keep.opus", "name": "kept"},
+            )
+            assert resp.status == 200
+            _make_recording("20240108/fresh.opus", 1_704_700_000)
+            app[web_streamer.EVENT_BUS_KEY].publish(
+                "recordings_changed",
+                {"reason": "encode_completed", "paths": ["20240108/fresh.opus"]},
+            )
+
+            resp = await client.get(
+                "/api/recordings/changes", params={"since": seq, "epoch": epoch}
+            )
+            delta = await resp.json()
+            assert delta["reset"] is False
+            assert delta["seq"] > seq
+            assert sorted(item["path"] for item in delta["added"]) == [
+                "20240107/kept.opus",
+                "20240108/fresh.opus",
+            ]
+            assert delta["updated"] == []
+            assert delta["removed"] == ["20240107/doomed.opus", "20240107/keep.opus"]
+            assert delta["recycle_bin_count"] == 1
+
+            follow_up = await (
+                await client.get(
+                    "/api/recordings/changes",
+                    params={"since": delta["seq"], "epoch": epoch},
+                )
+            ).json()
+            assert follow_up["added"] == follow_up["removed"] == []
+
+            stale_epoch = await (
+                await client.get(
+                    "/api/recordings/changes", params={"since": seq, "epoch": "other"}
+                )
+            ).json()
+            assert stale_epoch["reset"] is True
+
+            app[web_streamer.EVENT_BUS_KEY].publish(
+                "recordings_changed", {"reason": "external"}
+            )
+            after_reset = await (
+                await client.get(
+                    "/api/recordings/changes",
+                    params={"since": delta["seq"], "epoch": epoch},
+                )
+            ).json()
+            assert after_reset["reset"] is True
+
+            bad = await client.get("/api/recordings/changes", params={"since": "x"})
+            assert bad.status == 400
+        finally:
+            await client.close()
+            await server.close()
+
+    asyncio.run(runner())
+
+
+def test_retiered_recording_only_updates_the_change_feed(dashboard_env, tmp_path, monkeypatch):
+    from lib import storage_tiers
+
+    recording = dashboard_env / "20240109" / "tiered.opus"
+    recording.parent.mkdir(parents=True)
+    recording.write_bytes(b"audio" * 20)
+    _write_waveform_stub(recording.with_suffix(".opus.waveform.json"))
+    tier = storage_tiers.Tier("speech", 30.0, 24)
+    settings = storage_tiers.TierSettings(
+        recordings_dir=dashboard_env, tmp_dir=tmp_path / "tiers", enabled=True, tiers=(tier,)
+    )
+    monkeypatch.setattr(
+        storage_tiers,
+        "reencode_recording",
+        lambda path, tier, ffmpeg: storage_tiers.TierResult(path, tier, 100, 50, 0.1),
+    )
+
+    async def runner():
+        app = web_streamer.build_app()
+        client, server = await _start_client(app)
+        try:
+            listing = await (await client.get("/api/recordings")).json()
+            assert storage_tiers.RecordingTierer(settings).retier(recording, tier)
+            for spooled in sorted((tmp_path / "tiers" / "recordings_events").glob("*.json")):
+                record = json.loads(spooled.read_text())
+                app[web_streamer.EVENT_BUS_KEY].publish(record["type"], record["payload"])
+
+            delta = await (
+                await client.get(
+                    "/api/recordings/changes",
+                    params={"since": listing["changes_seq"], "epoch": listing["changes_epoch"]},
+                )
+            ).json()
+            assert delta["reset"] is False
+            assert delta["added"] == delta["removed"] == []
+            assert [item["path"] for item in delta["updated"]] == ["20240109/tiered.opus"]
+            relisted = await (await client.get("/api/recordings")).json()
+            assert relisted["total"] == listing["total"]
+        finally:
+            await client.close()
+            await server.close()
+
+    asyncio.run(runner())
+
+
+def test_collapse_changes_reports_short_lived_paths_as_discarded():
+    from lib.web_streamer_helpers.recordings_changes import (
+        ADDED,
+        CHANGED,
+        DISCARDED,
+        REMOVED,
+        RecordingChange,
+        collapse_changes,
+    )
+
+    changes = [
+        RecordingChange(1, ADDED, "a.opus"),
+        RecordingChange(2, CHANGED, "a.opus"),
+        RecordingChange(3, REMOVED, "a.opus"),
+        RecordingChange(4, REMOVED, "b.opus"),
+        RecordingChange(5, ADDED, "b.opus"),
+        RecordingChange(6, ADDED, "c.opus"),
+        RecordingChange(7, CHANGED, "c.opus"),
+        RecordingChange(8, CHANGED, "d.opus"),
+        RecordingChange(9, REMOVED, "d.opus"),
+        RecordingChange(10, ADDED, "e.opus"),
+        RecordingChange(11, REMOVED, "e.opus"),
+        RecordingChange(12, ADDED, "e.opus"),
+    ]
+    assert collapse_changes(changes) == {
+        "a.opus": DISCARDED,
+        "b.opus": CHANGED,
+        "c.opus": ADDED,
+        "d.opus": REMOVED,
+        "e.opus": ADDED,
+    }
+
+
+def test_recordings_delta_patches_listing_in_place():
+    node_path = shutil.which("node")
+    if node_path is None:
+        pytest.skip("Node.js binary is required for dashboard delta tests")
+    root = Path(__file__).resolve().parents[1]
+    module_url = (
+        root / "lib" / "webui" / "static" / "js" / "dashboard" / "utils" / "recordingsDelta.js"
+    ).as_uri()
+    script = textwrap.dedent(
+        f"""
+        const {{ applyRecordingsDelta }} = await import({json.dumps(module_url)});
+        const record = (path, modified, size) => ({{
+          path, modified, size_bytes: size, collection: "recent", day: path.split("/")[0],
+        }});
+        const payload = {{
+          collection: "recent",
+          limit: 3,
+          total: 5,
+          total_size_bytes: 100,
+          items: [record("d1/c", 30, 30), record("d1/b", 20, 20), record("d1/a", 10, 10)],
+          collection_counts: {{ recent: 5, saved: 0, recycle: 0 }},
+          collection_size_bytes: {{ recent: 100, saved: 0, recycle: 0 }},
+          available_days: ["d1"],
+          changes_epoch: "e",
+          changes_seq: 4,
+        }};
+        const added = applyRecordingsDelta(payload, {{
+          epoch: "e", seq: 6, reset: false,
+          added: [record("d2/new", 40, 5)], updated: [record("d1/a", 10, 12)], removed: [],
+          recycle_bin_count: 2,
+        }});
+        const removed = applyRecordingsDelta(payload, {{
+          epoch: "e", seq: 5, reset: false, added: [], updated: [], removed: ["d1/b"],
+        }});
+        const reset = applyRecordingsDelta(payload, {{ epoch: "e", seq: 9, reset: true }});
+        // Added and removed inside the window without ever being listed here.
+        const discarded = applyRecordingsDelta(payload, {{
+          epoch: "e", seq: 7, reset: false, added: [], updated: [], removed: [],
+          discarded: ["d9/gone"],
+        }});
+        const archived = applyRecordingsDelta(payload, {{
+          epoch: "e", seq: 8, reset: false, added: [], updated: [],
+          removed: ["Archive/d1/x"], saved_prefix: "Archive/",
+        }});
+        console.log(JSON.stringify({{ added, removed, reset, discarded, archived }}));
+        """
+    )
+    completed = subprocess.run(
+        [node_path, "--input-type=module", "-e", script],
+        capture_output=True,
+        text=True,
+        check=True,
+        cwd=root,
+    )
+    result = json.loads(completed.stdout.strip().splitlines()[-1])
+    added = result["added"]
+    assert [item["path"] for item in added["items"]] == ["d2/new", "d1/c", "d1/b"]
+    assert added["total"] == 6
+    assert added["collection_counts"] == {"recent": 6, "saved": 0, "recycle": 2}
+    assert added["total_size_bytes"] == 107
+    assert added["available_days"] == ["d2", "d1"]
+    assert added["changes_seq"] == 6
+    # Removing a record from a full page needs the next record from the server.
+    assert result["removed"] is None
+    assert result["reset"] is None
+    discarded = result["discarded"]
+    assert discarded["total"] == 5
+    assert discarded["collection_counts"] == {"recent": 5, "saved": 0, "recycle": 0}
+    # The server's saved prefix decides which collection loses the count.
+    assert result["archived"]["collection_counts"]["saved"] == 0
+    assert result["archived"]["collection_counts"]["recent"] == 5
+
+
+def test_recordings_file_supports_ranges_and_versioned_caching(dashboard_env):
+    async def runner():
+        day_dir = dashboard_env / "20240109"
+        day_dir.mkdir()
+        target = day_dir / "ranged.opus"
+        target.write_bytes(bytes(range(256)) * 4)
+        mtime = target.stat().st_mtime
+
+        app = web_streamer.build_app()
+        client, server = await _start_client(app)
+
+        try:
+            plain = await client.get("/recordings/20240109/ranged.opus")
+            assert plain.status == 200
+            assert plain.headers["Cache-Control"] == "no-cache"
+            assert plain.headers.get("Accept-Ranges") == "bytes"
+            etag = plain.headers["ETag"]
+            assert not etag.startswith("W/")
+            assert await plain.read() == target.read_bytes()
+
+            revalidated = await client.get(
+                "/recordings/20240109/ranged.opus", headers={"If-None-Match": etag}
+            )
+            assert revalidated.status == 304
+
+            partial = await client.get(
+                "/recordings/20240109/ranged.opus", headers={"Range": "bytes=10-19"}
+            )
+            assert partial.status == 206
+            assert partial.headers["Content-Range"] == "bytes 10-19/1024"
+            assert await partial.read() == bytes(range(10, 20))
+
+            pinned = await client.get(
+                "/recordings/20240109/ranged.opus", params={"v": repr(mtime)}
+            )
+            assert pinned.status == 200
+            assert "immutable" in pinned.headers["Cache-Control"]
+            assert pinned.headers["Cache-Control"].startswith("private")
+
+            stale = await client.get(
+                "/recordings/20240109/ranged.opus", params={"v": repr(mtime - 10)}
+            )
+            assert stale.headers["Cache-Control"] == "no-cache"
+        finally:
+            await client.close()
+            await server.close()
+
+    asyncio.run(runner())
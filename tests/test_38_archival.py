@@ -1,10 +1,18 @@
 from __future__ import annotations
 
+import os
 import shlex
+import sys
+import time
 from pathlib import Path
 from types import SimpleNamespace
 
 import lib.archival as archival
+from lib.archival_journal import ArchivalJournal
+from lib.archival_schedule import ArchivalSchedule
+from lib.archival_service import ArchivalService, ServiceSettings
+
+_ANY_TIME = ArchivalSchedule(pause_while_streaming=False)
 
 
 def test_upload_disabled_noop(tmp_path, monkeypatch):
@@ -26,6 +34,13 @@ def test_upload_disabled_noop(tmp_path, monkeypatch):
     monkeypatch.undo()
 
 
+def _upload(paths) -> None:
+    """Queue ``paths`` like the encoder, then let the service deliver them."""
+
+    archival.upload_paths([str(path) for path in paths])
+    ArchivalService(plugin_factory=archival._load_plugin, settings=ServiceSettings(), schedule=_ANY_TIME).run_once()
+
+
 def test_network_share_upload_and_waveform_gate(tmp_path, monkeypatch):
     recordings_dir = tmp_path / "recordings"
     archive_dir = tmp_path / "archive"
@@ -51,7 +66,7 @@ def test_network_share_upload_and_waveform_gate(tmp_path, monkeypatch):
     }
 
     monkeypatch.setattr(archival, "get_cfg", lambda: config)
-    archival.upload_paths([str(opus), str(waveform), str(transcript)])
+    _upload([opus, waveform, transcript])
 
     copied_audio = archive_dir / "20240101" / "foo.opus"
     assert copied_audio.exists()
@@ -61,33 +76,19 @@ def test_network_share_upload_and_waveform_gate(tmp_path, monkeypatch):
 
     config["archival"]["include_waveform_sidecars"] = True
     monkeypatch.setattr(archival, "get_cfg", lambda: config)
-    archival.upload_paths([str(waveform)])
+    _upload([waveform])
     assert (archive_dir / "20240101" / "foo.opus.waveform.json").exists()
 
     copied_transcript.unlink()
     config["archival"]["include_transcript_sidecars"] = False
     monkeypatch.setattr(archival, "get_cfg", lambda: config)
-    archival.upload_paths([str(transcript)])
+    _upload([transcript])
     assert not copied_transcript.exists()
     monkeypatch.undo()
 
 
-def test_rsync_invocation(monkeypatch, tmp_path):
-    recordings_dir = tmp_path / "recordings"
-    recordings_dir.mkdir()
-    sample = recordings_dir / "clip.opus"
-    sample.write_bytes(b"data")
-
-    captured: dict[str, object] = {}
-
-    def fake_run(cmd, **kwargs):
-        captured["cmd"] = cmd
-        captured["kwargs"] = kwargs
-        return SimpleNamespace(stdout="", stderr="")
-
-    monkeypatch.setattr(archival.subprocess, "run", fake_run)
-
-    config = {
+def _rsync_config(recordings_dir: Path, control_dir: Path) -> dict[str, object]:
+    return {
         "paths": {"recordings_dir": str(recordings_dir)},
         "archival": {
             "enabled": True,
@@ -99,31 +100,311 @@ def test_rsync_invocation(monkeypatch, tmp_path):
                 "ssh_options": ["-oStrictHostKeyChecking=yes"],
             },
         },
+        "archival_service": {
+            "ssh_control_dir": str(control_dir),
+            "ssh_control_persist_seconds": 300,
+        },
     }
 
+
+def test_rsync_invocation(monkeypatch, tmp_path):
+    recordings_dir = tmp_path / "recordings"
+    (recordings_dir / "20240101").mkdir(parents=True)
+    first = recordings_dir / "20240101" / "clip.opus"
+    first.write_bytes(b"data")
+    second = recordings_dir / "20240101" / "other.opus"
+    second.write_bytes(b"more data")
+    control_dir = tmp_path / "control"
+
+    captured: list[dict[str, object]] = []
+
+    def fake_run(cmd, **kwargs):
+        listing = next(arg for arg in cmd if str(arg).startswith("--files-from="))
+        names = Path(listing.split("=", 1)[1]).read_bytes().split(b"\0")
+        captured.append({"cmd": cmd, "kwargs": kwargs, "names": names})
+        return SimpleNamespace(returncode=0, stdout="", stderr="")
+
+    monkeypatch.setattr(archival.subprocess, "run", fake_run)
+    config = _rsync_config(recordings_dir, control_dir)
     monkeypatch.setattr(archival, "get_cfg", lambda: config)
-    archival.upload_paths([str(sample)])
 
-    assert "cmd" in captured
+    # The encoder only queues; nothing is sent inline.
+    archival.upload_paths([str(first), str(second)])
+    assert captured == []
+    journal = ArchivalJournal(recordings_dir)
+    assert journal.stats().pending == 2
+
+    service = ArchivalService(plugin_factory=archival._load_plugin, settings=ServiceSettings(), schedule=_ANY_TIME)
+    assert service.run_once() == 2
+
+    assert len(captured) == 1
     expected_shell = shlex.join(
         [
             "ssh",
             "-oBatchMode=yes",
             "-i",
             "/home/pi/.ssh/id_ed25519",
+            "-oControlMaster=auto",
+            f"-oControlPath={control_dir / '%C'}",
+            "-oControlPersist=300",
             "-oStrictHostKeyChecking=yes",
         ]
     )
-    expected_cmd = [
+    cmd = captured[0]["cmd"]
+    listing = cmd[4]
+    assert cmd == [
         "rsync",
         "-az",
         "--bwlimit=2000",
+        "--from0",
+        listing,
+        "--out-format=%n",
         "-e",
         expected_shell,
         "--",
-        str(sample),
-        "user@host:/srv/archive/clip.opus",
+        f"{recordings_dir.resolve()}/",
+        "user@host:/srv/archive/",
     ]
-    assert captured["cmd"] == expected_cmd
-    assert captured["kwargs"].get("check") is True
+    assert sorted(captured[0]["names"]) == [b"20240101/clip.opus", b"20240101/other.opus"]
+    stats = journal.stats()
+    assert stats.pending == 0
+    assert stats.files_uploaded == 2
+    assert stats.bytes_uploaded == len(b"data") + len(b"more data")
     monkeypatch.undo()
+
+
+FAKE_RSYNC = """#!{python}
+import os, shutil, sys
+from pathlib import Path
+
+state = Path(os.environ["FAKE_RSYNC_STATE"])
+runs = int(state.read_text()) if state.exists() else 0
+state.write_text(str(runs + 1))
+if runs == 0:
+    sys.stderr.write("ssh: connect to host archive port 22: Network is unreachable\\n")
+    sys.exit(255)
+
+args = sys.argv[1:]
+listing = next(arg.split("=", 1)[1] for arg in args if arg.startswith("--files-from="))
+source, destination = args[-2:]
+for name in Path(listing).read_bytes().split(b"\\0"):
+    name = name.decode()
+    target = Path(destination.split(":", 1)[1]) / name
+    target.parent.mkdir(parents=True, exist_ok=True)
+    shutil.copyfile(Path(source) / name, target)
+    print(name)
+"""
+
+
+def test_rsync_batches_retry_with_backoff_until_delivered(monkeypatch, tmp_path):
+    # A local stand-in for rsync over SSH: the first run fails like an
+    # unreachable host, later runs copy the listed files.
+    bin_dir = tmp_path / "bin"
+    bin_dir.mkdir()
+    fake = bin_dir / "rsync"
+    fake.write_text(FAKE_RSYNC.format(python=sys.executable), encoding="utf-8")
+    fake.chmod(0o755)
+    monkeypatch.setenv("PATH", f"{bin_dir}{os.pathsep}{os.environ.get('PATH', '')}")
+    monkeypatch.setenv("FAKE_RSYNC_STATE", str(tmp_path / "runs"))
+
+    recordings_dir = tmp_path / "recordings"
+    archive_dir = tmp_path / "archive"
+    sources = []
+    for idx in range(5):
+        path = recordings_dir / "20240101" / f"clip-{idx}.opus"
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_bytes(bytes([idx]) * 100)
+        sources.append(path)
+
+    config = _rsync_config(recordings_dir, tmp_path / "control")
+    config["archival"]["rsync"] = {"destination": f"localhost:{archive_dir}", "options": ["-a"]}
+    config["archival_service"]["ssh_control_dir"] = ""
+    monkeypatch.setattr(archival, "get_cfg", lambda: config)
+    archival.upload_paths([str(path) for path in sources])
+
+    now = time.time()
+    clock = [now]
+    service = ArchivalService(
+        plugin_factory=archival._load_plugin,
+        settings=ServiceSettings(batch_max_files=3, retry_base=30.0, retry_max=60.0),
+        schedule=_ANY_TIME,
+        clock=lambda: clock[0],
+    )
+    journal = ArchivalJournal(recordings_dir)
+
+    assert service.run_once() == 3
+    stats = journal.stats(now=clock[0])
+    assert stats.pending == 5
+    assert stats.retrying == 3
+    assert "Network is unreachable" in stats.last_error
+    assert stats.next_attempt <= now  # the two jobs not tried yet
+
+    assert service.run_once() == 2
+    assert journal.stats(now=clock[0]).pending == 3
+    retrying = journal.due(limit=10, now=now + 30)
+    assert [job.attempts for job in retrying] == [1, 1, 1]
+    assert all(job.next_attempt == now + 30 for job in retrying)
+    assert service.run_once() == 0  # backing off
+
+    clock[0] = now + 30
+    assert service.run_once() == 3
+    stats = journal.stats(now=clock[0])
+    assert stats.pending == 0
+    assert stats.files_uploaded == 5
+    assert stats.bytes_uploaded == 500
+    for path in sources:
+        copy = archive_dir / "20240101" / path.name
+        assert copy.read_bytes() == path.read_bytes()
+    monkeypatch.undo()
+
+
+def test_network_share_skips_and_links_identical_content(tmp_path, monkeypatch):
+    recordings_dir = tmp_path / "recordings"
+    archive_dir = tmp_path / "archive"
+    first = recordings_dir / "20240101" / "a.opus"
+    second = recordings_dir / "20240102" / "b.opus"
+    for path in (first, second):
+        path.parent.mkdir(parents=True)
+        path.write_bytes(b"same opus bytes")
+
+    config = {
+        "paths": {"recordings_dir": str(recordings_dir)},
+        "archival": {
+            "enabled": True,
+            "backend": "network_share",
+            "network_share": {"target_dir": str(archive_dir)},
+        },
+    }
+    monkeypatch.setattr(archival, "get_cfg", lambda: config)
+    copies: list[Path] = []
+    real_copy = archival._NetworkShareUploader._copy
+
+    def counting_copy(self, path):
+        copies.append(self.target_dir / path.relative_to(recordings_dir))
+        return real_copy(self, path)
+
+    monkeypatch.setattr(archival._NetworkShareUploader, "_copy", counting_copy)
+
+    _upload([first])
+    _upload([first])
+    assert copies == [archive_dir / "20240101" / "a.opus"]
+
+    _upload([second])
+    linked = archive_dir / "20240102" / "b.opus"
+    assert len(copies) == 1
+    assert linked.read_bytes() == b"same opus bytes"
+    assert linked.stat().st_ino == (archive_dir / "20240101" / "a.opus").stat().st_ino
+
+    # A copy removed from the share is restored from its identical sibling.
+    linked.unlink()
+    _upload([second])
+    assert linked.exists()
+    assert len(copies) == 1
+    monkeypatch.undo()
+
+
+def test_network_share_copies_resume_verify_and_rename(tmp_path, monkeypatch):
+    recordings_dir = tmp_path / "recordings"
+    archive_dir = tmp_path / "archive"
+    sources = []
+    for idx in range(4):
+        path = recordings_dir / "20240101" / f"clip-{idx}.opus"
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_bytes(bytes(range(256)) * (idx + 1) * 64)
+        sources.append(path)
+    config = {
+        "paths": {"recordings_dir": str(recordings_dir)},
+        "archival": {
+            "enabled": True,
+            "backend": "network_share",
+            "network_share": {"target_dir": str(archive_dir)},
+        },
+        "archival_service": {"copy_workers": 3, "verify_copies": True},
+    }
+    monkeypatch.setattr(archival, "get_cfg", lambda: config)
+
+    # An interrupted earlier copy left half of clip-1 behind.
+    partial = archive_dir / "20240101" / ".clip-1.opus.partial"
+    partial.parent.mkdir(parents=True)
+    half = sources[1].read_bytes()[: sources[1].stat().st_size // 2]
+    partial.write_bytes(half)
+    partial.with_name(partial.name + archival.PARTIAL_SOURCE_SUFFIX).write_text(
+        archival._source_version(sources[1].stat())
+    )
+
+    # The share corrupts clip-2 once; verification rejects it and it is retried.
+    corrupted: list[Path] = []
+    real_copy_range = archival._copy_range
+
+    def flaky_copy_range(src, out, offset, throttle=None):
+        real_copy_range(src, out, offset, throttle)
+        if src.name.endswith("clip-2.opus") and not corrupted:
+            corrupted.append(Path(src.name))
+            out.seek(0)
+            out.write(b"X")
+            out.flush()
+
+    monkeypatch.setattr(archival, "_copy_range", flaky_copy_range)
+
+    archival.upload_paths([str(path) for path in sources])
+    clock = [time.time()]
+    service = ArchivalService(
+        plugin_factory=archival._load_plugin,
+        settings=ServiceSettings(retry_base=30.0),
+        schedule=_ANY_TIME,
+        clock=lambda: clock[0],
+    )
+    journal = ArchivalJournal(recordings_dir)
+
+    assert service.run_once() == 4
+    stats = journal.stats(now=clock[0])
+    assert stats.pending == 1
+    assert "checksum mismatch" in stats.last_error
+    assert not (archive_dir / "20240101" / "clip-2.opus").exists()
+    assert not any(archive_dir.rglob("*.partial"))
+    assert not any(archive_dir.rglob("*.partial.source"))
+    # Only the missing half of clip-1 crossed the share.
+    sizes = sum(path.stat().st_size for path in sources)
+    assert stats.bytes_uploaded == sizes - len(half) - sources[2].stat().st_size
+
+    clock[0] += 30
+    assert service.run_once() == 1
+    assert journal.stats(now=clock[0]).pending == 0
+    for path in sources:
+        copy = archive_dir / "20240101" / path.name
+        assert copy.read_bytes() == path.read_bytes()
+        assert copy.stat().st_mtime == path.stat().st_mtime
+    monkeypatch.undo()
+
+
+def test_network_share_restarts_partial_when_source_changed(tmp_path, monkeypatch):
+    recordings_dir = tmp_path / "recordings"
+    source = recordings_dir / "20240101" / "clip.opus"
+    source.parent.mkdir(parents=True)
+    source.write_bytes(b"a" * 4096)
+    uploader = archival._NetworkShareUploader(recordings_dir, tmp_path / "archive")
+    dest = tmp_path / "archive" / "20240101" / "clip.opus"
+
+    real_copy_range = archival._copy_range
+
+    def interrupted_copy_range(src, out, offset, throttle=None):
+        out.write(src.read(1024))
+        out.flush()
+        raise OSError("share went away")
+
+    monkeypatch.setattr(archival, "_copy_range", interrupted_copy_range)
+    result = uploader.upload_batch([source])
+    assert source in result.failed
+    assert (dest.parent / ".clip.opus.partial").stat().st_size == 1024
+
+    # Re-encoded in place between attempts: same size, new bytes and mtime.
+    source.write_bytes(b"b" * 4096)
+    stat = source.stat()
+    os.utime(source, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+    monkeypatch.setattr(archival, "_copy_range", real_copy_range)
+
+    result = uploader.upload_batch([source])
+    assert result.done == [source]
+    assert result.uploaded_bytes == 4096
+    assert dest.read_bytes() == b"b" * 4096
+    assert sorted(path.name for path in dest.parent.iterdir()) == ["clip.opus"]
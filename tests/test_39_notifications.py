@@ -1,11 +1,38 @@
+import json
+import socketserver
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
 import lib.config as config
+from lib.notification_outbox import NotificationOutbox, SendBudget
 from lib.notifications import (
+    DeliverySettings,
     NotificationDispatcher,
     NotificationFilters,
     build_dispatcher,
 )
 
 
+def _wait_for(predicate, timeout=10.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if predicate():
+            return True
+        time.sleep(0.02)
+    return predicate()
+
+
+def _fast_retries(tmp_path, **overrides):
+    options = {
+        "outbox_path": tmp_path / "outbox.sqlite3",
+        "retry_base": 0.05,
+        "retry_max": 0.1,
+    }
+    options.update(overrides)
+    return DeliverySettings(**options)
+
+
 def test_filters_require_threshold_and_type():
     filters = NotificationFilters.from_cfg(
         {"min_trigger_rms": 500, "allowed_event_types": ["Human"]}
@@ -16,7 +43,7 @@ def test_filters_require_threshold_and_type():
     assert filters.matches({"trigger_rms": 600, "etype": "Human"})
 
 
-def test_build_dispatcher_short_circuits():
+def test_build_dispatcher_short_circuits(tmp_path):
     assert build_dispatcher(None) is None
     assert (
         build_dispatcher({"enabled": False, "webhook": {"url": "http://example"}})
@@ -28,9 +55,29 @@ def test_build_dispatcher_short_circuits():
         {
             "enabled": True,
             "webhook": {"url": "http://example"},
+            "delivery": {"outbox_path": str(tmp_path / "outbox.sqlite3"), "webhook_workers": 3},
         }
     )
     assert isinstance(dispatcher, NotificationDispatcher)
+    assert dispatcher.settings.webhook_workers == 3
+    # Building a dispatcher (as every importer of the segmenter does) only
+    # enqueues; delivery starts when a service asks for it.
+    assert not [t for t in threading.enumerate() if t.name.startswith("notification-webhook")]
+    dispatcher.handle_event({"base_name": "queued", "etype": "Human"})
+    assert NotificationOutbox(tmp_path / "outbox.sqlite3").pending() == {"webhook": 1}
+    dispatcher.close()
+
+    idle = build_dispatcher(
+        {
+            "enabled": True,
+            "webhook": {"url": "http://example"},
+            "delivery": {"outbox_path": str(tmp_path / "idle.sqlite3"), "webhook_workers": 2},
+        }
+    )
+    idle.start()
+    idle.start()
+    assert len([t for t in threading.enumerate() if t.name.startswith("notification-webhook")]) == 2
+    idle.close()
 
 
 def test_dispatcher_matches(monkeypatch):
@@ -75,3 +122,284 @@ def test_filters_resolve_custom_event_tags(monkeypatch):
     finally:
         monkeypatch.delenv("EVENT_TAG_HUMAN", raising=False)
         config.reload_cfg()
+
+
+def test_outbox_backs_off_and_expires_leases(tmp_path):
+    outbox = NotificationOutbox(tmp_path / "outbox.sqlite3")
+    first, second = outbox.enqueue(["webhook", "email"], {"event": {"etype": "Human"}}, now=100.0)
+
+    claimed = outbox.claim("webhook", limit=5, lease=60.0, now=100.0)
+    assert [message.id for message in claimed] == [first]
+    assert claimed[0].payload == {"event": {"etype": "Human"}}
+    assert outbox.claim("webhook", limit=5, lease=60.0, now=120.0) == []
+    # A worker that died holding the lease does not lose the message.
+    assert [message.id for message in outbox.claim("webhook", limit=5, lease=60.0, now=161.0)] == [first]
+
+    assert outbox.fail({first: "HTTP 503"}, retry_base=10.0, retry_max=15.0, max_attempts=3, now=200.0) == []
+    assert outbox.next_due("webhook") == 210.0
+    assert outbox.fail({first: "HTTP 503"}, retry_base=10.0, retry_max=15.0, max_attempts=3, now=210.0) == []
+    assert outbox.next_due("webhook") == 225.0
+    assert outbox.fail({first: "HTTP 503"}, retry_base=10.0, retry_max=15.0, max_attempts=3, now=225.0) == [first]
+    assert outbox.pending() == {"email": 1}
+
+    outbox.complete([second])
+    assert outbox.pending() == {}
+
+
+class _WebhookStandIn(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    failures_left = 0
+    received: list = []
+    lock = threading.Lock()
+
+    def do_POST(self):  # noqa: N802 - http.server naming
+        body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        with self.lock:
+            failing = _WebhookStandIn.failures_left > 0
+            if failing:
+                _WebhookStandIn.failures_left -= 1
+            _WebhookStandIn.received.append((self.client_address, json.loads(body), failing))
+        self.send_response(503 if failing else 204)
+        self.send_header("Content-Length", "0")
+        self.end_headers()
+
+    def log_message(self, *_args):
+        pass
+
+
+def test_webhook_outbox_keeps_connection_alive_and_retries(tmp_path):
+    _WebhookStandIn.failures_left = 2
+    _WebhookStandIn.received = []
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _WebhookStandIn)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    outbox = NotificationOutbox(tmp_path / "outbox.sqlite3")
+    dispatcher = NotificationDispatcher(
+        filters=NotificationFilters(),
+        webhook_cfg={"url": f"http://127.0.0.1:{server.server_port}/hook?source=test"},
+        email_cfg={},
+        outbox=outbox,
+        settings=_fast_retries(tmp_path, webhook_workers=1),
+    )
+    dispatcher.start()
+    try:
+        for idx in range(5):
+            dispatcher.handle_event({"base_name": f"event-{idx}", "etype": "Human"})
+
+        def delivered():
+            return {
+                payload["event"]["base_name"]
+                for _addr, payload, failing in _WebhookStandIn.received
+                if not failing
+            }
+
+        assert _wait_for(lambda: len(delivered()) == 5)
+        assert _wait_for(lambda: outbox.pending() == {})
+    finally:
+        dispatcher.close()
+        server.shutdown()
+        server.server_close()
+
+    assert len(_WebhookStandIn.received) == 7  # two 503s were retried
+    assert len({addr for addr, _payload, _failing in _WebhookStandIn.received}) == 1
+
+
+class _SmtpStandIn(socketserver.StreamRequestHandler):
+    sessions = 0
+    messages: list = []
+    data_attempts = 0
+    fail_first_data = True
+
+    def _reply(self, line):
+        self.wfile.write(f"{line}\r\n".encode("ascii"))
+
+    def handle(self):
+        _SmtpStandIn.sessions += 1
+        self._reply("220 stand-in ready")
+        while True:
+            line = self.rfile.readline()
+            if not line:
+                return
+            command = line.decode("ascii", "replace").strip().upper()
+            if command.startswith(("EHLO", "HELO")):
+                self._reply("250 stand-in")
+            elif command.startswith("DATA"):
+                self._reply("354 go ahead")
+                lines = []
+                while True:
+                    data = self.rfile.readline()
+                    if data in (b".\r\n", b""):
+                        break
+                    lines.append(data.decode("utf-8", "replace"))
+                _SmtpStandIn.data_attempts += 1
+                if _SmtpStandIn.fail_first_data:
+                    _SmtpStandIn.fail_first_data = False
+                    self._reply("451 try again later")
+                else:
+                    _SmtpStandIn.messages.append("".join(lines))
+                    self._reply("250 queued")
+            elif command.startswith("QUIT"):
+                self._reply("221 bye")
+                return
+            else:
+                self._reply("250 OK")
+
+
+def test_email_outbox_reuses_one_smtp_session(tmp_path):
+    _SmtpStandIn.sessions = 0
+    _SmtpStandIn.messages = []
+    _SmtpStandIn.data_attempts = 0
+    _SmtpStandIn.fail_first_data = True
+    server = socketserver.ThreadingTCPServer(("127.0.0.1", 0), _SmtpStandIn)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    outbox = NotificationOutbox(tmp_path / "outbox.sqlite3")
+    dispatcher = NotificationDispatcher(
+        filters=NotificationFilters(),
+        webhook_cfg={},
+        email_cfg={
+            "smtp_host": "127.0.0.1",
+            "smtp_port": server.server_address[1],
+            "use_tls": False,
+            "from": "tricorder@example.com",
+            "to": ["alerts@example.com"],
+            "subject_template": "Event {base_name}",
+        },
+        outbox=outbox,
+        settings=_fast_retries(tmp_path, email_batch_size=10),
+    )
+    dispatcher.start()
+    try:
+        for idx in range(3):
+            dispatcher.handle_event({"base_name": f"event-{idx}", "etype": "Human"})
+        assert _wait_for(lambda: len(_SmtpStandIn.messages) == 3)
+        assert _wait_for(lambda: outbox.pending() == {})
+    finally:
+        dispatcher.close()
+        server.shutdown()
+        server.server_close()
+
+    assert _SmtpStandIn.data_attempts == 4  # the 451 was retried
+    assert _SmtpStandIn.sessions == 1
+    assert all(f"Subject: Event event-{idx}" in "".join(_SmtpStandIn.messages) for idx in range(3))
+
+
+def _start_webhook_stand_in():
+    _WebhookStandIn.failures_left = 0
+    _WebhookStandIn.received = []
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _WebhookStandIn)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def test_digest_window_merges_events_into_one_webhook(tmp_path):
+    server = _start_webhook_stand_in()
+    outbox = NotificationOutbox(tmp_path / "outbox.sqlite3")
+    dispatcher = NotificationDispatcher(
+        filters=NotificationFilters(),
+        webhook_cfg={"url": f"http://127.0.0.1:{server.server_port}/hook"},
+        email_cfg={},
+        outbox=outbox,
+        settings=_fast_retries(tmp_path, digest_window=0.5),
+    )
+    dispatcher.start()
+    try:
+        # Start just after a window boundary so every event lands in the same window.
+        assert _wait_for(lambda: time.time() % 0.5 < 0.05)
+        for idx, etype in enumerate(["Human", "Human", "Other", "Both"]):
+            dispatcher.handle_event({"base_name": f"event-{idx}", "etype": etype})
+        assert _WebhookStandIn.received == []
+        assert _wait_for(lambda: outbox.pending() == {} and _WebhookStandIn.received)
+    finally:
+        dispatcher.close()
+        server.shutdown()
+        server.server_close()
+
+    assert len(_WebhookStandIn.received) == 1
+    digest = _WebhookStandIn.received[0][1]
+    assert digest["digest"] is True
+    assert digest["count"] == 4
+    assert digest["counts"] == {"Human": 2, "Other": 1, "Both": 1}
+    assert [event["base_name"] for event in digest["events"]] == [f"event-{idx}" for idx in range(4)]
+
+
+def test_rate_limit_coalesces_backlog_instead_of_dropping(tmp_path):
+    server = _start_webhook_stand_in()
+    outbox = NotificationOutbox(tmp_path / "outbox.sqlite3")
+    # A backlog left over from a busy period (or a restart).
+    for idx in range(6):
+        outbox.enqueue(["webhook"], {"event": {"base_name": f"old-{idx}", "etype": "Human"}, "generated_at": idx})
+    dispatcher = NotificationDispatcher(
+        filters=NotificationFilters(),
+        webhook_cfg={"url": f"http://127.0.0.1:{server.server_port}/hook"},
+        email_cfg={},
+        outbox=outbox,
+        settings=_fast_retries(tmp_path, webhook_max_per_hour=2, rate_period=0.6),
+    )
+    dispatcher.start()
+    started = time.monotonic()
+    try:
+        assert _wait_for(lambda: outbox.pending() == {})
+        assert len(_WebhookStandIn.received) == 2
+        dispatcher.handle_event({"base_name": "new-0", "etype": "Other"})
+        dispatcher.handle_event({"base_name": "new-1", "etype": "Other"})
+        assert _wait_for(lambda: outbox.pending() == {})
+        elapsed = time.monotonic() - started
+    finally:
+        dispatcher.close()
+        server.shutdown()
+        server.server_close()
+
+    payloads = [payload for _addr, payload, _failing in _WebhookStandIn.received]
+    assert len(payloads) <= 4
+    assert elapsed >= 0.6  # the spent budget held the new events back
+    delivered = []
+    for payload in payloads:
+        events = payload["events"] if payload.get("digest") else [payload["event"]]
+        delivered.extend(event["base_name"] for event in events)
+    assert sorted(delivered) == sorted([f"old-{idx}" for idx in range(6)] + ["new-0", "new-1"])
+    assert payloads[1]["digest"] is True and payloads[1]["count"] == 5
+
+
+def test_send_budget_is_shared_by_every_outbox_user(tmp_path):
+    path = tmp_path / "outbox.sqlite3"
+    # Two services (segmenter and live stream daemon) open the same outbox.
+    first = NotificationOutbox(path)
+    second = NotificationOutbox(path)
+    for idx in range(6):
+        first.enqueue(["webhook"], {"idx": idx}, now=100.0)
+    budget = SendBudget(3, period=60.0)
+
+    claim = first.claim_within_budget("webhook", batch=1, lease=30.0, budget=budget, now=100.0)
+    assert [m.payload["idx"] for m in claim.messages] == [0] and not claim.coalesce
+    claim = second.claim_within_budget("webhook", batch=1, lease=30.0, budget=budget, now=101.0)
+    assert [m.payload["idx"] for m in claim.messages] == [1] and not claim.coalesce
+    # The last send of the budget carries the remaining backlog as a digest.
+    claim = first.claim_within_budget(
+        "webhook", batch=1, lease=30.0, budget=budget, digest_limit=10, now=102.0
+    )
+    assert [m.payload["idx"] for m in claim.messages] == [2, 3, 4, 5] and claim.coalesce
+
+    second.enqueue(["webhook"], {"idx": 6}, now=103.0)
+    claim = second.claim_within_budget("webhook", batch=1, lease=30.0, budget=budget, now=103.0)
+    assert claim.messages == [] and claim.retry_after == 57.0
+    claim = second.claim_within_budget("webhook", batch=1, lease=30.0, budget=budget, now=160.0)
+    assert [m.payload["idx"] for m in claim.messages] == [6]
+
+
+def test_digest_email_lists_each_event():
+    dispatcher = NotificationDispatcher(
+        filters=NotificationFilters(),
+        webhook_cfg={},
+        email_cfg={"from": "tricorder@example.com", "to": ["alerts@example.com"]},
+        run_async=False,
+    )
+    digest = dispatcher._digest_payload(
+        [
+            {"event": {"base_name": "a", "etype": "Human", "trigger_rms": 500}, "generated_at": 1.0},
+            {"event": {"base_name": "b", "etype": "Other", "trigger_rms": 900}, "generated_at": 2.0},
+        ]
+    )
+    message = dispatcher._build_email(digest)
+    assert message["Subject"] == f"Tricorder: 2 events on {dispatcher.hostname} (Human 1, Other 1)"
+    body = message.get_content()
+    assert "Human  RMS 500" in body and body.rstrip().endswith("b")
@@ -0,0 +1,166 @@
+from __future__ import annotations
+
+import datetime as dt
+import json
+import time
+from types import SimpleNamespace
+
+import lib.archival as archival
+from lib.archival_journal import ArchivalJournal
+from lib.archival_schedule import (
+    LISTENER_STATE_MAX_AGE,
+    ArchivalSchedule,
+    TimeWindow,
+    TokenBucket,
+    live_listeners,
+    parse_windows,
+)
+from lib.archival_service import ArchivalService, ServiceSettings
+
+
+def _at(hour: int, minute: int = 0) -> float:
+    return dt.datetime(2024, 1, 1, hour, minute).timestamp()
+
+
+def test_time_windows_wrap_midnight_and_skip_invalid_entries():
+    windows = parse_windows(["22:30-06:00", "12:00-13:00", "bogus", "25:00-26:00"])
+    assert [str(window) for window in windows] == ["22:30-06:00", "12:00-13:00"]
+
+    night = windows[0]
+    assert night.contains(23 * 60)
+    assert night.contains(5 * 60 + 59)
+    assert not night.contains(6 * 60)
+    assert night.minutes_until_open(21 * 60) == 90
+    assert TimeWindow.parse("00:00-24:00").contains(0)
+    assert parse_windows("01:00-02:00, 03:00-04:00") == [TimeWindow(60, 120), TimeWindow(180, 240)]
+
+    schedule = ArchivalSchedule(windows=tuple(windows), pause_while_streaming=False)
+    assert schedule.blocked_reason(_at(23)) is None
+    assert schedule.blocked_reason(_at(12, 30)) is None
+    reason = schedule.blocked_reason(_at(9))
+    assert reason is not None and "next opens in 180 min" in reason
+
+
+def test_token_bucket_holds_combined_rate():
+    clock = [0.0]
+    sleeps: list[float] = []
+
+    def sleep(seconds: float) -> None:
+        sleeps.append(seconds)
+        clock[0] += seconds
+
+    bucket = TokenBucket(1000, clock=lambda: clock[0], sleep=sleep)
+    bucket.consume(1000)  # the initial burst is free
+    assert sleeps == []
+    bucket.consume(500)
+    bucket.consume(2500)  # larger than the bucket: paid in pieces
+    assert clock[0] == 3.0
+    clock[0] += 10  # idle time refills only up to the burst size
+    bucket.consume(1500)
+    assert clock[0] == 13.5
+
+
+def test_live_listeners_read_hls_and_webrtc_state(tmp_path):
+    now = time.time()
+    assert live_listeners(tmp_path, now=now) == 0
+
+    (tmp_path / "hls").mkdir()
+    (tmp_path / "hls" / "controller_state.json").write_text(
+        json.dumps({"clients": 1, "sessions": ["a", "b"], "timestamp": now})
+    )
+    (tmp_path / "webrtc").mkdir()
+    (tmp_path / "webrtc" / "webrtc_listeners.json").write_text(json.dumps({"clients": 1, "timestamp": now}))
+    assert live_listeners(tmp_path, now=now) == 3
+
+    # A web server that died with listeners recorded does not block forever.
+    assert live_listeners(tmp_path, now=now + LISTENER_STATE_MAX_AGE - 1) == 3
+    assert live_listeners(tmp_path, now=now + LISTENER_STATE_MAX_AGE + 1) == 0
+
+
+def test_service_pauses_for_listeners_and_windows(tmp_path, monkeypatch, capsys):
+    recordings_dir = tmp_path / "recordings"
+    clip = recordings_dir / "20240101" / "clip.opus"
+    clip.parent.mkdir(parents=True)
+    clip.write_bytes(b"opus")
+    tmp_dir = tmp_path / "tmp"
+    hls_state = tmp_dir / "hls" / "controller_state.json"
+    hls_state.parent.mkdir(parents=True)
+
+    config = {
+        "paths": {"recordings_dir": str(recordings_dir), "tmp_dir": str(tmp_dir)},
+        "archival": {
+            "enabled": True,
+            "backend": "rsync",
+            "rsync": {"destination": "user@host:/srv/archive", "options": ["-a"]},
+        },
+        "archival_service": {
+            "ssh_control_dir": "",
+            "windows": ["01:00-05:00"],
+            "bandwidth_limit_kbps": 4096,
+        },
+    }
+    monkeypatch.setattr(archival, "get_cfg", lambda: config)
+    commands: list[list[str]] = []
+
+    def fake_run(cmd, **_kwargs):
+        commands.append(cmd)
+        return SimpleNamespace(returncode=0, stdout="", stderr="")
+
+    monkeypatch.setattr(archival.subprocess, "run", fake_run)
+    journal = ArchivalJournal(recordings_dir)
+    journal.enqueue([clip], now=_at(0))
+
+    clock = [_at(12)]
+    hls_state.write_text(json.dumps({"clients": 1, "timestamp": time.time()}))
+    service = ArchivalService(
+        plugin_factory=archival._load_plugin,
+        settings=ServiceSettings(),
+        schedule=ArchivalSchedule.from_cfg(config),
+        clock=lambda: clock[0],
+    )
+
+    assert service.run_once() == 0  # outside the window
+    clock[0] = _at(2)
+    assert service.run_once() == 0  # inside the window, but someone is listening
+    assert commands == []
+    assert journal.stats().pending == 1
+    assert journal.stats().retrying == 0
+
+    hls_state.write_text(json.dumps({"clients": 0, "timestamp": time.time()}))
+    assert service.run_once() == 1
+    assert journal.stats().pending == 0
+    assert "--bwlimit=500" in commands[0]  # 4096 kbit/s in KiB/s
+
+    output = capsys.readouterr().out
+    assert "uploads paused: outside upload windows" in output
+    assert "uploads paused: 1 live listener(s) connected" in output
+    assert "uploads resumed" in output
+
+
+def test_network_share_copies_draw_from_token_bucket(tmp_path):
+    recordings_dir = tmp_path / "recordings"
+    sources = []
+    for idx in range(3):
+        path = recordings_dir / f"clip-{idx}.opus"
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_bytes(b"x" * 100_000)
+        sources.append(path)
+
+    consumed: list[int] = []
+
+    class CountingBucket:
+        def consume(self, amount):
+            consumed.append(amount)
+
+    plugin = archival._NetworkShareUploader(
+        recordings_dir=recordings_dir,
+        target_dir=tmp_path / "archive",
+        workers=3,
+        throttle=CountingBucket(),
+    )
+    result = plugin.upload_batch(sources)
+
+    assert len(result.done) == 3
+    assert sum(consumed) == 300_000
+    assert max(consumed) <= archival.THROTTLED_BLOCK_BYTES
+    assert all((tmp_path / "archive" / path.name).read_bytes() == path.read_bytes() for path in sources)
@@ -0,0 +1,76 @@
+import struct
+import wave
+
+import pytest
+
+from lib import audio_duration
+from lib.ogg_clip import ogg_crc
+
+PRE_SKIP = 312
+SERIAL = 0x5EED
+
+
+def _page(header_type, granule, sequence, body):
+    lacing = [255] * (len(body) // 255) + [len(body) % 255]
+    page = bytearray(
+        struct.pack("<4sBBqIIIB", b"OggS", 0, header_type, granule, SERIAL, sequence, 0, len(lacing))
+        + bytes(lacing)
+        + body
+    )
+    struct.pack_into("<I", page, 22, ogg_crc(bytes(page)))
+    return bytes(page)
+
+
+def _opus_file(path, granules, *, tail=b""):
+    head = b"OpusHead" + struct.pack("<BBHIhB", 1, 1, PRE_SKIP, 48000, 0, 0)
+    tags = b"OpusTags" + struct.pack("<I", 0) + struct.pack("<I", 0)
+    pages = [_page(0x02, 0, 0, head), _page(0, 0, 1, tags)]
+    for sequence, granule in enumerate(granules, start=2):
+        # Payloads that happen to contain the capture pattern must not confuse
+        # the backwards scan.
+        pages.append(_page(0, granule, sequence, b"\xf8OggS" + bytes(400)))
+    path.write_bytes(b"".join(pages) + tail)
+    return path
+
+
+def test_opus_duration_is_last_granule_minus_pre_skip(tmp_path):
+    path = _opus_file(tmp_path / "clip.opus", [48000, 96000, 96000 + 24000 + PRE_SKIP])
+
+    assert audio_duration.opus_duration_us(path) == 2_500_000
+    assert audio_duration.duration_seconds(path) == pytest.approx(2.5)
+
+
+def test_opus_duration_ignores_torn_and_continued_tail_pages(tmp_path):
+    torn = _page(0, 480000, 9, bytes(200))[:-50]
+    path = _opus_file(tmp_path / "live.opus", [48000 + PRE_SKIP, -1], tail=torn)
+
+    assert audio_duration.opus_duration_us(path) == 1_000_000
+
+
+def test_wav_duration_uses_data_chunk_and_streaming_placeholders(tmp_path):
+    path = tmp_path / "capture.wav"
+    with wave.open(str(path), "wb") as handle:
+        handle.setnchannels(2)
+        handle.setsampwidth(2)
+        handle.setframerate(16000)
+        handle.writeframes(bytes(4 * 24000))
+    assert audio_duration.wav_duration_us(path) == 1_500_000
+
+    # A writer that never patched the sizes leaves 0xFFFFFFFF behind.
+    data = bytearray(path.read_bytes())
+    offset = data.index(b"data") + 4
+    struct.pack_into("<I", data, offset, 0xFFFFFFFF)
+    path.write_bytes(bytes(data))
+    assert audio_duration.duration_us(path) == 1_500_000
+
+
+def test_unsupported_containers_raise_and_cli_reports_them(tmp_path, capsys):
+    path = tmp_path / "fake.opus"
+    path.write_bytes(b"fake")
+    with pytest.raises(audio_duration.DurationUnsupported):
+        audio_duration.duration_us(path)
+    assert audio_duration.main([str(path)]) == 2
+
+    clip = _opus_file(tmp_path / "clip.opus", [12 + PRE_SKIP])
+    assert audio_duration.main([str(clip)]) == 0
+    assert capsys.readouterr().out.strip() == "0.000250"
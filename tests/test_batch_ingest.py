@@ -0,0 +1,231 @@
+import random
+import wave
+from array import array
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+import lib.segmenter as segmenter
+from lib import process_dropped_file
+from lib.batch_ingest import BatchIngest, analyze_block, frame_rms, plan_chunks
+from lib.segmenter import FRAME_BYTES, FRAME_MS, TimelineRecorder
+
+VOICED_SAMPLE = 1500
+ADAPTIVE_CFG = {
+    "enabled": True,
+    "margin": 1.2,
+    "update_interval_sec": 0.5,
+    "window_sec": 1.0,
+    "hysteresis_tolerance": 0.1,
+    "release_percentile": 0.5,
+    "voiced_hold_sec": 0.4,
+}
+
+
+def _frame(value: int) -> bytes:
+    return value.to_bytes(2, "little", signed=True) * (FRAME_BYTES // 2)
+
+
+def _signal() -> list[int]:
+    values: list[int] = []
+
+    def add(value: int, count: int) -> None:
+        values.extend([value] * count)
+
+    add(200, 30)
+    add(3000, 12)  # event, kept alive across a short gap
+    add(200, 5)
+    add(2600, 8)
+    add(200, 40)
+    add(3000, 2)  # too short to start an event
+    add(200, 20)
+    add(VOICED_SAMPLE, 10)  # speech below the RMS threshold
+    add(200, 30)
+    add(2800, 150)  # long enough to autosplit
+    add(200, 30)
+    add(900, 120)  # noise floor rises and the adaptive threshold follows
+    add(1050, 15)
+    add(2500, 20)
+    add(300, 5)
+    add(2500, 9)
+    add(200, 40)
+    add(3000, 6)  # still loud at end of input
+    return values
+
+
+class _Capture:
+    def __init__(self):
+        self.events = []
+        self.wavs = {}
+
+    def handle_event(self, status):
+        self.events.append(status)
+
+    def enqueue(self, tmp_wav_path, final_base, **_kwargs):
+        with wave.open(tmp_wav_path, "rb") as handle:
+            self.wavs[final_base] = handle.readframes(handle.getnframes())
+        return None
+
+    def summary(self):
+        rows = []
+        for status in self.events:
+            base = status["base_name"]
+            _ts, etype, trigger, _count = base.split("_")
+            rows.append(
+                (
+                    etype,
+                    trigger,
+                    status["end_reason"],
+                    round(status["duration_seconds"], 3),
+                    round(status["avg_rms"], 3),
+                    self.wavs.get(base),
+                )
+            )
+        return rows
+
+
+@pytest.fixture
+def offline_env(tmp_path, monkeypatch):
+    tmp_dir = tmp_path / "tmp"
+    rec_dir = tmp_path / "rec"
+    tmp_dir.mkdir()
+    rec_dir.mkdir()
+    monkeypatch.setattr(segmenter, "TMP_DIR", str(tmp_dir))
+    monkeypatch.setattr(segmenter, "REC_DIR", str(rec_dir))
+    monkeypatch.setattr(segmenter, "STREAMING_ENCODE_ENABLED", False)
+    monkeypatch.setattr(segmenter, "PARALLEL_ENCODE_ENABLED", False)
+    monkeypatch.setattr(segmenter, "START_CONSECUTIVE", 3)
+    monkeypatch.setattr(segmenter, "KEEP_CONSECUTIVE", 2)
+    monkeypatch.setattr(segmenter, "KEEP_WINDOW", 5)
+    monkeypatch.setattr(segmenter, "POST_PAD", 200)
+    monkeypatch.setattr(segmenter, "POST_PAD_FRAMES", 10)
+    monkeypatch.setattr(segmenter, "PRE_PAD_FRAMES", 4)
+    monkeypatch.setattr(segmenter, "STATIC_RMS_THRESH", 1000)
+    monkeypatch.setattr(segmenter, "_AUTOSPLIT_LIMIT_SECONDS", 0.6)
+    monkeypatch.setattr(segmenter, "_AUTOSPLIT_LIMIT_FRAMES", 30)
+    monkeypatch.setattr(segmenter, "GAIN", 1.0)
+    monkeypatch.setattr(segmenter, "DENOISE_BEFORE_VAD", False)
+    monkeypatch.setitem(segmenter.cfg, "adaptive_rms", dict(ADAPTIVE_CFG))
+    monkeypatch.setattr(
+        segmenter, "is_voice", lambda buf: bytes(buf[:2]) == VOICED_SAMPLE.to_bytes(2, "little")
+    )
+    monkeypatch.setattr(segmenter, "_publish_recordings_event", lambda *a, **k: None)
+    monkeypatch.setattr(segmenter, "_schedule_recordings_refresh", lambda *a, **k: None)
+
+    def run(mode: str, values: list[int], estimate_error: int = 0):
+        capture = _Capture()
+        monkeypatch.setattr(segmenter, "NOTIFIER", capture)
+        monkeypatch.setattr(segmenter, "_enqueue_encode_job", capture.enqueue)
+        TimelineRecorder.event_counters.clear()
+        rec = TimelineRecorder(status_mode="ingest", recording_source="dropbox")
+        try:
+            if mode == "live":
+                clock = [0.0]
+                rec._adaptive = segmenter.AdaptiveRmsController(
+                    frame_ms=FRAME_MS,
+                    initial_linear_threshold=segmenter.STATIC_RMS_THRESH,
+                    cfg_section=segmenter.cfg.get("adaptive_rms"),
+                    clock=lambda: clock[0],
+                )
+                for idx, value in enumerate(values):
+                    clock[0] = idx * FRAME_MS / 1000.0
+                    rec.ingest(_frame(value), idx)
+                rec.flush(len(values))
+            elif mode == "chunked":
+                wav_path = tmp_path / "dropped.wav"
+                with wave.open(str(wav_path), "wb") as handle:
+                    handle.setnchannels(1)
+                    handle.setsampwidth(segmenter.SAMPLE_WIDTH)
+                    handle.setframerate(segmenter.SAMPLE_RATE)
+                    handle.writeframes(b"".join(_frame(value) for value in values))
+                with ThreadPoolExecutor(max_workers=3) as executor:
+                    frames = process_dropped_file._ingest_chunked(
+                        rec,
+                        wav_path,
+                        len(values) + estimate_error,
+                        executor=executor,
+                        chunk_frames=37,
+                    )
+                assert frames == len(values)
+                rec.flush(frames)
+            else:
+                pcm = b"".join(_frame(value) for value in values)
+                # Odd chunk sizes exercise pre-roll carried across blocks.
+                chunks = [pcm[offset : offset + 7 * FRAME_BYTES + 3] for offset in range(0, len(pcm), 7 * FRAME_BYTES + 3)]
+                frames = BatchIngest(rec).run(chunks)
+                assert frames == len(values)
+                rec.flush(frames)
+        finally:
+            rec.writer._running = False
+            rec.writer.join(timeout=1.0)
+        return capture.summary()
+
+    return run
+
+
+@pytest.mark.parametrize(
+    "rms_trigger,vad_trigger",
+    [(True, True), (True, False), (False, True)],
+)
+def test_batch_planner_matches_live_segmenter(offline_env, monkeypatch, rms_trigger, vad_trigger):
+    monkeypatch.setattr(segmenter, "RMS_TRIGGER_ENABLED", rms_trigger)
+    monkeypatch.setattr(segmenter, "VAD_TRIGGER_ENABLED", vad_trigger)
+    values = _signal()
+
+    live = offline_env("live", values)
+    batch = offline_env("batch", values)
+
+    assert live, "signal should produce events"
+    assert all(row[-1] for row in live)
+    assert batch == live
+    if rms_trigger:
+        reasons = [row[2] for row in live]
+        assert "autosplit after 1s" in reasons
+        assert reasons[-1] == "shutdown"
+
+
+def test_analyze_block_matches_scalar_gain_and_rms():
+    rng = random.Random(7)
+    samples = array("h", (rng.randint(-32768, 32767) // rng.choice((1, 8, 64)) for _ in range(FRAME_BYTES // 2 * 6)))
+    pcm = samples.tobytes()
+
+    analysis = analyze_block(pcm, gain=1.7, vad_enabled=False, denoise=False)
+
+    expected_pcm = b""
+    expected_rms = []
+    for offset in range(0, len(pcm), FRAME_BYTES):
+        scaled, _clipped = segmenter.pcm16_apply_gain(pcm[offset : offset + FRAME_BYTES], 1.7)
+        expected_pcm += scaled
+        expected_rms.append(segmenter.pcm16_rms(scaled))
+    assert analysis.pcm == expected_pcm
+    assert analysis.rms == expected_rms
+    assert analysis.clipped
+
+    frames = np.frombuffer(pcm, dtype="<i2").reshape(6, -1)
+    assert frame_rms(frames).tolist() == [
+        segmenter.pcm16_rms(pcm[offset : offset + FRAME_BYTES]) for offset in range(0, len(pcm), FRAME_BYTES)
+    ]
+
+
+@pytest.mark.parametrize("estimate_error", [0, -60, 90])
+def test_chunked_ingest_matches_single_pass(offline_env, monkeypatch, estimate_error):
+    monkeypatch.setattr(segmenter, "RMS_TRIGGER_ENABLED", True)
+    monkeypatch.setattr(segmenter, "VAD_TRIGGER_ENABLED", True)
+    monkeypatch.setattr(segmenter, "GAIN", 1.3)
+    values = _signal()
+
+    batch = offline_env("batch", values)
+    # 37-frame chunks put event starts, keep-alive gaps, post-pad tails and
+    # autosplits on chunk edges; the duration estimate may be off either way.
+    chunked = offline_env("chunked", values, estimate_error=estimate_error)
+
+    assert len(batch) >= 5
+    assert chunked == batch
+
+
+def test_plan_chunks_leaves_last_chunk_open_ended():
+    assert plan_chunks(100, 40) == [(0, 40), (40, 40), (80, None)]
+    assert plan_chunks(80, 40) == [(0, 40), (40, None)]
+    assert plan_chunks(0, 40) == [(0, None)]
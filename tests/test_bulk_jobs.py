@@ -0,0 +1,130 @@
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from lib.web_streamer_helpers.bulk_jobs import (
+    CANCELLED,
+    COMPLETED,
+    FAILED,
+    BulkBatch,
+    BulkJobEngine,
+    BulkOperation,
+    sync_directories,
+)
+
+
+def test_engine_runs_batches_and_commits_once_per_batch(tmp_path):
+    async def runner():
+        batches = []
+        commits = []
+        synced = []
+        events = []
+
+        def process(items):
+            batches.append(list(items))
+            return BulkBatch({"done": [item * 10 for item in items]}, touched={tmp_path})
+
+        def fsync(paths):
+            synced.append(set(paths))
+            return len(synced[-1])
+
+        loop_thread = threading.get_ident()
+        engine = BulkJobEngine(
+            batch_size=2,
+            fsync=fsync,
+            publish=lambda kind, payload: events.append((kind, payload)),
+        )
+        await engine.start()
+        try:
+            operation = BulkOperation(
+                kind="test",
+                items=[1, 2, 3, 4, 5],
+                process=process,
+                commit=lambda batch: commits.append((batch.payload["done"], threading.get_ident())),
+                initial_result={"done": [], "errors": [{"item": "x", "error": "invalid"}]},
+            )
+            job = engine.submit(operation)
+            result = await engine.wait(job)
+        finally:
+            await engine.stop()
+
+        assert batches == [[1, 2], [3, 4], [5]]
+        assert [done for done, _thread in commits] == [[10, 20], [30, 40], [50]]
+        # Commit hooks touch SQLite indexes, so they stay off the event loop.
+        assert loop_thread not in {thread for _done, thread in commits}
+        assert synced == [{tmp_path}] * 3
+        assert result == {"done": [10, 20, 30, 40, 50], "errors": [{"item": "x", "error": "invalid"}]}
+        assert job.state == COMPLETED
+
+        progress = [payload["processed"] for kind, payload in events if payload["state"] == "running"]
+        assert progress == [0, 2, 4, 5]
+        assert all(kind == "bulk_job" for kind, _ in events)
+        assert "result" not in events[-1][1]
+        assert engine.get(job.job_id).to_payload()["result"]["done"][-1] == 50
+
+    asyncio.run(runner())
+
+
+def test_engine_cancels_between_batches():
+    async def runner():
+        release = threading.Event()
+        started = threading.Event()
+        processed = []
+
+        def process(items):
+            started.set()
+            assert release.wait(timeout=5)
+            processed.extend(items)
+            return BulkBatch({"done": list(items)})
+
+        executor = ThreadPoolExecutor(max_workers=1)
+        engine = BulkJobEngine(executor=executor, batch_size=1, fsync=None)
+        await engine.start()
+        try:
+            job = engine.submit(BulkOperation(kind="test", items=["a", "b", "c"], process=process))
+            queued = engine.submit(BulkOperation(kind="test", items=["d"], process=process))
+            while not started.is_set():
+                await asyncio.sleep(0.01)
+
+            assert engine.cancel(job.job_id) is job
+            assert engine.cancel(queued.job_id).state == CANCELLED
+            release.set()
+            result = await engine.wait(job)
+        finally:
+            await engine.stop()
+            executor.shutdown(wait=True)
+
+        assert processed == ["a"]
+        assert job.state == CANCELLED
+        assert result["done"] == ["a"]
+        assert result["cancelled"] is True
+        assert result["skipped"] == 2
+        assert (await engine.wait(queued))["skipped"] == 1
+
+    asyncio.run(runner())
+
+
+def test_engine_reports_failures():
+    async def runner():
+        def process(items):
+            raise OSError("disk gone")
+
+        engine = BulkJobEngine(fsync=None)
+        await engine.start()
+        try:
+            job = engine.submit(BulkOperation(kind="test", items=[1], process=process))
+            with pytest.raises(OSError, match="disk gone"):
+                await engine.wait(job)
+        finally:
+            await engine.stop()
+        assert job.state == FAILED
+        assert job.to_payload()["error"] == "disk gone"
+
+    asyncio.run(runner())
+
+
+def test_sync_directories_skips_missing_paths(tmp_path):
+    (tmp_path / "a").mkdir()
+    assert sync_directories([tmp_path / "a", tmp_path / "a", tmp_path / "missing"]) == 1
@@ -0,0 +1,114 @@
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from lib.web_streamer_helpers.clip_jobs import (
+    COMPLETED,
+    FAILED,
+    ClipJobQueue,
+    ClipQueueFull,
+    ClipRequest,
+)
+
+
+def _request(name: str = "clip", start: float = 0.0) -> ClipRequest:
+    return ClipRequest(source_path="20240101/source.opus", start_seconds=start, end_seconds=5.0, clip_name=name)
+
+
+def test_queue_deduplicates_inflight_requests_and_reports_progress():
+    async def runner():
+        release = threading.Event()
+        calls = []
+        events = []
+
+        def run(request, progress):
+            calls.append(request)
+            progress("encoding", 0.5)
+            assert release.wait(timeout=5)
+            return {"path": f"20240101/{request.clip_name}.opus"}
+
+        executor = ThreadPoolExecutor(max_workers=1)
+        queue = ClipJobQueue(run, executor=executor, publish=lambda kind, payload: events.append((kind, payload)))
+        await queue.start()
+        try:
+            first, first_dedup = queue.submit(_request())
+            second, second_dedup = queue.submit(ClipRequest(" 20240101/source.opus/", 0.0001, 5.0, "clip"))
+            assert second is first
+            assert (first_dedup, second_dedup) == (False, True)
+
+            for _ in range(100):
+                if first.stage == "encoding":
+                    break
+                await asyncio.sleep(0.01)
+            assert first.progress == pytest.approx(0.5)
+
+            release.set()
+            result = await queue.wait(first)
+            assert result == {"path": "20240101/clip.opus"}
+            assert len(calls) == 1
+
+            # Finished jobs no longer deduplicate.
+            third, third_dedup = queue.submit(_request())
+            assert third is not first and not third_dedup
+            await queue.wait(third)
+        finally:
+            await queue.stop()
+            executor.shutdown(wait=True)
+
+        states = [payload["state"] for kind, payload in events if payload["job_id"] == first.job_id]
+        assert states[0] == "queued"
+        assert "running" in states
+        assert states[-1] == COMPLETED
+        assert all(kind == "clip_job" for kind, _ in events)
+        assert queue.get(first.job_id).to_payload()["result"]["path"] == "20240101/clip.opus"
+
+    asyncio.run(runner())
+
+
+def test_queue_refuses_submissions_past_pending_limit():
+    async def runner():
+        release = threading.Event()
+
+        def run(request, progress):
+            release.wait(timeout=5)
+            return {}
+
+        executor = ThreadPoolExecutor(max_workers=1)
+        queue = ClipJobQueue(run, executor=executor, max_pending=1)
+        await queue.start()
+        try:
+            running, _ = queue.submit(_request("a"))
+            for _ in range(100):
+                if running.state == "running":
+                    break
+                await asyncio.sleep(0.01)
+            queue.submit(_request("b"))
+            with pytest.raises(ClipQueueFull):
+                queue.submit(_request("c"))
+            release.set()
+        finally:
+            await queue.stop()
+            executor.shutdown(wait=True)
+
+    asyncio.run(runner())
+
+
+def test_queue_propagates_failures():
+    async def runner():
+        def run(request, progress):
+            raise ValueError("bad range")
+
+        queue = ClipJobQueue(run)
+        await queue.start()
+        try:
+            job, _ = queue.submit(_request())
+            with pytest.raises(ValueError, match="bad range"):
+                await queue.wait(job)
+            assert job.state == FAILED
+            assert job.to_payload()["error"] == "bad range"
+        finally:
+            await queue.stop()
+
+    asyncio.run(runner())
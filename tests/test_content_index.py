@@ -0,0 +1,39 @@
+from lib.content_index import INGESTED, ContentIndex, archive_scope, file_digest
+
+
+def test_lookup_existing_requires_recorded_outputs(tmp_path):
+    source = tmp_path / "drop.wav"
+    source.write_bytes(b"RIFF" + b"\x01" * 5000)
+    digest = file_digest(source, block_bytes=1024)
+    assert digest == file_digest(source)
+
+    index = ContentIndex(tmp_path)
+    assert index.lookup(digest, INGESTED) is None
+
+    output = tmp_path / "20240101" / "12-00-00_Both_RMS-500_1.opus"
+    output.parent.mkdir()
+    output.write_bytes(b"opus")
+    index.record(digest, INGESTED, ["20240101/12-00-00_Both_RMS-500_1.opus"], size=5004)
+
+    record = index.lookup_existing(digest, INGESTED)
+    assert record is not None and record.size == 5004
+    output.unlink()
+    assert index.lookup_existing(digest, INGESTED) is None
+    assert index.lookup(digest, INGESTED) is not None
+
+    # Silent input produced nothing and stays a duplicate.
+    index.record(digest, INGESTED, [])
+    assert index.lookup_existing(digest, INGESTED).outputs == ()
+
+
+def test_add_output_accumulates_per_scope(tmp_path):
+    index = ContentIndex(tmp_path, path=tmp_path / "index.sqlite3")
+    scope = archive_scope("user@host:/srv/archive")
+    index.add_output("abc", scope, "20240101/a.opus")
+    index.add_output("abc", scope, "20240102/b.opus")
+    index.add_output("abc", scope, "20240101/a.opus")
+
+    assert index.lookup("abc", scope).outputs == ("20240101/a.opus", "20240102/b.opus")
+    assert index.lookup("abc", archive_scope("/mnt/share")) is None
+    index.forget("abc", scope)
+    assert index.lookup("abc", scope) is None
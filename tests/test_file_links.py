@@ -0,0 +1,70 @@
+import errno
+import os
+
+import pytest
+
+from lib import file_links
+
+
+def test_link_or_clone_prefers_hardlinks(tmp_path):
+    source = tmp_path / "take.opus"
+    source.write_bytes(b"original")
+    backup = tmp_path / "backup.opus"
+
+    assert file_links.link_or_clone(source, backup) == file_links.HARDLINK
+    assert backup.stat().st_ino == source.stat().st_ino
+
+    # Replacing the source by rename leaves the linked backup untouched.
+    staged = tmp_path / "take.opus.partial"
+    staged.write_bytes(b"new clip")
+    os.replace(staged, source)
+    assert backup.read_bytes() == b"original"
+    assert backup.stat().st_nlink == 1
+
+
+def test_link_or_clone_falls_back_to_copy(tmp_path, monkeypatch):
+    source = tmp_path / "take.opus"
+    source.write_bytes(b"original")
+    backup = tmp_path / "backup.opus"
+
+    def cross_device(*_args, **_kwargs):
+        raise OSError(errno.EXDEV, "Invalid cross-device link")
+
+    monkeypatch.setattr(file_links.os, "link", cross_device)
+    monkeypatch.setattr(file_links, "clone_file", cross_device)
+
+    assert file_links.link_or_clone(source, backup) == file_links.COPY
+    assert backup.read_bytes() == b"original"
+    assert backup.stat().st_ino != source.stat().st_ino
+
+
+def test_link_or_clone_propagates_unexpected_errors(tmp_path):
+    with pytest.raises(FileNotFoundError):
+        file_links.link_or_clone(tmp_path / "missing.opus", tmp_path / "backup.opus")
+
+
+def test_move_or_copy_renames_and_copies_across_devices(tmp_path, monkeypatch):
+    source = tmp_path / "backup.opus"
+    source.write_bytes(b"previous")
+    target = tmp_path / "take.opus"
+    target.write_bytes(b"current")
+    inode = source.stat().st_ino
+
+    assert file_links.move_or_copy(source, target) == file_links.RENAME
+    assert target.read_bytes() == b"previous"
+    assert target.stat().st_ino == inode
+    assert not source.exists()
+
+    source.write_bytes(b"older")
+    real_replace = os.replace
+
+    def replace(src, dst):
+        if os.fspath(src) == os.fspath(source):
+            raise OSError(errno.EXDEV, "Invalid cross-device link")
+        return real_replace(src, dst)
+
+    monkeypatch.setattr(file_links.os, "replace", replace)
+    assert file_links.move_or_copy(source, target) == file_links.COPY
+    assert target.read_bytes() == b"older"
+    assert not source.exists()
+    assert sorted(path.name for path in tmp_path.iterdir()) == ["take.opus"]
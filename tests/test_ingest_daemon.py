@@ -0,0 +1,181 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+import pytest
+
+from lib import ingest_daemon, process_dropped_file
+from lib.ingest_daemon import IngestDaemon, IngestQueue, ThroughputMeter
+
+
+@pytest.fixture
+def dirs(tmp_path, monkeypatch):
+    dropbox = tmp_path / "dropbox"
+    work = tmp_path / "ingest"
+    dropbox.mkdir()
+    monkeypatch.setattr(process_dropped_file, "DROPBOX_DIR", dropbox)
+    monkeypatch.setattr(process_dropped_file, "WORK_DIR", work)
+    monkeypatch.setattr(process_dropped_file, "STABLE_CHECKS", 1)
+    monkeypatch.setattr(process_dropped_file, "STABLE_INTERVAL_SEC", 0.01)
+    return dropbox, work
+
+
+def test_queue_persists_and_resumes_interrupted_items(tmp_path):
+    work = tmp_path / "ingest"
+    queue = IngestQueue(work / ingest_daemon.QUEUE_FILENAME)
+    assert queue.push(work / "a.wav")
+    assert queue.push(work / "b.wav")
+    assert not queue.push(work / "a.wav")
+    running = queue.pop()
+    assert running.path == str(work / "a.wav") and running.attempts == 1
+
+    reopened = IngestQueue(work / ingest_daemon.QUEUE_FILENAME)
+    assert list(reopened.running) == [str(work / "a.wav")]
+    assert reopened.resume([work / "b.wav", work / "c.wav"]) == 2
+    assert [item.path for item in reopened.pending] == [
+        str(work / "a.wav"),
+        str(work / "b.wav"),
+        str(work / "c.wav"),
+    ]
+    assert reopened.pending[0].attempts == 1
+
+
+def test_throughput_meter_reports_files_per_minute_and_realtime_factor():
+    now = [1000.0]
+    meter = ThroughputMeter(window=600, clock=lambda: now[0])
+    meter.record(audio_seconds=120.0, wall_seconds=30.0)
+    now[0] += 30.0
+    meter.record(audio_seconds=60.0, wall_seconds=30.0)
+
+    stats = meter.snapshot()
+    assert stats["files"] == 2
+    assert stats["files_per_minute"] == pytest.approx(2.0)
+    assert stats["realtime_factor"] == pytest.approx(3.0)
+
+    now[0] += 601.0
+    assert meter.snapshot()["files"] == 0
+
+
+def test_daemon_ingests_dropbox_files_and_retires_failures(dirs):
+    dropbox, work = dirs
+    (dropbox / "good.wav").write_bytes(b"x" * 10)
+    (dropbox / "bad.wav").write_bytes(b"y" * 10)
+    (dropbox / "partial.wav.part").write_bytes(b"z")
+    seen = []
+
+    def fake_process(path):
+        seen.append(path)
+        if path.endswith("bad.wav"):
+            raise RuntimeError("decode error")
+        return 12.5
+
+    daemon = IngestDaemon(
+        workers=2,
+        executor=ThreadPoolExecutor(max_workers=2),
+        process=fake_process,
+        cpu_available=lambda: True,
+        use_inotify=False,
+    )
+    daemon.run(until_idle=True)
+
+    assert seen.count(str(work / "good.wav")) == 1
+    assert seen.count(str(work / "bad.wav")) == ingest_daemon.MAX_ATTEMPTS
+    assert not (work / "good.wav").exists()
+    assert (work / "failed" / "bad.wav").exists()
+    assert (dropbox / "partial.wav.part").exists()
+
+    queue = IngestQueue(work / ingest_daemon.QUEUE_FILENAME)
+    assert not queue.pending and not queue.running
+    assert queue.totals == {"files": 1, "failed": 1, "audio_seconds": 12.5}
+
+
+def test_broken_pool_is_only_charged_to_the_file_that_breaks_it(dirs):
+    dropbox, work = dirs
+    (dropbox / "good.wav").write_bytes(b"x" * 10)
+    (dropbox / "poison.wav").write_bytes(b"y" * 10)
+    both_running = threading.Barrier(2)
+    seen = []
+    concurrent = []
+    running = set()
+    lock = threading.Lock()
+
+    def fake_process(path):
+        with lock:
+            seen.append(path)
+            running.add(path)
+            concurrent.append(len(running))
+        try:
+            if len(seen) <= 2:
+                # Both files are in flight when the pool dies.
+                both_running.wait(5.0)
+                raise BrokenProcessPool("worker died")
+            if path.endswith("poison.wav"):
+                raise BrokenProcessPool("worker died")
+            return 3.0
+        finally:
+            with lock:
+                running.discard(path)
+
+    daemon = IngestDaemon(
+        workers=2,
+        executor=ThreadPoolExecutor(max_workers=2),
+        process=fake_process,
+        cpu_available=lambda: True,
+        use_inotify=False,
+    )
+    daemon.run(until_idle=True)
+
+    assert seen.count(str(work / "good.wav")) == 2
+    assert seen.count(str(work / "poison.wav")) == 1 + ingest_daemon.MAX_ATTEMPTS
+    assert concurrent[2:] == [1] * (len(concurrent) - 2)
+    assert (work / "failed" / "poison.wav").exists()
+    queue = IngestQueue(work / ingest_daemon.QUEUE_FILENAME)
+    assert queue.totals == {"files": 1, "failed": 1, "audio_seconds": 3.0}
+
+
+@pytest.mark.skipif(not ingest_daemon.inotify_available(), reason="inotify unavailable")
+def test_daemon_picks_up_closed_files_and_waits_for_cpu(dirs):
+    dropbox, work = dirs
+    processed = threading.Event()
+    admitted = []
+
+    def cpu_available():
+        # The first check is refused, as if the encoder were busy.
+        admitted.append(len(admitted) > 0)
+        return admitted[-1]
+
+    def fake_process(path):
+        processed.set()
+        return 1.0
+
+    daemon = IngestDaemon(
+        workers=1,
+        executor=ThreadPoolExecutor(max_workers=1),
+        process=fake_process,
+        cpu_available=cpu_available,
+        rescan_interval=3600,
+    )
+    thread = threading.Thread(target=daemon.run, daemon=True)
+    thread.start()
+    try:
+        time.sleep(0.2)
+        (dropbox / "late.wav").write_bytes(b"x" * 10)
+        assert processed.wait(5.0)
+    finally:
+        daemon.stop()
+        thread.join(5.0)
+
+    assert admitted[:2] == [False, True]
+    assert not (work / "late.wav").exists()
+
+
+def test_worker_pool_is_spawned(dirs):
+    daemon = IngestDaemon(workers=2, use_inotify=False)
+    executor = daemon._make_executor()
+    try:
+        assert executor._mp_context.get_start_method() == "spawn"
+        assert executor.submit(abs, -3).result(timeout=60) == 3
+    finally:
+        executor.shutdown()
+        daemon.close()
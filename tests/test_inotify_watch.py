@@ -0,0 +1,45 @@
+import asyncio
+import time
+
+import pytest
+
+from lib import inotify_watch
+
+
+@pytest.mark.skipif(
+    not inotify_watch.inotify_available(), reason="inotify is only available on Linux"
+)
+def test_path_watch_wakes_on_append(tmp_path):
+    target = tmp_path / "growing.partial.opus"
+    target.write_bytes(b"head")
+
+    async def runner():
+        async with inotify_watch.AsyncPathWatch(target) as watch:
+            assert watch.active
+
+            async def append():
+                await asyncio.sleep(0.05)
+                with target.open("ab") as handle:
+                    handle.write(b"more")
+
+            writer = asyncio.create_task(append())
+            started = time.monotonic()
+            assert await watch.wait(5.0) is True
+            assert time.monotonic() - started < 2.0
+            await writer
+
+            assert await watch.wait(0.05) is False
+
+    asyncio.run(runner())
+
+
+def test_path_watch_falls_back_to_timeout(tmp_path, monkeypatch):
+    monkeypatch.setattr(inotify_watch, "_libc", None)
+
+    async def runner():
+        watch = inotify_watch.AsyncPathWatch(tmp_path / "missing")
+        assert watch.start() is False
+        assert await watch.wait(0.01) is False
+        watch.close()
+
+    asyncio.run(runner())
@@ -0,0 +1,208 @@
+import os
+import struct
+
+import pytest
+
+from lib import ogg_clip
+
+FRAME_SAMPLES = 960  # 20 ms CELT frames (TOC config 31, code 0)
+PRE_SKIP = 312
+SERIAL = 0x5EED
+
+
+def _reference_crc(data: bytes) -> int:
+    crc = 0
+    for byte in data:
+        crc ^= byte << 24
+        for _ in range(8):
+            crc = ((crc << 1) ^ 0x04C11DB7) if crc & 0x80000000 else crc << 1
+            crc &= 0xFFFFFFFF
+    return crc
+
+
+def _page(header_type: int, granule: int, sequence: int, lacing: list[int], body: bytes) -> bytes:
+    header = struct.pack(
+        "<4sBBqIIIB", b"OggS", 0, header_type, granule, SERIAL, sequence, 0, len(lacing)
+    ) + bytes(lacing)
+    page = bytearray(header + body)
+    struct.pack_into("<I", page, 22, _reference_crc(bytes(page)))
+    return bytes(page)
+
+
+def _lacing(size: int) -> list[int]:
+    return [255] * (size // 255) + [size % 255]
+
+
+def _write_stream(path, *, seconds: float, packets_per_page: int = 10, packet_size: int = 40) -> list[bytes]:
+    head = b"OpusHead" + struct.pack("<BBHIhB", 1, 1, PRE_SKIP, 48000, 0, 0)
+    tags = b"OpusTags" + struct.pack("<I", 4) + b"test" + struct.pack("<I", 0)
+    pages = [_page(0x02, 0, 0, _lacing(len(head)), head), _page(0, 0, 1, _lacing(len(tags)), tags)]
+    total_packets = int(round(seconds * 48000 / FRAME_SAMPLES)) + 1
+    granule = 0
+    sequence = 2
+    audio_pages = []
+    for first in range(0, total_packets, packets_per_page):
+        count = min(packets_per_page, total_packets - first)
+        lacing: list[int] = []
+        body = b""
+        for index in range(first, first + count):
+            packet = b"\xf8" + bytes([index % 256]) * (packet_size - 1)
+            lacing += _lacing(len(packet))
+            body += packet
+        granule += count * FRAME_SAMPLES
+        is_last = first + count >= total_packets
+        page = _page(0x04 if is_last else 0, granule, sequence, lacing, body)
+        audio_pages.append(page)
+        sequence += 1
+    path.write_bytes(b"".join(pages + audio_pages))
+    return audio_pages
+
+
+def _parse(data: bytes) -> list[dict]:
+    pages = []
+    offset = 0
+    while offset < len(data):
+        _capture, _version, header_type, granule, serial, sequence, crc, segments = struct.unpack_from(
+            "<4sBBqIIIB", data, offset
+        )
+        lacing = data[offset + 27 : offset + 27 + segments]
+        size = 27 + segments + sum(lacing)
+        raw = bytearray(data[offset : offset + size])
+        struct.pack_into("<I", raw, 22, 0)
+        pages.append(
+            {
+                "header_type": header_type,
+                "granule": granule,
+                "serial": serial,
+                "sequence": sequence,
+                "crc_ok": crc == _reference_crc(bytes(raw)),
+                "body": bytes(data[offset + 27 + segments : offset + size]),
+            }
+        )
+        offset += size
+    return pages
+
+
+def test_ogg_crc_matches_reference_implementation():
+    for sample in (b"", b"OggS", bytes(range(256)) * 3):
+        assert ogg_clip.ogg_crc(sample) == _reference_crc(sample)
+
+
+def test_build_index_reads_header_and_granules(tmp_path):
+    source = tmp_path / "source.opus"
+    _write_stream(source, seconds=4.0)
+
+    index = ogg_clip.build_index(source)
+
+    assert index.pre_skip == PRE_SKIP
+    assert len(index.header_pages) == 2
+    assert index.serial == SERIAL
+    assert index.audio_pages[-1].granule == index.total_samples + PRE_SKIP
+    assert index.duration_seconds == pytest.approx(4.0, abs=0.05)
+
+
+def test_stream_copy_clip_is_sample_accurate(tmp_path):
+    source = tmp_path / "source.opus"
+    destination = tmp_path / "clip.opus"
+    source_pages = _write_stream(source, seconds=6.0)
+
+    plan = ogg_clip.stream_copy_clip(source, destination, 1.25, 3.5)
+
+    pages = _parse(destination.read_bytes())
+    assert all(page["crc_ok"] for page in pages)
+    assert [page["sequence"] for page in pages] == list(range(len(pages)))
+    assert pages[0]["header_type"] & 0x02
+    head = pages[0]["body"]
+    new_pre_skip = struct.unpack_from("<H", head, 10)[0]
+    assert new_pre_skip == plan.pre_skip
+    # The decoder must run at least 80 ms of pre-roll before the cut.
+    assert new_pre_skip >= ogg_clip.OPUS_PREROLL_SAMPLES
+    assert new_pre_skip <= ogg_clip.MAX_PRE_SKIP
+
+    audio = pages[2:]
+    assert audio[-1]["header_type"] & 0x04
+    assert not any(page["header_type"] & 0x04 for page in audio[:-1])
+    assert audio[-1]["granule"] - new_pre_skip == int((3.5 - 1.25) * 48000)
+    granules = [page["granule"] for page in audio]
+    assert granules == sorted(granules)
+
+    # Audio payloads are copied verbatim from the source pages.
+    source_bodies = [page["body"] for page in _parse(b"".join(source_pages))]
+    first = source_bodies.index(audio[0]["body"])
+    assert [page["body"] for page in audio] == source_bodies[first : first + len(audio)]
+
+    reindexed = ogg_clip.build_index(destination)
+    assert reindexed.duration_seconds == pytest.approx(2.25, abs=1e-6)
+
+
+def test_stream_copy_clip_from_start_keeps_original_pre_skip(tmp_path):
+    source = tmp_path / "source.opus"
+    destination = tmp_path / "clip.opus"
+    _write_stream(source, seconds=3.0)
+
+    plan = ogg_clip.stream_copy_clip(source, destination, 0.0, 1.0)
+
+    assert plan.first_page == 0
+    assert plan.pre_skip == PRE_SKIP
+    assert ogg_clip.build_index(destination).duration_seconds == pytest.approx(1.0, abs=1e-6)
+
+
+def test_plan_clip_rejects_pages_longer_than_pre_skip_range(tmp_path):
+    source = tmp_path / "long_pages.opus"
+    # 100 packets per page puts page boundaries two seconds apart, which is
+    # more than the 16-bit pre-skip field can discard.
+    _write_stream(source, seconds=8.0, packets_per_page=100)
+
+    with pytest.raises(ogg_clip.OggClipUnsupported):
+        ogg_clip.plan_clip(ogg_clip.build_index(source), 3.9, 5.0)
+
+
+def test_build_index_rejects_non_opus_streams(tmp_path):
+    source = tmp_path / "vorbis.ogg"
+    source.write_bytes(_page(0x02, 0, 0, [30], b"\x01vorbis" + bytes(23)))
+
+    with pytest.raises(ogg_clip.OggClipUnsupported):
+        ogg_clip.build_index(source)
+
+    not_ogg = tmp_path / "plain.opus"
+    not_ogg.write_bytes(b"RIFF" + bytes(64))
+    with pytest.raises(ogg_clip.OggClipUnsupported):
+        ogg_clip.build_index(not_ogg)
+
+
+def test_cached_index_tracks_file_changes(tmp_path):
+    source = tmp_path / "source.opus"
+    _write_stream(source, seconds=2.0)
+
+    first = ogg_clip.cached_index(source)
+    assert ogg_clip.cached_index(source) is first
+
+    _write_stream(source, seconds=3.0)
+    stat = source.stat()
+    os.utime(source, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+    refreshed = ogg_clip.cached_index(source)
+    assert refreshed is not first
+    assert refreshed.duration_seconds == pytest.approx(3.0, abs=0.05)
+
+
+def test_slice_waveform_cuts_buckets_and_rejects_coarse_sources():
+    payload = {
+        "version": 1,
+        "channels": 1,
+        "sample_rate": 48000,
+        "frame_count": 480000,
+        "duration_seconds": 10.0,
+        "peak_scale": 32767,
+        "peaks": [value for index in range(1000) for value in (-index, index)],
+        "rms_values": list(range(1000)),
+    }
+
+    sliced = ogg_clip.slice_waveform(payload, 2.0, 5.0)
+    assert sliced is not None
+    assert sliced["rms_values"] == list(range(200, 500))
+    assert sliced["peaks"][:2] == [-200, 200]
+    assert sliced["duration_seconds"] == pytest.approx(3.0)
+    assert sliced["frame_count"] == 144000
+
+    assert ogg_clip.slice_waveform(payload, 2.0, 2.5) is None
+    assert ogg_clip.slice_waveform({"peaks": [0, 0]}, 0.0, 1.0) is None
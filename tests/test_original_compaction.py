@@ -0,0 +1,132 @@
+from __future__ import annotations
+
+import json
+import math
+import os
+import shutil
+import struct
+import time
+import wave
+from pathlib import Path
+
+import pytest
+
+from lib.original_audio import flac_stream_info, open_pcm
+from lib.original_compaction import CompactionSettings, OriginalCompactor
+from lib.recording_metadata import update_original_paths
+from lib.retention import LOCK_DIRNAME, hold_files
+
+
+def _write_wav(path: Path, frames: int = 48000, *, age: float = 3600.0) -> bytes:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    pcm = b"".join(struct.pack("<h", int(8000 * math.sin(i / 20))) for i in range(frames))
+    with wave.open(str(path), "wb") as wav_file:
+        wav_file.setnchannels(1)
+        wav_file.setsampwidth(2)
+        wav_file.setframerate(48000)
+        wav_file.writeframes(pcm)
+    stamp = time.time() - age
+    os.utime(path, (stamp, stamp))
+    return pcm
+
+
+def _sidecar(path: Path, raw_rel: str) -> Path:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps({"peaks": [1, 2], "raw_audio_path": raw_rel}))
+    return path
+
+
+def _settings(tmp_path: Path, **overrides) -> CompactionSettings:
+    values = {
+        "recordings_dir": tmp_path / "recordings",
+        "tmp_dir": tmp_path / "tmp",
+        "min_age": 600.0,
+    }
+    values.update(overrides)
+    return CompactionSettings(**values)
+
+
+def test_flac_stream_info_reads_streaminfo(tmp_path):
+    # STREAMINFO: 48 kHz, 2 channels, 24 bits, 123456 frames.
+    packed = (48000 << 44) | (1 << 41) | (23 << 36) | 123456
+    block = struct.pack(">HH", 4096, 4096) + b"\0" * 6 + struct.pack(">Q", packed) + b"\0" * 16
+    path = tmp_path / "clip.flac"
+    path.write_bytes(b"fLaC" + bytes([0x80, 0, 0, 34]) + block)
+
+    info = flac_stream_info(path)
+    assert (info.sample_rate, info.channels, info.bits_per_sample, info.total_frames) == (48000, 2, 24, 123456)
+
+
+def test_update_original_paths_rewrites_matching_sidecars(tmp_path):
+    root = tmp_path / "recordings"
+    old_rel = ".original_wav/20240101/clip.wav"
+    day = _sidecar(root / "20240101" / "clip.opus.waveform.json", old_rel)
+    saved = _sidecar(root / "Saved" / "20240101" / "clip.opus.waveform.json", old_rel)
+    other = _sidecar(root / "20240101" / "clip-2.opus.waveform.json", ".original_wav/20240101/clip-2.wav")
+
+    updated = update_original_paths(root, old_rel, ".original_wav/20240101/clip.flac")
+
+    assert sorted(updated) == sorted([day, saved])
+    assert json.loads(day.read_text()) == {"peaks": [1, 2], "raw_audio_path": ".original_wav/20240101/clip.flac"}
+    assert json.loads(other.read_text())["raw_audio_path"] == ".original_wav/20240101/clip-2.wav"
+
+
+def test_compactor_waits_for_idle_and_skips_young_or_held_originals(tmp_path):
+    root = tmp_path / "recordings"
+    old = root / ".original_wav" / "20240101" / "old.wav"
+    young = root / ".original_wav" / "20240101" / "young.wav"
+    held = root / ".original_wav" / "20240101" / "held.wav"
+    _write_wav(old)
+    _write_wav(young, age=10)
+    _write_wav(held)
+    (root / ".original_wav" / "20240101" / "done.flac").write_bytes(b"fLaC")
+
+    load = [0.9]
+    compactor = OriginalCompactor(_settings(tmp_path), load=lambda: load[0])
+    assert compactor.busy_reason() == "load 0.90 per CPU above 0.50"
+
+    load[0] = 0.1
+    status_path = tmp_path / "tmp" / "segmenter_status.json"
+    status_path.parent.mkdir(parents=True)
+    status_path.write_text(json.dumps({"encoding": {"active": [{"base_name": "next"}], "pending": []}}))
+    assert compactor.busy_reason() == "segmenter is encoding"
+    status_path.write_text(json.dumps({"encoding": {"active": [], "pending": []}}))
+
+    disabled = OriginalCompactor(_settings(tmp_path, enabled=False))
+    assert disabled.busy_reason() == "disabled in original_compaction.enabled"
+
+    with hold_files([held], lock_dir=tmp_path / "tmp" / LOCK_DIRNAME):
+        assert compactor.due() == [old]
+    assert sorted(compactor.due()) == sorted([old, held])
+
+
+def test_open_pcm_reads_plain_wavs(tmp_path):
+    pcm = _write_wav(tmp_path / "clip.wav", frames=100)
+    with open_pcm(tmp_path / "clip.wav") as wav_file:
+        assert wav_file.getnframes() == 100
+        assert wav_file.readframes(100) == pcm
+
+
+@pytest.mark.skipif(shutil.which("ffmpeg") is None, reason="ffmpeg not available")
+def test_compaction_replaces_wav_with_verified_flac(tmp_path):
+    root = tmp_path / "recordings"
+    wav_path = root / ".original_wav" / "20240101" / "clip.wav"
+    pcm = _write_wav(wav_path)
+    sidecar = _sidecar(root / "20240101" / "clip.opus.waveform.json", ".original_wav/20240101/clip.wav")
+
+    compactor = OriginalCompactor(_settings(tmp_path, max_load_per_cpu=0.0))
+    assert compactor.run_once() == 1
+
+    flac_path = wav_path.with_suffix(".flac")
+    assert not wav_path.exists()
+    assert flac_stream_info(flac_path).total_frames == 48000
+    assert flac_path.stat().st_size < len(pcm)
+    assert json.loads(sidecar.read_text())["raw_audio_path"] == ".original_wav/20240101/clip.flac"
+    with open_pcm(flac_path) as wav_file:
+        assert wav_file.getsampwidth() == 2
+        assert wav_file.readframes(wav_file.getnframes()) == pcm
+    events = list((tmp_path / "tmp" / "recordings_events").glob("*.json"))
+    payload = json.loads(events[0].read_text())["payload"]
+    assert payload["reason"] == "original_compacted"
+    assert payload["paths"] == ["20240101/clip.opus"]
+    assert list(wav_path.parent.glob(".*")) == []
@@ -0,0 +1,116 @@
+import json
+import os
+
+from lib import recycle_bin_utils
+from lib.recycle_bin_index import RecycleBinIndex, entry_disk_usage, index_path_for
+
+
+def _write_entry(recycle_root, entry_id, deleted_at_epoch, payload=b"audio"):
+    entry_dir = recycle_root / entry_id
+    entry_dir.mkdir(parents=True)
+    (entry_dir / "clip.opus").write_bytes(payload)
+    metadata = {"id": entry_id, "stored_name": "clip.opus", "deleted_at_epoch": deleted_at_epoch}
+    (entry_dir / "metadata.json").write_text(json.dumps(metadata), encoding="utf-8")
+    return entry_dir, metadata
+
+
+def _reader(calls):
+    def read(entry_dir):
+        calls.append(entry_dir.name)
+        metadata_path = entry_dir / "metadata.json"
+        if not metadata_path.is_file():
+            return None
+        return json.loads(metadata_path.read_text(encoding="utf-8")), entry_disk_usage(entry_dir)
+
+    return read
+
+
+def _bump_mtime(path):
+    stat = path.stat()
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+
+
+def test_index_pages_by_deletion_time_and_tracks_totals(tmp_path):
+    recycle_root = tmp_path / ".recycle_bin"
+    index = RecycleBinIndex(recycle_root)
+    for number, epoch in enumerate((100.0, 300.0, 200.0)):
+        entry_dir, metadata = _write_entry(recycle_root, f"entry-{number}", epoch, b"x" * (number + 1))
+        index.add(metadata, disk_bytes=entry_disk_usage(entry_dir))
+
+    assert index.path == index_path_for(recycle_root)
+    assert index.path.parent == tmp_path
+    stats = index.stats()
+    assert stats.count == 3
+    metadata_bytes = sum(len((recycle_root / f"entry-{n}" / "metadata.json").read_bytes()) for n in range(3))
+    assert stats.total_bytes == 1 + 2 + 3 + metadata_bytes
+
+    assert [row["id"] for row in index.page()] == ["entry-1", "entry-2", "entry-0"]
+    assert [row["id"] for row in index.page(offset=1, limit=1)] == ["entry-2"]
+
+    generation = stats.generation
+    index.remove(["entry-1"])
+    stats = index.stats()
+    assert stats.count == 2
+    assert stats.generation > generation
+    assert index.get("entry-1") is None
+    assert index.get("entry-0")["deleted_at_epoch"] == 100.0
+
+
+def test_sync_only_parses_unseen_entries_when_the_bin_changes(tmp_path):
+    recycle_root = tmp_path / ".recycle_bin"
+    _write_entry(recycle_root, "first", 1.0)
+    _write_entry(recycle_root, "second", 2.0)
+    index = RecycleBinIndex(recycle_root)
+
+    calls: list[str] = []
+    assert index.sync(_reader(calls))
+    assert sorted(calls) == ["first", "second"]
+
+    calls.clear()
+    assert not index.sync(_reader(calls))
+    assert calls == []
+
+    # Another process adds one entry and removes one without touching the index.
+    _write_entry(recycle_root, "third", 3.0)
+    for child in (recycle_root / "first").iterdir():
+        child.unlink()
+    (recycle_root / "first").rmdir()
+    _bump_mtime(recycle_root)
+
+    assert index.sync(_reader(calls))
+    assert calls == ["third"]
+    assert [row["id"] for row in index.page()] == ["third", "second"]
+    assert index.stats().count == 2
+
+
+def test_full_sync_refreshes_edited_entries(tmp_path):
+    recycle_root = tmp_path / ".recycle_bin"
+    entry_dir, metadata = _write_entry(recycle_root, "entry", 5.0)
+    index = RecycleBinIndex(recycle_root)
+    index.add(metadata)
+
+    metadata["deleted_at_epoch"] = 50.0
+    (entry_dir / "metadata.json").write_text(json.dumps(metadata), encoding="utf-8")
+    assert not index.sync(_reader([]))
+    assert index.get("entry")["deleted_at_epoch"] == 5.0
+
+    assert index.sync(_reader([]), full=True)
+    assert index.get("entry")["deleted_at_epoch"] == 50.0
+
+
+def test_move_short_recording_updates_index(tmp_path):
+    recordings_root = tmp_path / "recordings"
+    day_dir = recordings_root / "20240101"
+    day_dir.mkdir(parents=True)
+    audio = day_dir / "short.opus"
+    audio.write_bytes(b"tiny")
+
+    result = recycle_bin_utils.move_short_recording_to_recycle_bin(audio, recordings_root, duration=0.4)
+
+    index = RecycleBinIndex(recordings_root / recycle_bin_utils.RECYCLE_BIN_DIRNAME)
+    rows = index.page()
+    assert [row["id"] for row in rows] == [result.entry_id]
+    assert rows[0]["original_path"] == "20240101/short.opus"
+    assert index.stats().total_bytes == entry_disk_usage(result.entry_dir)
+    # Nothing changed behind the writer's back, so readers do not rescan.
+    assert not index.sync(_reader([]))
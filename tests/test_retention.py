@@ -0,0 +1,188 @@
+from __future__ import annotations
+
+import json
+import os
+import time
+from collections import namedtuple
+from pathlib import Path
+
+from lib.recycle_bin_index import RecycleBinIndex, entry_disk_usage
+from lib.retention import (
+    LOCK_DIRNAME,
+    ORIGINAL_WAV,
+    RECORDINGS,
+    RECYCLE_BIN,
+    STAGING,
+    RetentionEngine,
+    RetentionReport,
+    RetentionSettings,
+    hold_files,
+    locked_paths,
+)
+from lib.web_streamer_helpers.recordings_changes import REMOVED, RecordingsChangeLog
+
+Usage = namedtuple("Usage", "total used free")
+DAY = 86400.0
+
+
+def _write(path: Path, size: int, age: float, now: float) -> Path:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_bytes(b"x" * size)
+    os.utime(path, (now - age, now - age))
+    return path
+
+
+def _recycle_entry(root: Path, entry_id: str, size: int, deleted_at: float) -> Path:
+    entry_dir = root / ".recycle_bin" / entry_id
+    entry_dir.mkdir(parents=True)
+    (entry_dir / "clip.opus").write_bytes(b"r" * size)
+    (entry_dir / "metadata.json").write_text(json.dumps({"id": entry_id, "deleted_at_epoch": deleted_at}))
+    return entry_dir
+
+
+def _settings(tmp_path: Path, **raw) -> RetentionSettings:
+    return RetentionSettings.from_cfg(
+        {
+            "paths": {"recordings_dir": str(tmp_path / "recordings"), "tmp_dir": str(tmp_path / "tmp")},
+            "retention": raw,
+        }
+    )
+
+
+def test_plans_by_age_quota_and_pressure_in_one_pass(tmp_path):
+    now = time.time()
+    rec = tmp_path / "recordings"
+    tmp = tmp_path / "tmp"
+    old = _write(rec / "20240101" / "old.opus", 100, 40 * DAY, now)
+    _write(rec / "20240101" / "old.opus.waveform.json", 10, 40 * DAY, now)
+    raw = _write(rec / ".original_wav" / "20240101" / "old.wav", 1000, 40 * DAY, now)
+    mid = _write(rec / "20240102" / "mid.opus", 100, 5 * DAY, now)
+    new = _write(rec / "20240103" / "new.opus", 100, 1 * DAY, now)
+    fresh = _write(rec / "20240103" / "fresh.opus", 100, 10, now)
+    saved = _write(rec / "Saved" / "20240101" / "kept.opus", 100, 90 * DAY, now)
+    mid_raw = _write(rec / ".original_wav" / "20240102" / "mid.wav", 1000, 5 * DAY, now)
+    stale = _write(tmp / "abandoned.wav", 500, 2 * DAY, now)
+    parallel = _write(tmp / "parallel" / "chunk.wav", 500, 10, now)
+    _write(tmp / "hls" / "segment.ts", 50, 2 * DAY, now)
+    binned = entry_disk_usage(_recycle_entry(rec, "bin-old", 300, now - 20 * DAY))
+    _recycle_entry(rec, "bin-new", 300, now - 1 * DAY)
+
+    settings = _settings(
+        tmp_path,
+        tmpfs={"stale_after_hours": 12, "max_usage_percent": 0},
+        recordings={"max_age_days": 30, "max_usage_percent": 50},
+        original_wav={"max_gb": 0},
+        recycle_bin={"max_age_days": 7},
+    )
+    # tmp and recordings share a filesystem here; it is 1000 bytes over the
+    # 50% cap once the age deletions are subtracted.
+    usage = Usage(total=10_000, used=5000 + 1110 + 500 + binned + 1000, free=0)
+    engine = RetentionEngine(settings, disk_usage=lambda _path: usage, clock=lambda: now)
+
+    dry = engine.run(dry_run=True)
+    assert dry.dry_run and old.exists() and stale.exists()
+    report = engine.run()
+    assert report.as_dict()["deleted"] == dry.as_dict()["deleted"]
+
+    # Age: the old recording (with its sidecar and original WAV), the stale
+    # staging file and the old recycle bin entry.
+    assert not old.exists() and not raw.exists() and not stale.exists()
+    assert not (rec / "20240101").exists()
+    assert not (rec / ".recycle_bin" / "bin-old").exists()
+    # Pressure: the next candidates in priority order cover the 1000 bytes,
+    # so the recycle bin goes before the original WAV and no recording is
+    # touched; the staging chunk is too young to delete.
+    assert not (rec / ".recycle_bin" / "bin-new").exists()
+    assert not mid_raw.exists()
+    assert mid.exists() and new.exists() and fresh.exists() and saved.exists() and parallel.exists()
+    assert (tmp / "hls" / "segment.ts").exists()
+
+    assert report.deleted == {STAGING: 1, RECYCLE_BIN: 2, ORIGINAL_WAV: 1, RECORDINGS: 1}
+    assert report.reclaimed_bytes[RECORDINGS] == 1110
+    assert report.reclaimed_bytes[ORIGINAL_WAV] == 1000
+    assert report.reclaimed_bytes[RECYCLE_BIN] > 600
+    assert report.reasons == {"age": 3, "pressure": 2}
+    assert RecycleBinIndex(rec / ".recycle_bin").stats().count == 0
+
+    events = [json.loads(path.read_text()) for path in (tmp / "recordings_events").glob("*.json")]
+    payloads = {event["payload"]["reason"]: event["payload"] for event in events}
+    assert payloads["deleted"]["paths"] == ["20240101/old.opus"]
+    assert payloads["original_removed"]["paths"] == [".original_wav/20240102/mid.wav"]
+    assert sorted(payloads["recycle_purged"]["entries"]) == ["bin-new", "bin-old"]
+
+
+def test_retention_deletions_reach_the_change_log_as_removed(tmp_path):
+    now = time.time()
+    rec = tmp_path / "recordings"
+    tmp = tmp_path / "tmp"
+    _write(rec / "20240101" / "old.opus", 100, 40 * DAY, now)
+    _write(rec / "20240101" / "old.opus.waveform.json", 10, 40 * DAY, now)
+    _write(rec / "20240101" / "old.opus.transcript.json", 10, 40 * DAY, now)
+    _write(rec / ".original_wav" / "20240101" / "old.wav", 1000, 40 * DAY, now)
+    _write(rec / ".original_wav" / "20240102" / "orphan.wav", 1000, 40 * DAY, now)
+    _write(rec / "20240103" / "new.opus", 100, 1 * DAY, now)
+    settings = _settings(tmp_path, recordings={"max_age_days": 30}, original_wav={"max_age_days": 30})
+    RetentionEngine(settings, clock=lambda: now).run()
+
+    log = RecordingsChangeLog()
+    for path in sorted((tmp / "recordings_events").glob("*.json")):
+        log.observe_event(json.loads(path.read_text()))
+    window = log.since(0, log.epoch)
+    assert not window.reset
+    assert [(change.kind, change.path) for change in window.changes] == [(REMOVED, "20240101/old.opus")]
+
+
+def test_quota_deletes_oldest_and_skips_locked_and_encoding_files(tmp_path):
+    now = time.time()
+    rec = tmp_path / "recordings"
+    tmp = tmp_path / "tmp"
+    first = _write(rec / "20240101" / "first.opus", 400, 4 * DAY, now)
+    second = _write(rec / "20240101" / "second.opus", 400, 3 * DAY, now)
+    third = _write(rec / "20240102" / "third.opus", 400, 2 * DAY, now)
+    fourth = _write(rec / "20240102" / "fourth.opus", 400, 1 * DAY, now)
+    (tmp).mkdir(parents=True)
+    (tmp / "segmenter_status.json").write_text(
+        json.dumps({"encoding": {"pending": [{"base_name": "second"}], "active": []}})
+    )
+
+    settings = _settings(
+        tmp_path,
+        recordings={"max_gb": 1000 / 1024**3, "max_usage_percent": 0},
+        tmpfs={"max_usage_percent": 0},
+    )
+    engine = RetentionEngine(settings, clock=lambda: now)
+    with hold_files([first], lock_dir=tmp / LOCK_DIRNAME):
+        assert locked_paths(tmp / LOCK_DIRNAME) == {str(first)}
+        report = engine.run()
+
+    # 1600 bytes against a 1000 byte quota: the two oldest would go, but one
+    # is held by an encode and the other is still queued, so the next oldest
+    # ones are taken instead.
+    assert first.exists() and second.exists()
+    assert not third.exists() and not fourth.exists()
+    assert report.skipped_locked == 2
+    assert report.reclaimed_bytes[RECORDINGS] == 800
+
+    # Released locks disappear, and so does one whose holder crashed.
+    (tmp / LOCK_DIRNAME / "1-dead.lock").write_text(str(third))
+    assert locked_paths(tmp / LOCK_DIRNAME) == set()
+    assert list((tmp / LOCK_DIRNAME).iterdir()) == []
+
+
+def test_lock_taken_after_planning_is_respected(tmp_path):
+    now = time.time()
+    rec = tmp_path / "recordings"
+    tmp = tmp_path / "tmp"
+    clip = _write(rec / "20240101" / "clip.opus", 100, 60 * DAY, now)
+    engine = RetentionEngine(
+        _settings(tmp_path, recordings={"max_age_days": 30, "max_usage_percent": 0}),
+        clock=lambda: now,
+    )
+    report = RetentionReport(dry_run=False)
+    planned = engine.plan(engine.scan(), now=now, report=report)
+    assert [candidate.key for candidate, _reason in planned] == ["20240101/clip.opus"]
+    with hold_files([clip], lock_dir=tmp / LOCK_DIRNAME):
+        engine.apply(planned, report)
+    assert clip.exists()
+    assert report.skipped_locked == 1
+    assert report.total_bytes == 0
@@ -0,0 +1,169 @@
+from __future__ import annotations
+
+import json
+import os
+import shutil
+import struct
+import subprocess
+import time
+from pathlib import Path
+
+import pytest
+
+from lib.audio_duration import opus_duration_us
+from lib.ogg_clip import ogg_crc
+from lib.original_compaction import CompactionSettings, OriginalCompactor
+from lib.retention import LOCK_DIRNAME, RECORDINGS, RetentionEngine, RetentionSettings, hold_files
+from lib.storage_tiers import RecordingTierer, Tier, TierSettings, opus_channels, status
+
+DAY = 86400.0
+PRE_SKIP = 312
+
+
+def _page(header_type: int, granule: int, sequence: int, body: bytes) -> bytes:
+    lacing = [255] * (len(body) // 255) + [len(body) % 255]
+    page = bytearray(
+        struct.pack("<4sBBqIIIB", b"OggS", 0, header_type, granule, 1, sequence, 0, len(lacing))
+        + bytes(lacing)
+        + body
+    )
+    struct.pack_into("<I", page, 22, ogg_crc(bytes(page)))
+    return bytes(page)
+
+
+def _opus_file(path: Path, *, seconds: float, kbps: float, age_days: float, channels: int = 1) -> Path:
+    """Header-only Ogg Opus stand-in with the size of a ``kbps`` recording."""
+
+    path.parent.mkdir(parents=True, exist_ok=True)
+    head = b"OpusHead" + struct.pack("<BBHIhB", 1, channels, PRE_SKIP, 48000, 0, 0)
+    body = bytes(max(0, int(seconds * kbps * 1000 / 8) - 200))
+    pages = [_page(0x02, 0, 0, head), _page(0, 0, 1, b"OpusTags" + bytes(8))]
+    pages.append(_page(0x04, int(seconds * 48000) + PRE_SKIP, 2, body[:60000]))
+    path.write_bytes(b"".join(pages))
+    stamp = time.time() - age_days * DAY
+    os.utime(path, (stamp, stamp))
+    return path
+
+
+def _sidecar(recording: Path, **payload) -> Path:
+    sidecar = recording.with_name(f"{recording.name}.waveform.json")
+    sidecar.write_text(json.dumps({"peaks": [], **payload}))
+    return sidecar
+
+
+def _settings(tmp_path: Path, **raw) -> TierSettings:
+    section = {
+        "enabled": True,
+        "tiers": [
+            {"name": "archive", "after_days": 180, "bitrate_kbps": 12},
+            {"name": "speech", "after_days": 30, "bitrate_kbps": 24, "application": "bogus"},
+            {"name": "broken", "after_days": "soon", "bitrate_kbps": 8},
+        ],
+    }
+    section.update(raw)
+    return TierSettings.from_cfg(
+        {
+            "paths": {"recordings_dir": str(tmp_path / "recordings"), "tmp_dir": str(tmp_path / "tmp")},
+            "storage_tiers": section,
+        }
+    )
+
+
+def test_settings_sort_tiers_and_pick_the_last_one_reached(tmp_path):
+    settings = _settings(tmp_path)
+
+    assert [tier.name for tier in settings.tiers] == ["speech", "archive"]
+    assert settings.tiers[0] == Tier("speech", 30.0, 24, 1, "voip")
+    assert settings.tier_for(29 * DAY) is None
+    assert settings.tier_for(45 * DAY).name == "speech"
+    assert settings.tier_for(400 * DAY).name == "archive"
+    assert not TierSettings.from_cfg({}).enabled
+
+
+def test_due_skips_recordings_already_tiered_held_encoding_or_saved(tmp_path):
+    root = tmp_path / "recordings"
+    old = _opus_file(root / "20240101" / "old.opus", seconds=10, kbps=48, age_days=40)
+    ancient = _opus_file(root / "20230101" / "ancient.opus", seconds=10, kbps=48, age_days=400)
+    young = _opus_file(root / "20240301" / "young.opus", seconds=10, kbps=48, age_days=5)
+    quiet = _opus_file(root / "20240101" / "quiet.opus", seconds=10, kbps=20, age_days=40)
+    # No waveform sidecar to keep its capture time in.
+    _opus_file(root / "20240101" / "bare.opus", seconds=10, kbps=48, age_days=40)
+    marked = _opus_file(root / "20240101" / "marked.opus", seconds=10, kbps=48, age_days=40)
+    marker = {"name": "speech", "bitrate_kbps": 24, "channels": 1}
+    _sidecar(marked, storage_tier=marker)
+    held = _opus_file(root / "20240101" / "held.opus", seconds=10, kbps=48, age_days=40)
+    queued = _opus_file(root / "20240101" / "queued.opus", seconds=10, kbps=48, age_days=40)
+    saved = _opus_file(root / "Saved" / "20240101" / "saved.opus", seconds=10, kbps=48, age_days=40)
+    for recording in (old, ancient, young, quiet, held, queued, saved):
+        _sidecar(recording)
+    status_path = tmp_path / "tmp" / "segmenter_status.json"
+    status_path.parent.mkdir(parents=True)
+    status_path.write_text(json.dumps({"encoding": {"active": [{"base_name": "queued"}], "pending": []}}))
+
+    assert opus_channels(old) == 1
+    tierer = RecordingTierer(_settings(tmp_path))
+    with hold_files([held], lock_dir=tmp_path / "tmp" / LOCK_DIRNAME):
+        due = [(path.name, tier.name) for path, tier in tierer.due()]
+    assert due == [("ancient.opus", "archive"), ("old.opus", "speech")]
+
+    # The marked recording moves on once its capture time (not the mtime of
+    # the re-encoded file) reaches the next tier.
+    _sidecar(marked, storage_tier={**marker, "recorded_at": time.time() - 400 * DAY})
+    assert ("marked.opus", "archive") in [(path.name, tier.name) for path, tier in tierer.due()]
+
+    with_saved = RecordingTierer(_settings(tmp_path, include_saved=True))
+    assert saved in [path for path, _tier in with_saved.due()]
+    assert ancient not in [path for path, _tier in RecordingTierer(_settings(tmp_path, enabled=False)).due()]
+
+
+@pytest.mark.skipif(shutil.which("ffmpeg") is None, reason="ffmpeg not available")
+def test_idle_pass_reencodes_and_marks_sidecar(tmp_path):
+    root = tmp_path / "recordings"
+    clip = root / "20240101" / "clip.opus"
+    clip.parent.mkdir(parents=True)
+    subprocess.run(
+        [
+            "ffmpeg", "-hide_banner", "-loglevel", "error", "-f", "lavfi",
+            "-i", "anoisesrc=d=6:c=pink:r=48000:a=0.3", "-ac", "1",
+            "-c:a", "libopus", "-b:a", "48k", "-vbr", "on", "-application", "audio", str(clip),
+        ],
+        check=True,
+    )
+    stamp = time.time() - 40 * DAY
+    os.utime(clip, (stamp, stamp))
+    before = clip.stat().st_size
+    duration = opus_duration_us(clip)
+    sidecar = clip.with_name("clip.opus.waveform.json")
+    sidecar.write_text(json.dumps({"peaks": [1, 2], "duration_seconds": duration / 1e6}))
+    tiers = _settings(tmp_path)
+
+    compactor = OriginalCompactor(
+        CompactionSettings(recordings_dir=root, tmp_dir=tmp_path / "tmp", max_load_per_cpu=0.0),
+        tiers=tiers,
+    )
+    assert compactor.run_once() == 1
+
+    assert clip.stat().st_size < before
+    # New bytes get a new mtime (cache busting, download resumes); the
+    # capture time moves to the sidecar.
+    assert clip.stat().st_mtime > stamp + DAY
+    assert abs(opus_duration_us(clip) - duration) <= 20_000
+    payload = json.loads(sidecar.read_text())
+    assert payload["peaks"] == [1, 2]
+    assert payload["storage_tier"]["name"] == "speech"
+    assert payload["storage_tier"]["original_bytes"] == before
+    assert payload["storage_tier"]["recorded_at"] == pytest.approx(stamp, abs=1)
+    assert status(tiers)["saved_bytes"] == before - clip.stat().st_size
+    assert compactor.tierer.due() == []
+    # Retention still sees the recording as 40 days old.
+    retention = RetentionEngine(
+        RetentionSettings.from_cfg(
+            {"paths": {"recordings_dir": str(root), "tmp_dir": str(tmp_path / "tmp")}, "retention": {}}
+        )
+    )
+    (candidate,) = retention.scan()[RECORDINGS]
+    assert candidate.mtime == pytest.approx(stamp, abs=1)
+    events = [json.loads(path.read_text()) for path in (tmp_path / "tmp" / "recordings_events").glob("*.json")]
+    assert events[0]["payload"]["reason"] == "recording_retiered"
+    assert events[0]["payload"]["paths"] == ["20240101/clip.opus"]
+    assert list(clip.parent.glob(".*")) == []
@@ -0,0 +1,150 @@
+import asyncio
+import shutil
+from pathlib import Path
+
+from lib.storage_usage import (
+    LEDGER_FILENAME,
+    ORIGINAL_WAV,
+    RECENT,
+    RECYCLE,
+    SAVED,
+    StorageUsageLedger,
+)
+from lib.web_streamer_helpers.storage_tracker import RECONCILE_RETRY_DELAY, StorageUsageTracker
+
+
+def _write(path, size):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_bytes(b"x" * size)
+    return path
+
+
+def _layout(root):
+    _write(root / "20240101" / "a.opus", 10)
+    _write(root / "20240101" / "a.opus.waveform.json", 3)
+    _write(root / "Saved" / "20240101" / "b.opus", 20)
+    _write(root / ".recycle_bin" / "entry" / "c.opus", 40)
+    _write(root / ".original_wav" / "20240101" / "a.wav", 80)
+    _write(root / ".recycle_bin.index.sqlite3", 1000)
+
+
+def test_reconcile_counts_each_collection_and_persists(tmp_path):
+    root = tmp_path / "recordings"
+    _layout(root)
+    ledger = StorageUsageLedger(root, ignore_top_level=(".recycle_bin.index.sqlite3",))
+
+    usage = ledger.reconcile()
+
+    assert usage.collections == {RECENT: 13, SAVED: 20, RECYCLE: 40, ORIGINAL_WAV: 80}
+    assert usage.total_bytes == 153
+    assert usage.reconciled_at is not None
+    assert (root / LEDGER_FILENAME).is_file()
+
+    reopened = StorageUsageLedger(root).usage()
+    assert reopened == usage
+
+
+def test_ignored_top_level_directories_are_not_walked(tmp_path):
+    root = tmp_path / "recordings"
+    _layout(root)
+    _write(root / ".clip_undo" / "token" / "take.opus", 500)
+    ledger = StorageUsageLedger(root, ignore_top_level=(".recycle_bin.index.sqlite3", ".clip_undo"))
+
+    assert ledger.reconcile().collections[RECENT] == 13
+
+
+def test_refresh_rescans_only_touched_directories(tmp_path):
+    root = tmp_path / "recordings"
+    _layout(root)
+    ledger = StorageUsageLedger(root, ignore_top_level=(".recycle_bin.index.sqlite3",))
+    ledger.reconcile()
+
+    # A recording moves to the recycle bin and a new day appears.
+    entry = root / ".recycle_bin" / "moved"
+    entry.mkdir()
+    (root / "20240101" / "a.opus").rename(entry / "a.opus")
+    _write(root / "20240102" / "d.opus", 5)
+    # A change nobody reports is only picked up by the next reconcile.
+    _write(root / "Saved" / "20240101" / "b.opus", 25)
+
+    ledger.refresh([root / "20240101", root / ".recycle_bin", root])
+    usage = ledger.usage()
+    assert usage.bytes_for(RECENT) == 3 + 5
+    assert usage.bytes_for(RECYCLE) == 40 + 10
+    assert usage.bytes_for(SAVED) == 20
+
+    shutil.rmtree(root / ".recycle_bin" / "entry")
+    ledger.refresh([root / ".recycle_bin", tmp_path / "outside"])
+    assert ledger.usage().bytes_for(RECYCLE) == 10
+
+    assert ledger.reconcile().bytes_for(SAVED) == 25
+
+
+def test_tracker_refreshes_directories_named_by_events(tmp_path):
+    root = tmp_path / "recordings"
+    _layout(root)
+    ledger = StorageUsageLedger(root, ignore_top_level=(".recycle_bin.index.sqlite3",))
+
+    async def runner():
+        tracker = StorageUsageTracker(
+            ledger,
+            relative_path=lambda raw: Path(raw).relative_to(root).as_posix(),
+        )
+        await tracker.start()
+        try:
+            first = tracker.usage
+            assert first.bytes_for(RECENT) == 13
+            generation = tracker.generation
+
+            saved_dir = root / "Saved" / "20240101"
+            (root / "20240101" / "a.opus").rename(saved_dir / "a.opus")
+            tracker.observe_event(
+                {
+                    "type": "recordings_changed",
+                    "payload": {"reason": "saved", "paths": ["Saved/20240101/a.opus"]},
+                }
+            )
+            _write(root / "20240101" / "e.opus", 7)
+            tracker.observe_event(
+                {
+                    "type": "recordings_changed",
+                    "payload": {"reason": "finalized", "path": str(root / "20240101" / "e.opus")},
+                }
+            )
+            await tracker.flush()
+        finally:
+            await tracker.stop()
+
+        usage = tracker.usage
+        assert usage.bytes_for(RECENT) == 3 + 7
+        assert usage.bytes_for(SAVED) == 30
+        assert tracker.generation > generation
+
+    asyncio.run(runner())
+
+
+def test_tracker_backs_off_after_failed_reconciles(tmp_path):
+    root = tmp_path / "recordings"
+    _layout(root)
+    ledger = StorageUsageLedger(root)
+    calls = []
+
+    def broken_reconcile(**_kwargs):
+        calls.append(1)
+        raise OSError("disk unavailable")
+
+    ledger.reconcile = broken_reconcile
+
+    async def runner():
+        tracker = StorageUsageTracker(ledger, reconcile_interval=12.0)
+        assert tracker._next_reconcile_delay() == 0.0
+        delays = []
+        for _ in range(4):
+            await tracker.reconcile()
+            delays.append(tracker._next_reconcile_delay())
+        return delays
+
+    delays = asyncio.run(runner())
+    assert len(calls) == 4
+    expected = [RECONCILE_RETRY_DELAY, RECONCILE_RETRY_DELAY * 2, 12.0, 12.0]
+    assert [round(delay) for delay in delays] == [round(value) for value in expected]
@@ -0,0 +1,169 @@
+from __future__ import annotations
+
+import os
+from pathlib import Path
+
+from lib import sync_manifest
+from lib.content_index import file_digest
+from lib.sync_manifest import MANIFEST_FILENAME, SyncManifest
+
+
+def _write(root: Path, relative: str, data: bytes, mtime: float = 1_700_000_000) -> Path:
+    path = root / relative
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_bytes(data)
+    os.utime(path, (mtime, mtime))
+    return path
+
+
+def _paths(page) -> list[str]:
+    return [entry.path for entry in page.entries]
+
+
+def _drain(manifest: SyncManifest, cursor: int, *, limit: int, epoch: str | None = None):
+    entries = []
+    while True:
+        page = manifest.page(cursor, limit=limit, epoch=epoch)
+        entries.extend(page.entries)
+        cursor = page.next_cursor
+        if not page.has_more:
+            return entries, page
+
+
+def test_manifest_pages_full_listing_and_deltas(tmp_path):
+    root = tmp_path / "recordings"
+    first = _write(root, "20240101/a.opus", b"a" * 10)
+    _write(root, "20240101/a.opus.waveform.json", b"{}")
+    _write(root, "Saved/20240101/kept.opus", b"saved")
+    _write(root, "20240102/live.partial.opus", b"growing")
+    _write(root, ".recycle_bin/x/audio.opus", b"binned")
+    _write(root, ".original_wav/20240101/a.wav", b"wav")
+
+    manifest = SyncManifest(root)
+    assert manifest.refresh() == 3
+    assert manifest.refresh() == 0  # unchanged files are not rehashed or re-sequenced
+    assert (root / MANIFEST_FILENAME).exists()
+
+    entries, last = _drain(manifest, 0, limit=2)
+    assert sorted(entry.path for entry in entries) == [
+        "20240101/a.opus",
+        "20240101/a.opus.waveform.json",
+        "Saved/20240101/kept.opus",
+    ]
+    by_path = {entry.path: entry for entry in entries}
+    assert by_path["20240101/a.opus"].digest == file_digest(first)
+    assert by_path["20240101/a.opus"].size == 10
+    assert by_path["20240101/a.opus"].mtime == 1_700_000_000
+    cursor, epoch = last.next_cursor, last.epoch
+    assert cursor == last.latest == 3
+
+    assert manifest.page(cursor, epoch=epoch).entries == ()
+
+    # Rewrite, add, delete and rename; only those show up after the cursor.
+    _write(root, "20240101/a.opus", b"b" * 12, mtime=1_700_000_100)
+    _write(root, "20240103/new.opus", b"new")
+    (root / "20240101" / "a.opus.waveform.json").unlink()
+    (root / "Saved" / "20240101" / "kept.opus").rename(root / "Saved" / "20240101" / "renamed.opus")
+    assert manifest.refresh() == 5
+
+    delta, last = _drain(manifest, cursor, limit=10, epoch=epoch)
+    assert not last.reset
+    changes = {entry.path: entry for entry in delta}
+    assert set(changes) == {
+        "20240101/a.opus",
+        "20240103/new.opus",
+        "20240101/a.opus.waveform.json",
+        "Saved/20240101/kept.opus",
+        "Saved/20240101/renamed.opus",
+    }
+    assert changes["20240101/a.opus"].size == 12
+    assert changes["20240101/a.opus.waveform.json"].deleted
+    assert changes["Saved/20240101/kept.opus"].deleted
+    assert changes["Saved/20240101/renamed.opus"].digest == by_path["Saved/20240101/kept.opus"].digest
+    assert changes["20240101/a.opus.waveform.json"].as_dict() == {
+        "path": "20240101/a.opus.waveform.json",
+        "seq": changes["20240101/a.opus.waveform.json"].seq,
+        "deleted": True,
+    }
+
+    # A fresh full listing leaves the tombstones out.
+    full, _ = _drain(manifest, 0, limit=100)
+    assert sorted(entry.path for entry in full) == [
+        "20240101/a.opus",
+        "20240103/new.opus",
+        "Saved/20240101/renamed.opus",
+    ]
+
+
+def test_manifest_resets_stale_cursors(tmp_path):
+    root = tmp_path / "recordings"
+    doomed = _write(root, "20240101/doomed.opus", b"x")
+    _write(root, "20240101/kept.opus", b"y")
+    manifest = SyncManifest(root)
+    manifest.refresh(now=1000.0)
+    cursor = manifest.page(0).next_cursor
+
+    doomed.unlink()
+    manifest.refresh(now=2000.0, tombstone_retention=500.0)
+    assert manifest.page(cursor).entries[0].deleted
+
+    # Once the tombstone is pruned the old cursor would miss the deletion.
+    assert manifest.refresh(now=3000.0, tombstone_retention=500.0) == 0
+    page = manifest.page(cursor)
+    assert page.reset
+    assert _paths(page) == ["20240101/kept.opus"]
+
+    current = manifest.page(page.next_cursor)
+    assert not current.reset and current.entries == ()
+    assert manifest.page(page.next_cursor, epoch="other-device").reset
+
+    # Recreating the database starts a new epoch.
+    (root / MANIFEST_FILENAME).unlink()
+    manifest.refresh()
+    assert manifest.page(0).epoch != page.epoch
+
+
+def test_refresh_step_hashes_within_budget_and_serves_partial_pages(tmp_path):
+    root = tmp_path / "recordings"
+    for index in range(5):
+        _write(root, f"20240101/{index}.opus", bytes([index]) * 100)
+
+    manifest = SyncManifest(root)
+    first = manifest.refresh_step(max_bytes=150)
+    assert (first.changed, first.remaining, first.complete) == (2, 3, False)
+    page = manifest.page(0)
+    assert len(page.entries) == 2 and not page.has_more
+
+    second = manifest.refresh_step(max_bytes=150)
+    assert (second.changed, second.remaining) == (2, 1)
+    last = manifest.refresh_step(max_bytes=150)
+    assert last.complete
+    entries, _page = _drain(manifest, 0, limit=10)
+    assert sorted(entry.path for entry in entries) == [f"20240101/{index}.opus" for index in range(5)]
+    assert manifest.refresh_step(max_bytes=1).changed == 0
+
+
+def test_refresh_steps_walk_the_tree_once_per_pass(tmp_path, monkeypatch):
+    root = tmp_path / "recordings"
+    for index in range(4):
+        _write(root, f"20240101/{index}.opus", bytes([index]) * 100)
+    walks = []
+    real_walk = sync_manifest._walk
+
+    def _counting_walk(path):
+        walks.append(path)
+        return real_walk(path)
+
+    monkeypatch.setattr(sync_manifest, "_walk", _counting_walk)
+    manifest = SyncManifest(root)
+    manifest.prepare()
+    journal = root / f"{MANIFEST_FILENAME}-journal"
+    assert journal.exists()
+    results = [manifest.refresh_step(max_bytes=1) for _ in range(4)]
+    assert [result.remaining for result in results] == [3, 2, 1, 0]
+    assert len(walks) == 1
+    # The journal is kept, so writes leave the root's entries alone.
+    assert journal.exists()
+    # A completed pass starts the next one with a new walk.
+    manifest.refresh_step(max_bytes=1)
+    assert len(walks) == 2
@@ -0,0 +1,63 @@
+import io
+import os
+import zipfile
+
+import pytest
+
+from lib.web_streamer_helpers.zip_stream import ZipStreamWriter
+
+
+def _build_archive(members, **kwargs):
+    writer = ZipStreamWriter(**kwargs)
+    output = io.BytesIO()
+    for name, data in members:
+        output.write(writer.start_member(name, mtime=1_700_000_000, size_hint=len(data)))
+        for start in range(0, len(data), 7):
+            output.write(writer.feed(data[start : start + 7]))
+        output.write(writer.end_member())
+    output.write(writer.finish())
+    assert writer.bytes_written == output.tell()
+    return output.getvalue()
+
+
+@pytest.mark.parametrize("zip64_limit", [None, 0])
+def test_streamed_archive_round_trips(zip64_limit):
+    members = [
+        ("20240101/alpha.opus", os.urandom(1000)),
+        ("20240101/alpha.opus.waveform.json", b'{"duration_seconds": 1.0}'),
+        ("20240101/empty.opus", b""),
+        ("20240101/ünïcode.opus", b"data"),
+    ]
+    kwargs = {} if zip64_limit is None else {"zip64_limit": zip64_limit}
+    archive_bytes = _build_archive(members, **kwargs)
+
+    with zipfile.ZipFile(io.BytesIO(archive_bytes)) as archive:
+        assert archive.testzip() is None
+        assert archive.namelist() == [name for name, _ in members]
+        for name, data in members:
+            info = archive.getinfo(name)
+            assert info.compress_type == zipfile.ZIP_STORED
+            assert info.file_size == len(data)
+            assert archive.read(name) == data
+        assert archive.getinfo("20240101/alpha.opus").date_time[0] == 2023
+
+
+def test_many_members_use_zip64_end_records():
+    members = [(f"f{index}", b"x") for index in range(0x10000)]
+    archive_bytes = _build_archive(members)
+    assert b"PK\x06\x06" in archive_bytes[-200:]
+
+    with zipfile.ZipFile(io.BytesIO(archive_bytes)) as archive:
+        assert len(archive.infolist()) == 0x10000
+        assert archive.read("f65535") == b"x"
+
+
+def test_writer_rejects_out_of_order_calls():
+    writer = ZipStreamWriter()
+    with pytest.raises(RuntimeError):
+        writer.feed(b"data")
+    writer.start_member("a", mtime=0)
+    with pytest.raises(RuntimeError):
+        writer.start_member("b", mtime=0)
+    with pytest.raises(RuntimeError):
+        writer.finish()